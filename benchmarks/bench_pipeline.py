@@ -0,0 +1,167 @@
+"""
+Benchmarks the frame pipeline on synthetic frames (see synthetic_frames.py), so it runs without a camera:
+splitting every frame layout, decoding, stats, hotspots, rendering at every scale and colormap, and recording.
+Prints the frames per second of each benchmark. The results can be saved as a baseline, and later runs compared against it:
+the exit code is 1 if any benchmark got slower than the baseline by more than the threshold.
+
+Usage: python benchmarks/bench_pipeline.py [--frames N] [--only NAME] [--json PATH] [--save-baseline PATH] [--baseline PATH] [--threshold FRACTION]
+"""
+import argparse, json, logging, os, platform, sys, tempfile, time
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.synthetic_frames import FRAME_LAYOUTS, SyntheticFrameGenerator
+from src.controllers.guiController import GuiController
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.defaults.values import DEFAULT_SCALE, SCALE_MAX, SCALE_MIN
+from src.enums.ColormapEnum import Colormap
+from src.enums.RawCompressionEnum import RawCompression
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.recording.rawstream import RawStreamWriter
+
+DEFAULT_DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+DEFAULT_FRAMES = 100
+DEFAULT_REPEATS = 3
+DEFAULT_REGRESSION_THRESHOLD = 0.2 # A benchmark regressed if it lost more than this share of its baseline fps
+WARMUP_FRAMES = 10
+
+def measureFps(step, items: list, repeats: int = DEFAULT_REPEATS) -> float:
+    """
+    Runs step on every item, after a warm-up, and returns the frames per second of the fastest of the repeats.
+    The fastest run is the one least disturbed by the rest of the machine.
+    """
+    for item in items[:WARMUP_FRAMES]:
+        step(item)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for item in items:
+            step(item)
+        best = min(best, time.perf_counter() - start)
+    return len(items) / best
+
+def runBenchmarks(device: DeviceInfo, frameCount: int, scales: list[int], colormaps: list[Colormap], repeats: int = DEFAULT_REPEATS, only: list[str] | None = None) -> dict[str, float]:
+    """
+    Runs every benchmark whose name starts with one of `only` (all by default) and returns the frames per second by name.
+    """
+    logger = logging.getLogger("bench_pipeline")
+    selected = lambda name: not only or any(name.startswith(prefix) for prefix in only)
+    generator = SyntheticFrameGenerator(device)
+    raws = [generator.raw(index) for index in range(frameCount)]
+    results: dict[str, float] = {}
+
+    with tempfile.TemporaryDirectory() as tempDir:
+        controller = ThermalCameraController(device=device, logger=logger, mediaOutputPath=tempDir, headless=True, printStats=False, hotspotCount=3)
+
+        # Splitting every layout (converted frames are rejected)
+        for layout in FRAME_LAYOUTS:
+            if selected(f"split/{layout.name}"):
+                frames = [generator.frameFromRaw(raw, layout) for raw in raws]
+                results[f"split/{layout.name}"] = measureFps(lambda frame: controller._splitFrameData(frame, logWarnings=False), frames, repeats)
+
+        # Analysis of the thermal half
+        frames = [generator.frameFromRaw(raw) for raw in raws]
+        halves = [controller._splitFrameData(frame) for frame in frames]
+        if selected("decode"):
+            results["decode"] = measureFps(lambda halves: controller.decodeThermalData(halves[1]), halves, repeats)
+        if selected("stats"):
+            results["stats"] = measureFps(controller.calculateFrameStats, raws, repeats)
+        if selected("hotspots"):
+            results["hotspots"] = measureFps(controller.calculateHotspots, raws, repeats)
+        if selected("process"):
+            results["process"] = measureFps(lambda frame: controller.processFrame(frame, 0), frames, repeats)
+
+        # Rendering (the stats are the same for every configuration)
+        rendered = [(imdata, thdata, controller.calculateFrameStats(raw)) for (imdata, thdata), raw in zip(halves, raws)]
+        for scale in scales:
+            for colormap in colormaps:
+                name = f"render/x{scale}/{colormap.name}"
+                if selected(name):
+                    gui = GuiController(logger, scale=scale, colormap=colormap, headless=True)
+                    results[name] = measureFps(lambda frame: gui.drawGUI(*frame, labelThreshold=2, isRecording=False), rendered, repeats)
+
+        # Recording
+        for compression in RawCompression:
+            name = f"record/raw-{compression.name}"
+            if selected(name):
+                header = RawStreamHeader.createFromDeviceInfo(device, width=generator.width, height=generator.height, compression=compression)
+                writer = RawStreamWriter(os.path.join(tempDir, f"{compression.name}.ptr"), header)
+                results[name] = measureFps(lambda raw: writer.write(raw, timestamp=0), raws, repeats)
+                writer.close()
+        if selected("record/avi"):
+            gui = GuiController(logger, scale=DEFAULT_SCALE, headless=True)
+            views = [gui.drawGUI(*frame, labelThreshold=2, isRecording=False).copy() for frame in rendered]
+            videoOut = cv2.VideoWriter(os.path.join(tempDir, "output.avi"), cv2.VideoWriter_fourcc(*'YUY2'), 25, (gui.scaledWidth, gui.scaledHeight))
+            results["record/avi"] = measureFps(videoOut.write, views, repeats)
+            videoOut.release()
+        controller.close()
+    return results
+
+def compareToBaseline(results: dict[str, float], baseline: dict[str, float], threshold: float = DEFAULT_REGRESSION_THRESHOLD) -> list[str]:
+    """
+    Returns the names of the benchmarks that lost more than `threshold` of their baseline frames per second.
+    Benchmarks missing from either side are not compared.
+    """
+    return [name for name, fps in results.items() if name in baseline and fps < baseline[name] * (1 - threshold)]
+
+def getEnvironment() -> dict[str, str]:
+    """
+    Describes the machine and libraries, since results are only comparable on the same setup.
+    """
+    return {"platform": platform.platform(), "processor": platform.processor() or platform.machine(), "python": platform.python_version(), "numpy": np.__version__, "opencv": cv2.__version__}
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the frame pipeline on synthetic frames, and compares the results with a baseline.")
+    parser.add_argument("--device", dest="device_json", type=str, default=DEFAULT_DEVICE_JSON_PATH, help="The device JSON the frames are generated for. Default is the TC001.")
+    parser.add_argument("--frames", type=int, default=DEFAULT_FRAMES, help=f"Number of frames per benchmark. Default is {DEFAULT_FRAMES}.")
+    parser.add_argument("--repeats", type=int, default=DEFAULT_REPEATS, help=f"Number of timed runs per benchmark; the fastest one counts. Default is {DEFAULT_REPEATS}.")
+    parser.add_argument("--scales", type=int, nargs="+", default=list(range(SCALE_MIN, SCALE_MAX + 1)), help="The scales to render at. Default is all of them.")
+    parser.add_argument("--colormaps", type=str.upper, nargs="+", choices=[colormap.name for colormap in Colormap], default=[colormap.name for colormap in Colormap],
+                        help="The colormaps to render with. Default is all of them.")
+    parser.add_argument("--only", type=str, action="append", default=None, help="Only run the benchmarks whose name starts with this (e.g. split, render/x3). Can be given several times.")
+    parser.add_argument("--json", dest="json_path", type=str, default=None, help="Also write the results to this JSON file.")
+    parser.add_argument("--save-baseline", dest="save_baseline", type=str, default=None, help="Save the results as the baseline to this JSON file.")
+    parser.add_argument("--baseline", type=str, default=None, help="Compare the results with the baseline in this JSON file. The exit code is 1 if any benchmark regressed.")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_REGRESSION_THRESHOLD,
+                        help=f"The share of its baseline fps a benchmark may lose before it counts as regressed. Default is {DEFAULT_REGRESSION_THRESHOLD}.")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.baseline is not None:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get("environment") != getEnvironment():
+            print(f"Warning: the baseline was taken on a different setup ({baseline.get('environment')}), so the comparison may not be meaningful.")
+
+    results = runBenchmarks(DeviceInfo.createFromJson(args.device_json), args.frames, args.scales, [Colormap[name] for name in args.colormaps], args.repeats, args.only)
+    if not results:
+        parser.error(f"--only {' '.join(args.only)} matches no benchmark.") # Exits before an empty result could overwrite a baseline
+
+    baselineResults = baseline["results"] if baseline is not None else {}
+    regressions = compareToBaseline(results, baselineResults, args.threshold)
+    width = max(len(name) for name in results)
+    print(f"{'benchmark':<{width}} {'fps':>10}" + (f" {'baseline':>10} {'change':>8}" if baseline is not None else ""))
+    for name, fps in results.items():
+        line = f"{name:<{width}} {fps:>10.1f}"
+        if name in baselineResults:
+            line += f" {baselineResults[name]:>10.1f} {fps / baselineResults[name] - 1:>+8.1%}" + ("  REGRESSED" if name in regressions else "")
+        print(line)
+
+    output = {"environment": getEnvironment(), "frames": args.frames, "results": {name: round(fps, 1) for name, fps in results.items()}}
+    for path in (args.json_path, args.save_baseline):
+        if path is not None:
+            with open(path, "w") as f:
+                json.dump(output, f, indent=4)
+
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) regressed by more than {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
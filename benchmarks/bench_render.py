@@ -0,0 +1,73 @@
+"""
+Benchmarks the render path (GuiController.drawGUI) for every upscale interpolation at scales 1-5,
+with and without native compositing, and prints the frames per second of each.
+
+Usage: python benchmarks/bench_render.py [--frames N] [--json PATH]
+"""
+import argparse, json, logging, os, sys, time
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.guiController import GuiController
+from src.defaults.values import DEFAULT_SENSOR_HEIGHT_PX, DEFAULT_SENSOR_WIDTH_PX, SCALE_MAX, SCALE_MIN
+from src.enums.ColormapEnum import Colormap
+from src.enums.InterpolationEnum import Interpolation
+from src.models.framestats import FrameStats
+
+def makeFrames(count: int, width: int = DEFAULT_SENSOR_WIDTH_PX, height: int = DEFAULT_SENSOR_HEIGHT_PX) -> list[tuple[np.ndarray, np.ndarray, FrameStats]]:
+    """
+    Makes synthetic (imdata, thdata, stats) frames: a moving warm blob over noise, as YUYV image and thermal halves.
+    """
+    rng = np.random.default_rng(0)
+    rows, cols = np.mgrid[0:height, 0:width]
+    frames = []
+    for index in range(count):
+        blob = 120 * np.exp(-((rows - height / 2) ** 2 + (cols - (index * 3) % width) ** 2) / 400.0)
+        luma = np.clip(60 + blob + rng.normal(0, 3, size=(height, width)), 0, 255).astype(np.uint8)
+        imdata = np.dstack([luma, np.full_like(luma, 128)])
+        thdata = rng.integers(0, 255, size=(height, width, 2), dtype=np.uint8)
+        stats = FrameStats(18000, 30.0, 25.0 + 0.01 * (index % 10), 20.0, 45.0, 1.0, 21.0, 25.0, 44.0, 10, 10, height // 2, (index * 3) % width)
+        frames.append((imdata, thdata, stats))
+    return frames
+
+def benchmark(frames: list, scale: int, interpolation: Interpolation, nativeCompositing: bool) -> float:
+    """
+    Renders all frames once to warm up and once timed, and returns the frames per second.
+    """
+    gui = GuiController(logging.getLogger("bench_render"), scale=scale, colormap=Colormap.JET, headless=True, interpolation=interpolation, nativeCompositing=nativeCompositing)
+    for imdata, thdata, stats in frames[:10]:
+        gui.drawGUI(imdata, thdata, stats, labelThreshold=2, isRecording=False)
+
+    start = time.perf_counter()
+    for imdata, thdata, stats in frames:
+        gui.drawGUI(imdata, thdata, stats, labelThreshold=2, isRecording=False)
+    return len(frames) / (time.perf_counter() - start)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks the render path for every interpolation and scale.")
+    parser.add_argument("--frames", type=int, default=200, help="Number of frames rendered per configuration. Default is 200.")
+    parser.add_argument("--json", dest="json_path", type=str, default=None, help="Also write the results to this JSON file.")
+    args = parser.parse_args()
+
+    frames = makeFrames(args.frames)
+    results = []
+    print(f"{'compositing':<12} {'interpolation':<14}" + "".join(f"{f'x{scale} fps':>10}" for scale in range(SCALE_MIN, SCALE_MAX + 1)))
+    for nativeCompositing in (False, True):
+        for interpolation in Interpolation:
+            row = []
+            for scale in range(SCALE_MIN, SCALE_MAX + 1):
+                fps = benchmark(frames, scale, interpolation, nativeCompositing)
+                row.append(fps)
+                results.append({"native_compositing": nativeCompositing, "interpolation": interpolation.name, "scale": scale, "fps": round(fps, 1)})
+            print(f"{'native' if nativeCompositing else 'scaled':<12} {interpolation.name:<14}" + "".join(f"{fps:>10.1f}" for fps in row))
+
+    if args.json_path is not None:
+        with open(args.json_path, "w") as f:
+            json.dump({"frames": args.frames, "results": results}, f, indent=4)
+
+if __name__ == "__main__":
+    main()
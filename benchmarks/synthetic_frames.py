@@ -0,0 +1,110 @@
+"""
+Generates realistic synthetic frames of a thermal camera, so the pipeline can be benchmarked and tested without the hardware.
+
+The scene is an ambient background with a gentle gradient, a few drifting Gaussian hot spots and sensor noise (the device's NETD by default).
+Frames are built the way the camera sends them: the visible (AGC luma) half on top of the thermal (raw little-endian) half,
+in each of the layouts ThermalCameraController._splitFrameData handles.
+"""
+import os, sys
+import numpy as np
+from numpy.typing import NDArray
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.enums.FrameLayoutEnum import FrameLayout
+from src.helpers.thermal_decoding import getRawDtype
+from src.models.deviceinfo import DeviceInfo
+
+# The frame layouts capture backends deliver:
+# YUY2: (2*height, width, 2) uint8, the normal raw capture
+# UINT16: (2*height, width) uint16, packed YUY2 as exposed by some V4L2 paths
+# PADDED: (1, 2*height*stride*2) uint8, a flattened buffer with a padded row stride
+# CONVERTED: (2*height, width, 3) uint8, a BGR frame OpenCV already converted, which has to be rejected
+FRAME_LAYOUTS: tuple[FrameLayout, ...] = (FrameLayout.YUY2, FrameLayout.UINT16, FrameLayout.PADDED, FrameLayout.CONVERTED)
+PADDED_STRIDE_EXTRA_PX: int = 32
+
+class SyntheticFrameGenerator:
+    """
+    Generates the frames of one device. Frame contents only depend on the seed and the frame index, apart from the noise.
+    """
+    def __init__(self,
+                 device: DeviceInfo,
+                 hotspots: int = 3,
+                 hotspotPeakC: float = 30.0,
+                 hotspotRadiusPx: float = 8.0,
+                 ambientC: float = 22.0,
+                 noiseC: float | None = None,
+                 seed: int = 0):
+        self.device = device
+        self.width = device.specs.imaging.ir_resolution_width_px
+        self.height = device.specs.imaging.ir_resolution_height_px
+        self.ambientC = ambientC
+        self.hotspotPeakC = hotspotPeakC
+        self.hotspotRadiusPx = hotspotRadiusPx
+        self.noiseC = noiseC if noiseC is not None else (device.specs.imaging.netd_mk or 0) / 1000
+        self._rng = np.random.default_rng(seed)
+        self._rows, self._cols = np.mgrid[0:self.height, 0:self.width].astype(np.float32)
+        # Each hot spot circles around its own center, at its own speed
+        self._centers = self._rng.uniform((0.2 * self.height, 0.2 * self.width), (0.8 * self.height, 0.8 * self.width), size=(hotspots, 2))
+        self._phases = self._rng.uniform(0, 2 * np.pi, size=hotspots)
+        self._speeds = self._rng.uniform(0.02, 0.08, size=hotspots)
+        self._background = (ambientC + 2.0 * self._cols / self.width).astype(np.float32)
+
+    def hotspotPositions(self, index: int) -> NDArray[np.float64]:
+        """
+        Returns the (row, col) of every hot spot's peak in the given frame.
+        """
+        angles = self._phases + self._speeds * index
+        return self._centers + 10.0 * np.stack([np.sin(angles), np.cos(angles)], axis=1)
+
+    def temperatures(self, index: int) -> NDArray[np.float32]:
+        """
+        Returns the temperature field of the given frame, in Celsius. The noise differs on every call.
+        """
+        field = self._background.copy()
+        for row, col in self.hotspotPositions(index):
+            field += (self.hotspotPeakC * np.exp(-((self._rows - row) ** 2 + (self._cols - col) ** 2) / (2 * self.hotspotRadiusPx ** 2))).astype(np.float32)
+        if self.noiseC > 0:
+            field += self._rng.normal(0, self.noiseC, size=field.shape).astype(np.float32)
+        return field
+
+    def raw(self, index: int) -> NDArray[np.uint16]:
+        """
+        Returns the raw samples of the given frame, as the camera encodes them: (temperature + offset) * divisor.
+        """
+        misc = self.device.misc
+        return np.clip(np.rint((self.temperatures(index) + misc.normalization_offset) * misc.normalization_divisor), 0, 65535).astype(np.uint16)
+
+    def frameFromRaw(self, raw: NDArray[np.uint16], layout: FrameLayout = FrameLayout.YUY2) -> NDArray:
+        """
+        Builds a camera frame in the given layout (see FRAME_LAYOUTS) from raw samples.
+        """
+        height, width = raw.shape
+        frame = np.empty((2 * height, width, 2), dtype=np.uint8)
+        # Visible half: the camera's AGC stretches the scene over the luma range; the chroma is neutral
+        low, high = int(raw.min()), int(raw.max())
+        frame[:height, :, 0] = ((raw.astype(np.float32) - low) * (219 / max(high - low, 1)) + 16).astype(np.uint8)
+        frame[:height, :, 1] = 128
+        # Thermal half: the raw samples, in the device's byte order
+        frame[height:] = raw.astype(getRawDtype(self.device.misc.thermal_byte_order)).view(np.uint8).reshape(height, width, 2)
+
+        if layout == FrameLayout.YUY2:
+            return frame
+        if layout == FrameLayout.UINT16:
+            return frame.view(np.uint16)[..., 0].copy()
+        if layout == FrameLayout.PADDED:
+            padded = np.zeros((2 * height, width + PADDED_STRIDE_EXTRA_PX, 2), dtype=np.uint8)
+            padded[:, :width] = frame
+            return padded.reshape(1, -1)
+        if layout == FrameLayout.CONVERTED:
+            return np.dstack([frame[..., 0], frame[..., 0], frame[..., 0]])
+        raise ValueError(f"Unsupported frame layout {layout}. Expected one of: {', '.join(layout.name for layout in FRAME_LAYOUTS)}")
+
+    def frame(self, index: int, layout: FrameLayout = FrameLayout.YUY2) -> NDArray:
+        """
+        Returns the given frame in the given layout (see FRAME_LAYOUTS).
+        """
+        return self.frameFromRaw(self.raw(index), layout)
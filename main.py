@@ -6,42 +6,207 @@ A Python program to read, parse and display thermal data from the Topdon TC001 T
 Forked by Riley Meyerkorth on 17 January 2025 to modernize and clean up the program for Windows and the TS001.
 '''
 
-import logging, cv2.utils.logging, os, sys
+import atexit, logging, cv2.utils.logging, os, sys, multiprocessing
 from datetime import datetime
 from src.models.deviceinfo import DeviceInfo
+from src.models.regionofinterest import RegionOfInterest
+from src.models.alarmdefinition import AlarmDefinition
+from src.alarms.alarmsinks import LogAlarmEventSink, ConsoleAlarmEventSink, JsonlAlarmEventSink, SocketAlarmEventSink
+from src.enums.AlarmKindEnum import AlarmKind
+from src.enums.AlarmMetricEnum import AlarmMetric
 from src.parsers.cli_parser import createParser
-from src.defaults.values import DEFAULT_LOG_LEVEL, DEFAULT_VIDEO_DEVICE_INDEX
-from src.defaults.devices import printAllSupportedDevices
+from src.helpers.hot_path_logging import startQueueLogging
+from src.defaults.values import (
+    DEFAULT_LOG_LEVEL, DEFAULT_VIDEO_DEVICE_INDEX, DEFAULT_FRAME_RING_CAPACITY, DEFAULT_FRAME_POLICY, DEFAULT_HEADLESS,
+    DEFAULT_RECORDING_FORMAT, DEFAULT_RAW_COMPRESSION, DEFAULT_PLAYBACK_SPEED, DEFAULT_ANALYSIS_FRAMES_PER_SHARD,
+    DEFAULT_COLOR_SPAN, DEFAULT_COLOR_SPAN_MIN_C, DEFAULT_COLOR_SPAN_MAX_C, DEFAULT_COLOR_SPAN_SMOOTHING,
+    DEFAULT_NATIVE_COMPOSITING, DEFAULT_HOTSPOT_COUNT, DEFAULT_HOTSPOT_FILTER, DEFAULT_HOTSPOT_FILTER_SIZE,
+    DEFAULT_HOTSPOT_MIN_DISTANCE, DEFAULT_TEMPORAL_FILTER, DEFAULT_TEMPORAL_ALPHA, DEFAULT_TEMPORAL_FRAMES, TEMPORAL_FRAMES_MAX,
+    DEFAULT_MOTION_THRESHOLD_C, DEFAULT_STREAM_HOST, DEFAULT_STREAM_JPEG_QUALITY, DEFAULT_MULTI_CAMERA_MAX_FPS,
+    DEFAULT_MEDIA_OUTPUT_PATH, DEVICE_PROBE_TIMEOUT_S, LOG_FORMAT, DEFAULT_SNAPSHOT_RAW_FORMAT, DEFAULT_SNAPSHOT_BURST_FRAMES)
+from src.enums.FramePolicyEnum import FramePolicy
+from src.enums.RawCompressionEnum import RawCompression
+from src.enums.RecordingFormatEnum import RecordingFormat
+from src.enums.ColorSpanEnum import ColorSpan
+from src.enums.InterpolationEnum import Interpolation
+from src.enums.HotspotFilterEnum import HotspotFilter
+from src.enums.TemporalFilterEnum import TemporalFilter
+from src.enums.SnapshotRawFormatEnum import SnapshotRawFormat
+from src.defaults.devices import printAllSupportedDevices, printConnectedDevices
 from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.controllers.multiCameraController import MultiCameraController
+from src.sources.rawfilesource import RawFileSource
+from src.analysis.recordinganalysis import analyzeRecordings, printAnalysisSummary
 
 # Determine base directory
 if getattr(sys, 'frozen', False): base_dir = os.path.dirname(sys.executable)
 else: base_dir = os.path.dirname(__file__)
 
-# Initialize argument parsing
-parser = createParser()
-args = parser.parse_args()
+logger = logging.getLogger("PyThermalCamera")
 
-# Initialize logging
-logsDirPath = os.path.join(base_dir, "logs")
-logFilePath = os.path.join(logsDirPath, f"log_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
+# Only when run as the program: the analysis worker processes are spawned on Windows (and macOS), and re-import this module as
+# __mp_main__. They must not parse the arguments again, or open a log file of their own.
+if __name__ == '__main__':
+    # Initialize argument parsing
+    parser = createParser()
+    args = parser.parse_args()
 
-if not os.path.exists(logsDirPath): os.makedirs(logsDirPath)
+    # Initialize logging
+    logsDirPath = os.path.join(base_dir, "logs")
+    logFilePath = os.path.join(logsDirPath, f"log_{datetime.now().strftime('%Y-%m-%d_%H-%M-%S')}.log")
 
-logging.basicConfig(filename=logFilePath, level=logging.INFO, format='[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s')
-logger = logging.getLogger("PyThermalCamera")
-logger.info("Program started.")
+    if not os.path.exists(logsDirPath): os.makedirs(logsDirPath)
+
+    # Written by a background thread, so logging never makes the capture loop wait for the disk
+    logQueueListener = startQueueLogging(logFilePath, format=LOG_FORMAT, level=logging.INFO)
+    atexit.register(logQueueListener.stop)
+    logger.info("Program started.")
+
+def loadDeviceInfo(json_path: str) -> DeviceInfo | None:
+    """
+    Loads a device JSON, or prints why it cannot be loaded and returns None.
+    """
+    if not os.path.isfile(json_path):
+        logger.error(f"Provided JSON file path does not exist: {json_path}")
+        print(f"Error: The provided JSON file path does not exist: {json_path}")
+        return None
+    if not json_path.endswith(".json"):
+        logger.error(f"Provided file is not a JSON file: {json_path}")
+        print(f"Error: The provided file is not a JSON file: {json_path}")
+        return None
+    logger.info(f"Loading device information from JSON file: {json_path}")
+    return DeviceInfo.createFromJson(json_path)
 
+def labelledPath(path: str | None, label: str | None) -> str | None:
+    """
+    Gives each camera of the multi subcommand its own output file: events.jsonl becomes events_cam0.jsonl, ...
+    """
+    if path is None or label is None:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}_{label}{ext}"
+
+def createCamera(source: int | str, json_path: str, camera_number: int, multi: bool, headless: bool, alarm_sinks: list, camera_options: dict) -> ThermalCameraController | None:
+    """
+    Creates the controller of one camera: its device, frame source, regions of interest and alarms, plus the options shared by all cameras.
+    The alarm sinks it opens are its own, and are also added to alarm_sinks so they can be closed on errors. Prints why the camera cannot be created and returns None on errors.
+    """
+    label = f"cam{camera_number}" if multi else None
+    stream_port = camera_options.pop('streamPort')
+    device_info = loadDeviceInfo(json_path)
+    if device_info is None:
+        return None
+    roi_path = getattr(args, 'roi_path', None) or RegionOfInterest.findFileForDevice(json_path)
+    alarms_path = getattr(args, 'alarms_path', None) or AlarmDefinition.findFileForDevice(json_path)
+
+    # Initialize the frame source. Recordings are played back with BLOCK by default so no frame is skipped.
+    frame_source = None
+    device_index = source
+    if isinstance(source, str):
+        if not os.path.isfile(source):
+            logger.error(f"Provided source recording does not exist: {source}")
+            print(f"Error: The provided source recording does not exist: {source}")
+            return None
+        logger.info(f"Playing back raw recording: {source}")
+        frame_source = RawFileSource(source, speed=getattr(args, 'playback_speed', DEFAULT_PLAYBACK_SPEED))
+        device_index = DEFAULT_VIDEO_DEVICE_INDEX
+    regions = None
+    if roi_path is not None:
+        try:
+            regions = RegionOfInterest.loadAllFromFile(roi_path)
+        except (OSError, ValueError, KeyError, TypeError, RuntimeError) as e:
+            logger.error(f"Failed to load regions of interest from {roi_path}: {e}")
+            print(f"Error: Failed to load regions of interest from {roi_path}: {e}")
+            return None
+        logger.info(f"Loaded {len(regions)} region(s) of interest from {roi_path}")
+    alarms = []
+    if alarms_path is not None:
+        try:
+            alarms = AlarmDefinition.loadAllFromFile(alarms_path)
+        except (OSError, ValueError, KeyError, TypeError, RuntimeError) as e:
+            logger.error(f"Failed to load alarms from {alarms_path}: {e}")
+            print(f"Error: Failed to load alarms from {alarms_path}: {e}")
+            return None
+        logger.info(f"Loaded {len(alarms)} alarm(s) from {alarms_path}")
+    if getattr(args, 'alarm_high', None) is not None:
+        alarms.append(AlarmDefinition("high temperature", args.alarm_high, kind=AlarmKind.ABOVE, metric=AlarmMetric.MAX))
+    if getattr(args, 'alarm_low', None) is not None:
+        alarms.append(AlarmDefinition("low temperature", args.alarm_low, kind=AlarmKind.BELOW, metric=AlarmMetric.MIN))
+    camera_sinks = []
+    if alarms:
+        try:
+            camera_sinks.append(LogAlarmEventSink(logger.getChild("Alarms")))
+            if headless:
+                camera_sinks.append(ConsoleAlarmEventSink())
+            if getattr(args, 'alarm_log', None) is not None:
+                camera_sinks.append(JsonlAlarmEventSink(labelledPath(args.alarm_log, label)))
+            if getattr(args, 'alarm_socket', None) is not None:
+                camera_sinks.append(SocketAlarmEventSink(args.alarm_socket, logger.getChild("Alarms")))
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to open alarm output: {e}")
+            print(f"Error: Failed to open alarm output: {e}")
+            return None
+        finally:
+            alarm_sinks.extend(camera_sinks)
+    frame_policy_name = getattr(args, 'frame_policy', None)
+    if frame_policy_name is not None:
+        frame_policy = FramePolicy[frame_policy_name]
+    else:
+        frame_policy = FramePolicy.BLOCK if frame_source is not None else DEFAULT_FRAME_POLICY
+
+    # Initialize the controller (this also checks that the alarms only target known regions of interest)
+    try:
+        return ThermalCameraController(
+            device=device_info
+            , device_index=device_index
+            , logger=logger.getChild("ThermalCameraController" + (f".{label}" if multi else ""))
+            , framePolicy=frame_policy
+            , headless=headless or multi
+            , frameSource=frame_source
+            , regions=regions
+            , alarms=alarms
+            , alarmSinks=camera_sinks
+            , streamPort=stream_port + camera_number if stream_port else stream_port
+            , mediaOutputPath=os.path.join(DEFAULT_MEDIA_OUTPUT_PATH, label) if multi else DEFAULT_MEDIA_OUTPUT_PATH
+            , label=label
+            , printStats=headless
+            , profileReportPath=labelledPath(getattr(args, 'profile_report', None), label)
+            , **camera_options
+        )
+    except ValueError as e:
+        logger.error(f"Failed to initialize the controller: {e}")
+        print(f"Error: {e}")
+        return None
+    
 def main():
     logger.info("Parsing command-line arguments.")
     subcommand = getattr(args, 'subcommand', None)
-    device_info = None
+    camera_specs = []
 
     logger.info(f"Processing subcommand: {subcommand}")
     match subcommand:
         case "list":
             logger.info("Listing all supported devices from devices folder.")
             printAllSupportedDevices()
+            logger.info("Listing the connected video devices.")
+            printConnectedDevices(probe=getattr(args, 'probe', False), timeout=getattr(args, 'probe_timeout', DEVICE_PROBE_TIMEOUT_S))
+            return
+        case "analyze":
+            logger.info("Analyzing raw recordings.")
+            try:
+                outputPaths = analyzeRecordings(
+                    paths=args.paths
+                    , logger=logger.getChild("Analysis")
+                    , outputDir=getattr(args, 'output_dir', None)
+                    , workers=getattr(args, 'jobs', None)
+                    , framesPerShard=getattr(args, 'frames_per_shard', DEFAULT_ANALYSIS_FRAMES_PER_SHARD))
+            except (OSError, ValueError, KeyError) as e:
+                logger.error(f"Failed to analyze the recordings: {e}")
+                print(f"Error: Failed to analyze the recordings: {e}")
+                return
+            if len(outputPaths) == 0:
+                print(f"Error: No raw recordings found in: {', '.join(args.paths)}")
+            printAnalysisSummary(outputPaths)
             return
         case "device":
             json_path = getattr(args, 'json_path', None)
@@ -49,26 +214,49 @@ def main():
                 logger.error("No JSON file path provided for device subcommand.")
                 print("Error: A JSON file path is required when using the device subcommand.")
                 return
-            if not os.path.isfile(json_path):
-                logger.error(f"Provided JSON file path does not exist: {json_path}")
-                print(f"Error: The provided JSON file path does not exist: {json_path}")
-                return
-            if not json_path.endswith(".json"):
-                logger.error(f"Provided file is not a JSON file: {json_path}")
-                print(f"Error: The provided file is not a JSON file: {json_path}")
-                return
-            logger.info(f"Loading device information from JSON file: {json_path}")
-            device_info = DeviceInfo.createFromJson(json_path)
+            camera_specs = [(getattr(args, 'source', None) or getattr(args, 'device_index', DEFAULT_VIDEO_DEVICE_INDEX), json_path)]
+        case "multi":
+            camera_specs = args.cameras
         case _:
             parser.print_help()
             return
 
     # get global arguments/options
     logger.info("Retrieving global arguments.")
-    device_index = getattr(args, 'device_index', DEFAULT_VIDEO_DEVICE_INDEX)
     debug = getattr(args, 'debug', False)
     verbose = getattr(args, 'verbose', False)
     quiet = getattr(args, 'quiet', False)
+    ring_size = getattr(args, 'ring_size', DEFAULT_FRAME_RING_CAPACITY)
+    playback_speed = getattr(args, 'playback_speed', DEFAULT_PLAYBACK_SPEED)
+    record_format = RecordingFormat[getattr(args, 'record_format', DEFAULT_RECORDING_FORMAT.name)]
+    raw_compression = RawCompression[getattr(args, 'raw_compression', DEFAULT_RAW_COMPRESSION.name)]
+    headless = getattr(args, 'headless', DEFAULT_HEADLESS)
+    control_port = getattr(args, 'control_port', None)
+    stream_port = getattr(args, 'stream_port', None)
+    stream_host = getattr(args, 'stream_host', DEFAULT_STREAM_HOST)
+    stream_quality = getattr(args, 'stream_quality', DEFAULT_STREAM_JPEG_QUALITY)
+    workers = getattr(args, 'workers', None)
+    max_fps = getattr(args, 'max_fps', DEFAULT_MULTI_CAMERA_MAX_FPS)
+    mosaic_columns = getattr(args, 'mosaic_columns', None)
+    profile = getattr(args, 'profile', False)
+    backend_cache = not getattr(args, 'no_backend_cache', False)
+    snapshot_raw = SnapshotRawFormat[getattr(args, 'snapshot_raw', DEFAULT_SNAPSHOT_RAW_FORMAT.name)]
+    snapshot_burst = getattr(args, 'snapshot_burst', DEFAULT_SNAPSHOT_BURST_FRAMES)
+    color_span = ColorSpan[getattr(args, 'color_span', DEFAULT_COLOR_SPAN.name)]
+    span_min = getattr(args, 'span_min', DEFAULT_COLOR_SPAN_MIN_C)
+    span_max = getattr(args, 'span_max', DEFAULT_COLOR_SPAN_MAX_C)
+    span_smoothing = getattr(args, 'span_smoothing', DEFAULT_COLOR_SPAN_SMOOTHING)
+    interpolation_name = getattr(args, 'interpolation', None)
+    interpolation = Interpolation[interpolation_name] if interpolation_name is not None else None
+    native_compositing = getattr(args, 'native_compositing', DEFAULT_NATIVE_COMPOSITING)
+    hotspot_count = getattr(args, 'hotspots', DEFAULT_HOTSPOT_COUNT)
+    hotspot_filter = HotspotFilter[getattr(args, 'hotspot_filter', DEFAULT_HOTSPOT_FILTER.name)]
+    hotspot_filter_size = getattr(args, 'hotspot_filter_size', DEFAULT_HOTSPOT_FILTER_SIZE)
+    hotspot_distance = getattr(args, 'hotspot_distance', DEFAULT_HOTSPOT_MIN_DISTANCE)
+    temporal_filter = TemporalFilter[getattr(args, 'temporal_filter', DEFAULT_TEMPORAL_FILTER.name)]
+    temporal_alpha = getattr(args, 'temporal_alpha', DEFAULT_TEMPORAL_ALPHA)
+    temporal_frames = getattr(args, 'temporal_frames', DEFAULT_TEMPORAL_FRAMES)
+    motion_threshold = getattr(args, 'motion_threshold', DEFAULT_MOTION_THRESHOLD_C)
     logging_level = "DEBUG" if debug else str(getattr(args, 'log_level', DEFAULT_LOG_LEVEL)) # TODO: add default consts for these
 
     # Set logging config based on arguments
@@ -77,21 +265,103 @@ def main():
     cv2.utils.logging.setLogLevel(cv2.utils.logging.LOG_LEVEL_ERROR) # TODO: add argument for specifically OpenCV. For now, I only want errors.
     logger.setLevel(logging_level)
         
-    # Initialize the controller
-    c = ThermalCameraController(
-        device=device_info
-        , device_index=device_index
-        , logger=logger.getChild("ThermalCameraController")
-    )
-    
+    if ring_size < 2:
+        logger.error(f"Invalid frame ring size: {ring_size}")
+        print(f"Error: --ring-size ({ring_size}) must be at least 2.")
+        return
+    if playback_speed < 0:
+        logger.error(f"Invalid playback speed: {playback_speed}")
+        print(f"Error: --playback-speed ({playback_speed}) must not be negative.")
+        return
+    if span_min >= span_max:
+        logger.error(f"Invalid color span: {span_min} to {span_max}")
+        print(f"Error: --span-min ({span_min}) must be lower than --span-max ({span_max}).")
+        return
+    if not 0 < span_smoothing <= 1:
+        logger.error(f"Invalid color span smoothing: {span_smoothing}")
+        print(f"Error: --span-smoothing ({span_smoothing}) must be greater than 0 and at most 1.")
+        return
+    if hotspot_count < 0 or hotspot_filter_size < 1 or hotspot_distance < 1:
+        logger.error(f"Invalid hotspot options: count {hotspot_count}, filter size {hotspot_filter_size}, distance {hotspot_distance}")
+        print("Error: --hotspots must not be negative, and --hotspot-filter-size and --hotspot-distance must be at least 1.")
+        return
+    if snapshot_burst < 1:
+        logger.error(f"Invalid snapshot burst: {snapshot_burst}")
+        print(f"Error: --snapshot-burst ({snapshot_burst}) must be at least 1.")
+        return
+    if not 0 < temporal_alpha <= 1 or not 1 <= temporal_frames <= TEMPORAL_FRAMES_MAX or motion_threshold <= 0:
+        logger.error(f"Invalid temporal filter options: alpha {temporal_alpha}, frames {temporal_frames}, motion threshold {motion_threshold}")
+        print(f"Error: --temporal-alpha must be greater than 0 and at most 1, --temporal-frames between 1 and {TEMPORAL_FRAMES_MAX}, and --motion-threshold greater than 0.")
+        return
+    if (stream_port is not None and not 0 <= stream_port <= 65535) or not 1 <= stream_quality <= 100:
+        logger.error(f"Invalid stream options: port {stream_port}, quality {stream_quality}")
+        print("Error: --stream-port must be between 0 and 65535, and --stream-quality between 1 and 100.")
+        return
+    if (workers is not None and workers < 1) or max_fps < 0 or (mosaic_columns is not None and mosaic_columns < 1):
+        logger.error(f"Invalid multi-camera options: workers {workers}, max fps {max_fps}, mosaic columns {mosaic_columns}")
+        print("Error: --workers and --mosaic-columns must be at least 1, and --max-fps must not be negative.")
+        return
+
+    # Initialize one controller per camera (a single one for the device subcommand)
+    multi = subcommand == "multi"
+    cameras = []
+    alarm_sinks = []
+    for camera_number, (source, json_path) in enumerate(camera_specs):
+        camera = createCamera(source, json_path, camera_number, multi, headless, alarm_sinks, dict(
+            frameRingCapacity=ring_size
+            , recordingFormat=record_format
+            , rawCompression=raw_compression
+            # Cameras of the multi subcommand are run by the supervisor, which owns the window and the control port
+            , controlPort=None if multi else control_port
+            , colorSpan=color_span
+            , colorSpanMinC=span_min
+            , colorSpanMaxC=span_max
+            , colorSpanSmoothing=span_smoothing
+            , interpolation=interpolation
+            , nativeCompositing=native_compositing
+            , hotspotCount=hotspot_count
+            , hotspotFilter=hotspot_filter
+            , hotspotFilterSize=hotspot_filter_size
+            , hotspotMinDistance=hotspot_distance
+            , temporalFilter=temporal_filter
+            , temporalAlpha=temporal_alpha
+            , temporalFrames=temporal_frames
+            , motionThresholdC=motion_threshold
+            , streamPort=stream_port
+            , streamHost=stream_host
+            , streamJpegQuality=stream_quality
+            , profile=profile
+            , captureBackendCache=backend_cache
+            , snapshotRawFormat=snapshot_raw
+            , snapshotBurstFrames=snapshot_burst))
+        if camera is None:
+            for sink in alarm_sinks:
+                sink.close()
+            return
+        cameras.append(camera)
+    c = cameras[0]
+
     # Print the all info needed on startup
     c.printCredits()
-    c.printBindings()
+    if not headless:
+        c.printBindings()
     
     # Start the controller
     logger.info("Entering main runtime block.")
     try:
-        c.run()
+        if multi:
+            MultiCameraController(
+                cameras=cameras
+                , logger=logger.getChild("MultiCameraController")
+                , labels=[f"cam{camera_number}" for camera_number in range(len(cameras))]
+                , headless=headless
+                , workers=workers
+                , maxFps=max_fps
+                , mosaicColumns=mosaic_columns
+                , controlPort=control_port
+            ).run()
+        else:
+            c.run()
     except KeyboardInterrupt:
         logger.info("KeyboardInterrupt received. Exiting program.")
         print("Exiting program.")
@@ -103,4 +373,5 @@ def main():
     
 # Basic main call 
 if __name__ == '__main__':
+    multiprocessing.freeze_support() # Needed for the analysis worker processes in frozen (pyinstaller) builds
     main()
\ No newline at end of file
@@ -0,0 +1,168 @@
+import logging, numpy as np
+from numpy.typing import NDArray
+from src.alarms.alarmsinks import AlarmEventSink
+from src.defaults.values import ALARM_TARGET_FRAME, ALARM_TARGET_ALL_ROIS, ALARM_HISTORY_INTERVAL_S, ALARM_HISTORY_CAPACITY
+from src.enums.AlarmKindEnum import AlarmKind
+from src.enums.AlarmMetricEnum import AlarmMetric
+from src.enums.AlarmStateEnum import AlarmState
+from src.models.alarmdefinition import AlarmDefinition
+from src.models.alarmevent import AlarmEvent
+from src.models.regionofinterest import RegionOfInterest
+from src.models.thermalframe import ThermalFrame
+from src.sinks.framesink import FrameSink
+
+# Layout of the value vector that all alarms read from: the frame metrics, then each ROI_STATS_DTYPE field for all regions
+FRAME_METRICS: tuple[AlarmMetric, ...] = (AlarmMetric.MAX, AlarmMetric.MIN, AlarmMetric.MEAN, AlarmMetric.CENTER)
+ROI_METRIC_FIELDS: dict[AlarmMetric, str] = {AlarmMetric.MEAN: "mean", AlarmMetric.MIN: "min", AlarmMetric.MAX: "max"}
+
+class AlarmEngine(FrameSink):
+    """
+    Evaluates temperature alarms on the stats and ROI stats of every frame and emits an AlarmEvent to the alarm sinks
+    whenever one is raised or cleared.
+
+    All alarms are compiled into flat arrays once, so a frame is evaluated with a handful of vectorized operations
+    regardless of the number of alarms or regions:
+    - every frame and ROI metric is gathered into one value vector, which each alarm indexes into
+    - RISE alarms compare it with a sampled history of the same vector (one lookup per distinct window)
+    - hysteresis and debouncing are a small state machine over boolean/float arrays
+    Only the alarms that actually change state are touched in Python, to build their events.
+    """
+    def __init__(self, alarms: list[AlarmDefinition], regions: list[RegionOfInterest] | None, sinks: list[AlarmEventSink], logger: logging.Logger):
+        self.logger = logger
+        self.sinks = list(sinks) # A copy, so sinks added to the caller's list later do not receive this engine's events
+        regions = regions or []
+        regionIndices = {region.name: index for index, region in enumerate(regions)}
+
+        # Expand the definitions into one alarm per target
+        self.alarms: list[tuple[AlarmDefinition, str]] = []
+        sources = []
+        for alarm in alarms:
+            if alarm.target == ALARM_TARGET_FRAME:
+                targets = [(ALARM_TARGET_FRAME, FRAME_METRICS.index(alarm.metric))]
+            else:
+                names = list(regionIndices) if alarm.target == ALARM_TARGET_ALL_ROIS else [alarm.target]
+                if alarm.target not in regionIndices and alarm.target != ALARM_TARGET_ALL_ROIS:
+                    raise ValueError(f"Alarm '{alarm.name}' targets the unknown region of interest '{alarm.target}'")
+                fieldOffset = len(FRAME_METRICS) + list(ROI_METRIC_FIELDS).index(alarm.metric) * len(regions)
+                targets = [(name, fieldOffset + regionIndices[name]) for name in names]
+            for target, source in targets:
+                self.alarms.append((alarm, target))
+                sources.append(source)
+
+        self._regionCount = len(regions)
+        self._values: NDArray[np.float64] = np.full(len(FRAME_METRICS) + len(ROI_METRIC_FIELDS) * len(regions), np.nan)
+        self._sources = np.array(sources, dtype=np.intp)
+        definitions = [alarm for alarm, _ in self.alarms]
+        self._sign = np.array([-1.0 if alarm.kind == AlarmKind.BELOW else 1.0 for alarm in definitions])
+        self._threshold = np.array([alarm.threshold for alarm in definitions]) * self._sign
+        self._hysteresis = np.array([alarm.hysteresis for alarm in definitions])
+        self._minDuration = np.array([alarm.minDuration for alarm in definitions])
+
+        # RISE alarms are grouped by window, so each distinct window needs one history lookup
+        isRise = np.array([alarm.kind == AlarmKind.RISE for alarm in definitions], dtype=bool)
+        self._riseGroups: list[tuple[float, NDArray[np.intp]]] = []
+        for window in sorted({alarm.window for alarm in definitions if alarm.kind == AlarmKind.RISE}):
+            group = np.flatnonzero(isRise & np.array([alarm.window == window for alarm in definitions], dtype=bool))
+            self._riseGroups.append((window, group))
+        self._historyTimes: NDArray[np.float64] = np.zeros(ALARM_HISTORY_CAPACITY if self._riseGroups else 0)
+        self._historyValues: NDArray[np.float64] = np.zeros((len(self._historyTimes), len(self._values)))
+        self._historyCount: int = 0
+        self._historyNext: int = 0
+
+        # Alarm states: whether each alarm is active, and since when its pending transition's condition holds (NaN if none)
+        self.active: NDArray[np.bool_] = np.zeros(len(self.alarms), dtype=bool)
+        self._since: NDArray[np.float64] = np.full(len(self.alarms), np.nan)
+        self._signals: NDArray[np.float64] = np.zeros(len(self.alarms))
+
+        self.logger.info(f"Evaluating {len(self.alarms)} alarm(s) from {len(alarms)} definition(s).")
+
+    @property
+    def activeAlarms(self) -> list[tuple[str, str]]:
+        """
+        The (name, target) of every currently active alarm.
+        """
+        return [(self.alarms[index][0].name, self.alarms[index][1]) for index in np.flatnonzero(self.active)]
+
+    def write(self, frame: ThermalFrame) -> None:
+        self.evaluate(frame)
+
+    def evaluate(self, frame: ThermalFrame) -> list[AlarmEvent]:
+        """
+        Evaluates all alarms on the frame, emits the events of the alarms that were raised or cleared and returns them.
+        """
+        if len(self.alarms) == 0:
+            return []
+        now = frame.timestamp / 1e9
+        stats, values = frame.stats, self._values
+        values[:len(FRAME_METRICS)] = (stats.maxTemp, stats.minTemp, stats.avgTemp, stats.centerTemp)
+        if self._regionCount > 0:
+            roiValues = values[len(FRAME_METRICS):].reshape(len(ROI_METRIC_FIELDS), self._regionCount)
+            if frame.roiStats is not None:
+                for row, field in enumerate(ROI_METRIC_FIELDS.values()):
+                    roiValues[row] = frame.roiStats[field]
+            else:
+                roiValues[:] = np.nan
+
+        signals = self._signals
+        np.take(values, self._sources, out=signals)
+        if self._riseGroups:
+            self._updateRates(now, signals)
+
+        # Raise when the (signed) signal passes the threshold, clear when it is back past it by the hysteresis.
+        # A transition only happens after its condition held for the minimum duration. NaN (no data) never changes anything.
+        with np.errstate(invalid='ignore'):
+            signed = signals * self._sign
+            holds = np.where(self.active, signed < self._threshold - self._hysteresis, signed > self._threshold)
+        self._since = np.where(holds, np.fmin(self._since, now), np.nan)
+        fired = holds & (now - self._since >= self._minDuration)
+        if not fired.any():
+            return []
+
+        self.active ^= fired
+        self._since[fired] = np.nan
+        events = []
+        for index in np.flatnonzero(fired):
+            alarm, target = self.alarms[index]
+            events.append(AlarmEvent(
+                name=alarm.name,
+                target=target,
+                metric=alarm.metric,
+                kind=alarm.kind,
+                state=AlarmState.RAISED if self.active[index] else AlarmState.CLEARED,
+                value=round(float(signals[index]), 3),
+                threshold=alarm.threshold,
+                timestamp=frame.timestamp,
+                frameIndex=frame.index))
+        for sink in self.sinks:
+            for event in events:
+                sink.emit(event)
+        return events
+
+    def _updateRates(self, now: float, signals: NDArray[np.float64]) -> None:
+        """
+        Replaces the signals of the RISE alarms with the rate of rise (°C/s) of their values over their window.
+        The history is sampled every ALARM_HISTORY_INTERVAL_S. Until it covers a window (or, for windows longer than the history, the
+        whole history), the rate is NaN: a rate over the first few frames would be sensor noise divided by a few milliseconds.
+        """
+        capacity = len(self._historyTimes)
+        if self._historyCount == 0 or now - self._historyTimes[self._historyNext - 1] >= ALARM_HISTORY_INTERVAL_S:
+            self._historyTimes[self._historyNext] = now
+            self._historyValues[self._historyNext] = self._values
+            self._historyNext = (self._historyNext + 1) % capacity
+            self._historyCount = min(self._historyCount + 1, capacity)
+
+        order = (self._historyNext - self._historyCount + np.arange(self._historyCount)) % capacity
+        times = self._historyTimes[order]
+        historySpan = ALARM_HISTORY_INTERVAL_S * (capacity - 1)
+        for window, group in self._riseGroups:
+            # The newest sample that is at least a window old, or the oldest one there is
+            sample = order[max(int(np.searchsorted(times, now - window, side='right')) - 1, 0)]
+            elapsed = now - self._historyTimes[sample]
+            if elapsed <= 0 or elapsed < min(window, historySpan):
+                signals[group] = np.nan
+                continue
+            signals[group] = (self._values[self._sources[group]] - self._historyValues[sample, self._sources[group]]) / elapsed
+
+    def close(self) -> None:
+        for sink in self.sinks:
+            sink.close()
@@ -0,0 +1,82 @@
+import os, json, socket, logging
+from abc import ABC, abstractmethod
+from src.enums.AlarmStateEnum import AlarmState
+from src.models.alarmevent import AlarmEvent
+
+class AlarmEventSink(ABC):
+    """
+    Base class for everything that receives alarm events (the log, a JSONL file, a socket, ...).
+    Events are emitted from the main loop, so emit() should be cheap and must not raise.
+    """
+    @abstractmethod
+    def emit(self, event: AlarmEvent) -> None:
+        ...
+
+    def close(self) -> None:
+        pass
+
+class LogAlarmEventSink(AlarmEventSink):
+    """
+    Logs raised alarms as warnings and cleared alarms as info.
+    """
+    def __init__(self, logger: logging.Logger):
+        self.logger = logger
+
+    def emit(self, event: AlarmEvent) -> None:
+        self.logger.log(logging.WARNING if event.state == AlarmState.RAISED else logging.INFO, "%s", event)
+
+class ConsoleAlarmEventSink(AlarmEventSink):
+    """
+    Prints every event to the console. Used in headless mode, next to the stats output.
+    """
+    def emit(self, event: AlarmEvent) -> None:
+        print(event)
+
+class JsonlAlarmEventSink(AlarmEventSink):
+    """
+    Appends every event as one JSON object per line to a file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def emit(self, event: AlarmEvent) -> None:
+        self._file.write(json.dumps(event.toJson()) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+class SocketAlarmEventSink(AlarmEventSink):
+    """
+    Sends every event as a JSON datagram to a local UDP port ("host:port") or Unix datagram socket ("unix:/path/to/socket").
+    Nothing has to be listening; undeliverable events are dropped (and logged once).
+    """
+    def __init__(self, address: str, logger: logging.Logger):
+        self.address = address
+        self.logger = logger
+        self._didLogError = False
+        if address.startswith("unix:"):
+            self._target = address[len("unix:"):]
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        else:
+            host, _, port = address.rpartition(":")
+            if not host or not port.isdigit():
+                raise ValueError(f"Invalid alarm socket address '{address}'. Expected 'host:port' or 'unix:/path/to/socket'.")
+            self._target = (host, int(port))
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setblocking(False)
+
+    def emit(self, event: AlarmEvent) -> None:
+        try:
+            self._socket.sendto(json.dumps(event.toJson()).encode("utf-8"), self._target)
+        except OSError as e:
+            if not self._didLogError:
+                self.logger.warning(f"Failed to send alarm events to {self.address}: {e}")
+                self._didLogError = True
+
+    def close(self) -> None:
+        self._socket.close()
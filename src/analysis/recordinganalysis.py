@@ -0,0 +1,151 @@
+import os, json, logging, numpy as np
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, fields
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_ANALYSIS_FRAMES_PER_SHARD, RAW_STREAM_EXTENSION, ANALYSIS_OUTPUT_SUFFIX
+from src.helpers.roi_stats import ROI_STATS_DTYPE, RoiStatsCalculator
+from src.helpers.thermal_stats import computeFrameStats
+from src.models.framestats import FrameStats
+from src.models.regionofinterest import RegionOfInterest
+from src.recording.rawstream import RawStreamReader
+
+@dataclass
+class AnalysisShard:
+    """
+    A range of frames [start, stop) of one recording, analyzed by one worker.
+    """
+    path: str
+    start: int
+    stop: int
+
+def findRecordings(paths: list[str]) -> list[str]:
+    """
+    Expands the given files and directories (recursively) into a sorted list of raw recordings.
+    """
+    recordings = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                recordings.extend(os.path.join(root, f) for f in files if f.endswith(RAW_STREAM_EXTENSION))
+        elif os.path.isfile(path):
+            recordings.append(path)
+    return sorted(set(recordings))
+
+def planShards(recordings: list[str], framesPerShard: int = DEFAULT_ANALYSIS_FRAMES_PER_SHARD) -> list[AnalysisShard]:
+    """
+    Splits every recording into shards of about framesPerShard frames.
+    For compressed recordings the shards are aligned to whole chunks, so no chunk is decoded twice.
+    """
+    shards = []
+    for path in recordings:
+        reader = RawStreamReader(path)
+        chunkFrames = max(1, reader.header.chunk_frames)
+        size = -(-max(1, framesPerShard) // chunkFrames) * chunkFrames
+        shards.extend(AnalysisShard(path, start, min(start + size, len(reader))) for start in range(0, len(reader), size))
+        reader.close()
+    return shards
+
+def createColumns(start: int, stop: int, regionCount: int = 0) -> dict[str, NDArray]:
+    """
+    Allocates the stats columns of the frames [start, stop): the frame indices, and zeroed timestamps and FrameStats fields.
+    With regions of interest, zeroed roi_<field> columns of shape (frames, regions) are added.
+    """
+    count = stop - start
+    columns: dict[str, NDArray] = {
+        "frame_index": np.arange(start, stop, dtype=np.int64),
+        "timestamp": np.zeros(count, dtype=np.int64)}
+    for field in fields(FrameStats):
+        columns[field.name] = np.zeros(count, dtype=np.int32 if field.type in (int, "int") else np.float32)
+    if regionCount > 0:
+        for name in ROI_STATS_DTYPE.names:
+            columns["roi_" + name] = np.zeros((count, regionCount), dtype=np.float32)
+    return columns
+
+def analyzeShard(shard: AnalysisShard) -> tuple[AnalysisShard, dict[str, NDArray]]:
+    """
+    Calculates the FrameStats of every frame in the shard, using the same stats kernel as the live view.
+    Returns the stats as columns (one array per FrameStats field), plus the frame indices and timestamps.
+    If regions of interest were tracked while recording, their stats are added as roi_<field> columns of shape (frames, regions).
+    """
+    reader = RawStreamReader(shard.path)
+    columns = createColumns(shard.start, shard.stop, len(reader.header.rois or []))
+    roiStatsCalculator = None
+    if reader.header.rois:
+        roiStatsCalculator = RoiStatsCalculator([RegionOfInterest.createFromJson(roi) for roi in reader.header.rois])
+
+    d, c = reader.header.normalization_divisor, reader.header.normalization_offset
+    for index, (frame, timestamp) in enumerate(reader.iterFrames(shard.start, shard.stop)):
+        stats = computeFrameStats(frame, d=d, c=c)
+        columns["timestamp"][index] = timestamp
+        for field in fields(FrameStats):
+            columns[field.name][index] = getattr(stats, field.name)
+        if roiStatsCalculator is not None:
+            roiStats = roiStatsCalculator.calculate(frame, d=d, c=c)
+            for name in ROI_STATS_DTYPE.names:
+                columns["roi_" + name][index] = roiStats[name]
+
+    reader.close()
+    return shard, columns
+
+def analyzeRecordings(paths: list[str], logger: logging.Logger, outputDir: str | None = None, workers: int | None = None, framesPerShard: int = DEFAULT_ANALYSIS_FRAMES_PER_SHARD) -> list[str]:
+    """
+    Analyzes every recording found in paths on a process pool, sharded by file and by frame range.
+    The per-frame stats of each recording are saved as columns to a .npz file (next to the recording unless outputDir is given).
+    Returns the paths of the written files.
+    """
+    recordings = findRecordings(paths)
+    if len(recordings) == 0:
+        logger.warning(f"No recordings found in {paths}.")
+        return []
+
+    shards = planShards(recordings, framesPerShard)
+    logger.info(f"Analyzing {len(recordings)} recording(s) in {len(shards)} shard(s) with {workers or os.cpu_count()} worker(s).")
+
+    results: dict[str, list[tuple[AnalysisShard, dict[str, NDArray]]]] = {path: [] for path in recordings}
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(analyzeShard, shard) for shard in shards]
+        for future in as_completed(futures):
+            shard, columns = future.result()
+            results[shard.path].append((shard, columns))
+
+    outputPaths = []
+    for path, shardResults in results.items():
+        shardResults.sort(key=lambda result: result[0].start)
+        reader = RawStreamReader(path)
+        if shardResults:
+            columns = {name: np.concatenate([result[1][name] for result in shardResults]) for name in shardResults[0][1]}
+        else:
+            # Empty recordings have no shards, but still get every (empty) column
+            columns = createColumns(0, 0, len(reader.header.rois or []))
+        outputName = os.path.splitext(os.path.basename(path))[0] + ANALYSIS_OUTPUT_SUFFIX
+        outputPath = os.path.join(outputDir if outputDir is not None else os.path.dirname(path), outputName)
+        if outputDir is not None:
+            os.makedirs(outputDir, exist_ok=True)
+        np.savez_compressed(outputPath, header=np.array(json.dumps(reader.header.toJson())), **columns)
+        reader.close()
+
+        logger.info(f"Saved stats of {path} ({len(columns['frame_index'])} frames) to {outputPath}")
+        outputPaths.append(outputPath)
+
+    return outputPaths
+
+def printAnalysisSummary(outputPaths: list[str]) -> None:
+    """
+    Prints a short summary of each analysis output to the console.
+    """
+    for outputPath in outputPaths:
+        with np.load(outputPath) as data:
+            print("-" * 20)
+            print(f"File: {outputPath}")
+            print(f"Frames: {len(data['frame_index'])}")
+            if len(data["frame_index"]) == 0:
+                continue
+            hottest = int(data["maxTemp"].argmax())
+            coldest = int(data["minTemp"].argmin())
+            print(f"Max: {data['maxTemp'][hottest]:.2f}C at frame {data['frame_index'][hottest]} ({data['maxRow'][hottest]}, {data['maxCol'][hottest]})")
+            print(f"Min: {data['minTemp'][coldest]:.2f}C at frame {data['frame_index'][coldest]} ({data['minRow'][coldest]}, {data['minCol'][coldest]})")
+            print(f"Avg: {data['avgTemp'].mean():.2f}C")
+            if "roi_max" in data.files and data["roi_max"].size > 0 and not np.isnan(data["roi_max"]).all():
+                rois = json.loads(str(data["header"])).get("rois", [])
+                frame, region = np.unravel_index(np.nanargmax(data["roi_max"]), data["roi_max"].shape)
+                print(f"Hottest ROI: {rois[region]['name']} at {data['roi_max'][frame, region]:.2f}C at frame {data['frame_index'][frame]}")
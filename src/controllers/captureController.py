@@ -0,0 +1,70 @@
+import logging, threading
+from src.defaults.values import CAPTURE_MAX_CONSECUTIVE_FAILED_READS, DEFAULT_FRAME_WAIT_TIMEOUT_S
+from src.helpers.profiling import StageProfiler
+from src.models.framering import FrameRing
+from src.sources.framesource import FrameSource
+
+class CaptureController:
+    """
+    Runs the capture loop on its own thread. The thread only reads frames from the source into the frame ring,
+    so slow rendering or disk writes on the consumer side can never stall acquisition.
+    Frames are committed with the timestamp the source gives them (the capture time, or the recorded time of a recording).
+    """
+    def __init__(self, cap: FrameSource, ring: FrameRing, logger: logging.Logger, profiler: StageProfiler | None = None):
+        self.logger = logger
+        self._cap = cap
+        self._ring = ring
+        self._profiler = profiler if profiler is not None else StageProfiler()
+        self._thread: threading.Thread | None = None
+        self._stopEvent = threading.Event()
+        self.failedReads: int = 0
+
+    @property
+    def isRunning(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self) -> None:
+        """
+        Starts the capture thread.
+        """
+        self.logger.info("Starting capture thread.")
+        self._stopEvent.clear()
+        self._thread = threading.Thread(target=self._run, name="CaptureThread", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = DEFAULT_FRAME_WAIT_TIMEOUT_S) -> None:
+        """
+        Stops the capture thread and closes the ring so any waiting consumers return.
+        """
+        self.logger.info("Stopping capture thread.")
+        self._stopEvent.set()
+        self._ring.close()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        consecutiveFailedReads = 0
+        try:
+            while not self._stopEvent.is_set() and self._cap.isOpened():
+                buffer = self._ring.getWriteBuffer()
+
+                # Includes the wait for the camera's next frame
+                with self._profiler.measure("capture"):
+                    ret, frame, timestamp = self._cap.read(buffer) if buffer is not None else self._cap.read()
+                if not ret:
+                    self.failedReads += 1
+                    consecutiveFailedReads += 1
+                    if consecutiveFailedReads >= CAPTURE_MAX_CONSECUTIVE_FAILED_READS:
+                        self.logger.error(f"Capture failed {consecutiveFailedReads} times in a row. Stopping capture thread.")
+                        break
+                    continue
+
+                consecutiveFailedReads = 0
+                self._ring.commitWrite(frame, timestamp, timeout=DEFAULT_FRAME_WAIT_TIMEOUT_S)
+                if self._ring.closed:
+                    break
+        except Exception as e:
+            self.logger.exception("An error occurred in the capture thread: ", exc_info=e)
+        finally:
+            self._ring.close()
+            self.logger.info("Capture thread ended.")
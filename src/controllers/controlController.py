@@ -0,0 +1,114 @@
+import signal, socket, logging, queue, threading
+from src.defaults.keybinds import *
+from src.defaults.values import DEFAULT_CONTROL_HOST, NO_KEY_PRESS
+
+# Commands accepted over the control socket, in addition to any single key from the keybinds
+CONTROL_COMMANDS: dict[str, str] = {
+    "quit": KEY_QUIT,
+    "snapshot": KEY_SNAPSHOT,
+    "burst": KEY_SNAPSHOT_BURST,
+    "record": KEY_RECORD,
+    "stop": KEY_STOP,
+    "unit": KEY_TOGGLE_TEMP_UNIT,
+    "swap": KEY_TOGGLE_OUTPUT_MODE,
+}
+
+class ControlController:
+    """
+    Replaces the OpenCV window's key handling when running headless.
+    Key presses come from POSIX signals and, optionally, a local UDP control socket, and are queued for the main loop.
+
+    Signals:
+    - SIGINT/SIGTERM: quit (so recordings are closed cleanly)
+    - SIGUSR1: snapshot
+    - SIGUSR2: toggle recording
+
+    Socket: each datagram is either a single key (e.g. 'p') or one of the CONTROL_COMMANDS (e.g. 'snapshot').
+    """
+    def __init__(self, logger: logging.Logger, port: int | None = None, host: str = DEFAULT_CONTROL_HOST):
+        self.logger = logger
+        self.port = port
+        self.host = host
+        self.isRecording: bool = False
+        self._keys: queue.SimpleQueue[int] = queue.SimpleQueue()
+        self._socket: socket.socket | None = None
+        self._thread: threading.Thread | None = None
+        self._previousHandlers: dict[int, object] = {}
+
+    def start(self) -> None:
+        """
+        Installs the signal handlers and starts the control socket (if a port was given).
+        Must be called from the main thread.
+        """
+        self._installSignalHandler(signal.SIGINT, KEY_QUIT)
+        self._installSignalHandler(signal.SIGTERM, KEY_QUIT)
+        if hasattr(signal, "SIGUSR1"):
+            self._installSignalHandler(signal.SIGUSR1, KEY_SNAPSHOT)
+        if hasattr(signal, "SIGUSR2"):
+            self._installSignalHandler(signal.SIGUSR2, None)
+
+        if self.port is not None:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            self._socket.bind((self.host, self.port))
+            self._thread = threading.Thread(target=self._listen, name="ControlSocketThread", daemon=True)
+            self._thread.start()
+            self.logger.info(f"Listening for control commands on udp://{self.host}:{self.port}")
+
+    def stop(self) -> None:
+        """
+        Restores the previous signal handlers and closes the control socket.
+        """
+        for signum, handler in self._previousHandlers.items():
+            signal.signal(signum, handler)
+        self._previousHandlers.clear()
+        if self._socket is not None:
+            self._socket.close()
+            self._socket = None
+
+    def poll(self) -> int:
+        """
+        Returns the next queued key press, or NO_KEY_PRESS (like cv2.waitKey(...) & 0xFF) if there is none.
+        """
+        try:
+            return self._keys.get_nowait()
+        except queue.Empty:
+            return NO_KEY_PRESS
+
+    def push(self, key: str) -> None:
+        """
+        Queues a key press.
+        """
+        self._keys.put(ord(key))
+
+    def pushCommand(self, command: str) -> bool:
+        """
+        Queues the key press for a command or single key. Returns False if the command is unknown.
+        """
+        command = command.strip().lower()
+        if command in CONTROL_COMMANDS:
+            self.push(CONTROL_COMMANDS[command])
+            return True
+        if len(command) == 1:
+            self.push(command)
+            return True
+        return False
+
+    def _installSignalHandler(self, signum: int, key: str | None) -> None:
+        def handler(receivedSignum, frame):
+            self.logger.info(f"Received signal {receivedSignum}.")
+            # A key of None toggles recording, since a signal carries no state of its own
+            if key is None:
+                self.push(KEY_STOP if self.isRecording else KEY_RECORD)
+            else:
+                self.push(key)
+        self._previousHandlers[signum] = signal.signal(signum, handler)
+
+    def _listen(self) -> None:
+        while self._socket is not None:
+            try:
+                data, address = self._socket.recvfrom(1024)
+            except OSError:
+                break
+            command = data.decode("utf-8", errors="ignore")
+            if not self.pushCommand(command):
+                self.logger.warning(f"Unknown control command from {address}: {command!r}")
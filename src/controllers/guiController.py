@@ -3,8 +3,15 @@ import time, cv2, logging, numpy as np
 from src.defaults.keybinds import *
 from src.enums.TemperatureUnitEnum import TemperatureUnit, getSymbolFromTempUnit
 from src.models.deviceinfo import DeviceInfo
+from src.models.framestats import FrameStats
+from src.models.overlaytile import OverlayTile
 from src.defaults.values import *
 from src.enums.ColormapEnum import Colormap
+from src.enums.ColorSpanEnum import ColorSpan
+from src.enums.InterpolationEnum import Interpolation
+from src.enums.RoiShapeEnum import RoiShape
+from src.helpers.profiling import StageProfiler
+from src.helpers.display_lut import OPENCV_INTERPOLATIONS, buildDisplayLut, applyDisplayLut, celsiusToRaw, rawToPaletteIndex
 
 class GuiController:
     def __init__(self
@@ -19,7 +26,17 @@ class GuiController:
                  , threshold: int = DEFAULT_THRESHOLD
                  , temperatureUnit: TemperatureUnit = DEFAULT_TEMPERATURE_UNIT
                  , temperatureUnitSymbol: str = DEFAULT_TEMPERATURE_UNIT_SYMBOL
-                 , reverseOutput: bool = False):
+                 , reverseOutput: bool = False
+                 , headless: bool = DEFAULT_HEADLESS
+                 , colorSpan: ColorSpan = DEFAULT_COLOR_SPAN
+                 , colorSpanMinC: float = DEFAULT_COLOR_SPAN_MIN_C
+                 , colorSpanMaxC: float = DEFAULT_COLOR_SPAN_MAX_C
+                 , colorSpanSmoothing: float = DEFAULT_COLOR_SPAN_SMOOTHING
+                 , normalizationDivisor: float = DEFAULT_NORMALIZATION_DIVISOR
+                 , normalizationOffset: float = DEFAULT_NORMALIZATION_OFFSET
+                 , interpolation: Interpolation = DEFAULT_INTERPOLATION
+                 , nativeCompositing: bool = DEFAULT_NATIVE_COMPOSITING
+                 , profiler: StageProfiler | None = None):
         self.logger = logger
         self.logger.info("Initializing GUIController.")
 
@@ -35,6 +52,16 @@ class GuiController:
         self.temperatureUnitSymbol = temperatureUnitSymbol
         self._temperatureUnit = temperatureUnit
         self.reverseOutput = reverseOutput
+        self.headless = headless
+        self.colorSpan = colorSpan
+        self.colorSpanMinC = colorSpanMinC
+        self.colorSpanMaxC = colorSpanMaxC
+        self.colorSpanSmoothing = colorSpanSmoothing
+        self.normalizationDivisor = normalizationDivisor
+        self.normalizationOffset = normalizationOffset
+        self.interpolation = interpolation
+        self.nativeCompositing = nativeCompositing
+        self.profiler = profiler if profiler is not None else StageProfiler()
 
         # Calculated properties
         self.scaledWidth = int(self.width*self.scale)
@@ -45,6 +72,8 @@ class GuiController:
         self.isFullscreen: bool = DEFAULT_FULLSCREEN
         self.isInverted: bool = False
         self.showPiP: bool = True
+        self.showRois: bool = DEFAULT_ROIS_VISIBLE
+        self.showProfiler: bool = DEFAULT_PROFILER_VISIBLE
         
         # Recording stats
         self.recordingStartTime: float = DEFAULT_RECORDING_START_TIME
@@ -53,13 +82,40 @@ class GuiController:
         
         # Other
         self._font = DEFAULT_FONT
+
+        # Preallocated render buffers, reused every frame (see _getRenderBuffer)
+        # They only change size with the scale, so they are dropped whenever the scale changes.
+        self._renderBuffers: dict[str, np.ndarray] = {}
+        self.renderBufferAllocations: int = 0 # Total number of buffers allocated since startup
+        self.frameBufferAllocations: int = 0 # Number of buffers allocated while rendering the last frame
+
+        # Fused contrast/inversion/colormap lookup table, rebuilt only when one of those settings changes
+        self._displayLut: np.ndarray | None = None
+        self._displayLutKey: tuple | None = None
+
+        # Cached overlay tiles (see OverlayTile)
+        self._hudTile: OverlayTile | None = None
+        self._hudLines: list[tuple | None] = []
+        self._crosshairTile: OverlayTile | None = None
+        self._pipTile: OverlayTile | None = None
+        self._roiTile: OverlayTile | None = None
+
+        # Profiler panel text, refreshed every PROFILER_PANEL_REFRESH_S
+        self._profilerLines: list[str] = []
+        self._profilerLinesTime: float = 0
+
+        # Color span in raw units, smoothed over frames in the SMOOTHED mode
+        self._smoothedSpan: tuple[float, float] | None = None
         
-        # Initialize the GUI
-        cv2.namedWindow(self.windowTitle, cv2.WINDOW_GUI_NORMAL)
-        cv2.resizeWindow(self.windowTitle, self.scaledWidth, self.scaledHeight)
+        # Initialize the GUI (headless mode has no window, so it does not need OpenCV's HighGUI at all)
+        if not self.headless:
+            cv2.namedWindow(self.windowTitle, cv2.WINDOW_GUI_NORMAL)
+            cv2.resizeWindow(self.windowTitle, self.scaledWidth, self.scaledHeight)
 
-        self.logger.info("GUIController initialized with window title: %s, width: %d, height: %d, scale: %d, colormap: %s, contrast: %.1f, blur radius: %d, threshold: %d, temperature unit symbol: %s",
-                         self.windowTitle, self.width, self.height, self.scale, self.colormap.name, self.contrast, self.blurRadius, self.threshold, self.temperatureUnitSymbol)
+        self.logger.info("GUIController initialized with window title: %s, width: %d, height: %d, scale: %d, colormap: %s, contrast: %.1f, blur radius: %d, "
+                         "threshold: %d, temperature unit symbol: %s, color span: %s, interpolation: %s, native compositing: %s",
+                         self.windowTitle, self.width, self.height, self.scale, self.colormap.name, self.contrast, self.blurRadius,
+                         self.threshold, self.temperatureUnitSymbol, self.colorSpan.name, self.interpolation.name, self.nativeCompositing)
         
     def updateRecordingStats(self):
         """
@@ -98,8 +154,9 @@ class GuiController:
                 self.scale = SCALE_MAX
             self.scaledWidth = deviceInfo.specs.imaging.ir_resolution_width_px*self.scale
             self.scaledHeight = deviceInfo.specs.imaging.ir_resolution_height_px*self.scale
-            if self.isFullscreen == False:
+            if self.isFullscreen == False and not self.headless:
                 cv2.resizeWindow(self.windowTitle, self.scaledWidth, self.scaledHeight)
+            self._releaseRenderBuffers()
 
             self.logger.info("Scale increased. New value: %d", self.scale)
         if keyPress == ord(KEY_DECREASE_SCALE): # Decrease scale
@@ -108,19 +165,20 @@ class GuiController:
                 self.scale = SCALE_MIN
             self.scaledWidth = deviceInfo.specs.imaging.ir_resolution_width_px*self.scale
             self.scaledHeight = deviceInfo.specs.imaging.ir_resolution_height_px*self.scale
-            if self.isFullscreen == False:
+            if self.isFullscreen == False and not self.headless:
                 cv2.resizeWindow(self.windowTitle, self.scaledWidth,self.scaledHeight)
+            self._releaseRenderBuffers()
 
             self.logger.info("Scale decreased. New value: %d", self.scale)
 
         ### FULLSCREEN CONTROLS
-        if keyPress == ord(KEY_FULLSCREEN): # Enable fullscreen
+        if keyPress == ord(KEY_FULLSCREEN) and not self.headless: # Enable fullscreen
             self.isFullscreen = DEFAULT_FULLSCREEN
             cv2.namedWindow(self.windowTitle, cv2.WND_PROP_FULLSCREEN)
             cv2.setWindowProperty(self.windowTitle, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
             
             self.logger.info("Fullscreen mode enabled.")
-        if keyPress == ord(KEY_WINDOWED): # Disable fullscreen
+        if keyPress == ord(KEY_WINDOWED) and not self.headless: # Disable fullscreen
             self.isFullscreen = not DEFAULT_FULLSCREEN
             cv2.namedWindow(self.windowTitle, cv2.WINDOW_GUI_NORMAL)
             cv2.setWindowProperty(self.windowTitle, cv2.WND_PROP_AUTOSIZE, cv2.WINDOW_GUI_NORMAL)
@@ -163,6 +221,10 @@ class GuiController:
         if keyPress == ord(KEY_INVERT): # Cycle through color maps
             self.logger.info("Inverting colors. Previous state: %s", self.isInverted)
             self.isInverted = not self.isInverted
+        if keyPress == ord(KEY_CYCLE_COLOR_SPAN): # Cycle through color spans
+            self.colorSpan = ColorSpan((self.colorSpan.value + 1) % len(ColorSpan))
+            self._smoothedSpan = None
+            self.logger.info("Color span changed to %s", self.colorSpan.name)
         
         if keyPress == ord(KEY_TOGGLE_OUTPUT_MODE): # Toggle between processed and raw thermal output
             self.logger.info("Toggling output mode. Previous state: %s", self.reverseOutput)
@@ -171,56 +233,141 @@ class GuiController:
         if keyPress == ord(KEY_TOGGLE_PIP): # Toggle PiP window visibility
             self.logger.info("Toggling PiP window visibility. Previous state: %s", self.showPiP)
             self.showPiP = not self.showPiP
+
+        if keyPress == ord(KEY_TOGGLE_ROIS): # Toggle ROI outlines and labels
+            self.logger.info("Toggling ROI visibility. Previous state: %s", self.showRois)
+            self.showRois = not self.showRois
+
+        if keyPress == ord(KEY_TOGGLE_PROFILER): # Toggle the stage timings panel
+            self.logger.info("Toggling profiler panel visibility. Previous state: %s", self.showProfiler)
+            self.showProfiler = not self.showProfiler
+            self._profilerLinesTime = 0
         
-    def drawGUI(self, imdata, thdata, temp, averageTemp, maxTemp, minTemp, labelThreshold, isRecording, mrow, mcol, lrow, lcol):
+    def _getRenderBuffer(self, name: str, shape: tuple, dtype=np.uint8) -> np.ndarray:
+        """
+        Gets the preallocated render buffer with the given name, (re)allocating it only if its shape or dtype changed.
+        Every allocation is counted, so a buffer that gets reallocated every frame shows up in frameBufferAllocations.
+        """
+        buffer = self._renderBuffers.get(name)
+        if buffer is None or buffer.shape != shape or buffer.dtype != dtype:
+            buffer = np.empty(shape, dtype=dtype)
+            self._renderBuffers[name] = buffer
+            self.renderBufferAllocations += 1
+        return buffer
+
+    def _releaseRenderBuffers(self):
+        """
+        Drops all render buffers and overlay tiles, so they are allocated and drawn again at the new size on the next frame.
+        """
+        self.logger.debug("Releasing %d render buffers.", len(self._renderBuffers))
+        self._renderBuffers.clear()
+        self._hudTile = None
+        self._crosshairTile = None
+        self._pipTile = None
+        self._roiTile = None
+
+    def drawGUI(self, imdata, thdata, stats: FrameStats, labelThreshold, isRecording, raw=None, hotspots=None, coldspots=None, regions=None, roiStats=None, activeAlarms=None):
         """
         Draws the GUI elements on the thermal image.
+        The stats are expected to already be converted to the display temperature unit.
+        If a decoded raw matrix is given and a color span other than LUMA is selected, the image is colored by temperature instead of by the image data.
+        If hotspots/coldspots (HOTSPOT_DTYPE arrays, in the display temperature unit) are given, they are marked instead of the single min/max pixel.
+        If regions of interest and their stats (ROI_STATS_DTYPE, in the display temperature unit) are given, they are outlined and labelled.
+        Active alarms, as (name, target) pairs, are listed in the bottom left corner.
+
+        The returned image is a render buffer that is reused for the next frame, so copy it if it has to outlive the frame.
         """
+        allocationsBefore = self.renderBufferAllocations
+
         # Swap data sources if reverseOutput is enabled
         # This helps if the camera backend is showing the wrong half of the frame
-        if self.reverseOutput:
+        if self.reverseOutput and thdata is not None:
             display_data = thdata
             pip_data = imdata
         else:
             display_data = imdata
             pip_data = thdata
         
-        # Apply affects
-        img = self.applyEffects(imdata=display_data)
-        
-        # Apply inversion
-        if self.isInverted == True:
-            img = cv2.bitwise_not(img)
+        # Apply affects (contrast, inversion and colormap included)
+        with self.profiler.measure("colormap"):
+            if self.colorSpan != ColorSpan.LUMA and raw is not None:
+                img = self.colorizeTemperatures(raw)
+            else:
+                img = self.colorizeImageData(display_data)
+
+        # Upscale. With native compositing, all pixel processing (blur, PiP) happens at sensor resolution
+        # and only the vector overlays below are drawn on the upscaled image.
+        hasPiP = self.showPiP and pip_data is not None and pip_data.size > 0
+        with self.profiler.measure("effects"):
+            if self.nativeCompositing:
+                if self.blurRadius > 0:
+                    img = cv2.blur(img, (self.blurRadius, self.blurRadius), dst=self._getRenderBuffer("blurredNative", img.shape))
+                if hasPiP:
+                    img = self._insertPiPImage(img, pip_data, self._getPiPRect(isNative=True))
+                img = self._resize(img)
+            else:
+                img = self._upscale(img)
+
+        with self.profiler.measure("overlays"):
+            img = self._drawOverlays(img, stats, labelThreshold, isRecording, pip_data, hasPiP, hotspots, coldspots, regions, roiStats, activeAlarms)
+
+        self.frameBufferAllocations = self.renderBufferAllocations - allocationsBefore
+        if self.frameBufferAllocations > 0:
+            self.logger.debug("Allocated %d render buffers this frame (%d in total).", self.frameBufferAllocations, self.renderBufferAllocations)
 
-        # Apply colormap
-        img = self.applyColormap(img)
+        return img
+
+    def _drawOverlays(self, img, stats: FrameStats, labelThreshold, isRecording, pip_data, hasPiP: bool, hotspots, coldspots, regions, roiStats, activeAlarms):
+        """
+        Draws the crosshairs, labels, HUD and other overlays onto the upscaled image (see drawGUI).
+        """
 
         # Draw crosshairs
         img = self.drawCrosshairs(img)
         
         # Draw temp
-        img = self.drawTemp(img, temp)
+        img = self.drawTemp(img, stats.centerTemp)
+
+        # Draw regions of interest
+        if self.showRois and regions and roiStats is not None:
+            img = self.drawRegionsOfInterest(img, regions, roiStats)
 
         # Draw HUD
         if self.isHudVisible == True:
-            img = self.drawHUD(img, averageTemp, labelThreshold, isRecording)
+            img = self.drawHUD(img, stats.avgTemp, labelThreshold, isRecording)
         
-        # Display floating max temp
-        if maxTemp > averageTemp + labelThreshold:
-            img = self.drawMaxTemp(img, mrow, mcol, maxTemp)
-
-        # Display floating min temp
-        if minTemp < averageTemp - labelThreshold:
-            img = self.drawMinTemp(img, lrow, lcol, minTemp)
+        # Display floating max temp(s)
+        if hotspots is not None:
+            for spot in hotspots[hotspots["temperature"] > stats.avgTemp + labelThreshold]:
+                img = self.drawMaxTemp(img, spot["row"], spot["col"], round(float(spot["temperature"]), DEFAULT_TEMPERATURE_SIG_DIGITS))
+        elif stats.maxTemp > stats.avgTemp + labelThreshold:
+            img = self.drawMaxTemp(img, stats.maxRow, stats.maxCol, stats.maxTemp)
+
+        # Display floating min temp(s)
+        if coldspots is not None:
+            for spot in coldspots[coldspots["temperature"] < stats.avgTemp - labelThreshold]:
+                img = self.drawMinTemp(img, spot["row"], spot["col"], round(float(spot["temperature"]), DEFAULT_TEMPERATURE_SIG_DIGITS))
+        elif stats.minTemp < stats.avgTemp - labelThreshold:
+            img = self.drawMinTemp(img, stats.minRow, stats.minCol, stats.minTemp)
             
+        # Display active alarms
+        if activeAlarms:
+            img = self.drawAlarms(img, activeAlarms)
+
         # Update recording stats
         if isRecording == True:
             self.updateRecordingStats()
         
         # Show PiP with the alternate data source for comparison if enabled
-        if self.showPiP:
+        if hasPiP and self.nativeCompositing:
+            img = self._drawPiPBorder(img, tuple(value*self.scale for value in self._getPiPRect(isNative=True)), self.reverseOutput)
+        elif hasPiP:
             img = self._overlayRawThermalData(img, pip_data, self.reverseOutput)
 
+        # Stage timings panel
+        if self.showProfiler:
+            img = self.drawProfiler(img)
+
         return img
 
     def drawTemp(self, img, temp):
@@ -251,174 +398,164 @@ class GuiController:
     def drawCrosshairs(self, img):
         """
         Draws crosshairs on the image.
+        The crosshairs are drawn once into a cached tile, which is only redrawn when the scale changes.
         """
-        cv2.line(
-            img,
-            (int(self.scaledWidth/2),int(self.scaledHeight/2)+20),
-            (int(self.scaledWidth/2),int(self.scaledHeight/2)-20),
-            (255,255,255),
-            2) #vline
-        cv2.line(
-            img,
-            (int(self.scaledWidth/2)+20,int(self.scaledHeight/2)),
-            (int(self.scaledWidth/2)-20,int(self.scaledHeight/2)),
-            (255,255,255),
-            2) #hline
+        centerX, centerY = int(self.scaledWidth/2), int(self.scaledHeight/2)
+        key = (centerX, centerY)
+        if self._crosshairTile is None or self._crosshairTile.key != key:
+            tile = OverlayTile(centerX - 22, centerY - 22, 45, 45, key=key)
+            tile.line((centerX, centerY+20), (centerX, centerY-20), (255,255,255), 2) #vline
+            tile.line((centerX+20, centerY), (centerX-20, centerY), (255,255,255), 2) #hline
+            tile.line((centerX, centerY+20), (centerX, centerY-20), (0,0,0), 1) #vline
+            tile.line((centerX+20, centerY), (centerX-20, centerY), (0,0,0), 1) #hline
+            self._crosshairTile = tile
+
+        return self._crosshairTile.blit(img)
+
+    def drawRegionsOfInterest(self, img, regions, roiStats):
+        """
+        Draws the outlines of the regions of interest and labels the hottest ones (up to ROI_LABEL_LIMIT) with their max temperature.
+        The outlines do not change, so they are drawn once into a cached tile that is only redrawn when the scale or the regions change.
+        """
+        key = (self.scale, id(regions))
+        if self._roiTile is None or self._roiTile.key != key:
+            tile = OverlayTile(0, 0, self.scaledWidth, self.scaledHeight, key=key)
+            for region in regions:
+                if region.shape == RoiShape.POLYGON:
+                    points = [(x*self.scale + self.scale//2, y*self.scale + self.scale//2) for x, y in region.points]
+                    for start, end in zip(points, points[1:] + points[:1]):
+                        tile.line(start, end, (255, 255, 255), 1)
+                else:
+                    tile.rectangle(
+                        (region.x*self.scale, region.y*self.scale),
+                        ((region.x + region.width)*self.scale - 1, (region.y + region.height)*self.scale - 1),
+                        (255, 255, 255),
+                        1)
+            self._roiTile = tile
+        img = self._roiTile.blit(img)
+
+        # Label only the hottest regions, so hundreds of regions stay readable (and cheap to draw)
+        maxima = np.nan_to_num(roiStats["max"], nan=-np.inf)
+        hottest = np.argsort(-maxima, kind='stable')[:ROI_LABEL_LIMIT]
+        for index in hottest:
+            if not np.isfinite(maxima[index]):
+                break
+            region = regions[index]
+            text = region.name+': '+str(round(float(maxima[index]), DEFAULT_TEMPERATURE_SIG_DIGITS))+' '+self.temperatureUnitSymbol
+            org = (max(region.x, 0)*self.scale + 2, max(region.y*self.scale - 4, 12))
+            cv2.putText(img, text, org, self._font, 0.4, (0, 0, 0), 2, cv2.LINE_AA)
+            cv2.putText(img, text, org, self._font, 0.4, (255, 255, 255), 1, cv2.LINE_AA)
+        return img
 
-        cv2.line(
-            img,
-            (int(self.scaledWidth/2),int(self.scaledHeight/2)+20),
-            (int(self.scaledWidth/2),int(self.scaledHeight/2)-20),
-            (0,0,0),
-            1) #vline
-        cv2.line(
-            img,
-            (int(self.scaledWidth/2)+20,int(self.scaledHeight/2)),
-            (int(self.scaledWidth/2)-20,int(self.scaledHeight/2)),
-            (0,0,0),
-            1) #hline
-        
+    def drawAlarms(self, img, activeAlarms):
+        """
+        Lists the active alarms (up to ALARM_DISPLAY_LIMIT of them) in the bottom left corner of the image.
+        """
+        lines = ['ALARM: '+name+('' if target == ALARM_TARGET_FRAME else ' ('+target+')') for name, target in activeAlarms[:ALARM_DISPLAY_LIMIT]]
+        if len(activeAlarms) > ALARM_DISPLAY_LIMIT:
+            lines.append('+'+str(len(activeAlarms) - ALARM_DISPLAY_LIMIT)+' more alarms')
+        for index, text in enumerate(reversed(lines)):
+            org = (10, self.scaledHeight - 10 - 16*index)
+            cv2.putText(img, text, org, self._font, 0.45, (0, 0, 0), 2, cv2.LINE_AA)
+            cv2.putText(img, text, org, self._font, 0.45, (40, 40, 255), 1, cv2.LINE_AA)
         return img
 
     def drawHUD(self, img, averageTemp, labelThreshold, isRecording):
         """
         Draws the HUD onto the image.
+        The HUD is kept in a cached tile; only the lines whose text changed since the last frame are redrawn.
         """
-        # Display black box for our data
-        cv2.rectangle(
-            img, 
-            (0, 0),
-            (160, 134),
-            (0,0,0),
-            -1)
-        
-        # Put text in the box
-        cv2.putText(
-            img,
-            'Avg Temp: '+str(averageTemp)+' '+self.temperatureUnitSymbol,
-            (10, 14),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
-
-        cv2.putText(
-            img,
-            'Label Threshold: '+str(labelThreshold)+' '+self.temperatureUnitSymbol,
-            (10, 28),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
-
-        cv2.putText(
-            img,
-            'Colormap: '+self.colormap.name,
-            (10, 42),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
-
-        cv2.putText(
-            img,
-            'Blur: '+str(self.blurRadius)+' ', 
-            (10, 56),
-            self._font, 
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
-
-        cv2.putText(
-            img,
-            'Scaling: '+str(self.scale)+' ',
-            (10, 70),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
-
-        cv2.putText(
-            img,
-            'Contrast: '+str(self.contrast)+' ',
-            (10, 84),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
+        lines = [
+            ('Avg Temp: '+str(averageTemp)+' '+self.temperatureUnitSymbol, (0, 255, 255)),
+            ('Label Threshold: '+str(labelThreshold)+' '+self.temperatureUnitSymbol, (0, 255, 255)),
+            ('Colormap: '+self.colormap.name, (0, 255, 255)),
+            ('Blur: '+str(self.blurRadius)+' ', (0, 255, 255)),
+            ('Scaling: '+str(self.scale)+' ', (0, 255, 255)),
+            ('Contrast: '+str(self.contrast)+' ', (0, 255, 255)),
+            ('Snapshot: '+self.last_snapshot_time+' ', (0, 255, 255)),
+            ('Recording: '+str(isRecording), (200, 200, 200)) if isRecording == False else ('Recording: '+self.recordingDuration, (40, 40, 255)),
+            ('Inverted: '+str(self.isInverted), (0, 255, 255)),
+        ]
+
+        # The text may run past the black box (e.g. the snapshot time), so the tile is made wide enough for the longest line
+        width = max(161, max(10 + cv2.getTextSize(text, self._font, 0.4, 1)[0][0] + 2 for text, _ in lines))
+        width = min(width, self.scaledWidth)
+        if self._hudTile is None or self._hudTile.width < width:
+            self._hudTile = OverlayTile(0, 0, width, min(135, self.scaledHeight), opaqueWidth=161, opaqueHeight=135)
+            self._hudLines = [None] * len(lines)
+
+        # The glyphs of neighbouring lines share a row, so a changed line's rows are cleared
+        # and redrawn together with the parts of its neighbours that reach into them
+        tile = self._hudTile
+        changed = [index for index, line in enumerate(lines) if self._hudLines[index] != line]
+        for index in changed:
+            y = 14 + 14*index
+            tile.clearRows(y - 10, y + 5)
+            for neighbour in range(max(index - 1, 0), min(index + 2, len(lines))):
+                text, color = lines[neighbour]
+                tile.putText(text, (10, 14 + 14*neighbour), self._font, 0.4, color, 1, cv2.LINE_AA, clipRows=(y - 10, y + 5))
+        self._hudLines = lines
+
+        return tile.blit(img)
+    
+    def drawProfiler(self, img):
+        """
+        Draws the stage timings of the profiler in the top right corner.
+        The text is only refreshed every PROFILER_PANEL_REFRESH_S, since the percentiles are too costly to take every frame.
+        """
+        now = time.monotonic()
+        if now - self._profilerLinesTime >= PROFILER_PANEL_REFRESH_S:
+            if self.profiler.enabled:
+                self._profilerLines = ["Stage timings (ms)"] + self.profiler.formatReport()
+            else:
+                self._profilerLines = ["Profiler disabled"]
+            self._profilerLinesTime = now
+
+        lineHeight = 14
+        width = min(10 + max(cv2.getTextSize(line, self._font, PROFILER_PANEL_SCALE, 1)[0][0] for line in self._profilerLines), img.shape[1])
+        height = min(6 + lineHeight*len(self._profilerLines), img.shape[0])
+        left = img.shape[1] - width
+        img[:height, left:] = 0
+        for index, line in enumerate(self._profilerLines):
+            cv2.putText(img, line, (left + 5, lineHeight*(index + 1)), self._font, PROFILER_PANEL_SCALE, (0, 255, 255), 1, cv2.LINE_AA)
+        return img
 
-        cv2.putText(
-            img,
-            'Snapshot: '+self.last_snapshot_time+' ',
-            (10, 98),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
+    def _toDisplayPoint(self, row: float, col: float) -> tuple[tuple[int, int], tuple[int, int]]:
+        """
+        Converts a (sub-pixel) sensor position into display coordinates:
+        a fixed-point point (with DISPLAY_POINT_SHIFT fractional bits) for circles, and a whole-pixel point for text.
+        """
+        x, y = col*self.scale, row*self.scale
+        return ((round(x * (1 << DISPLAY_POINT_SHIFT)), round(y * (1 << DISPLAY_POINT_SHIFT))), (int(round(x)), int(round(y))))
 
-        if isRecording == False:
-            cv2.putText(
-                img,
-                'Recording: '+str(isRecording),
-                (10, 112),
-                self._font,
-                0.4,
-                (200, 200, 200),
-                1,
-                cv2.LINE_AA)
-        else:
-            cv2.putText(
-                img,
-                'Recording: '+self.recordingDuration,
-                (10, 112),
-                self._font,
-                0.4,
-                (40, 40, 255),
-                1,
-                cv2.LINE_AA)
-            
-        cv2.putText(
-            img,
-            'Inverted: '+str(self.isInverted),
-            (10, 126),
-            self._font,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
-            
-        return img
-    
-    def drawMaxTemp(self, img, row: int, col: int, maxTemp):
+    def drawMaxTemp(self, img, row: float, col: float, maxTemp):
         """
         Draws the maximum temperature point on the image.
+        The position may be sub-pixel (e.g. from the hotspot engine).
         """
+        center, (x, y) = self._toDisplayPoint(row, col)
+
         # Draw max temp circle(s)
         cv2.circle(
             img,
-            (row*self.scale, col*self.scale),
-            5,
+            center,
+            5 << DISPLAY_POINT_SHIFT,
             (0,0,0),
-            2)
+            2,
+            shift=DISPLAY_POINT_SHIFT)
         cv2.circle(
             img,
-            (row*self.scale, col*self.scale),
-            5,
+            center,
+            5 << DISPLAY_POINT_SHIFT,
             (0,0,255),
-            -1)
+            -1,
+            shift=DISPLAY_POINT_SHIFT)
         
         # Draw max temp label(s)
         cv2.putText(
             img=img,
             text=str(maxTemp)+' '+self.temperatureUnitSymbol, 
-            org=((row*self.scale)+10, (col*self.scale)+5),
+            org=(x+10, y+5),
             fontFace=self._font, 
             fontScale=0.45,
             color=(0,0,0), 
@@ -428,7 +565,7 @@ class GuiController:
         cv2.putText(
             img=img,
             text=str(maxTemp)+' '+self.temperatureUnitSymbol,
-            org=((row*self.scale)+10, (col*self.scale)+5),
+            org=(x+10, y+5),
             fontFace=self._font,
             fontScale=0.45,
             color=(0, 255, 255),
@@ -437,20 +574,23 @@ class GuiController:
 
         return img
     
-    def drawMinTemp(self, img, row: int, col: int, minTemp):
+    def drawMinTemp(self, img, row: float, col: float, minTemp):
         """
         Draws the minimum temperature point on the image.
+        The position may be sub-pixel (e.g. from the hotspot engine).
         """
+        center, (x, y) = self._toDisplayPoint(row, col)
+
         # Draw min temp circle
-        cv2.circle(img, (row*self.scale, col*self.scale), 5, (0,0,0), 2)
-        cv2.circle(img, (row*self.scale, col*self.scale), 5, (255,0,0), -1)
+        cv2.circle(img, center, 5 << DISPLAY_POINT_SHIFT, (0,0,0), 2, shift=DISPLAY_POINT_SHIFT)
+        cv2.circle(img, center, 5 << DISPLAY_POINT_SHIFT, (255,0,0), -1, shift=DISPLAY_POINT_SHIFT)
         
         # Draw min temp label(s)
         cv2.putText(
             img,
             str(minTemp)+' '+self.temperatureUnitSymbol,
-            ((row*self.scale)+10,
-             (col*self.scale)+5),
+            (x+10,
+             y+5),
             self._font,
             0.45,
             (0,0,0),
@@ -459,8 +599,8 @@ class GuiController:
         cv2.putText(
             img,
             str(minTemp)+' '+self.temperatureUnitSymbol, 
-            ((row*self.scale)+10,
-             (col*self.scale)+5),
+            (x+10,
+             y+5),
             self._font,
             0.45,
             (0, 255, 255),
@@ -469,84 +609,143 @@ class GuiController:
 
         return img
     
-    def applyColormap(self, img):
-        """
-        Applies the selected colormap to the image data.
-        """
-        match Colormap(self.colormap):
-            case Colormap.JET:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_JET)
-            case Colormap.HOT:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_HOT)
-            case Colormap.MAGMA:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_MAGMA)
-            case Colormap.INFERNO:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_INFERNO)
-            case Colormap.PLASMA:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_PLASMA)
-            case Colormap.BONE:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_BONE)
-            case Colormap.SPRING:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_SPRING)
-            case Colormap.AUTUMN:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_AUTUMN)
-            case Colormap.VIRIDIS:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_VIRIDIS)
-            case Colormap.PARULA:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_PARULA)
-            case Colormap.INV_RAINBOW:
-                img = cv2.applyColorMap(img, cv2.COLORMAP_RAINBOW)
-                img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
+    def _getDisplayLut(self, contrast: float | None = None, videoRange: bool = False) -> np.ndarray:
+        """
+        Gets the fused contrast/inversion/colormap lookup table, rebuilding it if any of those settings changed.
+        """
+        key = (self.contrast if contrast is None else contrast, self.isInverted, Colormap(self.colormap), videoRange)
+        if self._displayLut is None or self._displayLutKey != key:
+            self._displayLut = buildDisplayLut(*key)
+            self._displayLutKey = key
+            self.logger.debug("Rebuilt display LUT for contrast: %.1f, inverted: %s, colormap: %s, video range: %s", key[0], key[1], key[2].name, key[3])
+        return self._displayLut
+
+    def applyColormap(self, gray, videoRange: bool = False):
+        """
+        Applies contrast, inversion and the selected colormap to 8-bit grayscale image data, using the fused lookup table.
+        videoRange is for the luma of YUYV data, which is expanded from 16-235 to 0-255 first.
+        """
+        return applyDisplayLut(gray, self._getDisplayLut(videoRange=videoRange), out=self._getRenderBuffer("colormap", gray.shape + (3,)))
 
-        return img
+    def getColorSpan(self, raw) -> tuple[float, float]:
+        """
+        Gets the span of raw values that the colormap is stretched over, for the selected color span mode.
+        FIXED uses the configured temperatures, AUTO the frame's own min/max, SMOOTHED an exponential moving average of the frame min/max.
+        """
+        if self.colorSpan == ColorSpan.FIXED:
+            return (celsiusToRaw(self.colorSpanMinC, self.normalizationDivisor, self.normalizationOffset),
+                    celsiusToRaw(self.colorSpanMaxC, self.normalizationDivisor, self.normalizationOffset))
+
+        low, high, _, _ = cv2.minMaxLoc(raw)
+        if self.colorSpan == ColorSpan.SMOOTHED:
+            if self._smoothedSpan is not None:
+                alpha = self.colorSpanSmoothing
+                low = self._smoothedSpan[0] + alpha * (low - self._smoothedSpan[0])
+                high = self._smoothedSpan[1] + alpha * (high - self._smoothedSpan[1])
+            self._smoothedSpan = (low, high)
+
+        # Keep a minimum width centered on the span, so sensor noise of a uniform scene is not stretched over the whole colormap
+        minWidth = COLOR_SPAN_MIN_WIDTH_C * self.normalizationDivisor
+        if high - low < minWidth:
+            center = (low + high) / 2
+            low, high = center - minWidth / 2, center + minWidth / 2
+        return low, high
+
+    def colorizeTemperatures(self, raw):
+        """
+        Colors the decoded raw matrix by temperature over the selected color span, at sensor resolution.
+        Contrast is not applied, so every color always stands for the same temperature within the span.
+        """
+        low, high = self.getColorSpan(raw)
+        paletteIndex = rawToPaletteIndex(raw, low, high, out=self._getRenderBuffer("paletteIndex", raw.shape))
+        return applyDisplayLut(paletteIndex, self._getDisplayLut(contrast=1.0), out=self._getRenderBuffer("colormap", raw.shape + (3,)))
+
+    def applyTemperatureEffects(self, raw):
+        """
+        Colors the decoded raw matrix by temperature over the selected color span, then upscales and blurs it.
+        """
+        return self._upscale(self.colorizeTemperatures(raw))
 
     def applyEffects(self, imdata):
         """
-        Applies effects (contrast, blur, upscaling, interpolation, etc.) to the image data.
+        Applies effects (contrast, inversion, colormap, upscaling, interpolation, blur) to the image data.
         """
-        # Convert thermal camera YUYV image data into BGR for display.
-        try:
-            imdata = cv2.cvtColor(imdata, cv2.COLOR_YUV2BGR_YUYV)
-        except cv2.error:
-            pass
+        return self._upscale(self.colorizeImageData(imdata))
 
-        # Contrast
-        img = cv2.convertScaleAbs(imdata, alpha=self.contrast)
-        
-        # Bicubic interpolate, upscale and blur
-        img = cv2.resize(img, (self.scaledWidth,self.scaledHeight), interpolation=cv2.INTER_CUBIC) # Scale up!
+    def colorizeImageData(self, imdata):
+        """
+        Applies contrast, inversion and the colormap to the image data, at sensor resolution with one lookup table.
+        """
+        # The colormaps work on luminance. YUYV image data already has it in the Y channel, so there is no conversion needed:
+        # the table expands its video range (16-235) like the conversion to BGR would.
+        if imdata.ndim == 3 and imdata.shape[2] == 2:
+            return self.applyColormap(imdata[..., 0], videoRange=True)
+        elif imdata.ndim == 3:
+            gray = cv2.cvtColor(imdata, cv2.COLOR_BGR2GRAY, dst=self._getRenderBuffer("gray", imdata.shape[:2]))
+        else:
+            gray = imdata
+
+        # Contrast, inversion and colormap
+        return self.applyColormap(gray)
+
+    def _resize(self, img):
+        """
+        Upscales the native resolution image to the display size with the selected interpolation.
+        """
+        return cv2.resize(img, (self.scaledWidth,self.scaledHeight)
+                          , dst=self._getRenderBuffer("scaled", (self.scaledHeight, self.scaledWidth, 3))
+                          , interpolation=OPENCV_INTERPOLATIONS[self.interpolation]) # Scale up!
+
+    def _upscale(self, img):
+        """
+        Upscales the colored native resolution image to the display size and blurs it.
+        """
+        img = self._resize(img)
         
         # Blur
         if self.blurRadius > 0:
-            img = cv2.blur(img,(self.blurRadius, self.blurRadius))
+            img = cv2.blur(img,(self.blurRadius, self.blurRadius), dst=self._getRenderBuffer("blurred", img.shape))
 
         return img
     
+    def _getPiPRect(self, isNative: bool = False) -> tuple[int, int, int, int]:
+        """
+        Gets the (x, y, width, height) of the PiP window: roughly 1/3 of the image, in the bottom-right corner with some padding.
+        With isNative, the rect is in sensor pixels (for native compositing), otherwise in display pixels.
+        """
+        if isNative:
+            width, height, padding = self.width, self.height, max(1, round(10 / self.scale))
+        else:
+            width, height, padding = self.scaledWidth, self.scaledHeight, 10
+        pip_width = width // 3
+        pip_height = height // 3
+        return (width - pip_width - padding, height - pip_height - padding, pip_width, pip_height)
+
     def _overlayRawThermalData(self, img, thdata, is_swapped):
         """
         Overlays the alternate data source as a picture-in-picture window on the main image.
         This shows what the camera is actually sending alongside the processed view.
         When swapped, shows the normal view in PiP while thermal data is the main display.
-
-        TODO: clean this up
         """
         if thdata is None or thdata.size == 0:
             return img
-        
-        # Calculate PiP window size (roughly 1/3 of the main image)
-        pip_width = self.scaledWidth // 3
-        pip_height = self.scaledHeight // 3
-        
-        # Position in bottom-right corner with some padding
-        x_offset = self.scaledWidth - pip_width - 10
-        y_offset = self.scaledHeight - pip_height - 10
+
+        rect = self._getPiPRect()
+        img = self._drawPiPBorder(img, rect, is_swapped)
+        return self._insertPiPImage(img, thdata, rect)
+
+    def _insertPiPImage(self, img, thdata, rect: tuple[int, int, int, int]):
+        """
+        Renders the alternate data source into the given (x, y, width, height) rect of the image.
+        """
+        x_offset, y_offset, pip_width, pip_height = rect
         
         # Try to display as YUY2 (convert from raw bytes)
         try:
-            # Treat the 2-channel thermal data as YUYV packed format
-            thermal_yuyv = thdata.astype(np.uint8)
+            # Treat the 2-channel thermal data as YUYV packed format (no copy if it already is uint8)
+            thermal_yuyv = np.asarray(thdata, dtype=np.uint8)
             # Convert YUY2 to BGR for display (this will show the raw colors)
-            thermal_bgr = cv2.cvtColor(thermal_yuyv, cv2.COLOR_YUV2BGR_YUYV)
+            thermal_bgr = cv2.cvtColor(thermal_yuyv, cv2.COLOR_YUV2BGR_YUYV, dst=self._getRenderBuffer("pipBgr", thermal_yuyv.shape[:2] + (3,)))
         except cv2.error:
             # Fallback: stack the channels to see the raw data
             if thdata.ndim == 2:
@@ -557,40 +756,37 @@ class GuiController:
                     thermal_bgr = cv2.cvtColor(thermal_bgr, cv2.COLOR_GRAY2BGR)
         
         # Resize to PiP dimensions
-        pip_img = cv2.resize(thermal_bgr, (pip_width, pip_height), interpolation=cv2.INTER_CUBIC)
+        pip_img = cv2.resize(thermal_bgr, (pip_width, pip_height), dst=self._getRenderBuffer("pip", (pip_height, pip_width, 3)), interpolation=OPENCV_INTERPOLATIONS[self.interpolation])
         
         # Apply contrast
-        pip_img = cv2.convertScaleAbs(pip_img, alpha=self.contrast)
-        
-        # Draw border around PiP
-        cv2.rectangle(img, (x_offset - 2, y_offset - 2), 
-                     (x_offset + pip_width + 2, y_offset + pip_height + 2), 
-                     (255, 255, 255), 2)
-        
-        # Label changes based on whether we're swapped or not
-        label = 'NORMAL VIEW' if is_swapped else 'THERMAL DATA'
-        
-        # Add label above PiP
-        cv2.putText(
-            img,
-            label,
-            (x_offset, y_offset - 8),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.4,
-            (0, 0, 0),
-            2,
-            cv2.LINE_AA)
-        cv2.putText(
-            img,
-            label,
-            (x_offset, y_offset - 8),
-            cv2.FONT_HERSHEY_SIMPLEX,
-            0.4,
-            (0, 255, 255),
-            1,
-            cv2.LINE_AA)
+        pip_img = cv2.convertScaleAbs(pip_img, dst=pip_img, alpha=self.contrast)
         
         # Overlay the PiP onto the main image
         img[y_offset:y_offset + pip_height, x_offset:x_offset + pip_width] = pip_img
         
-        return img
\ No newline at end of file
+        return img
+
+    def _drawPiPBorder(self, img, rect: tuple[int, int, int, int], is_swapped):
+        """
+        Draws the border and label of the PiP window at the given (x, y, width, height) display rect.
+        They are cached in a tile, since they only move when the scale changes.
+        """
+        x_offset, y_offset, pip_width, pip_height = rect
+
+        # Label changes based on whether we're swapped or not
+        label = 'NORMAL VIEW' if is_swapped else 'THERMAL DATA'
+        key = (x_offset, y_offset, pip_width, pip_height, label)
+        if self._pipTile is None or self._pipTile.key != key:
+            (labelWidth, labelHeight), _ = cv2.getTextSize(label, cv2.FONT_HERSHEY_SIMPLEX, 0.4, 2)
+            top = max(y_offset - 8 - labelHeight - 4, 0)
+            tile = OverlayTile(
+                x_offset - 3, top,
+                min(max(pip_width + 7, labelWidth + 6), self.scaledWidth - x_offset + 3), min(y_offset + pip_height + 4, self.scaledHeight) - top,
+                key=key)
+            tile.rectangle((x_offset - 2, y_offset - 2), (x_offset + pip_width + 2, y_offset + pip_height + 2), (255, 255, 255), 2)
+            # Add label above PiP
+            tile.putText(label, (x_offset, y_offset - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 0, 0), 2, cv2.LINE_AA)
+            tile.putText(label, (x_offset, y_offset - 8), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1, cv2.LINE_AA)
+            self._pipTile = tile
+
+        return self._pipTile.blit(img)
@@ -0,0 +1,272 @@
+import cv2, math, os, time, logging, threading, numpy as np
+from concurrent.futures import Future, ThreadPoolExecutor
+from numpy.typing import NDArray
+from src.controllers.controlController import ControlController
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.defaults.values import *
+from src.defaults.keybinds import *
+from src.models.camerametrics import CameraMetrics
+
+class CameraSlot:
+    """
+    The supervisor's bookkeeping for one camera. Only the worker running the camera's step touches the camera;
+    the supervisor queues key presses here and applies them with the next step.
+    """
+    def __init__(self, camera: ThermalCameraController, label: str):
+        self.camera = camera
+        self.label = label
+        self.future: Future | None = None
+        self.keys: list[int] = []
+        self.ended: bool = False
+        self.lastStart: float = 0
+        self.processed: int = 0
+        self.processSeconds: float = 0
+        self.reportedProcessed: int = 0
+        self.reportedProcessSeconds: float = 0
+
+class MultiCameraController:
+    """
+    Runs several camera pipelines in one process, e.g. all cameras of an inspection station.
+
+    Each camera keeps its own capture thread and frame ring (its ThermalCameraController). The supervisor waits on all rings
+    at once and hands each new frame to a shared pool of worker threads that decode, analyze and render it. A camera never has
+    more than one frame in flight, so a slow camera or a busy pool drops frames (the newest frame is always taken) instead of queueing them.
+    The CPU use of the whole station is bounded by the number of workers (OpenCV's own threads are limited to one per worker)
+    and, optionally, a per-camera frame rate limit.
+
+    The cameras are shown as a tiled mosaic in one window, or run headless with their sinks. Key presses apply to every camera.
+    """
+    def __init__(self,
+                 cameras: list[ThermalCameraController],
+                 logger: logging.Logger,
+                 labels: list[str] | None = None,
+                 headless: bool = DEFAULT_HEADLESS,
+                 workers: int | None = None,
+                 maxFps: float = DEFAULT_MULTI_CAMERA_MAX_FPS,
+                 mosaicColumns: int | None = None,
+                 controlPort: int | None = None,
+                 metricsInterval: float = MULTI_CAMERA_METRICS_INTERVAL_S):
+        if len(cameras) == 0:
+            raise ValueError("The multi-camera supervisor needs at least one camera")
+        self.logger = logger
+        self.headless = headless
+        self.workers = workers if workers is not None else min(len(cameras), os.cpu_count() or 1)
+        self.maxFps = maxFps
+        self.metricsInterval = metricsInterval
+        labels = labels if labels is not None else [f"cam{index}" for index in range(len(cameras))]
+        self._slots: list[CameraSlot] = [CameraSlot(camera, label) for camera, label in zip(cameras, labels)]
+        self._wakeup = threading.Event()
+        self._controlController = ControlController(logger=logger.getChild("ControlController"), port=controlPort)
+
+        # Mosaic layout
+        self._columns: int = mosaicColumns if mosaicColumns else math.ceil(math.sqrt(len(cameras)))
+        self._rows: int = math.ceil(len(cameras) / self._columns)
+        self._cellSize: tuple[int, int] = (0, 0) # height, width
+        self._mosaic: NDArray[np.uint8] | None = None
+        self._mosaicDirty: bool = False
+        self._lastMosaicTime: float = 0
+        self._lastKeyPollTime: float = 0
+        self._isFullscreen: bool = DEFAULT_FULLSCREEN
+        self._windowCreated: bool = False
+
+        self._lastReportTime: float = 0
+        self.logger.info(f"Supervising {len(cameras)} camera(s) with {self.workers} worker(s)" + (f", at most {maxFps} fps each" if maxFps > 0 else ""))
+
+    @property
+    def labels(self) -> list[str]:
+        return [slot.label for slot in self._slots]
+
+    def getMetrics(self) -> list[CameraMetrics]:
+        """
+        Returns the metrics of every camera since the last call (rates) and since the start (counts).
+        """
+        now = time.monotonic()
+        elapsed = now - self._lastReportTime if self._lastReportTime > 0 else 0
+        metrics = []
+        for slot in self._slots:
+            processed, processSeconds = slot.processed, slot.processSeconds
+            frames = processed - slot.reportedProcessed
+            counters = slot.camera.getFrameCounters()
+            metrics.append(CameraMetrics(
+                label=slot.label,
+                fps=frames / elapsed if elapsed > 0 else 0,
+                captured=counters.get("captured", 0),
+                processed=processed,
+                dropped=counters.get("consumers", {}).get("display", {}).get("dropped", 0),
+                processMs=(processSeconds - slot.reportedProcessSeconds) / frames * 1000 if frames > 0 else 0))
+            slot.reportedProcessed, slot.reportedProcessSeconds = processed, processSeconds
+        self._lastReportTime = now
+        return metrics
+
+    def run(self) -> None:
+        """
+        Runs all cameras until the quit key is pressed or every capture has ended.
+        """
+        self.logger.info("Beginning MultiCameraController run.")
+        previousCvThreads = cv2.getNumThreads()
+        if self.workers > 1:
+            # The workers already run the cameras in parallel; OpenCV's own thread pool on top of that would oversubscribe the CPU
+            cv2.setNumThreads(1)
+        pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="CameraWorker")
+        try:
+            for slot in self._slots:
+                slot.camera.open(frameEvent=self._wakeup)
+            if self.headless:
+                self._controlController.start()
+            else:
+                cv2.namedWindow(MOSAIC_WINDOW_TITLE, cv2.WINDOW_GUI_NORMAL)
+                self._windowCreated = True
+            self._lastReportTime = time.monotonic()
+
+            while True:
+                self._wakeup.clear()
+                now = time.monotonic()
+                self._collectResults()
+                nextDue = self._dispatchFrames(pool, now)
+                if all(slot.ended and slot.future is None for slot in self._slots):
+                    self.logger.warning("All captures ended. Exiting main loop.")
+                    return
+
+                keyPress = self._pollKeys(now)
+                if keyPress == ord(KEY_QUIT):
+                    self.logger.info("Quit key pressed. Exiting main loop.")
+                    return
+                if keyPress != NO_KEY_PRESS:
+                    self._handleKeyPress(keyPress)
+
+                if now - self._lastReportTime >= self.metricsInterval:
+                    self._reportMetrics()
+
+                # Sleep until a frame is captured or a worker finishes (both set the wakeup event)
+                self._wakeup.wait(min(MULTI_CAMERA_IDLE_WAIT_S, max(nextDue - time.monotonic(), 0)))
+        finally:
+            pool.shutdown(wait=True)
+            for slot in self._slots:
+                slot.camera.close()
+            self._controlController.stop()
+            if self._windowCreated:
+                cv2.destroyWindow(MOSAIC_WINDOW_TITLE)
+                self._windowCreated = False
+            cv2.setNumThreads(previousCvThreads)
+            for metrics in self.getMetrics():
+                self.logger.info(f"Final metrics: {metrics}")
+
+    def _collectResults(self) -> None:
+        """
+        Takes the rendered frames of the finished steps into the mosaic. Errors in a step end the run.
+        """
+        for index, slot in enumerate(self._slots):
+            if slot.future is None or not slot.future.done():
+                continue
+            heatmap = slot.future.result()
+            slot.future = None
+            if heatmap is not None and not self.headless:
+                self._updateTile(index, heatmap)
+
+    def _dispatchFrames(self, pool: ThreadPoolExecutor, now: float) -> float:
+        """
+        Starts a step for every idle camera with a new frame. Returns when the next rate-limited camera is due.
+        """
+        nextDue = math.inf
+        minInterval = 1 / self.maxFps if self.maxFps > 0 else 0
+        for slot in self._slots:
+            if slot.future is not None or slot.ended:
+                continue
+            if now - slot.lastStart < minInterval:
+                nextDue = min(nextDue, slot.lastStart + minInterval)
+                continue
+            frame, timestamp = slot.camera.readFrame(timeout=0)
+            if frame is None:
+                if slot.camera.captureEnded:
+                    self.logger.warning(f"Capture of {slot.label} ended.")
+                    slot.ended = True
+                continue
+            keys, slot.keys = slot.keys, []
+            slot.lastStart = now
+            slot.future = pool.submit(self._stepCamera, slot, frame, timestamp, keys)
+            slot.future.add_done_callback(lambda _: self._wakeup.set())
+        return nextDue
+
+    def _stepCamera(self, slot: CameraSlot, frame: NDArray, timestamp: int, keys: list[int]) -> NDArray | None:
+        """
+        Processes one frame of a camera on a worker thread, and applies the key presses queued for it.
+        Returns the rendered frame (the camera's reused buffer, only valid until its next step), or None if nothing was drawn.
+        """
+        start = time.perf_counter()
+        heatmap = None
+        if slot.camera.processFrame(frame, timestamp) is not None:
+            heatmap = slot.camera.renderFrame(force=not self.headless or ord(KEY_SNAPSHOT) in keys)
+        for key in keys:
+            if key == ord(KEY_SNAPSHOT) and heatmap is None:
+                continue
+            slot.camera.handleKeyPress(key, heatmap)
+        elapsed = time.perf_counter() - start
+        slot.camera.profiler.record("frame", int(elapsed * 1e9))
+        slot.processSeconds += elapsed
+        slot.processed += 1
+        return heatmap
+
+    def _updateTile(self, index: int, heatmap: NDArray[np.uint8]) -> None:
+        """
+        Copies a camera's rendered frame into its cell of the mosaic. The cells grow to the largest frame.
+        """
+        height, width = heatmap.shape[:2]
+        if height > self._cellSize[0] or width > self._cellSize[1] or self._mosaic is None:
+            self._cellSize = (max(height, self._cellSize[0]), max(width, self._cellSize[1]))
+            self._mosaic = np.zeros((self._cellSize[0] * self._rows, self._cellSize[1] * self._columns, 3), dtype=np.uint8)
+        row, column = divmod(index, self._columns)
+        top, left = row * self._cellSize[0], column * self._cellSize[1]
+        cell = self._mosaic[top:top + self._cellSize[0], left:left + self._cellSize[1]]
+        if (height, width) != self._cellSize:
+            cell[:] = 0
+        cell[:height, :width] = heatmap
+        cv2.putText(cell, self._slots[index].label, (5, height - 8), DEFAULT_FONT, MOSAIC_LABEL_SCALE, (0, 0, 0), 2, cv2.LINE_AA)
+        cv2.putText(cell, self._slots[index].label, (5, height - 8), DEFAULT_FONT, MOSAIC_LABEL_SCALE, (255, 255, 255), 1, cv2.LINE_AA)
+        self._mosaicDirty = True
+
+    def _pollKeys(self, now: float) -> int:
+        """
+        Shows the mosaic (at most MOSAIC_MAX_FPS times a second) and returns the pressed key, or NO_KEY_PRESS.
+        """
+        if self.headless:
+            return self._controlController.poll()
+        shown = False
+        if self._mosaicDirty and now - self._lastMosaicTime >= 1 / MOSAIC_MAX_FPS:
+            cv2.imshow(MOSAIC_WINDOW_TITLE, self._mosaic)
+            self._mosaicDirty = False
+            self._lastMosaicTime = now
+            shown = True
+        # HighGUI only processes window events in waitKey, so it is polled regularly even without new frames
+        if not shown and now - self._lastKeyPollTime < MULTI_CAMERA_IDLE_WAIT_S:
+            return NO_KEY_PRESS
+        self._lastKeyPollTime = now
+        return cv2.waitKey(KEY_PRESS_DELAY) & 0xFF
+
+    def _handleKeyPress(self, keyPress: int) -> None:
+        """
+        Handles the mosaic window's own keys, and queues all others for every camera.
+        """
+        if keyPress == ord(KEY_FULLSCREEN) and not self.headless:
+            self._isFullscreen = True
+            cv2.setWindowProperty(MOSAIC_WINDOW_TITLE, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_FULLSCREEN)
+            return
+        if keyPress == ord(KEY_WINDOWED) and not self.headless:
+            self._isFullscreen = False
+            cv2.setWindowProperty(MOSAIC_WINDOW_TITLE, cv2.WND_PROP_FULLSCREEN, cv2.WINDOW_NORMAL)
+            return
+        for slot in self._slots:
+            slot.keys.append(keyPress)
+        # Signals toggle recording, so they need to know whether the cameras are recording (they start and stop together)
+        if keyPress == ord(KEY_RECORD):
+            self._controlController.isRecording = True
+        elif keyPress == ord(KEY_STOP):
+            self._controlController.isRecording = False
+
+    def _reportMetrics(self) -> None:
+        metrics = self.getMetrics()
+        # The share of the worker pool spent on frames, i.e. how much of the station's CPU budget is in use
+        load = sum(cameraMetrics.fps * cameraMetrics.processMs for cameraMetrics in metrics) / 1000 / self.workers
+        summary = f"{load:.0%} of {self.workers} worker(s) | " + ", ".join(str(cameraMetrics) for cameraMetrics in metrics)
+        self.logger.info(f"Camera metrics: {summary}")
+        if self.headless:
+            print(f"[station] {summary}")
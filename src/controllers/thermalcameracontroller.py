@@ -1,16 +1,55 @@
 import logging
 
-import cv2, time, os, sys, numpy as np
+import cv2, time, os, sys, threading, numpy as np
+from dataclasses import replace
 from numpy.typing import NDArray
 from src.enums.ThermalByteOrderEnum import ThermalByteOrder
 from src.defaults.values import *
 from src.defaults.keybinds import *
 from src.enums.ColormapEnum import Colormap
+from src.enums.ColorSpanEnum import ColorSpan
+from src.enums.InterpolationEnum import Interpolation
 from src.controllers.guiController import GuiController
+from src.controllers.captureController import CaptureController
+from src.controllers.controlController import ControlController
+from src.enums.FrameLayoutEnum import FrameLayout
+from src.enums.FramePolicyEnum import FramePolicy
+from src.enums.HotspotFilterEnum import HotspotFilter
+from src.enums.TemporalFilterEnum import TemporalFilter
+from src.enums.RawCompressionEnum import RawCompression
+from src.enums.RecordingFormatEnum import RecordingFormat
+from src.enums.SnapshotRawFormatEnum import SnapshotRawFormat
 from src.enums.TemperatureUnitEnum import TemperatureUnit, getSymbolFromTempUnit
-from src.helpers.conversions import convertTemperatureDeltaForDisplay, convertTemperatureForDisplay
+from src.helpers.capture_backend_cache import CaptureBackendCache
+from src.helpers.conversions import convertTemperatureForDisplay, convertTemperatureDeltaForDisplay
+from src.helpers.device_discovery import findUsbId
+from src.helpers.frame_layout import FrameSplitter
+from src.helpers.hot_path_logging import HotPathLogger
+from src.helpers.hotspots import findHotspots, prefilterField
+from src.helpers.roi_stats import RoiStatsCalculator
+from src.helpers.profiling import StageProfiler
+from src.helpers.temporalfilters import TemporalNoiseFilter, createTemporalFilter
+from src.alarms.alarmengine import AlarmEngine
+from src.alarms.alarmsinks import AlarmEventSink
+from src.models.alarmdefinition import AlarmDefinition
+from src.models.capturebackendchoice import CaptureBackendChoice
+from src.helpers.thermal_decoding import decodeRawThermalData
+from src.helpers.thermal_stats import computeFrameStats
 from src.models.deviceinfo import DeviceInfo
 from src.models.envinfo import EnvInfo
+from src.models.framestats import FrameStats
+from src.models.framering import FrameRing, FrameRingConsumer
+from src.models.thermalframe import ThermalFrame
+from src.models.regionofinterest import RegionOfInterest
+from src.models.rawstreamheader import RawStreamHeader
+from src.models.snapshot import Snapshot
+from src.recording.snapshotwriter import SnapshotWriter
+from src.sinks.rawrecordingsink import RawRecordingSink
+from src.sinks.framesink import FrameSink
+from src.sinks.statsconsolesink import StatsConsoleSink
+from src.sources.framesource import FrameSource
+from src.sources.livecamerasource import LiveCameraSource
+from src.streaming.streamserver import StreamServer
 
 class ThermalCameraController:
     def __init__(self, 
@@ -19,39 +58,133 @@ class ThermalCameraController:
                  device_index: int = DEFAULT_VIDEO_DEVICE_INDEX,
                  environment: EnvInfo = EnvInfo(),
                  mediaOutputPath: str = DEFAULT_MEDIA_OUTPUT_PATH,
-                 temperatureUnit: TemperatureUnit = TemperatureUnit.CELSIUS):
+                 temperatureUnit: TemperatureUnit = TemperatureUnit.CELSIUS,
+                 frameRingCapacity: int = DEFAULT_FRAME_RING_CAPACITY,
+                 framePolicy: FramePolicy = DEFAULT_FRAME_POLICY,
+                 recordingFormat: RecordingFormat = DEFAULT_RECORDING_FORMAT,
+                 rawCompression: RawCompression = DEFAULT_RAW_COMPRESSION,
+                 headless: bool = DEFAULT_HEADLESS,
+                 controlPort: int | None = None,
+                 frameSource: FrameSource | None = None,
+                 colorSpan: ColorSpan = DEFAULT_COLOR_SPAN,
+                 colorSpanMinC: float = DEFAULT_COLOR_SPAN_MIN_C,
+                 colorSpanMaxC: float = DEFAULT_COLOR_SPAN_MAX_C,
+                 colorSpanSmoothing: float = DEFAULT_COLOR_SPAN_SMOOTHING,
+                 interpolation: Interpolation | None = None,
+                 nativeCompositing: bool = DEFAULT_NATIVE_COMPOSITING,
+                 hotspotCount: int = DEFAULT_HOTSPOT_COUNT,
+                 hotspotFilter: HotspotFilter = DEFAULT_HOTSPOT_FILTER,
+                 hotspotFilterSize: int = DEFAULT_HOTSPOT_FILTER_SIZE,
+                 hotspotMinDistance: int = DEFAULT_HOTSPOT_MIN_DISTANCE,
+                 regions: list[RegionOfInterest] | None = None,
+                 alarms: list[AlarmDefinition] | None = None,
+                 alarmSinks: list[AlarmEventSink] | None = None,
+                 temporalFilter: TemporalFilter = DEFAULT_TEMPORAL_FILTER,
+                 temporalAlpha: float = DEFAULT_TEMPORAL_ALPHA,
+                 temporalFrames: int = DEFAULT_TEMPORAL_FRAMES,
+                 motionThresholdC: float = DEFAULT_MOTION_THRESHOLD_C,
+                 streamPort: int | None = None,
+                 streamHost: str = DEFAULT_STREAM_HOST,
+                 streamJpegQuality: int = DEFAULT_STREAM_JPEG_QUALITY,
+                 label: str | None = None,
+                 printStats: bool | None = None,
+                 profile: bool = False,
+                 profileReportPath: str | None = None,
+                 captureBackendCache: bool = DEFAULT_CAPTURE_BACKEND_CACHE,
+                 snapshotRawFormat: SnapshotRawFormat = DEFAULT_SNAPSHOT_RAW_FORMAT,
+                 snapshotBurstFrames: int = DEFAULT_SNAPSHOT_BURST_FRAMES):
         self.logger = logger
+        self._hotPathLogger = HotPathLogger(logger)
         self.logger.info(f"Initializing ThermalCameraController for device '{device.name}' at index {device_index}")
         
         # Parameters init
+        # Recordings carry the normalization they were recorded with, which takes precedence over the device JSON
+        if frameSource is not None and frameSource.header is not None:
+            device = replace(device, misc=replace(
+                device.misc,
+                normalization_divisor=frameSource.header.normalization_divisor,
+                normalization_offset=frameSource.header.normalization_offset))
         self._deviceInfo: DeviceInfo = device
         self._deviceIndex: int = device_index
         self._env: EnvInfo = environment
         self._temperatureUnit: TemperatureUnit = temperatureUnit
         self._temperatureUnitSymbol: str = getSymbolFromTempUnit(self._temperatureUnit)
+        self._headless: bool = headless
 
         # Log if rpi is detected
         if self._env.isPi:
             self.logger.info("Detected Raspberry Pi environment.")
 
         # Calculated values init
-        self._rawTemp = DEFAULT_TEMPERATURE_RAW
-        self._temp = DEFAULT_TEMPERATURE
-        self._maxTemp = DEFAULT_TEMPERATURE_MAX
-        self._minTemp = DEFAULT_TEMPERATURE_MIN
-        self._avgTemp = DEFAULT_TEMPERATURE_AVG
-        self._mcol: int = 0
-        self._mrow: int = 0
-        self._lcol: int = 0
-        self._lrow: int = 0
+        self._frameStats: FrameStats = FrameStats()
+        self._rawField: NDArray[np.uint16] | None = None
+        self._frameIndex: int = 0
+
+        # Profiler init (a report path implies profiling; the profiler panel turns it on while shown)
+        self._profile: bool = profile or profileReportPath is not None
+        self._profileReportPath: str | None = profileReportPath
+        self._label: str | None = label
+        self._profiler: StageProfiler = StageProfiler(logger=logger.getChild("Profiler"), enabled=self._profile)
+
+        # Temporal noise filter init (on the raw field, at sensor resolution)
+        self._temporalFilter: TemporalNoiseFilter | None = createTemporalFilter(
+            temporalFilter,
+            alpha=temporalAlpha,
+            frames=temporalFrames,
+            motionThresholdC=motionThresholdC,
+            d=self._deviceInfo.misc.normalization_divisor)
+        if self._temporalFilter is not None:
+            self.logger.info(f"Using the {temporalFilter.name} temporal noise filter.")
+
+        # Hotspot engine init (a count of 0 keeps the single min/max pixel markers)
+        self._hotspotCount: int = hotspotCount
+        self._hotspotFilter: HotspotFilter = hotspotFilter
+        self._hotspotFilterSize: int = hotspotFilterSize
+        self._hotspotMinDistance: int = hotspotMinDistance
+        self._hotspotField: NDArray[np.float32] | None = None
+        self._hotspots: NDArray | None = None
+        self._coldspots: NDArray | None = None
+
+        # Regions of interest init. Recordings carry the regions they were recorded with, which are used if none were given.
+        if regions is None and frameSource is not None and frameSource.header is not None:
+            regions = [RegionOfInterest.createFromJson(roi) for roi in frameSource.header.rois]
+        self._regions: list[RegionOfInterest] = regions or []
+        self._roiStatsCalculator: RoiStatsCalculator | None = RoiStatsCalculator(self._regions) if self._regions else None
+        self._roiStats: NDArray | None = None
+        if self._regions:
+            self.logger.info(f"Tracking {len(self._regions)} region(s) of interest.")
+
+        # Alarm engine init (evaluated as a frame sink, after the stats and ROI stats of each frame are known)
+        self._alarmEngine: AlarmEngine | None = None
+        if alarms:
+            self._alarmEngine = AlarmEngine(alarms, self._regions, alarmSinks or [], logger=logger.getChild("AlarmEngine"))
+
+        # Sinks init
+        self._sinks: list[FrameSink] = []
+        # The stats are printed when headless unless told otherwise (cameras shown in the multi-camera mosaic run headless, but quietly)
+        self._statsConsoleSink: StatsConsoleSink | None = None
+        if printStats if printStats is not None else self._headless:
+            self._statsConsoleSink = StatsConsoleSink(temperatureUnit=self._temperatureUnit, label=label)
+            self._sinks.append(self._statsConsoleSink)
+        if self._alarmEngine is not None:
+            self._sinks.append(self._alarmEngine)
         
         # Media/recording init
         self._isRecording = DEFAULT_RECORDING_STATE
+        self._recordingFormat: RecordingFormat = recordingFormat
+        self._rawCompression: RawCompression = rawCompression
+        self._rawRecordingSink: RawRecordingSink | None = None
         self._mediaOutputPath: str = mediaOutputPath
         
         if not os.path.exists(self._mediaOutputPath):
             self.logger.info(f"Media output path '{self._mediaOutputPath}' does not exist. Creating directory.")
             os.makedirs(self._mediaOutputPath)
+
+        # Snapshots are written in the background; a burst snapshots the next frames as they are rendered
+        self._snapshotWriter = SnapshotWriter(logger=logger.getChild("SnapshotWriter"), rawFormat=snapshotRawFormat)
+        self._snapshotBurstFrames: int = max(snapshotBurstFrames, 1)
+        self._snapshotBurstRemaining: int = 0
+        self._snapshotBurstName: str = ""
         
         # GUI Init
         self._guiController = GuiController(
@@ -59,30 +192,83 @@ class ThermalCameraController:
             , width=self._deviceInfo.specs.imaging.ir_resolution_width_px
             , height=self._deviceInfo.specs.imaging.ir_resolution_height_px
             , temperatureUnit=self._temperatureUnit
-            , reverseOutput=self._deviceInfo.misc.reverse_output)
+            , reverseOutput=self._deviceInfo.misc.reverse_output
+            , headless=self._headless
+            , colorSpan=colorSpan
+            , colorSpanMinC=colorSpanMinC
+            , colorSpanMaxC=colorSpanMaxC
+            , colorSpanSmoothing=colorSpanSmoothing
+            , normalizationDivisor=self._deviceInfo.misc.normalization_divisor
+            , normalizationOffset=self._deviceInfo.misc.normalization_offset
+            , interpolation=interpolation if interpolation is not None else (DEFAULT_PI_INTERPOLATION if self._env.isPi else DEFAULT_INTERPOLATION)
+            , nativeCompositing=nativeCompositing
+            , profiler=self._profiler)
+
+        # Control init (replaces the window's key handling when headless)
+        self._controlController = ControlController(logger=logger.getChild("ControlController"), port=controlPort)
+
+        # Streaming server init (started with the main loop)
+        self._streamServer: StreamServer | None = None
+        if streamPort is not None:
+            self._streamServer = StreamServer(
+                logger=logger.getChild("StreamServer"),
+                port=streamPort,
+                host=streamHost,
+                jpegQuality=streamJpegQuality,
+                normalizationDivisor=self._deviceInfo.misc.normalization_divisor,
+                normalizationOffset=self._deviceInfo.misc.normalization_offset)
+            self._sinks.append(self._streamServer)
         
-        # OpenCV init
-        self._cap = None
+        # Frame source init
+        self._source: FrameSource = frameSource if frameSource is not None else LiveCameraSource(self._openCapture, self._configureCapture)
+        self._playbackImage: NDArray[np.uint8] | None = None
+        self._frameRingCapacity: int = frameRingCapacity
+        self._framePolicy: FramePolicy = framePolicy
+        self._frameRing: FrameRing | None = None
+        self._displayConsumer: FrameRingConsumer | None = None
+        self._lastFrameData: tuple[NDArray | None, NDArray | None, NDArray[np.uint16] | None] = (None, None, None) # imdata, thdata and raw of the last processed frame
+        self._captureController: CaptureController | None = None
         self._videoOut = None
         self._didLogFrameLayoutWarning = False
+        self._frameSplitter = FrameSplitter(
+            width=self._deviceInfo.specs.imaging.ir_resolution_width_px,
+            height=self._deviceInfo.specs.imaging.ir_resolution_height_px,
+            logger=logger.getChild("FrameSplitter"))
         self._captureBackend = None
         self._didLogThermalByteOrder = False
+        # The backend that delivered raw frames is cached per device, so the next start can skip probing (live cameras only)
+        self._backendCache: CaptureBackendCache | None = None
+        if captureBackendCache and frameSource is None:
+            self._backendCache = CaptureBackendCache(os.path.join(self._mediaOutputPath, CAPTURE_BACKEND_CACHE_FILE_NAME), logger=logger.getChild("CaptureBackendCache"))
 
         self.logger.info("ThermalCameraController initialized successfully")
         self.logger.debug(f"Device Info: {self._deviceInfo}")
 
-    def _rawFromBytes(self, byte0: int, byte1: int) -> int:
+    def decodeThermalData(self, thdata: NDArray) -> NDArray[np.uint16]:
         """
-        Combine two uint8 bytes into a 16-bit raw temperature sample.
+        Decodes the 2-channel thermal half of the frame into a 2D uint16 matrix of raw samples, once per frame.
+        All of the calculate* methods read from this matrix.
 
         The original TC001 script treats channel 0 as the LSB and channel 1 as the MSB.
-        Some Windows capture paths/backends can swap this ordering, so we allow autodetection.
+        Some Windows capture paths/backends can swap this ordering, so the device's thermal byte order is honoured.
         """
-        self.logger.debug(f"Combining bytes into raw temperature with byte0={byte0}, byte1={byte1}, thermal_byte_order={self._deviceInfo.misc.thermal_byte_order}")
-        if self._deviceInfo.misc.thermal_byte_order == ThermalByteOrder.LSB_BYTE_1:
-            return int(byte1) + (int(byte0) << 8)
-        return int(byte0) + (int(byte1) << 8)
-    
+        self._rawField = decodeRawThermalData(thdata, self._deviceInfo.misc.thermal_byte_order, out=self._rawField)
+        return self._rawField
+
+    def _asRawField(self, data: NDArray) -> NDArray[np.uint16]:
+        """
+        Returns the decoded raw matrix for the given data, decoding it first if it is still 2-channel bytes.
+        """
+        if data.ndim == 2:
+            return data
+        return self.decodeThermalData(data)
+
+    def addSink(self, sink: FrameSink) -> None:
+        """
+        Adds a sink that receives every processed frame.
+        """
+        self._sinks.append(sink)
+
     def is_plausible_celsius(self, temp: float) -> bool:
         """
         Checks if a temperature is within a plausible range for Celsius temperatures that the device should be able to read.
@@ -112,12 +298,16 @@ class ThermalCameraController:
         print(f'{KEY_FULLSCREEN} {KEY_WINDOWED}: Fullscreen Windowed (note going back to windowed does not seem to work on the Pi!)')
         print(f'{KEY_RECORD} {KEY_STOP}: Record and Stop')
         print(f'{KEY_SNAPSHOT} : Snapshot')
+        print(f'{KEY_SNAPSHOT_BURST} : Snapshot burst (the next frames)')
         print(f'{KEY_CYCLE_THROUGH_COLORMAPS} : Cycle through ColorMaps')
         print(f'{KEY_INVERT} : Invert ColorMap')
+        print(f'{KEY_CYCLE_COLOR_SPAN} : Cycle through Color Spans (image data, fixed/auto/smoothed temperature range)')
         print(f'{KEY_TOGGLE_HUD} : Toggle HUD')
         print(f'{KEY_TOGGLE_TEMP_UNIT} : Toggle Celsius/Fahrenheit')
         print(f'{KEY_TOGGLE_OUTPUT_MODE} : Swap Frame Halves (fixes wrong half displaying)')
         print(f'{KEY_TOGGLE_PIP} : Toggle Picture-in-Picture Window')
+        print(f'{KEY_TOGGLE_ROIS} : Toggle Regions of Interest')
+        print(f'{KEY_TOGGLE_PROFILER} : Toggle Stage Timings (profiler)')
         print(f'{KEY_QUIT} : Quit')
 
     @staticmethod
@@ -136,6 +326,7 @@ class ThermalCameraController:
         TODO/CONSIDER: move recording controls and ALL keypresses to gui controller?
         """
         self._guiController.handleKeyPresses(keyPress, self._deviceInfo)
+        self._profiler.enabled = self._profile or self._guiController.showProfiler
 
         ### Temp Units
         if keyPress == ord(KEY_TOGGLE_TEMP_UNIT): # Toggle temperature unit
@@ -149,55 +340,139 @@ class ThermalCameraController:
             self._temperatureUnitSymbol = getSymbolFromTempUnit(self._temperatureUnit)
             self.logger.info("Temperature unit changed to %s", self._temperatureUnit.name)
             self._guiController.temperatureUnitSymbol = self._temperatureUnitSymbol
+            if self._statsConsoleSink is not None:
+                self._statsConsoleSink.temperatureUnit = self._temperatureUnit
         
         ### RECORDING/MEDIA CONTROLS
         if keyPress == ord(KEY_RECORD) and self._isRecording == False: # Start recording
-            self._videoOut = self._record()
-            self._isRecording = DEFAULT_RECORDING_STATE
-            self._guiController.recordingStartTime = time.time()
+            self._startRecording()
             
-        if keyPress == ord(KEY_STOP): # Stop recording
-            self._isRecording = not DEFAULT_RECORDING_STATE
-            self._guiController.recordingDuration = DEFAULT_RECORDING_DURATION
+        if keyPress == ord(KEY_STOP) and self._isRecording == True: # Stop recording
+            self._stopRecording()
 
         if keyPress == ord(KEY_SNAPSHOT): # Take a snapshot
             self._guiController.last_snapshot_time = self._snapshot(img)
 
-    def _record(self):
+        if keyPress == ord(KEY_SNAPSHOT_BURST) and self._snapshotBurstRemaining == 0: # Snapshot the next frames
+            self._startSnapshotBurst()
+
+    def _startRecording(self):
+        """
+        Starts recording in the configured format(s).
+        """
+        currentTimeStr = time.strftime("%Y%m%d--%H%M%S")
+        if self._recordingFormat in (RecordingFormat.AVI, RecordingFormat.BOTH):
+            self._videoOut = self._record(currentTimeStr)
+        if self._recordingFormat in (RecordingFormat.RAW, RecordingFormat.BOTH):
+            self._rawRecordingSink = self._recordRaw(currentTimeStr)
+            self.addSink(self._rawRecordingSink)
+
+        self._isRecording = not DEFAULT_RECORDING_STATE
+        self._guiController.recordingStartTime = time.time()
+
+    def _stopRecording(self):
+        """
+        Stops all running recordings and closes their files.
+        """
+        self.logger.info("Stopping recording...")
+        if self._videoOut is not None:
+            self._videoOut.release()
+            self._videoOut = None
+        if self._rawRecordingSink is not None:
+            self._sinks.remove(self._rawRecordingSink)
+            self._rawRecordingSink.close()
+            self.logger.info(f"Raw recording saved to {self._rawRecordingSink.path} ({self._rawRecordingSink.frameCount} frames)")
+            self._rawRecordingSink = None
+
+        self._isRecording = DEFAULT_RECORDING_STATE
+        self._guiController.recordingDuration = DEFAULT_RECORDING_DURATION
+
+    def _record(self, currentTimeStr: str):
         """
         Start recording video to file.
         """
         self.logger.info("Starting recording...")
 
-        currentTimeStr = time.strftime("%Y%m%d--%H%M%S")
         #do NOT use mp4 here, it is flakey!
         self._videoOut = cv2.VideoWriter(
             f"{self._mediaOutputPath}/{currentTimeStr}-output.avi",
             cv2.VideoWriter_fourcc(*'YUY2'),
-            self._deviceInfo.fps,
+            self._deviceInfo.specs.imaging.frame_rate_hz or DEFAULT_DEVICE_FPS,
             (self._guiController.scaledWidth, self._guiController.scaledHeight))
         return self._videoOut
+
+    def _recordRaw(self, currentTimeStr: str) -> RawRecordingSink:
+        """
+        Start recording the decoded thermal data (raw radiometric stream) to file.
+        """
+        self.logger.info("Starting raw recording...")
+
+        # The shape of the last processed field: live frames are decoded into _rawField, but recordings that are played back are not
+        lastRaw = self._lastFrameData[2]
+        if lastRaw is not None:
+            height, width = lastRaw.shape
+        else:
+            height, width = self._deviceInfo.specs.imaging.ir_resolution_height_px, self._deviceInfo.specs.imaging.ir_resolution_width_px
+        header = RawStreamHeader.createFromDeviceInfo(self._deviceInfo, width=width, height=height, compression=self._rawCompression, rois=[region.toJson() for region in self._regions])
+        return RawRecordingSink(f"{self._mediaOutputPath}/{currentTimeStr}-output{RAW_STREAM_EXTENSION}", header)
     
-    def _snapshot(self, img):
+    def _snapshot(self, img, name: str | None = None):
         """
-        Takes a snapshot of the current frame.
+        Takes a snapshot of the current frame. It is only queued here (copied, since the buffers are reused); the SnapshotWriter saves it in the background.
         """
         self.logger.info("Taking snapshot...")
         #I would put colons in here, but it Win throws a fit if you try and open them!
         currentTimeStr = time.strftime("%Y%m%d-%H%M%S") 
         self._guiController.last_snapshot_time = time.strftime("%H:%M:%S")
-        if not cv2.imwrite(f"{self._mediaOutputPath}/{self._deviceInfo.name}-{currentTimeStr}.png", img):
-            self.logger.error("Failed to save snapshot.")
-        else:
-            self.logger.info(f"Snapshot saved to {self._mediaOutputPath}/{self._deviceInfo.name}-{currentTimeStr}.png")
+        # The field that was processed and handed to the sinks (filtered, if a temporal filter is on), which the stats describe
+        raw = self._lastFrameData[2]
+        withRaw = self._snapshotWriter.rawFormat != SnapshotRawFormat.NONE and raw is not None
+        self._snapshotWriter.submit(Snapshot(
+            basePath=f"{self._mediaOutputPath}/{name or f'{self._deviceInfo.name}-{currentTimeStr}'}",
+            image=img.copy() if img is not None else None,
+            raw=raw.copy() if withRaw else None,
+            metadata=self._snapshotMetadata() if withRaw else None))
         return self._guiController.last_snapshot_time
 
+    def _snapshotMetadata(self) -> dict:
+        """
+        Describes the raw field of a snapshot: where it comes from, and how to turn it into temperatures.
+        """
+        return {
+            "device_id": self._deviceInfo.id,
+            "device_name": self._deviceInfo.name,
+            "label": self._label,
+            "taken": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "frame_index": self._frameIndex - 1, # As in the ThermalFrame handed to the sinks
+            "normalization_divisor": self._deviceInfo.misc.normalization_divisor,
+            "normalization_offset": self._deviceInfo.misc.normalization_offset,
+            "celsius": "raw / normalization_divisor - normalization_offset",
+            "temporal_filter": type(self._temporalFilter).__name__ if self._temporalFilter is not None else None,
+            "raw_is_filtered": self._temporalFilter is not None, # Unlike raw recordings, which keep the sensor samples
+            "stats_c": self._frameStats.toJson(),
+        }
+
+    def _startSnapshotBurst(self) -> None:
+        """
+        Snapshots the next frames as they are rendered (see renderFrame). Frames keep being captured meanwhile; snapshots the writer cannot keep up with are dropped.
+        """
+        self.logger.info(f"Taking a burst of {self._snapshotBurstFrames} snapshots...")
+        self._snapshotBurstRemaining = self._snapshotBurstFrames
+        self._snapshotBurstName = f"{self._deviceInfo.name}-{time.strftime('%Y%m%d-%H%M%S')}-burst"
+
+    @property
+    def wantsSnapshot(self) -> bool:
+        """
+        Whether the next rendered frame will be snapshotted (a burst is running).
+        """
+        return self._snapshotBurstRemaining > 0
+
     def normalizeTemperature(self, rawTemp: float, d: int = DEFAULT_NORMALIZATION_DIVISOR, c: float = DEFAULT_NORMALIZATION_OFFSET) -> float:
         """
         Normalizes/converts the raw temperature data using the formula found by LeoDJ.
         Link: https://www.eevblog.com/forum/thermal-imaging/infiray-and-their-p2-pro-discussion/200/
         """
-        self.logger.debug(f"Normalizing temperature with rawTemp={rawTemp}, rawTemp/d={rawTemp/d}, d={d}, c={c}")
+        self._hotPathLogger.debug("Normalizing temperature with rawTemp=%s, d=%s, c=%s", rawTemp, d, c)
         return (rawTemp/d) - c
 
     def calculateTemperature(self, thdata: NDArray) -> float:
@@ -210,126 +485,121 @@ class ThermalCameraController:
     def calculateRawTemperature(self, thdata: NDArray) -> float:
         """
         Calculates the raw temperature of the center of the frame.
+        Accepts either the 2-channel thermal data or the already decoded raw matrix.
         """
-        self.logger.debug(f"Calculating raw temperature from thermal data with shape {thdata.shape} and dtype {thdata.dtype}")
+        self._hotPathLogger.debug("Calculating raw temperature from thermal data with shape %s and dtype %s", thdata.shape, thdata.dtype)
         if thdata.size == 0 or thdata.shape[0] == 0 or thdata.shape[1] == 0:
             self.logger.warning("Thermal data is empty or has invalid shape. Returning default raw temperature.")
             return DEFAULT_TEMPERATURE_RAW
 
-        centerRow = thdata.shape[0] // 2
-        centerCol = thdata.shape[1] // 2
-        b0 = int(thdata[centerRow, centerCol, 0])
-        b1 = int(thdata[centerRow, centerCol, 1])
-        return self._rawFromBytes(b0, b1)
+        raw = self._asRawField(thdata)
+        centerRow = raw.shape[0] // 2
+        centerCol = raw.shape[1] // 2
+        return int(raw[centerRow, centerCol])
 
     def calculateAverageTemperature(self, thdata: NDArray) -> float:
         """
         Calculates the average temperature of the frame.
+        Accepts either the 2-channel thermal data or the already decoded raw matrix.
         """
-        self.logger.debug(f"Calculating average temperature from thermal data with shape {thdata.shape} and dtype {thdata.dtype}")
-        if thdata is None or thdata.size == 0 or thdata.ndim < 3 or thdata.shape[2] < 2:
+        self._hotPathLogger.debug("Calculating average temperature from thermal data with shape %s and dtype %s", thdata.shape, thdata.dtype)
+        if thdata is None or thdata.size == 0 or (thdata.ndim == 3 and thdata.shape[2] < 2) or thdata.ndim not in (2, 3):
             self.logger.warning("Thermal data is empty or has invalid shape. Returning default average temperature.")
             return DEFAULT_TEMPERATURE_AVG
 
-        b0avg = int(thdata[..., 0].mean())
-        b1avg = int(thdata[..., 1].mean())
-        raw = self._rawFromBytes(b0avg, b1avg)
+        raw = float(self._asRawField(thdata).mean(dtype=np.float64))
         return round(self.normalizeTemperature(raw, d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset), DEFAULT_TEMPERATURE_SIG_DIGITS)
 
     def calculateMinimumTemperature(self, thdata: NDArray) -> float:
         """
         Calculates the minimum temperature of the frame.
+        Accepts either the 2-channel thermal data or the already decoded raw matrix.
         """
-        self.logger.debug(f"Calculating minimum temperature from thermal data with shape {thdata.shape} and dtype {thdata.dtype}")
+        self._hotPathLogger.debug("Calculating minimum temperature from thermal data with shape %s and dtype %s", thdata.shape, thdata.dtype)
+        raw = self._asRawField(thdata)
 
         # Find the min temperature in the frame
-        posmin = int(thdata[...,1].argmin())
+        posmin = int(raw.argmin())
         
-        # Since argmax returns a linear index, convert back to row and col
-        width = thdata.shape[1]
-        self._lcol, self._lrow = divmod(posmin, width)
-        b0 = int(thdata[self._lcol, self._lrow, 0])
-        b1 = int(thdata[self._lcol, self._lrow, 1])
-        raw = self._rawFromBytes(b0, b1)
+        # Since argmin returns a linear index, convert back to row and col
+        row, col = divmod(posmin, raw.shape[1])
 
-        return round(self.normalizeTemperature(raw, d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset), DEFAULT_TEMPERATURE_SIG_DIGITS)
+        return round(self.normalizeTemperature(int(raw[row, col]), d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset), DEFAULT_TEMPERATURE_SIG_DIGITS)
 
     def calculateMaximumTemperature(self, thdata: NDArray) -> float:
         """
         Calculates the maximum temperature of the frame.
+        Accepts either the 2-channel thermal data or the already decoded raw matrix.
         """
-        self.logger.debug(f"Calculating maximum temperature from thermal data with shape {thdata.shape} and dtype {thdata.dtype}")
+        self._hotPathLogger.debug("Calculating maximum temperature from thermal data with shape %s and dtype %s", thdata.shape, thdata.dtype)
+        raw = self._asRawField(thdata)
 
         # Find the max temperature in the frame
-        lomax = int(thdata[...,1].max())
-        posmax = int(thdata[...,1].argmax())
+        posmax = int(raw.argmax())
 
         # Since argmax returns a linear index, convert back to row and col
-        width = thdata.shape[1]
-        self._mcol, self._mrow = divmod(posmax, width)
-        b0 = int(thdata[self._mcol, self._mrow, 0])
-        b1 = int(thdata[self._mcol, self._mrow, 1])
-        raw = self._rawFromBytes(b0, b1)
+        row, col = divmod(posmax, raw.shape[1])
 
-        return round(self.normalizeTemperature(raw, d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset), DEFAULT_TEMPERATURE_SIG_DIGITS)
+        return round(self.normalizeTemperature(int(raw[row, col]), d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset), DEFAULT_TEMPERATURE_SIG_DIGITS)
+
+    def calculateFrameStats(self, thdata: NDArray) -> FrameStats:
+        """
+        Calculates all statistics of the frame (center, average, min/max and their positions, standard deviation, percentiles) in one go.
+        Accepts either the 2-channel thermal data or the already decoded raw matrix.
+        """
+        raw = self._asRawField(thdata)
+        return computeFrameStats(raw, d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset)
+
+    def calculateHotspots(self, raw: NDArray[np.uint16]) -> tuple[NDArray | None, NDArray | None]:
+        """
+        Locates the hottest and coldest spots of the frame with sub-pixel precision (see src.helpers.hotspots).
+        Both passes share one prefiltered field. Returns (None, None) when the hotspot engine is off.
+        """
+        if self._hotspotCount <= 0:
+            return None, None
+        self._hotspotField = prefilterField(raw, self._hotspotFilter, self._hotspotFilterSize, out=self._hotspotField)
+        d, c = self._deviceInfo.misc.normalization_divisor, self._deviceInfo.misc.normalization_offset
+        hotspots = findHotspots(raw, self._hotspotCount, self._hotspotMinDistance, d=d, c=c, field=self._hotspotField)
+        coldspots = findHotspots(raw, self._hotspotCount, self._hotspotMinDistance, coldspots=True, d=d, c=c, field=self._hotspotField)
+        return hotspots, coldspots
+
+    def calculateRoiStats(self, raw: NDArray[np.uint16]) -> NDArray | None:
+        """
+        Calculates the stats (ROI_STATS_DTYPE, in Celsius) of every region of interest, or None if there are none.
+        """
+        if self._roiStatsCalculator is None:
+            return None
+        return self._roiStatsCalculator.calculate(raw, d=self._deviceInfo.misc.normalization_divisor, c=self._deviceInfo.misc.normalization_offset)
 
     def _splitFrameData(self, frame: NDArray, *, logWarnings: bool = True) -> tuple[NDArray | None, NDArray | None]:
         """
-        Splits frame into visible-image and thermal-data halves, handling backend-specific layouts.
+        Splits frame into visible-image and thermal-data halves, handling backend-specific layouts (see FrameSplitter).
         """
-        self.logger.debug(f"Splitting frame data with shape {frame.shape} and dtype {frame.dtype}")
         if frame is None or frame.size == 0:
             self.logger.warning("Received empty frame. Cannot split frame data.")
             return None, None
 
-        parsedFrame = frame
-
-        # If OpenCV has already converted to BGR/RGB (3 channels) we can no longer recover thermal bytes.
-        # Fail fast with a clear warning rather than producing nonsense temperatures.
-        if parsedFrame.ndim == 3 and parsedFrame.shape[2] != 2:
-            if logWarnings and not self._didLogFrameLayoutWarning:
+        imageData, thermalData = self._frameSplitter.split(frame)
+        if thermalData is None and logWarnings and not self._didLogFrameLayoutWarning:
+            # If OpenCV has already converted to BGR/RGB (3 channels) we can no longer recover thermal bytes.
+            # Fail fast with a clear warning rather than producing nonsense temperatures.
+            if self._frameSplitter.layout == FrameLayout.CONVERTED:
                 self.logger.warning(
                     "OpenCV returned a converted frame (not raw YUY2). "
-                    f"shape={parsedFrame.shape}, dtype={parsedFrame.dtype}. "
+                    f"shape={frame.shape}, dtype={frame.dtype}. "
                     "Thermal bytes are not available; try a different backend (DSHOW vs MSMF) or disable RGB conversion."
                 )
-                self._didLogFrameLayoutWarning = True
-            return None, None
-
-        totalRows = self._deviceInfo.specs.imaging.ir_resolution_height_px * 2
-
-        # Some Linux/V4L2 paths can expose packed YUY2 as a 2D uint16 image
-        # where each uint16 encodes the two bytes we need for thermal decoding.
-        if parsedFrame.ndim == 2 and parsedFrame.dtype == np.uint16:
-            rows, cols = parsedFrame.shape
-            if rows >= totalRows and cols >= self._deviceInfo.specs.imaging.ir_resolution_width_px:
-                parsedFrame = parsedFrame.view(np.uint8).reshape(rows, cols, 2)
-
-        # Some backends return flattened buffers (often with padded row stride).
-        if parsedFrame.ndim == 2:
-            flattened = parsedFrame.reshape(-1)
-            if flattened.size % totalRows == 0:
-                bytesPerRow = flattened.size // totalRows
-                if bytesPerRow % 2 == 0:
-                    pixelsPerRow = bytesPerRow // 2
-                    if pixelsPerRow >= self._deviceInfo.specs.imaging.ir_resolution_width_px:
-                        parsedFrame = flattened.reshape((totalRows, pixelsPerRow, 2))
-                        parsedFrame = parsedFrame[:, :self._deviceInfo.specs.imaging.ir_resolution_width_px, :]
-
-        if parsedFrame.ndim == 3 and parsedFrame.shape[0] >= totalRows:
-            imageData = parsedFrame[:self._deviceInfo.specs.imaging.ir_resolution_height_px, :, :]
-            thermalData = parsedFrame[self._deviceInfo.specs.imaging.ir_resolution_height_px:self._deviceInfo.specs.imaging.ir_resolution_height_px * 2, :, :]
-            return imageData, thermalData
-
-        if parsedFrame.ndim == 3 and parsedFrame.shape[0] >= 2:
-            imageData, thermalData = np.array_split(parsedFrame, 2, axis=0)
-            return imageData, thermalData
-
-        if logWarnings and not self._didLogFrameLayoutWarning:
-            self.logger.warning(f"Unsupported frame layout from OpenCV: shape={parsedFrame.shape}, dtype={parsedFrame.dtype}")
+            else:
+                self.logger.warning(f"Unsupported frame layout from OpenCV: shape={frame.shape}, dtype={frame.dtype}")
             self._didLogFrameLayoutWarning = True
+        return imageData, thermalData
 
-        return None, None
+    @property
+    def frameLayout(self) -> FrameLayout | None:
+        """
+        The layout of the camera's frames, as detected from the last frame split (None before the first).
+        """
+        return self._frameSplitter.layout
 
     def _configureCapture(self, cap: cv2.VideoCapture) -> None:
         """Apply capture properties required to preserve thermal bytes."""
@@ -342,6 +612,65 @@ class ThermalCameraController:
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self._deviceInfo.specs.imaging.ir_resolution_height_px * 2)
         cap.set(cv2.CAP_PROP_FPS, self._deviceInfo.specs.imaging.frame_rate_hz)
 
+    def _captureCacheKey(self) -> str:
+        """
+        Identifies the camera in the capture backend cache: the device model, its USB id where known, and the index.
+        """
+        return f"{self._deviceInfo.id or self._deviceInfo.name}|{findUsbId(self._deviceIndex) or 'unknown'}|{self._deviceIndex}"
+
+    def _createCapture(self, backend: int) -> cv2.VideoCapture:
+        if self._env.isPi:
+            # On the Pi, we have to use the V4L2 backend to get raw frames
+            return cv2.VideoCapture(f"/dev/video{self._deviceIndex}", backend)
+        return cv2.VideoCapture(self._deviceIndex, backend)
+
+    def _isRawSplit(self, frame: NDArray) -> bool:
+        imdata, thdata = self._splitFrameData(frame, logWarnings=False)
+        return imdata is not None and thdata is not None and thdata.ndim == 3 and thdata.shape[2] == 2
+
+    def _describeCaptureChoice(self, cap: cv2.VideoCapture, backend: int, frame: NDArray) -> CaptureBackendChoice:
+        """
+        Records what the backend negotiated and the layout of its frames, to be cached.
+        """
+        try:
+            backendName = cap.getBackendName()
+        except cv2.error:
+            backendName = str(backend)
+        fourcc = (int(cap.get(cv2.CAP_PROP_FOURCC)) & 0xFFFFFFFF).to_bytes(4, "little").decode("ascii", errors="replace").strip("\0 ")
+        return CaptureBackendChoice(
+            backend=backend,
+            backendName=backendName,
+            fourcc=fourcc,
+            width=int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+            height=int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+            frameShape=tuple(frame.shape),
+            frameDtype=str(frame.dtype),
+            rowStrideBytes=frame.nbytes // (self._deviceInfo.specs.imaging.ir_resolution_height_px * 2),
+            frameLayout=self._frameSplitter.layout.name)
+
+    def _openCachedCapture(self, choice: CaptureBackendChoice) -> cv2.VideoCapture | None:
+        """
+        Opens the capture with the cached backend and checks a single frame: it has to split into raw halves and have the cached shape, dtype and layout.
+        Returns None (with the capture released) if it does not, so the backends are probed again.
+        """
+        start = time.perf_counter()
+        cap = self._createCapture(choice.backend)
+        if cap is None or not cap.isOpened():
+            self.logger.info(f"The cached capture backend {choice.backendName} could not open device index {self._deviceIndex}")
+            return None
+        self._captureBackend = choice.backend
+        self._configureCapture(cap)
+        ret, frame = cap.read()
+        if ret and frame is not None and self._isRawSplit(frame) and choice.matchesFrame(frame.shape, str(frame.dtype), self._frameSplitter.layout.name):
+            self.logger.info(f"Opened device index {self._deviceIndex} with the cached capture backend {choice.backendName} "
+                             f"({choice.fourcc} {choice.width}x{choice.height}, {choice.frameLayout} frames) in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return cap
+        self.logger.info(f"The cached capture backend {choice.backendName} did not deliver the cached frame layout "
+                         f"({'no frame' if not ret or frame is None else f'shape={frame.shape}, dtype={frame.dtype}'})")
+        cap.release()
+        self._captureBackend = None
+        return None
+
     def _openCapture(self) -> cv2.VideoCapture:
         """
         Opens the video capture and verifies we can read raw (2-channel) frames.
@@ -349,7 +678,20 @@ class ThermalCameraController:
         On Windows especially, some backends ignore CAP_PROP_CONVERT_RGB and return 3-channel BGR,
         which destroys the thermal data. We probe a few backends and only accept one that yields
         a splittable frame with a 2-channel layout.
+
+        The backend that worked is cached per device, so the next start opens it directly and only checks one frame.
+        If that check fails, the cache entry is dropped and the backends are probed again.
         """
+        cacheKey = self._captureCacheKey() if self._backendCache is not None else None
+        if self._backendCache is not None:
+            choice = self._backendCache.get(cacheKey)
+            if choice is not None:
+                cap = self._openCachedCapture(choice)
+                if cap is not None:
+                    return cap
+                self.logger.info("Invalidating the cached capture backend and probing the backends again")
+                self._backendCache.invalidate(cacheKey)
+
         self.logger.info("Opening video capture and searching for a backend that provides raw thermal data frames")
 
         backends: list[int]
@@ -365,11 +707,7 @@ class ThermalCameraController:
         lastBackend: int | None = None
 
         for backend in backends:
-            if self._env.isPi:
-                # On the Pi, we have to use the V4L2 backend to get raw frames
-                cap = cv2.VideoCapture(f"/dev/video{self._deviceIndex}", backend)
-            else:
-                cap = cv2.VideoCapture(self._deviceIndex, backend)
+            cap = self._createCapture(backend)
             if cap is None or not cap.isOpened():
                 continue
 
@@ -380,20 +718,21 @@ class ThermalCameraController:
 
             # Prime the capture and validate the layout.
             ok = False
-            for attempt in range(5):
+            for attempt in range(CAPTURE_BACKEND_PROBE_FRAMES):
                 ret, frame = cap.read()
                 if not ret:
-                    self.logger.debug(f"Backend {backend} attempt {attempt}: failed to read frame")
+                    self.logger.debug("Backend %d attempt %d: failed to read frame", backend, attempt)
                     continue
-                self.logger.debug(f"Backend {backend} attempt {attempt}: frame shape={frame.shape}, dtype={frame.dtype}")
-                imdata, thdata = self._splitFrameData(frame, logWarnings=False)
-                if imdata is not None and thdata is not None and thdata.ndim == 3 and thdata.shape[2] == 2:
-                    self.logger.debug(f"Backend {backend} SUCCESS: thermal data shape={thdata.shape}")
+                self.logger.debug("Backend %d attempt %d: frame shape=%s, dtype=%s", backend, attempt, frame.shape, frame.dtype)
+                if self._isRawSplit(frame):
+                    self.logger.debug("Backend %d SUCCESS: frame layout %s", backend, self._frameSplitter.layout.name)
                     ok = True
                     break
 
             if ok:
                 self._captureBackend = backend
+                if self._backendCache is not None:
+                    self._backendCache.put(cacheKey, self._describeCaptureChoice(cap, backend, frame))
                 return cap
 
             cap.release()
@@ -407,82 +746,282 @@ class ThermalCameraController:
             "This usually means OpenCV is converting to BGR/MJPG, which breaks thermal temperature decoding."
         )
 
+    def _imageDataFromRaw(self, raw: NDArray[np.uint16]) -> NDArray[np.uint8]:
+        """
+        Builds a YUYV image, like the visible half of a camera frame, from a decoded raw matrix.
+        The luma is the raw data stretched to the full 8-bit range, so the GUI can render recordings unchanged.
+        """
+        if self._playbackImage is None or self._playbackImage.shape[:2] != raw.shape:
+            self._playbackImage = np.full((raw.shape[0], raw.shape[1], 2), 128, dtype=np.uint8)
+        self._playbackImage[..., 0] = cv2.normalize(raw, None, 0, 255, cv2.NORM_MINMAX, dtype=cv2.CV_8U)
+        return self._playbackImage
+
+    def _drawFrame(self, imdata: NDArray, thdata: NDArray, raw: NDArray[np.uint16] | None = None) -> NDArray:
+        """
+        Renders the current frame and its stats into the displayed image.
+        """
+        displayStats = self._frameStats.toDisplayUnit(self._temperatureUnit)
+        displayThreshold = convertTemperatureDeltaForDisplay(self._guiController.threshold, self._temperatureUnit)
+        displayHotspots, displayColdspots = None, None
+        if self._hotspots is not None and self._coldspots is not None:
+            displayHotspots, displayColdspots = self._hotspots.copy(), self._coldspots.copy()
+            for spots in (displayHotspots, displayColdspots):
+                spots["temperature"] = convertTemperatureForDisplay(spots["temperature"], self._temperatureUnit)
+        displayRoiStats = None
+        if self._roiStats is not None:
+            displayRoiStats = self._roiStats.copy()
+            for field in ("mean", "min", "max"):
+                displayRoiStats[field] = convertTemperatureForDisplay(displayRoiStats[field], self._temperatureUnit)
+            displayRoiStats["std"] = convertTemperatureDeltaForDisplay(displayRoiStats["std"], self._temperatureUnit)
+        return self._guiController.drawGUI(
+            imdata=imdata,
+            thdata=thdata,
+            stats=displayStats,
+            labelThreshold=displayThreshold,
+            isRecording=self._isRecording,
+            raw=raw,
+            hotspots=displayHotspots,
+            coldspots=displayColdspots,
+            regions=self._regions,
+            roiStats=displayRoiStats,
+            activeAlarms=self._alarmEngine.activeAlarms if self._alarmEngine is not None else None)
+
+    @property
+    def captureEnded(self) -> bool:
+        """
+        Whether the capture thread stopped (end of a recording, or the camera failed), so no more frames will come.
+        """
+        return self._frameRing is not None and self._frameRing.closed
+
+    def open(self, frameEvent: threading.Event | None = None) -> None:
+        """
+        Opens the frame source and starts the capture thread and, if enabled, the stream server.
+        The optional event is set whenever a frame is captured, so a supervisor can wait on several cameras at once.
+        """
+        # Initialize the frame source (the live camera unless another source was given)
+        try:
+            self._source.open()
+        except Exception as e:
+            self.logger.critical(f"Failed to open frame source {type(self._source).__name__} (device index {self._deviceIndex}): {e}")
+            raise RuntimeError(f"Failed to open frame source for device index {self._deviceIndex}") from e
+
+        # Start the capture thread. It only reads frames into the ring, so rendering and recording can lag without stalling acquisition.
+        self._frameRing = FrameRing(self._frameRingCapacity, frameEvent=frameEvent)
+        self._displayConsumer = self._frameRing.addConsumer("display", self._framePolicy)
+        self._captureController = CaptureController(self._source, self._frameRing, logger=self.logger.getChild("CaptureController"), profiler=self._profiler)
+        self._captureController.start()
+
+        if self._streamServer is not None:
+            try:
+                self._streamServer.start()
+            except OSError as e:
+                self.logger.critical(f"Failed to start the stream server on {self._streamServer.host}:{self._streamServer.port}: {e}")
+                raise RuntimeError(f"Failed to start the stream server on {self._streamServer.host}:{self._streamServer.port}") from e
+
+    def readFrame(self, timeout: float | None = DEFAULT_FRAME_WAIT_TIMEOUT_S) -> tuple[NDArray | None, int]:
+        """
+        Returns the next frame to process and its timestamp, or (None, 0) if none arrived within the timeout.
+        BLOCK consumers want every frame in order; otherwise this is always the newest frame.
+        """
+        if self._framePolicy == FramePolicy.BLOCK:
+            return self._displayConsumer.next(timeout=timeout)
+        return self._displayConsumer.latest(timeout=timeout)
+
+    def processFrame(self, frame: NDArray, timestamp: int) -> ThermalFrame | None:
+        """
+        Decodes a captured frame, calculates its stats and hands it to the sinks.
+        Returns None if the frame could not be split into its image and thermal halves.
+        """
+        if self._source.isDecoded:
+            # Recordings already hold the decoded thermal matrix; a visible image is built from it for display below
+            raw = frame
+            imdata, thdata = None, None
+        else:
+            # Split frame into two parts: image data and thermal data
+            with self._profiler.measure("split"):
+                imdata, thdata = self._splitFrameData(frame)
+            if imdata is None or thdata is None or thdata.size == 0:
+                if not self._didLogFrameLayoutWarning:
+                    self.logger.warning(
+                        "Failed to split frame data into image and thermal components. "
+                        f"Frame shape: {frame.shape}, imdata shape: {imdata.shape if imdata is not None else 'None'}, "
+                        f"thdata shape: {thdata.shape if thdata is not None else 'None'}")
+                    self._didLogFrameLayoutWarning = True
+                return None
+
+            # Determine which data to use for temperature calculations
+            # If swapped, the thermal data is in what we're calling 'imdata'
+            temp_data = imdata if self._guiController.reverseOutput else thdata
+
+            # Decode the thermal bytes once, then compute all statistics from the decoded matrix
+            with self._profiler.measure("decode"):
+                raw = self.decodeThermalData(temp_data)
+
+        # Reduce the temporal noise of the raw field before anything is calculated from it (recordings keep the sensor samples)
+        sensorRaw = raw
+        if self._temporalFilter is not None:
+            with self._profiler.measure("temporal filter"):
+                raw = self._temporalFilter.apply(raw)
+        if self._source.isDecoded:
+            imdata = self._imageDataFromRaw(raw)
+
+        with self._profiler.measure("stats"):
+            self._frameStats = self.calculateFrameStats(raw)
+        with self._profiler.measure("hotspots"):
+            self._hotspots, self._coldspots = self.calculateHotspots(raw)
+        with self._profiler.measure("roi stats"):
+            self._roiStats = self.calculateRoiStats(raw)
+        self._lastFrameData = (imdata, thdata, raw)
+
+        # Hand the frame to the sinks (headless output, recordings, ...)
+        thermalFrame = ThermalFrame(
+            index=self._frameIndex
+            , timestamp=timestamp
+            , raw=raw
+            , stats=self._frameStats
+            , imdata=imdata
+            , sensorRaw=sensorRaw if self._temporalFilter is not None else None
+            , hotspots=self._hotspots
+            , coldspots=self._coldspots
+            , regions=self._regions or None
+            , roiStats=self._roiStats)
+        self._frameIndex += 1
+        with self._profiler.measure("sinks"):
+            for sink in self._sinks:
+                sink.write(thermalFrame)
+        self._profiler.logPeriodically()
+        return thermalFrame
+
+    def renderFrame(self, force: bool = False) -> NDArray | None:
+        """
+        Rasterizes the GUI for the last processed frame, but only when someone will look at it: the window, an AVI recording,
+        an MJPEG client, a snapshot burst, or the caller (force, e.g. for a snapshot). Also feeds the AVI recording, the MJPEG stream and snapshot bursts.
+        Returns None if nothing was drawn.
+        """
+        wantsStreamView = self._streamServer is not None and self._streamServer.wantsView
+        if not (force or not self._headless or self._videoOut is not None or wantsStreamView or self.wantsSnapshot):
+            return None
+        heatmap = self._drawFrame(*self._lastFrameData)
+        if self.wantsSnapshot:
+            burstIndex = self._snapshotBurstFrames - self._snapshotBurstRemaining
+            self._snapshotBurstRemaining -= 1
+            self._snapshot(heatmap, name=f"{self._snapshotBurstName}{burstIndex:02d}")
+        if self._videoOut is not None:
+            with self._profiler.measure("video write"):
+                self._videoOut.write(heatmap)
+        if wantsStreamView:
+            with self._profiler.measure("stream"):
+                self._streamServer.publishView(heatmap)
+        return heatmap
+
+    @property
+    def isRecording(self) -> bool:
+        return self._isRecording
+
+    def getFrameCounters(self) -> dict:
+        """
+        Returns the capture ring's counters (frames captured, and read/dropped by the display consumer), or {} before open().
+        """
+        return self._frameRing.getCounters() if self._frameRing is not None else {}
+
+    def handleKeyPress(self, keyPress: int, img: NDArray | None) -> None:
+        """
+        Acts on a key press for this camera. img is the rendered frame, which snapshots are taken of.
+        """
+        self._checkForKeyPress(keyPress=keyPress, img=img)
+        self._controlController.isRecording = self._isRecording
+
+    def close(self) -> None:
+        """
+        Stops any recording and the capture thread, and releases the frame source and sinks.
+        """
+        if self._isRecording == True:
+            self._stopRecording()
+        if self._captureController is not None:
+            self._captureController.stop()
+        self._controlController.stop()
+        self._source.release()
+        for sink in self._sinks:
+            sink.close()
+        self._snapshotWriter.close()
+        if self._frameRing is not None:
+            self.logger.info(f"Frame counters: {self._frameRing.getCounters()}, failed reads: {self._captureController.failedReads}, "
+                             f"frame layout: {self.frameLayout.name if self.frameLayout is not None else 'none'} ({self._frameSplitter.detections} detection(s))")
+        if self._profile:
+            self.logger.info("Stage timings:\n" + "\n".join(self._profiler.formatReport()))
+        if self._profileReportPath is not None:
+            self.writeProfileReport(self._profileReportPath)
+
+    @property
+    def profiler(self) -> StageProfiler:
+        return self._profiler
+
+    def writeProfileReport(self, path: str) -> None:
+        """
+        Writes the stage timings as JSON, along with the device and the options that affect them.
+        """
+        try:
+            self._profiler.writeReport(
+                path,
+                device=self._deviceInfo.name,
+                label=self._label,
+                frames=self._frameIndex,
+                interpolation=self._guiController.interpolation.name,
+                nativeCompositing=self._guiController.nativeCompositing,
+                scale=self._guiController.scale,
+                colorSpan=self._guiController.colorSpan.name,
+                temporalFilter=type(self._temporalFilter).__name__ if self._temporalFilter is not None else None,
+                hotspots=self._hotspotCount,
+                regions=len(self._regions),
+                frameLayout=self.frameLayout.name if self.frameLayout is not None else None,
+                frameLayoutDetections=self._frameSplitter.detections)
+            self.logger.info(f"Stage timings written to {path}")
+        except OSError as e:
+            self.logger.error(f"Failed to write the stage timings to {path}: {e}")
+
     def run(self):
         """
         Runs the main runtime loop for the program.
         """
         self.logger.info("Beginning ThermalCameraController run.")
-        
-        # Initialize video
-        self._cap = self._openCapture()
-        if self._cap is None or not self._cap.isOpened():
-            self.logger.critical(f"Failed to open video capture on device index {self._deviceIndex}. No backends produced a usable raw frame.")
-            raise RuntimeError(f"Failed to open video device index {self._deviceIndex}")
-        # Ensure our settings are applied even if the backend changes behavior after opening.
-        self._configureCapture(self._cap)
-
-        # Start main runtime loop
-        self.logger.info("Starting main runtime loop")
-        while(self._cap.isOpened()):
-            ret, frame = self._cap.read()
-            if ret == True:
-                # Split frame into two parts: image data and thermal data
-                imdata, thdata = self._splitFrameData(frame)
-                if imdata is None or thdata is None or thdata.size == 0:
-                    if not self._didLogFrameLayoutWarning:
-                        self.logger.warning(
-                            "Failed to split frame data into image and thermal components. "
-                            f"Frame shape: {frame.shape}, imdata shape: {imdata.shape if imdata is not None else 'None'}, "
-                            f"thdata shape: {thdata.shape if thdata is not None else 'None'}")
-                        self._didLogFrameLayoutWarning = True
+        try:
+            self.open()
+
+            # Start main runtime loop
+            self.logger.info("Starting main runtime loop" + (" (headless)" if self._headless else ""))
+            if self._headless:
+                self._controlController.start()
+            while True:
+                frame, timestamp = self.readFrame()
+                if frame is None:
+                    if self.captureEnded:
+                        self.logger.warning("Capture ended. Exiting main loop.")
+                        return
                     continue
 
-                # Determine which data to use for temperature calculations
-                # If swapped, the thermal data is in what we're calling 'imdata'
-                temp_data = imdata if self._guiController.reverseOutput else thdata
-                
-                # Find the average temperature in the frame
-                self._avgTemp = self.calculateAverageTemperature(temp_data)
-                self._rawTemp = self.calculateRawTemperature(temp_data) # also updates byte order detection
-                self._temp = self.calculateTemperature(temp_data)
-                self._minTemp = self.calculateMinimumTemperature(temp_data)
-                self._maxTemp = self.calculateMaximumTemperature(temp_data)
-
-                displayTemp = convertTemperatureForDisplay(self._temp, self._temperatureUnit)
-                displayMinTemp = convertTemperatureForDisplay(self._minTemp, self._temperatureUnit)
-                displayMaxTemp = convertTemperatureForDisplay(self._maxTemp, self._temperatureUnit)
-                displayAvgTemp = convertTemperatureForDisplay(self._avgTemp, self._temperatureUnit)
-                displayThreshold = convertTemperatureDeltaForDisplay(self._guiController.threshold, self._temperatureUnit)
-
-                # Draw GUI elements
-                heatmap = self._guiController.drawGUI(
-                    imdata=imdata,
-                    thdata=thdata,
-                    temp=displayTemp,
-                    maxTemp=displayMaxTemp,
-                    minTemp=displayMinTemp,
-                    averageTemp=displayAvgTemp,
-                    labelThreshold=displayThreshold,
-                    isRecording=self._isRecording,
-                    mcol=self._mcol,
-                    mrow=self._mrow,
-                    lcol=self._lcol,
-                    lrow=self._lrow)
-
-                # Check for recording
-                if self._isRecording == True:
-                    self._videoOut.write(heatmap)
-                    
+                frameStart = time.perf_counter_ns()
+                if self.processFrame(frame, timestamp) is None:
+                    continue
+
+                # Only rasterize the GUI when someone will look at it (a snapshot taken in headless mode needs it too)
+                keyPress = self._controlController.poll() if self._headless else NO_KEY_PRESS
+                heatmap = self.renderFrame(force=keyPress == ord(KEY_SNAPSHOT))
+
                 # Check for quit and other inputs
-                keyPress = cv2.waitKey(KEY_PRESS_DELAY) & 0xFF
+                if not self._headless:
+                    with self._profiler.measure("wait key"):
+                        keyPress = cv2.waitKey(KEY_PRESS_DELAY) & 0xFF
                 if keyPress == ord(KEY_QUIT):
                     # Check for recording and close out
                     self.logger.info("Quit key pressed. Exiting main loop.")
-                    if self._isRecording == True:
-                        self._videoOut.release()
                     return
 
-                self._checkForKeyPress(keyPress=keyPress, img=heatmap)
+                self.handleKeyPress(keyPress, heatmap)
                 
                 # Display image
-                cv2.imshow(self._guiController.windowTitle, heatmap)
+                if not self._headless:
+                    with self._profiler.measure("imshow"):
+                        cv2.imshow(self._guiController.windowTitle, heatmap)
+                self._profiler.record("frame", time.perf_counter_ns() - frameStart)
+        finally:
+            self.close()
@@ -1,19 +1,22 @@
-import os
+import os, time
+from src.defaults.values import ROI_FILE_EXTENSIONS, ALARM_FILE_EXTENSIONS, DEVICE_PROBE_TIMEOUT_S
+from src.helpers.device_discovery import discoverVideoDevices
 from src.models.deviceinfo import DeviceInfo
 
 DEVICES_FOLDER_PATH = os.path.join(os.getcwd(), "devices")
 DEVICE_PRINT_SPACING = 20
 
+def findSupportedDeviceFiles() -> list[str]:
+    """
+    Returns the paths of the device JSONs in the devices/ folder (not their ROI and alarm files).
+    """
+    return sorted(os.path.join(DEVICES_FOLDER_PATH, f) for f in os.listdir(DEVICES_FOLDER_PATH) if f.endswith(".json") and not f.endswith(ROI_FILE_EXTENSIONS + ALARM_FILE_EXTENSIONS))
+
 def loadAllSupportedDevices() -> list[DeviceInfo]:
     """
     Loads all the supported devices from the devices/ folder and returns them as a list of DeviceInfo objects.
     """
-    device_files = [f for f in os.listdir(DEVICES_FOLDER_PATH) if f.endswith(".json")]
-    devices = []
-    for file in device_files:
-        device = DeviceInfo.createFromJson(os.path.join(DEVICES_FOLDER_PATH, file))
-        devices.append(device)
-    return devices
+    return [DeviceInfo.createFromJson(path) for path in findSupportedDeviceFiles()]
 
 def printAllSupportedDevices():
     """
@@ -27,4 +30,37 @@ def printAllSupportedDevices():
         print(f"Resolution: {device.specs.imaging.ir_resolution_width_px}x{device.specs.imaging.ir_resolution_height_px}")
         print(f"Temperature Range: {device.specs.functions.measurement_range_min_c}C to {device.specs.functions.measurement_range_max_c}C")
         print(f"Temperature Accuracy: ±{device.specs.imaging.measurement_accuracy_c}C")
-        print(f"Frame Rate: {device.specs.imaging.frame_rate_hz} FPS")
\ No newline at end of file
+        print(f"Frame Rate: {device.specs.imaging.frame_rate_hz} FPS")
+
+def printConnectedDevices(probe: bool = False, timeout: float = DEVICE_PROBE_TIMEOUT_S):
+    """
+    Prints the connected video devices, the supported devices each one fits, and the specs to run them all with the multi subcommand.
+    """
+    start = time.perf_counter()
+    supported = {os.path.relpath(path): DeviceInfo.createFromJson(path) for path in findSupportedDeviceFiles()}
+    devices = discoverVideoDevices(supported, probe=probe, timeout=timeout)
+    print(f"Connected video devices (found in {(time.perf_counter() - start) * 1000:.0f} ms):")
+    captureDevices = [device for device in devices if device.isCapture]
+    if not captureDevices:
+        print("No video devices found.")
+    for device in captureDevices:
+        print("-" * DEVICE_PRINT_SPACING)
+        print(f"Index: {device.index}" + (f" ({device.path})" if device.path else ""))
+        if device.name:
+            print(f"Name: {device.name}")
+        if device.usbId:
+            print(f"USB ID: {device.usbId}")
+        if device.formats:
+            print(f"Formats: {'; '.join(f'{fourcc} ' + ', '.join(f'{w}x{h}' for w, h in sizes) for fourcc, sizes in device.formats.items())}")
+        if device.probed:
+            if device.probeOk:
+                print(f"Probe: raw frames of shape {device.probeFrameShape} ({device.probeSeconds:.2f} s)")
+            else:
+                print(f"Probe: failed, {device.probeError}")
+        print(f"Matches: {', '.join(device.matches) if device.matches else 'no supported device'}")
+    if len(devices) > len(captureDevices):
+        print(f"({len(devices) - len(captureDevices)} metadata node(s) without video skipped)")
+    specs = [f"{device.index}:{device.matches[0]}" for device in captureDevices if device.matches and device.probeOk is not False]
+    if specs:
+        print("-" * DEVICE_PRINT_SPACING)
+        print(f"To run all matched cameras: python main.py multi {' '.join(specs)}")
\ No newline at end of file
@@ -1,11 +1,15 @@
 from cv2 import FONT_HERSHEY_SIMPLEX
 from src.enums.TemperatureUnitEnum import TemperatureUnit
 from src.enums.ColormapEnum import Colormap
+from src.enums.ColorSpanEnum import ColorSpan
+from src.enums.InterpolationEnum import Interpolation
 
 ### GUI CONSTANTS
 WINDOW_TITLE: str = "Thermal Camera"
 DEFAULT_FULLSCREEN: bool = False
 DEFAULT_HUD_VISIBLE: bool = True
+DEFAULT_ROIS_VISIBLE: bool = True
+ALARM_DISPLAY_LIMIT: int = 5 # Active alarms listed on the display, the rest are summed up
 DEFAULT_LAST_SNAPSHOT_TIME: str = ""
 DEFAULT_RECORDING_START_TIME: float = 0
 DEFAULT_RECORDING_DURATION: str = "00:00:00"
@@ -19,12 +23,37 @@ SCALE_MAX: int = 5
 SCALE_MIN: int = 1
 SCALE_INCREMENT: int = 1
 
+# Upscaling
+DEFAULT_INTERPOLATION: Interpolation = Interpolation.CUBIC
+DEFAULT_PI_INTERPOLATION: Interpolation = Interpolation.LINEAR # Bicubic is the costliest step of a frame on Pi-class CPUs
+DEFAULT_NATIVE_COMPOSITING: bool = False
+
+# Fractional bits of sub-pixel marker positions (OpenCV drawing "shift")
+DISPLAY_POINT_SHIFT: int = 4
+
 # Delays
 KEY_PRESS_DELAY: int = 1
 
+# Multi-camera mosaic
+MOSAIC_WINDOW_TITLE: str = "Thermal Cameras"
+MOSAIC_MAX_FPS: float = 30.0 # The mosaic is redrawn at most this often, however many cameras update it
+MOSAIC_LABEL_SCALE: float = 0.5
+
+# Profiler panel
+DEFAULT_PROFILER_VISIBLE: bool = False
+PROFILER_PANEL_REFRESH_S: float = 0.5 # The percentiles are recomputed this often, not every frame
+PROFILER_PANEL_SCALE: float = 0.4
+
 ### IMAGE PROCESSING CONSTANTS
 DEFAULT_COLORMAP: Colormap = Colormap.NONE
 
+# Color span (which values the colormap is stretched over)
+DEFAULT_COLOR_SPAN: ColorSpan = ColorSpan.LUMA
+DEFAULT_COLOR_SPAN_MIN_C: float = 20.0
+DEFAULT_COLOR_SPAN_MAX_C: float = 40.0
+DEFAULT_COLOR_SPAN_SMOOTHING: float = 0.1 # Weight of the newest frame in the SMOOTHED span
+COLOR_SPAN_MIN_WIDTH_C: float = 1.0 # Keeps uniform scenes from stretching sensor noise over the whole colormap
+
 # Contrast
 DEFAULT_CONTRAST: float = 1.0
 CONTRAST_MAX: float = 3.0
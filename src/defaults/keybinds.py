@@ -11,10 +11,14 @@ KEY_WINDOWED = 'w'
 KEY_RECORD = 'r'
 KEY_STOP = 't'
 KEY_SNAPSHOT = 'p'
+KEY_SNAPSHOT_BURST = 'j'
 KEY_CYCLE_THROUGH_COLORMAPS = 'm'
 KEY_INVERT = 'i'
+KEY_CYCLE_COLOR_SPAN = 'g'
 KEY_TOGGLE_HUD = 'h'
 KEY_TOGGLE_TEMP_UNIT = 'u'
 KEY_TOGGLE_OUTPUT_MODE = 'o'
 KEY_TOGGLE_PIP = 'b'
+KEY_TOGGLE_ROIS = 'n'
+KEY_TOGGLE_PROFILER = 'l'
 KEY_QUIT = 'q'
\ No newline at end of file
@@ -1,4 +1,10 @@
 from src.defaults.gui_values import *
+from src.enums.FramePolicyEnum import FramePolicy
+from src.enums.RawCompressionEnum import RawCompression
+from src.enums.RecordingFormatEnum import RecordingFormat
+from src.enums.HotspotFilterEnum import HotspotFilter
+from src.enums.TemporalFilterEnum import TemporalFilter
+from src.enums.SnapshotRawFormatEnum import SnapshotRawFormat
 from os import getcwd
 
 ### MAIN CONSTANTS
@@ -6,6 +12,8 @@ DEFAULT_VIDEO_DEVICE_INDEX: int = 0
 
 ### LOGGING CONSTANTS
 DEFAULT_LOG_LEVEL: str = "WARNING"
+HOT_PATH_LOG_SAMPLE_EVERY: int = 100 # Per-frame debug messages are logged once, then once in this many calls
+LOG_FORMAT: str = "[%(asctime)s] [%(name)s] [%(levelname)s] %(message)s"
 
 #### DEVICE CONSTANTS
 # NOTE: The defaults for these values are set to the TC001's specifications, but they can be overridden by command line arguments when running the program.
@@ -31,4 +39,89 @@ DEFAULT_NORMALIZATION_DIVISOR = 64
 
 ### DEFAULT RECORDING CONSTANTS
 DEFAULT_MEDIA_OUTPUT_PATH: str = f"{getcwd()}/output"
-DEFAULT_RECORDING_STATE: bool = False
\ No newline at end of file
+DEFAULT_RECORDING_STATE: bool = False
+DEFAULT_RECORDING_FORMAT: RecordingFormat = RecordingFormat.AVI
+DEFAULT_RAW_COMPRESSION: RawCompression = RawCompression.NONE
+DEFAULT_RAW_CHUNK_FRAMES: int = 64
+RAW_STREAM_VERSION: int = 1
+RAW_STREAM_EXTENSION: str = ".ptr"
+RAW_STREAM_MAGIC: bytes = b"PTCRAW01"
+RAW_STREAM_CHUNK_MAGIC: bytes = b"PTCC"
+RAW_STREAM_ALIGNMENT: int = 4096
+RAW_STREAM_PREALLOCATE_BYTES: int = 16 * 1024 * 1024
+
+### HOTSPOT CONSTANTS
+DEFAULT_HOTSPOT_COUNT: int = 0 # 0 only marks the single hottest and coldest pixel, like before the hotspot engine
+DEFAULT_HOTSPOT_FILTER: HotspotFilter = HotspotFilter.GAUSSIAN
+DEFAULT_HOTSPOT_FILTER_SIZE: int = 3
+DEFAULT_HOTSPOT_MIN_DISTANCE: int = 8 # In sensor pixels
+
+### TEMPORAL FILTER CONSTANTS
+DEFAULT_TEMPORAL_FILTER: TemporalFilter = TemporalFilter.NONE
+DEFAULT_TEMPORAL_ALPHA: float = 0.2 # Weight of the newest frame (EMA), or its minimum weight (MOTION_ADAPTIVE)
+DEFAULT_TEMPORAL_FRAMES: int = 8 # Frames averaged by RUNNING_MEAN
+TEMPORAL_FRAMES_MAX: int = 256 # Keeps the float32 running sum of raw samples exact
+DEFAULT_MOTION_THRESHOLD_C: float = 0.5 # Changes this large (in °C) are followed immediately by MOTION_ADAPTIVE
+
+### ROI CONSTANTS
+ROI_FILE_EXTENSIONS: tuple[str, ...] = (".roi.json", ".roi.yaml", ".roi.yml") # Looked up next to the device JSON, e.g. devices/TC001.roi.json
+ROI_LABEL_LIMIT: int = 32 # Only the hottest ROIs are labelled on the display and printed in headless mode, so hundreds of ROIs stay readable (and cheap to draw)
+
+### ALARM CONSTANTS
+ALARM_FILE_EXTENSIONS: tuple[str, ...] = (".alarms.json", ".alarms.yaml", ".alarms.yml") # Looked up next to the device JSON, e.g. devices/TC001.alarms.json
+ALARM_TARGET_FRAME: str = "frame" # Alarms on the whole frame's stats
+ALARM_TARGET_ALL_ROIS: str = "*" # Expands into one alarm per region of interest
+DEFAULT_ALARM_HYSTERESIS_C: float = 1.0 # How far (°C, or °C/s for RISE) the value has to get back past the threshold before an alarm clears
+DEFAULT_ALARM_MIN_DURATION_S: float = 0.0 # How long the condition has to hold before an alarm is raised or cleared
+DEFAULT_ALARM_RISE_WINDOW_S: float = 5.0
+ALARM_HISTORY_INTERVAL_S: float = 0.1 # The sampling interval of the history that rates of rise are calculated from
+ALARM_HISTORY_CAPACITY: int = 1024 # Samples kept in that history, so windows of up to ALARM_HISTORY_INTERVAL_S * ALARM_HISTORY_CAPACITY seconds
+
+### ANALYSIS CONSTANTS
+DEFAULT_ANALYSIS_FRAMES_PER_SHARD: int = 1000
+ANALYSIS_OUTPUT_SUFFIX: str = ".stats.npz"
+
+### SNAPSHOT CONSTANTS
+DEFAULT_SNAPSHOT_RAW_FORMAT: SnapshotRawFormat = SnapshotRawFormat.NONE
+DEFAULT_SNAPSHOT_BURST_FRAMES: int = 10
+SNAPSHOT_QUEUE_CAPACITY: int = 16 # Snapshots waiting to be written. When full, new snapshots are dropped rather than blocking the frame loop
+SNAPSHOT_WRITER_THREADS: int = 2
+
+### CAPTURE CONSTANTS
+DEFAULT_FRAME_RING_CAPACITY: int = 4
+DEFAULT_FRAME_POLICY: FramePolicy = FramePolicy.DROP_OLDEST
+DEFAULT_FRAME_WAIT_TIMEOUT_S: float = 1.0
+CAPTURE_MAX_CONSECUTIVE_FAILED_READS: int = 100
+DEFAULT_PLAYBACK_SPEED: float = 1.0
+DEFAULT_CAPTURE_BACKEND_CACHE: bool = True
+CAPTURE_BACKEND_CACHE_FILE_NAME: str = "capture_backends.json" # In the media output path
+CAPTURE_BACKEND_PROBE_FRAMES: int = 5 # Frames read from each backend while searching for one that delivers raw frames
+
+### HEADLESS CONSTANTS
+DEFAULT_HEADLESS: bool = False
+DEFAULT_CONTROL_HOST: str = "127.0.0.1"
+DEFAULT_STATS_PRINT_INTERVAL_S: float = 1.0
+NO_KEY_PRESS: int = 0xFF
+
+### STREAMING CONSTANTS
+DEFAULT_STREAM_HOST: str = "127.0.0.1"
+DEFAULT_STREAM_JPEG_QUALITY: int = 80
+STREAM_WRITE_BUFFER_BYTES: int = 1 << 20 # Per client. Above this, the client's newest frame waits for the socket and older ones are dropped
+STREAM_CLIENT_TIMEOUT_S: float = 10.0 # Clients that accept no data for this long (or send no request) are disconnected
+STREAM_MAX_REQUEST_BYTES: int = 8192
+STREAM_MJPEG_BOUNDARY: str = "thermalframe"
+
+### PROFILING CONSTANTS
+PROFILER_WINDOW_SAMPLES: int = 1024 # The percentiles of each stage are over its last this many timings
+PROFILER_LOG_INTERVAL_S: float = 10.0
+
+### DEVICE DISCOVERY CONSTANTS
+V4L2_SYSFS_PATH: str = "/sys/class/video4linux"
+V4L2_DEVICE_PATH: str = "/dev"
+DEVICE_PROBE_TIMEOUT_S: float = 3.0 # For all probes together, since they run at the same time
+DEVICE_PROBE_MAX_INDEX: int = 10 # Without sysfs (Windows, macOS), the indices below this are probed
+
+### MULTI-CAMERA CONSTANTS
+DEFAULT_MULTI_CAMERA_MAX_FPS: float = 0 # Per camera. 0 processes every frame the cameras deliver
+MULTI_CAMERA_METRICS_INTERVAL_S: float = 5.0
+MULTI_CAMERA_IDLE_WAIT_S: float = 0.05 # How long the supervisor sleeps when no camera has a new frame (the mosaic window stays responsive)
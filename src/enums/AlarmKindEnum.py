@@ -0,0 +1,6 @@
+from enum import Enum
+
+class AlarmKind(Enum):
+    ABOVE = 0 # The value rises above the threshold
+    BELOW = 1 # The value falls below the threshold
+    RISE = 2 # The value rises faster than the threshold (in °C/s) over the alarm's window
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class AlarmMetric(Enum):
+    MAX = 0
+    MIN = 1
+    MEAN = 2
+    CENTER = 3 # Only for the whole frame (the center pixel)
@@ -0,0 +1,5 @@
+from enum import Enum
+
+class AlarmState(Enum):
+    RAISED = 0
+    CLEARED = 1
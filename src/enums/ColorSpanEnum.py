@@ -0,0 +1,7 @@
+from enum import Enum
+
+class ColorSpan(Enum):
+    LUMA = 0
+    FIXED = 1
+    AUTO = 2
+    SMOOTHED = 3
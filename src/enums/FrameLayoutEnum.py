@@ -0,0 +1,9 @@
+from enum import Enum
+
+class FrameLayout(Enum):
+    YUY2 = 0 # (rows, cols, 2) bytes, the image half on top of the thermal half
+    UINT16 = 1 # (rows, cols) uint16, each pixel packing the two bytes
+    PADDED = 2 # A flattened byte buffer, possibly with a padded row stride
+    HALVES = 3 # (rows, cols, 2) bytes with fewer rows than the device has; split in two halves
+    CONVERTED = 4 # Already converted to BGR/RGB by OpenCV; the thermal bytes are lost
+    UNSUPPORTED = 5
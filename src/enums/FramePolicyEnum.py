@@ -0,0 +1,5 @@
+from enum import Enum
+
+class FramePolicy(Enum):
+    DROP_OLDEST = 0
+    BLOCK = 1
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class HotspotFilter(Enum):
+    NONE = 0
+    BOX = 1
+    GAUSSIAN = 2
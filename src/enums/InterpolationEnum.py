@@ -0,0 +1,7 @@
+from enum import Enum
+
+class Interpolation(Enum):
+    NEAREST = 0
+    LINEAR = 1
+    CUBIC = 2
+    LANCZOS = 3
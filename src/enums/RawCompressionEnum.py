@@ -0,0 +1,5 @@
+from enum import Enum
+
+class RawCompression(Enum):
+    NONE = 0
+    DELTA = 1
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class RecordingFormat(Enum):
+    AVI = 0
+    RAW = 1
+    BOTH = 2
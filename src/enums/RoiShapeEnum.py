@@ -0,0 +1,5 @@
+from enum import Enum
+
+class RoiShape(Enum):
+    RECT = 0
+    POLYGON = 1
@@ -0,0 +1,6 @@
+from enum import Enum
+
+class SnapshotRawFormat(Enum):
+    NONE = 0
+    TIFF = 1
+    NPY = 2
@@ -0,0 +1,7 @@
+from enum import Enum
+
+class TemporalFilter(Enum):
+    NONE = 0
+    EMA = 1 # Exponential moving average
+    RUNNING_MEAN = 2 # Mean of the last N frames
+    MOTION_ADAPTIVE = 3 # Exponential moving average that follows changes beyond the noise immediately
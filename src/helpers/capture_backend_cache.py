@@ -0,0 +1,57 @@
+import json, logging, os, threading
+from src.models.capturebackendchoice import CaptureBackendChoice
+
+class CaptureBackendCache:
+    """
+    The capture backend choices of every device, in one JSON file keyed by device.
+    The cache only saves time, so it never stops a camera from opening: an unreadable file or a malformed entry counts as missing.
+    """
+    _lock = threading.Lock() # Cameras of one process may share the file
+
+    def __init__(self, path: str, logger: logging.Logger | None = None):
+        self.path = path
+        self.logger = logger or logging.getLogger(__name__)
+
+    def get(self, key: str) -> CaptureBackendChoice | None:
+        data = self._load().get(key)
+        if data is None:
+            return None
+        try:
+            return CaptureBackendChoice.createFromJson(data)
+        except (KeyError, TypeError, ValueError) as e:
+            self.logger.warning(f"Ignoring the malformed capture backend cache entry for '{key}': {e}")
+            return None
+
+    def put(self, key: str, choice: CaptureBackendChoice) -> None:
+        with self._lock:
+            entries = self._load()
+            entries[key] = choice.toJson()
+            self._save(entries)
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            entries = self._load()
+            if entries.pop(key, None) is not None:
+                self._save(entries)
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Ignoring the unreadable capture backend cache '{self.path}': {e}")
+            return {}
+
+    def _save(self, entries: dict) -> None:
+        # Written to a temporary file first, so a crash never leaves a truncated cache behind
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temporaryPath = f"{self.path}.tmp"
+            with open(temporaryPath, "w", encoding="utf-8") as f:
+                json.dump(entries, f, indent=4)
+            os.replace(temporaryPath, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not save the capture backend cache '{self.path}': {e}")
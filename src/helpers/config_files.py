@@ -0,0 +1,31 @@
+import os, json
+
+def loadConfigFile(path: str) -> dict:
+    """
+    Loads a JSON or YAML (.yaml/.yml) config file. PyYAML is only needed (and imported) for YAML files.
+    Raises ValueError if the file cannot be parsed, and RuntimeError if it is YAML and PyYAML is not installed.
+    """
+    with open(path, "r", encoding="utf-8") as f:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as e:
+                raise RuntimeError(f"Loading the YAML file '{path}' requires PyYAML (pip install pyyaml). Use a JSON file otherwise.") from e
+            try:
+                data = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"Invalid YAML in '{path}': {e}") from e
+        else:
+            data = json.load(f)
+    return data or {}
+
+def findConfigFileForDevice(devicePath: str, extensions: tuple[str, ...]) -> str | None:
+    """
+    Finds the config file with one of the given extensions that belongs to a device JSON
+    (e.g. devices/TC001.roi.json for devices/TC001.json), if there is one.
+    """
+    base = os.path.splitext(devicePath)[0]
+    for extension in extensions:
+        if os.path.isfile(base + extension):
+            return base + extension
+    return None
@@ -0,0 +1,210 @@
+import os, re, struct, sys, threading, time, cv2
+from itertools import count
+from src.defaults.values import V4L2_SYSFS_PATH, V4L2_DEVICE_PATH, DEVICE_PROBE_TIMEOUT_S, DEVICE_PROBE_MAX_INDEX
+from src.models.deviceinfo import DeviceInfo
+from src.models.videodevice import VideoDevice
+
+# V4L2 ioctls and flags (linux/videodev2.h)
+VIDIOC_QUERYCAP: int = 0x80685600 # _IOR('V', 0, struct v4l2_capability)
+VIDIOC_ENUM_FMT: int = 0xC0405602 # _IOWR('V', 2, struct v4l2_fmtdesc)
+VIDIOC_ENUM_FRAMESIZES: int = 0xC02C564A # _IOWR('V', 74, struct v4l2_frmsizeenum)
+V4L2_CAPABILITY_SIZE: int = 104
+V4L2_FMTDESC_SIZE: int = 64
+V4L2_FRMSIZEENUM_SIZE: int = 44
+V4L2_BUF_TYPE_VIDEO_CAPTURE: int = 1
+V4L2_CAP_VIDEO_CAPTURE: int = 0x00000001
+V4L2_CAP_DEVICE_CAPS: int = 0x80000000
+V4L2_FRMSIZE_TYPE_DISCRETE: int = 1
+
+# The thermal cameras send the visible and thermal halves stacked in one YUYV frame
+RAW_FRAME_FOURCC: str = "YUYV"
+PROBE_ERROR_NOT_OPENED: str = "could not be opened"
+
+def scanVideoDevices(sysfsRoot: str = V4L2_SYSFS_PATH, devRoot: str = V4L2_DEVICE_PATH, queryFormats: bool = True) -> list[VideoDevice]:
+    """
+    Lists the V4L2 devices from sysfs with their USB ids and, unless queryFormats is off, their formats and frame sizes.
+    Nothing is streamed: the formats are queried with ioctls on the device node, which takes microseconds where opening a capture takes seconds.
+    Returns an empty list where there is no sysfs (Windows, macOS).
+    """
+    if not os.path.isdir(sysfsRoot):
+        return []
+    devices = []
+    for entry in os.listdir(sysfsRoot):
+        match = re.fullmatch(r"video(\d+)", entry)
+        if match is None:
+            continue
+        nodePath = os.path.join(sysfsRoot, entry)
+        device = VideoDevice(index=int(match.group(1)), path=os.path.join(devRoot, entry), name=_readSysfsValue(nodePath, "name"))
+        device.usbVendorId, device.usbProductId = _findUsbIds(os.path.join(nodePath, "device"))
+        if queryFormats:
+            _queryFormats(device)
+        devices.append(device)
+    return sorted(devices, key=lambda device: device.index)
+
+def findUsbId(index: int, sysfsRoot: str = V4L2_SYSFS_PATH) -> str | None:
+    """
+    Returns the USB id (vendor:product) of the video device with the given index, or None where it is unknown (no sysfs, not USB).
+    """
+    vendorId, productId = _findUsbIds(os.path.join(sysfsRoot, f"video{index}", "device"))
+    return f"{vendorId}:{productId}" if vendorId and productId else None
+
+def _readSysfsValue(path: str, name: str) -> str | None:
+    try:
+        with open(os.path.join(path, name), encoding="utf-8", errors="replace") as file:
+            return file.read().strip() or None
+    except OSError:
+        return None
+
+def _findUsbIds(devicePath: str) -> tuple[str | None, str | None]:
+    """
+    Finds the USB vendor and product id of a video node. The node's device is the USB interface, whose parent is the USB device that has the ids.
+    """
+    if not os.path.exists(devicePath):
+        return None, None
+    path = os.path.realpath(devicePath)
+    for _ in range(3):
+        vendorId = _readSysfsValue(path, "idVendor")
+        if vendorId is not None:
+            return vendorId, _readSysfsValue(path, "idProduct")
+        path = os.path.dirname(path)
+    return None, None
+
+def _queryFormats(device: VideoDevice) -> None:
+    """
+    Fills in whether the node captures video, and its formats and frame sizes, from the V4L2 ioctls. Leaves them unknown if the node cannot be queried.
+    """
+    try:
+        import fcntl
+    except ImportError:
+        return
+    try:
+        fd = os.open(device.path, os.O_RDWR | os.O_NONBLOCK)
+    except OSError:
+        return
+    try:
+        capability = bytearray(V4L2_CAPABILITY_SIZE)
+        fcntl.ioctl(fd, VIDIOC_QUERYCAP, capability)
+        _, card, busInfo, _, capabilities, deviceCaps = struct.unpack_from("16s32s32sIII", capability)
+        # Nodes of a multi-node device (e.g. a camera's metadata node) report their own capabilities in device_caps
+        device.isCapture = bool((deviceCaps if capabilities & V4L2_CAP_DEVICE_CAPS else capabilities) & V4L2_CAP_VIDEO_CAPTURE)
+        device.busInfo = busInfo.rstrip(b"\0").decode("ascii", errors="replace") or None
+        device.name = device.name or card.rstrip(b"\0").decode("utf-8", errors="replace")
+        if not device.isCapture:
+            return
+        for formatIndex in count():
+            description = bytearray(struct.pack("II", formatIndex, V4L2_BUF_TYPE_VIDEO_CAPTURE).ljust(V4L2_FMTDESC_SIZE, b"\0"))
+            try:
+                fcntl.ioctl(fd, VIDIOC_ENUM_FMT, description)
+            except OSError:
+                break # EINVAL past the last format
+            pixelFormat = struct.unpack_from("I", description, 44)[0]
+            fourcc = pixelFormat.to_bytes(4, "little").decode("ascii", errors="replace").strip()
+            device.formats[fourcc] = _queryFrameSizes(fcntl, fd, pixelFormat)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _queryFrameSizes(fcntl, fd: int, pixelFormat: int) -> list[tuple[int, int]]:
+    """
+    Returns the discrete frame sizes of a format. Stepwise and continuous ranges are listed as their smallest and largest size.
+    """
+    sizes = []
+    for sizeIndex in count():
+        frameSize = bytearray(struct.pack("II", sizeIndex, pixelFormat).ljust(V4L2_FRMSIZEENUM_SIZE, b"\0"))
+        try:
+            fcntl.ioctl(fd, VIDIOC_ENUM_FRAMESIZES, frameSize)
+        except OSError:
+            break
+        sizeType = struct.unpack_from("I", frameSize, 8)[0]
+        if sizeType == V4L2_FRMSIZE_TYPE_DISCRETE:
+            sizes.append(struct.unpack_from("II", frameSize, 12))
+        else:
+            minWidth, maxWidth, _, minHeight, maxHeight, _ = struct.unpack_from("6I", frameSize, 12)
+            sizes += [(minWidth, minHeight), (maxWidth, maxHeight)]
+            break
+    return sizes
+
+def probeCapture(device: VideoDevice) -> tuple[bool, tuple[int, ...] | None, str | None]:
+    """
+    Opens the device as the camera controller would (raw YUY2, no RGB conversion) and reads one frame.
+    Returns whether a raw frame was read, its shape, and why not otherwise.
+    """
+    if sys.platform.startswith("win"):
+        cap = cv2.VideoCapture(device.index, cv2.CAP_DSHOW)
+    elif device.path is not None:
+        cap = cv2.VideoCapture(device.path, cv2.CAP_V4L2)
+    else:
+        cap = cv2.VideoCapture(device.index)
+    try:
+        if not cap.isOpened():
+            return False, None, PROBE_ERROR_NOT_OPENED
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'YUY2'))
+        cap.set(cv2.CAP_PROP_CONVERT_RGB, 0)
+        ret, frame = cap.read()
+        if not ret or frame is None:
+            return False, None, "no frame"
+        if frame.ndim == 3 and frame.shape[2] != 2:
+            return False, frame.shape, "frames are converted to BGR (no raw thermal data)"
+        return True, frame.shape, None
+    finally:
+        cap.release()
+
+def probeVideoDevices(devices: list[VideoDevice], timeout: float = DEVICE_PROBE_TIMEOUT_S, probe=probeCapture) -> list[VideoDevice]:
+    """
+    Probes all devices at once, each on its own daemon thread, and fills in their probe results.
+    The probes share one deadline, so this takes at most `timeout` however many devices hang. A probe that has not
+    finished by then is reported as timed out and left to finish in the background (OpenCV opens cannot be cancelled).
+    """
+    results: dict[int, tuple] = {}
+
+    def run(device: VideoDevice) -> None:
+        start = time.perf_counter()
+        try:
+            ok, shape, error = probe(device)
+        except Exception as e:
+            ok, shape, error = False, None, str(e)
+        results[device.index] = (ok, shape, error, time.perf_counter() - start)
+
+    threads = [threading.Thread(target=run, args=(device,), name=f"DeviceProbe{device.index}", daemon=True) for device in devices]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + timeout
+    for thread in threads:
+        thread.join(max(deadline - time.monotonic(), 0))
+
+    for device in devices:
+        device.probed = True
+        result = results.get(device.index)
+        if result is None:
+            device.probeOk, device.probeSeconds, device.probeError = None, timeout, f"timed out after {timeout:g} s"
+        else:
+            device.probeOk, device.probeFrameShape, device.probeError, device.probeSeconds = result
+    return devices
+
+def matchVideoDevices(devices: list[VideoDevice], supported: dict[str, DeviceInfo]) -> list[VideoDevice]:
+    """
+    Matches every device with the device JSONs (by path) whose sensor fits it: a YUYV format (or a probed raw frame)
+    of the sensor's width and twice its height, since the visible and thermal halves are stacked.
+    """
+    for device in devices:
+        sizes = set(device.formats.get(RAW_FRAME_FOURCC, []))
+        if device.probeOk and device.probeFrameShape is not None:
+            sizes.add((device.probeFrameShape[1], device.probeFrameShape[0]))
+        device.matches = [path for path, info in supported.items()
+                          if (info.specs.imaging.ir_resolution_width_px, 2 * (info.specs.imaging.ir_resolution_height_px or 0)) in sizes]
+    return devices
+
+def discoverVideoDevices(supported: dict[str, DeviceInfo], probe: bool = False, timeout: float = DEVICE_PROBE_TIMEOUT_S, maxIndex: int = DEVICE_PROBE_MAX_INDEX) -> list[VideoDevice]:
+    """
+    Finds the video devices and matches them with the supported device JSONs.
+    On Linux, sysfs and the V4L2 format queries find every device without streaming; with probe, the capture nodes are also opened to check that they deliver raw frames.
+    Elsewhere there is no way to list devices without opening them, so the indices up to maxIndex are probed (all at once) and those that open are returned.
+    """
+    devices = scanVideoDevices()
+    if not devices and not os.path.isdir(V4L2_SYSFS_PATH):
+        devices = [device for device in probeVideoDevices([VideoDevice(index=index) for index in range(maxIndex)], timeout)
+                   if device.probeError != PROBE_ERROR_NOT_OPENED]
+    elif probe:
+        probeVideoDevices([device for device in devices if device.isCapture], timeout)
+    return matchVideoDevices(devices, supported)
@@ -0,0 +1,81 @@
+import cv2, numpy as np
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_NORMALIZATION_OFFSET
+from src.enums.ColormapEnum import Colormap
+from src.enums.InterpolationEnum import Interpolation
+
+# OpenCV colormap for each Colormap. INV_RAINBOW is RAINBOW with the red and blue channels swapped.
+OPENCV_COLORMAPS: dict[Colormap, int] = {
+    Colormap.JET: cv2.COLORMAP_JET,
+    Colormap.HOT: cv2.COLORMAP_HOT,
+    Colormap.MAGMA: cv2.COLORMAP_MAGMA,
+    Colormap.INFERNO: cv2.COLORMAP_INFERNO,
+    Colormap.PLASMA: cv2.COLORMAP_PLASMA,
+    Colormap.BONE: cv2.COLORMAP_BONE,
+    Colormap.SPRING: cv2.COLORMAP_SPRING,
+    Colormap.AUTUMN: cv2.COLORMAP_AUTUMN,
+    Colormap.VIRIDIS: cv2.COLORMAP_VIRIDIS,
+    Colormap.PARULA: cv2.COLORMAP_PARULA,
+    Colormap.INV_RAINBOW: cv2.COLORMAP_RAINBOW,
+}
+
+# OpenCV interpolation flag for each Interpolation
+OPENCV_INTERPOLATIONS: dict[Interpolation, int] = {
+    Interpolation.NEAREST: cv2.INTER_NEAREST,
+    Interpolation.LINEAR: cv2.INTER_LINEAR,
+    Interpolation.CUBIC: cv2.INTER_CUBIC,
+    Interpolation.LANCZOS: cv2.INTER_LANCZOS4,
+}
+
+def videoRangeLevels() -> NDArray[np.uint8]:
+    """
+    Returns the 256x1 table of what OpenCV's YUYV to BGR conversion turns each luma value into (with neutral chroma):
+    the video range 16-235 stretched onto 0-255, with OpenCV's own rounding.
+    """
+    yuyv = np.full((1, 256, 2), 128, dtype=np.uint8)
+    yuyv[0, :, 0] = np.arange(256)
+    return np.ascontiguousarray(cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUYV)[0, :, :1])
+
+def buildDisplayLut(contrast: float, isInverted: bool, colormap: Colormap, videoRange: bool = False) -> NDArray[np.uint8]:
+    """
+    Builds a 256x3 BGR lookup table that fuses contrast, inversion and the colormap into one step.
+    Every step is pointwise on 8-bit values, so applying the table gives the same result as applying them one after another.
+    With videoRange, the table is indexed with the luma of YUYV image data, and first expands it like a conversion to BGR would.
+    """
+    levels = videoRangeLevels() if videoRange else np.arange(256, dtype=np.uint8).reshape(256, 1)
+    levels = cv2.convertScaleAbs(levels, alpha=contrast)
+    if isInverted:
+        levels = cv2.bitwise_not(levels)
+
+    colormap = Colormap(colormap)
+    if colormap == Colormap.NONE:
+        return np.ascontiguousarray(np.repeat(levels, 3, axis=1))
+
+    lut = cv2.applyColorMap(levels, OPENCV_COLORMAPS[colormap]).reshape(256, 3)
+    if colormap == Colormap.INV_RAINBOW:
+        lut = lut[:, ::-1]
+    return np.ascontiguousarray(lut)
+
+def celsiusToRaw(temperature: float, d: float = DEFAULT_NORMALIZATION_DIVISOR, c: float = DEFAULT_NORMALIZATION_OFFSET) -> float:
+    """
+    Converts a Celsius temperature into the raw sample value it would be read as (the inverse of raw / d - c).
+    """
+    return (temperature + c) * d
+
+def rawToPaletteIndex(raw: NDArray[np.uint16], low: float, high: float, out: NDArray[np.uint8] | None = None) -> NDArray[np.uint8]:
+    """
+    Linearly maps raw samples in [low, high] onto the palette indices 0-255, saturating anything outside the span.
+    The span is given in raw units, so this is a single pass over the 16-bit matrix without converting it to Celsius first.
+    """
+    alpha = 255.0 / max(high - low, 1e-6)
+    if out is None or out.shape != raw.shape:
+        out = np.empty(raw.shape, dtype=np.uint8)
+    return cv2.addWeighted(raw, alpha, raw, 0.0, -low * alpha, dst=out, dtype=cv2.CV_8U)
+
+def applyDisplayLut(gray: NDArray[np.uint8], lut: NDArray[np.uint8], out: NDArray[np.uint8] | None = None) -> NDArray[np.uint8]:
+    """
+    Maps an 8-bit grayscale image through a 256x3 lookup table into a BGR image, in a single pass.
+    """
+    if out is None or out.shape != gray.shape + (3,):
+        out = np.empty(gray.shape + (3,), dtype=np.uint8)
+    return np.take(lut, gray, axis=0, out=out)
@@ -0,0 +1,88 @@
+import logging
+import numpy as np
+from typing import Callable
+from numpy.typing import NDArray
+from src.enums.FrameLayoutEnum import FrameLayout
+
+SplitFunction = Callable[[NDArray], tuple[NDArray, NDArray]]
+
+def detectFrameLayout(frame: NDArray, width: int, height: int) -> FrameLayout:
+    """
+    Detects how a backend laid out a camera frame of a device with the given thermal resolution (the frame holds two such halves).
+    """
+    totalRows = height * 2
+    if frame.ndim == 3:
+        if frame.shape[2] != 2:
+            return FrameLayout.CONVERTED
+        if frame.shape[0] >= totalRows:
+            return FrameLayout.YUY2
+        return FrameLayout.HALVES if frame.shape[0] >= 2 else FrameLayout.UNSUPPORTED
+    if frame.ndim != 2:
+        return FrameLayout.UNSUPPORTED
+    # Some Linux/V4L2 paths expose packed YUY2 as a 2D uint16 image, where each uint16 holds the two bytes of a pixel
+    if frame.dtype == np.uint16:
+        rows, cols = frame.shape
+        return FrameLayout.UINT16 if rows >= totalRows and cols >= width else FrameLayout.UNSUPPORTED
+    # Some backends return flattened byte buffers, often with a padded row stride
+    if frame.dtype == np.uint8 and frame.size % totalRows == 0:
+        bytesPerRow = frame.size // totalRows
+        if bytesPerRow % 2 == 0 and bytesPerRow // 2 >= width:
+            return FrameLayout.PADDED
+    return FrameLayout.UNSUPPORTED
+
+def createSplitFunction(layout: FrameLayout, shape: tuple[int, ...], width: int, height: int, contiguous: bool = True) -> SplitFunction | None:
+    """
+    Returns a function that splits frames of the given layout and shape into their image and thermal halves, or None if they cannot be split.
+    The halves are views of the frame: everything about the layout is worked out here, so the function only slices.
+    """
+    totalRows = height * 2
+    if layout == FrameLayout.YUY2:
+        return lambda frame: (frame[:height], frame[height:totalRows])
+    if layout == FrameLayout.HALVES:
+        half = (shape[0] + 1) // 2
+        return lambda frame: (frame[:half], frame[half:])
+    if layout == FrameLayout.UINT16:
+        rows, cols = shape
+        def splitPacked(frame: NDArray) -> tuple[NDArray, NDArray]:
+            pixels = (frame if contiguous else np.ascontiguousarray(frame)).view(np.uint8).reshape(rows, cols, 2)
+            return pixels[:height], pixels[height:totalRows]
+        return splitPacked
+    if layout == FrameLayout.PADDED:
+        pixelsPerRow = int(np.prod(shape)) // totalRows // 2
+        def splitPadded(frame: NDArray) -> tuple[NDArray, NDArray]:
+            pixels = (frame if contiguous else np.ascontiguousarray(frame)).reshape(totalRows, pixelsPerRow, 2)
+            return pixels[:height, :width], pixels[height:, :width]
+        return splitPadded
+    return None
+
+class FrameSplitter:
+    """
+    Splits camera frames into their image and thermal halves.
+    The layout is detected on the first frame, and a function specialised for it (see createSplitFunction) splits every frame after that.
+    It is only detected again when the frames' shape, dtype or strides change.
+    """
+    def __init__(self, width: int, height: int, logger: logging.Logger | None = None):
+        self.width = width
+        self.height = height
+        self.logger = logger or logging.getLogger(__name__)
+        self.layout: FrameLayout | None = None
+        self.detections: int = 0
+        self._key: tuple | None = None
+        self._split: SplitFunction | None = None
+
+    def split(self, frame: NDArray) -> tuple[NDArray | None, NDArray | None]:
+        """
+        Returns the image and thermal halves of the frame, or (None, None) if its layout cannot be split.
+        """
+        if (frame.shape, frame.dtype, frame.strides) != self._key:
+            self._detect(frame)
+        if self._split is None:
+            return None, None
+        return self._split(frame)
+
+    def _detect(self, frame: NDArray) -> None:
+        self._key = (frame.shape, frame.dtype, frame.strides)
+        self.layout = detectFrameLayout(frame, self.width, self.height)
+        self._split = createSplitFunction(self.layout, frame.shape, self.width, self.height, contiguous=frame.flags.c_contiguous)
+        self.detections += 1
+        self.logger.info(f"Frame layout {self.layout.name} detected for frames of shape {frame.shape} and dtype {frame.dtype}" + (f" (detection {self.detections})" if self.detections > 1 else ""))
@@ -0,0 +1,37 @@
+import logging, queue
+from logging.handlers import QueueHandler, QueueListener
+from src.defaults.values import HOT_PATH_LOG_SAMPLE_EVERY
+
+class HotPathLogger:
+    """
+    Debug logging for code that runs on every frame. Messages are %-style and only formatted when they are logged,
+    nothing is done beyond a level check unless DEBUG is enabled, and each message is sampled: the first call and then
+    one in every `sampleEvery` are logged, so debugging does not flood the log (or slow the frame rate) at 25 fps.
+    """
+    def __init__(self, logger: logging.Logger, sampleEvery: int = HOT_PATH_LOG_SAMPLE_EVERY):
+        self.logger = logger
+        self.sampleEvery = max(sampleEvery, 1)
+        self._calls: dict[str, int] = {} # By message format, i.e. by call site
+
+    def debug(self, msg: str, *args) -> None:
+        if not self.logger.isEnabledFor(logging.DEBUG):
+            return
+        calls = self._calls.get(msg, 0)
+        self._calls[msg] = calls + 1
+        if calls % self.sampleEvery == 0:
+            self.logger.debug(msg + " [call %d, 1 in %d logged]", *args, calls + 1, self.sampleEvery, stacklevel=2)
+
+def startQueueLogging(filename: str, format: str, level: int = logging.INFO) -> QueueListener:
+    """
+    Logs to the file through a queue: the threads that log only enqueue their records, and a background thread writes them,
+    so no capture or render thread ever waits for the disk. Stop the returned listener at exit to flush the queue.
+    """
+    logQueue: queue.SimpleQueue = queue.SimpleQueue() # Unbounded, so logging never blocks
+    fileHandler = logging.FileHandler(filename, encoding="utf-8")
+    fileHandler.setFormatter(logging.Formatter(format))
+    listener = QueueListener(logQueue, fileHandler, respect_handler_level=True)
+    rootLogger = logging.getLogger()
+    rootLogger.addHandler(QueueHandler(logQueue))
+    rootLogger.setLevel(level)
+    listener.start()
+    return listener
@@ -0,0 +1,108 @@
+import cv2, numpy as np
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_NORMALIZATION_OFFSET, DEFAULT_HOTSPOT_COUNT, DEFAULT_HOTSPOT_FILTER, DEFAULT_HOTSPOT_FILTER_SIZE, DEFAULT_HOTSPOT_MIN_DISTANCE
+from src.enums.HotspotFilterEnum import HotspotFilter
+
+# A located extremum. row/col are sub-pixel positions in sensor pixels (the center of pixel (0, 0) is at 0.0),
+# raw is the interpolated peak in raw units and temperature the same in Celsius.
+HOTSPOT_DTYPE: np.dtype = np.dtype([
+    ("row", np.float32),
+    ("col", np.float32),
+    ("raw", np.float32),
+    ("temperature", np.float32),
+])
+
+def prefilterField(raw: NDArray, prefilter: HotspotFilter = DEFAULT_HOTSPOT_FILTER, size: int = DEFAULT_HOTSPOT_FILTER_SIZE, out: NDArray[np.float32] | None = None) -> NDArray[np.float32]:
+    """
+    Converts the raw field to float32 and smooths it with a box or Gaussian filter of the given (odd) size,
+    so single-pixel noise does not show up as an extremum.
+    """
+    if out is None or out.shape != raw.shape:
+        out = np.empty(raw.shape, dtype=np.float32)
+    np.copyto(out, raw, casting='unsafe')
+    size = size | 1
+    if prefilter == HotspotFilter.BOX and size > 1:
+        cv2.blur(out, (size, size), dst=out)
+    elif prefilter == HotspotFilter.GAUSSIAN and size > 1:
+        cv2.GaussianBlur(out, (size, size), 0, dst=out)
+    return out
+
+def findHotspots(raw: NDArray,
+                 count: int = DEFAULT_HOTSPOT_COUNT,
+                 minDistance: int = DEFAULT_HOTSPOT_MIN_DISTANCE,
+                 prefilter: HotspotFilter = DEFAULT_HOTSPOT_FILTER,
+                 filterSize: int = DEFAULT_HOTSPOT_FILTER_SIZE,
+                 coldspots: bool = False,
+                 d: float = DEFAULT_NORMALIZATION_DIVISOR,
+                 c: float = DEFAULT_NORMALIZATION_OFFSET,
+                 field: NDArray[np.float32] | None = None) -> NDArray:
+    """
+    Finds the (up to) count hottest local maxima of the raw field, or the coldest local minima with coldspots,
+    at least minDistance pixels apart, refined to sub-pixel positions. Returns a HOTSPOT_DTYPE array, most extreme first.
+
+    Local extrema are found with a grayscale dilation (non-maximum suppression in a (2*minDistance+1)^2 window).
+    Each one is then refined with a 1D quadratic fit through its neighbours along each axis.
+    A prefiltered field can be passed in to reuse it (e.g. for the hot and the cold pass).
+    """
+    if count <= 0 or raw.size == 0:
+        return np.empty(0, dtype=HOTSPOT_DTYPE)
+    if field is None:
+        field = prefilterField(raw, prefilter, filterSize)
+
+    # Search for maxima of the negated field to find minima
+    signedField = -field if coldspots else field
+
+    # Non-maximum suppression: a pixel is a peak if it equals the maximum of its neighbourhood
+    window = 2 * max(minDistance, 1) + 1
+    dilated = cv2.dilate(signedField, cv2.getStructuringElement(cv2.MORPH_RECT, (window, window)))
+    rows, cols = np.nonzero(signedField >= dilated)
+    values = signedField[rows, cols]
+
+    # Keep the strongest candidates. Flat plateaus yield several equal peaks, so take a few extra and suppress them below.
+    candidates = min(len(values), count * 4)
+    order = np.argpartition(-values, candidates - 1)[:candidates] if candidates < len(values) else np.arange(len(values))
+    order = order[np.argsort(-values[order], kind='stable')]
+    rows, cols = rows[order], cols[order]
+
+    # Greedy suppression of candidates closer than minDistance to a stronger one (only a handful of candidates remain)
+    keep = np.zeros(len(rows), dtype=bool)
+    for index in range(len(rows)):
+        kept = np.flatnonzero(keep)
+        if len(kept) > 0 and np.any((np.abs(rows[kept] - rows[index]) <= minDistance) & (np.abs(cols[kept] - cols[index]) <= minDistance)):
+            continue
+        keep[index] = True
+        if np.count_nonzero(keep) == count:
+            break
+    rows, cols = rows[keep], cols[keep]
+
+    # Sub-pixel refinement: fit a parabola through each peak and its two neighbours along each axis (not possible on the border)
+    height, width = signedField.shape
+    center = signedField[rows, cols]
+    up = signedField[np.clip(rows - 1, 0, height - 1), cols]
+    down = signedField[np.clip(rows + 1, 0, height - 1), cols]
+    left = signedField[rows, np.clip(cols - 1, 0, width - 1)]
+    right = signedField[rows, np.clip(cols + 1, 0, width - 1)]
+    rowOffset, rowGain = _fitParabola(up, center, down, (rows > 0) & (rows < height - 1))
+    colOffset, colGain = _fitParabola(left, center, right, (cols > 0) & (cols < width - 1))
+
+    spots = np.empty(len(rows), dtype=HOTSPOT_DTYPE)
+    spots["row"] = rows + rowOffset
+    spots["col"] = cols + colOffset
+    peak = center + rowGain + colGain
+    spots["raw"] = -peak if coldspots else peak
+    spots["temperature"] = spots["raw"] / d - c
+    return spots
+
+def _fitParabola(before: NDArray, center: NDArray, after: NDArray, valid: NDArray) -> tuple[NDArray, NDArray]:
+    """
+    Fits a parabola through three equally spaced samples and returns the offset of its vertex from the center sample
+    (clamped to half a pixel) and how much higher the vertex is than the center sample.
+    """
+    curvature = before - 2 * center + after
+    slope = (after - before) / 2
+    valid = valid & (curvature < 0)
+    offset = np.zeros_like(center)
+    np.divide(-slope, curvature, out=offset, where=valid)
+    np.clip(offset, -0.5, 0.5, out=offset)
+    gain = np.where(valid, slope * offset / 2, 0).astype(np.float32)
+    return offset, gain
@@ -0,0 +1,151 @@
+import json, logging, time, numpy as np
+from src.defaults.values import PROFILER_WINDOW_SAMPLES, PROFILER_LOG_INTERVAL_S
+
+class StageTimings:
+    """
+    The timings of one pipeline stage. The last `window` durations are kept in a ring of nanoseconds, which the percentiles are taken over;
+    the count, mean and max are since the start.
+    """
+    __slots__ = ("samples", "count", "totalNs", "maxNs")
+
+    def __init__(self, window: int = PROFILER_WINDOW_SAMPLES):
+        self.samples = np.zeros(window, dtype=np.int64)
+        self.count: int = 0
+        self.totalNs: int = 0
+        self.maxNs: int = 0
+
+    def record(self, durationNs: int) -> None:
+        self.samples[self.count % len(self.samples)] = durationNs
+        self.count += 1
+        self.totalNs += durationNs
+        if durationNs > self.maxNs:
+            self.maxNs = durationNs
+
+    def summarize(self) -> dict[str, float]:
+        """
+        Returns the count, mean, p50/p95/p99 and max of the stage, in milliseconds.
+        """
+        window = self.samples[:min(self.count, len(self.samples))]
+        p50, p95, p99 = np.percentile(window, (50, 95, 99)) / 1e6 if len(window) else (0.0, 0.0, 0.0)
+        return {
+            "count": self.count,
+            "mean_ms": self.totalNs / self.count / 1e6 if self.count else 0.0,
+            "p50_ms": float(p50),
+            "p95_ms": float(p95),
+            "p99_ms": float(p99),
+            "max_ms": self.maxNs / 1e6,
+        }
+
+class _StageTimer:
+    """
+    Times a `with` block into a stage. There is one timer per stage, reused for every measurement,
+    so a stage must not be measured in nested blocks or from two threads at once.
+    """
+    __slots__ = ("_timings", "_start")
+
+    def __init__(self, timings: StageTimings):
+        self._timings = timings
+        self._start: int = 0
+
+    def __enter__(self) -> None:
+        self._start = time.perf_counter_ns()
+
+    def __exit__(self, *exc) -> None:
+        self._timings.record(time.perf_counter_ns() - self._start)
+
+class _NullTimer:
+    __slots__ = ()
+
+    def __enter__(self) -> None:
+        pass
+
+    def __exit__(self, *exc) -> None:
+        pass
+
+_NULL_TIMER = _NullTimer()
+
+class StageProfiler:
+    """
+    Collects how long each stage of the frame pipeline takes (e.g. `with profiler.measure("decode"): ...`), using time.perf_counter_ns.
+    While disabled, measure() returns a shared no-op timer, so the instrumentation costs one attribute check per stage.
+
+    Stages are listed in the order they were first measured. Each stage is expected to be measured on one thread
+    (the capture thread measures the capture, the processing thread everything else).
+    """
+    def __init__(self, logger: logging.Logger | None = None, enabled: bool = False, window: int = PROFILER_WINDOW_SAMPLES, logInterval: float = PROFILER_LOG_INTERVAL_S):
+        self.logger = logger
+        self.enabled = enabled
+        self.window = window
+        self.logInterval = logInterval
+        self._stages: dict[str, StageTimings] = {}
+        self._timers: dict[str, _StageTimer] = {}
+        self._lastLogTime: float = time.monotonic()
+
+    @property
+    def stages(self) -> list[str]:
+        return list(self._stages)
+
+    def _getTimings(self, stage: str) -> StageTimings:
+        timings = self._stages.get(stage)
+        if timings is None:
+            timings = self._stages[stage] = StageTimings(self.window)
+        return timings
+
+    def measure(self, stage: str) -> _StageTimer | _NullTimer:
+        """
+        Returns a context manager that times its block into the stage.
+        """
+        if not self.enabled:
+            return _NULL_TIMER
+        timer = self._timers.get(stage)
+        if timer is None:
+            timer = self._timers[stage] = _StageTimer(self._getTimings(stage))
+        return timer
+
+    def record(self, stage: str, durationNs: int) -> None:
+        """
+        Adds a duration measured elsewhere (e.g. across calls) to the stage.
+        """
+        if self.enabled:
+            self._getTimings(stage).record(durationNs)
+
+    def reset(self) -> None:
+        """
+        Drops all timings collected so far.
+        """
+        self._stages = {}
+        self._timers = {}
+
+    def getReport(self) -> dict[str, dict[str, float]]:
+        """
+        Returns the summary of every stage (see StageTimings.summarize), in milliseconds.
+        """
+        return {stage: timings.summarize() for stage, timings in list(self._stages.items()) if timings.count > 0}
+
+    def formatReport(self) -> list[str]:
+        """
+        Returns one line per stage with its percentiles, for the log and the profiler panel.
+        """
+        report = self.getReport()
+        width = max((len(stage) for stage in report), default=0)
+        return [f"{stage:<{width}}  p50 {summary['p50_ms']:6.2f}  p95 {summary['p95_ms']:6.2f}  p99 {summary['p99_ms']:6.2f} ms"
+                for stage, summary in report.items()]
+
+    def logPeriodically(self) -> None:
+        """
+        Logs the report every logInterval seconds. Meant to be called once per frame.
+        """
+        if not self.enabled or self.logger is None:
+            return
+        now = time.monotonic()
+        if now - self._lastLogTime < self.logInterval:
+            return
+        self._lastLogTime = now
+        self.logger.info("Stage timings:\n" + "\n".join(self.formatReport()))
+
+    def writeReport(self, path: str, **metadata) -> None:
+        """
+        Writes the report as JSON, along with any metadata given (e.g. the device and the options the timings were taken with).
+        """
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump({**metadata, "window": self.window, "stages": self.getReport()}, file, indent=2)
@@ -0,0 +1,118 @@
+import cv2, numpy as np
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_NORMALIZATION_OFFSET
+from src.enums.RoiShapeEnum import RoiShape
+from src.models.regionofinterest import RegionOfInterest
+
+# The stats of one region, in Celsius. Regions that lie completely outside the frame get NaN.
+ROI_STATS_DTYPE: np.dtype = np.dtype([
+    ("mean", np.float32),
+    ("min", np.float32),
+    ("max", np.float32),
+    ("std", np.float32),
+])
+
+class RoiStatsCalculator:
+    """
+    Calculates the stats of many regions of interest per frame.
+
+    The means and standard deviations of all rectangles come from one summed-area table (and one of the squares) per frame,
+    so they cost O(1) per rectangle and are calculated for all rectangles at once. Their extremes are reduced in two vectorized steps:
+    every row segment of every rectangle with one ufunc.reduceat over the flattened frame, then the segments of each rectangle.
+    Polygons are rasterized once into masks over their bounding boxes, which are cached until the frame size changes.
+    """
+    def __init__(self, regions: list[RegionOfInterest]):
+        self.regions = regions
+        self._shape: tuple[int, int] | None = None
+        self._rectIndices: NDArray[np.intp] = np.empty(0, dtype=np.intp)
+        self._rectBounds: NDArray[np.intp] = np.empty((0, 4), dtype=np.intp) # (top, left, bottom, right), clipped to the frame
+        self._rectAreas: NDArray[np.float64] = np.empty(0, dtype=np.float64)
+        self._segmentBounds: NDArray[np.intp] = np.empty(0, dtype=np.intp) # (start, end) of every row segment of every rectangle in the flattened frame, interleaved
+        self._segmentStarts: NDArray[np.intp] = np.empty(0, dtype=np.intp) # The first row segment of every rectangle
+        self._flatFrame: NDArray[np.uint16] | None = None
+        self._polygons: list[tuple[int, tuple[int, int, int, int], NDArray[np.uint8]]] = [] # (index, bounds, mask)
+        self._emptyIndices: NDArray[np.intp] = np.empty(0, dtype=np.intp)
+        self._sum: NDArray[np.float64] | None = None
+        self._squaredSum: NDArray[np.float64] | None = None
+        self._stats: NDArray = np.zeros(len(regions), dtype=ROI_STATS_DTYPE)
+
+    def _compile(self, height: int, width: int) -> None:
+        """
+        Clips the regions to the frame and rasterizes the polygon masks.
+        """
+        rectIndices, rectBounds, polygons, emptyIndices = [], [], [], []
+        for index, region in enumerate(self.regions):
+            top, left = max(region.y, 0), max(region.x, 0)
+            bottom, right = min(region.y + region.height, height), min(region.x + region.width, width)
+            if bottom <= top or right <= left:
+                emptyIndices.append(index)
+                continue
+            if region.shape == RoiShape.RECT:
+                rectIndices.append(index)
+                rectBounds.append((top, left, bottom, right))
+                continue
+
+            mask = np.zeros((bottom - top, right - left), dtype=np.uint8)
+            vertices = np.array(region.points, dtype=np.int32) - (left, top)
+            cv2.fillPoly(mask, [vertices], 255)
+            if cv2.countNonZero(mask) == 0:
+                emptyIndices.append(index)
+                continue
+            polygons.append((index, (top, left, bottom, right), mask))
+
+        self._rectIndices = np.array(rectIndices, dtype=np.intp)
+        self._rectBounds = np.array(rectBounds, dtype=np.intp).reshape(-1, 4)
+        self._rectAreas = ((self._rectBounds[:, 2] - self._rectBounds[:, 0]) * (self._rectBounds[:, 3] - self._rectBounds[:, 1])).astype(np.float64)
+
+        # reduceat reduces [bounds[i], bounds[i + 1]), so interleaving the starts and ends yields the segments at the even positions
+        top, left, bottom, right = self._rectBounds.T
+        heights = bottom - top
+        owners = np.repeat(np.arange(len(heights)), heights)
+        rows = np.arange(len(owners)) - np.repeat(np.cumsum(heights) - heights, heights) + top[owners]
+        self._segmentBounds = np.empty(2 * len(rows), dtype=np.intp)
+        self._segmentBounds[0::2] = rows * width + left[owners]
+        self._segmentBounds[1::2] = rows * width + right[owners]
+        self._segmentStarts = (np.cumsum(heights) - heights).astype(np.intp)
+        self._flatFrame = np.zeros(height * width + 1, dtype=np.uint16) # One spare element, as a segment may end at the very end of the frame
+        self._polygons = polygons
+        self._emptyIndices = np.array(emptyIndices, dtype=np.intp)
+        self._sum = np.zeros((height + 1, width + 1), dtype=np.float64)
+        self._squaredSum = np.zeros((height + 1, width + 1), dtype=np.float64)
+        self._shape = (height, width)
+
+    def calculate(self, raw: NDArray[np.uint16], d: float = DEFAULT_NORMALIZATION_DIVISOR, c: float = DEFAULT_NORMALIZATION_OFFSET) -> NDArray:
+        """
+        Calculates the stats of every region (in the order of the regions) from the decoded raw matrix.
+        NOTE: The returned array is reused for the next frame. Copy it to keep it around.
+        """
+        stats = self._stats
+        if len(self.regions) == 0:
+            return stats
+        if self._shape != raw.shape:
+            self._compile(*raw.shape)
+
+        if len(self._rectIndices) > 0:
+            # One pass over the frame for the summed-area tables, then four lookups per rectangle
+            cv2.integral2(raw, self._sum, self._squaredSum, sdepth=cv2.CV_64F, sqdepth=cv2.CV_64F)
+            top, left, bottom, right = self._rectBounds.T
+            sums = self._sum[bottom, right] - self._sum[top, right] - self._sum[bottom, left] + self._sum[top, left]
+            squaredSums = self._squaredSum[bottom, right] - self._squaredSum[top, right] - self._squaredSum[bottom, left] + self._squaredSum[top, left]
+            means = sums / self._rectAreas
+            variances = np.maximum(squaredSums / self._rectAreas - np.square(means), 0)
+            stats["mean"][self._rectIndices] = means / d - c
+            stats["std"][self._rectIndices] = np.sqrt(variances) / d
+
+            self._flatFrame[:-1] = raw.ravel()
+            for field, ufunc in (("min", np.minimum), ("max", np.maximum)):
+                segments = ufunc.reduceat(self._flatFrame, self._segmentBounds)[0::2]
+                stats[field][self._rectIndices] = ufunc.reduceat(segments, self._segmentStarts) / d - c
+
+        for index, (polygonTop, polygonLeft, polygonBottom, polygonRight), mask in self._polygons:
+            view = raw[polygonTop:polygonBottom, polygonLeft:polygonRight]
+            minimum, maximum, _, _ = cv2.minMaxLoc(view, mask)
+            mean, std = cv2.meanStdDev(view, mask=mask)
+            stats[index] = (mean[0, 0] / d - c, minimum / d - c, maximum / d - c, std[0, 0] / d)
+
+        if len(self._emptyIndices) > 0:
+            stats[self._emptyIndices] = np.nan
+        return stats
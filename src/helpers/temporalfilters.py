@@ -0,0 +1,151 @@
+import cv2, numpy as np
+from abc import ABC, abstractmethod
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_TEMPORAL_ALPHA, DEFAULT_TEMPORAL_FRAMES, TEMPORAL_FRAMES_MAX, DEFAULT_MOTION_THRESHOLD_C
+from src.enums.TemporalFilterEnum import TemporalFilter
+
+class TemporalNoiseFilter(ABC):
+    """
+    Base class of the temporal noise filters. They run on the decoded raw matrix at sensor resolution,
+    keeping their state in preallocated float32 buffers that are updated in place.
+
+    apply() returns the filtered field rounded back to uint16 raw samples, so everything downstream (stats, hotspots, ROIs, display)
+    works as before. The unrounded float32 estimate is kept in `state`.
+    NOTE: The returned matrix is reused for the next frame. Copy it to keep it around.
+    """
+    def __init__(self):
+        self.state: NDArray[np.float32] | None = None
+        self._output: NDArray[np.uint16] | None = None
+        self._rounded: NDArray[np.float32] | None = None
+
+    def apply(self, raw: NDArray[np.uint16]) -> NDArray[np.uint16]:
+        if self.state is None or self.state.shape != raw.shape:
+            self._allocate(raw.shape)
+            self._start(raw)
+        else:
+            self._update(raw)
+        np.rint(self.state, out=self._rounded)
+        np.copyto(self._output, self._rounded, casting='unsafe')
+        return self._output
+
+    def reset(self) -> None:
+        """
+        Drops the state, so the next frame starts the filter again (e.g. after the camera moved or the source changed).
+        """
+        self.state = None
+
+    def _allocate(self, shape: tuple[int, ...]) -> None:
+        self.state = np.empty(shape, dtype=np.float32)
+        self._output = np.empty(shape, dtype=np.uint16)
+        self._rounded = np.empty(shape, dtype=np.float32)
+
+    def _start(self, raw: NDArray[np.uint16]) -> None:
+        np.copyto(self.state, raw, casting='unsafe')
+
+    @abstractmethod
+    def _update(self, raw: NDArray[np.uint16]) -> None:
+        """
+        Folds the next frame into the state.
+        """
+
+class EmaFilter(TemporalNoiseFilter):
+    """
+    Exponential moving average: state += alpha * (raw - state).
+    Reduces the noise (and thus the NETD) by a factor of sqrt(alpha / (2 - alpha)), at the cost of a lag of about 1 / alpha frames.
+    """
+    def __init__(self, alpha: float = DEFAULT_TEMPORAL_ALPHA):
+        super().__init__()
+        self.alpha = alpha
+
+    def _update(self, raw: NDArray[np.uint16]) -> None:
+        cv2.accumulateWeighted(raw, self.state, self.alpha)
+
+class RunningMeanFilter(TemporalNoiseFilter):
+    """
+    Mean of the last N frames, from a preallocated ring of frames and a running sum.
+    Each frame adds the newest and subtracts the oldest frame instead of summing all N again. The raw samples are integers,
+    so the float32 running sum stays exact (no drift) for up to TEMPORAL_FRAMES_MAX frames.
+    Reduces the noise by a factor of sqrt(N), with a lag of N / 2 frames.
+    """
+    def __init__(self, frames: int = DEFAULT_TEMPORAL_FRAMES):
+        super().__init__()
+        if not 1 <= frames <= TEMPORAL_FRAMES_MAX:
+            raise ValueError(f"The running mean needs 1 to {TEMPORAL_FRAMES_MAX} frames, got {frames}")
+        self.frames = frames
+        self._ring: NDArray[np.uint16] | None = None
+        self._sum: NDArray[np.float32] | None = None
+        self._count: int = 0
+        self._next: int = 0
+
+    def _allocate(self, shape: tuple[int, ...]) -> None:
+        super()._allocate(shape)
+        self._ring = np.empty((self.frames,) + tuple(shape), dtype=np.uint16)
+        self._sum = np.zeros(shape, dtype=np.float32)
+
+    def _start(self, raw: NDArray[np.uint16]) -> None:
+        self._sum.fill(0)
+        self._count = 0
+        self._next = 0
+        self._update(raw)
+
+    def _update(self, raw: NDArray[np.uint16]) -> None:
+        slot = self._ring[self._next]
+        if self._count == self.frames:
+            np.subtract(self._sum, slot, out=self._sum)
+        else:
+            self._count += 1
+        np.add(self._sum, raw, out=self._sum)
+        np.copyto(slot, raw)
+        self._next = (self._next + 1) % self.frames
+        np.multiply(self._sum, np.float32(1.0 / self._count), out=self.state)
+
+class MotionAdaptiveFilter(TemporalNoiseFilter):
+    """
+    Exponential moving average whose weight grows per pixel with the difference between the new frame and the estimate:
+    alpha = clip(|raw - state| / motionThreshold, minAlpha, 1).
+    Differences at the noise level are averaged like the EMA, while real changes (a moving object, a hand in front of the camera)
+    are followed within a frame instead of leaving a trail.
+    """
+    def __init__(self, minAlpha: float = DEFAULT_TEMPORAL_ALPHA, motionThreshold: float = DEFAULT_MOTION_THRESHOLD_C * DEFAULT_NORMALIZATION_DIVISOR):
+        super().__init__()
+        self.minAlpha = minAlpha
+        self.motionThreshold = motionThreshold # In raw units
+        self._difference: NDArray[np.float32] | None = None
+        self._alpha: NDArray[np.float32] | None = None
+
+    def _allocate(self, shape: tuple[int, ...]) -> None:
+        super()._allocate(shape)
+        self._difference = np.empty(shape, dtype=np.float32)
+        self._alpha = np.empty(shape, dtype=np.float32)
+
+    def _update(self, raw: NDArray[np.uint16]) -> None:
+        np.subtract(raw, self.state, out=self._difference)
+        np.abs(self._difference, out=self._alpha)
+        np.multiply(self._alpha, np.float32(1.0 / self.motionThreshold), out=self._alpha)
+        np.clip(self._alpha, self.minAlpha, 1.0, out=self._alpha)
+        np.multiply(self._difference, self._alpha, out=self._difference)
+        np.add(self.state, self._difference, out=self.state)
+
+def createTemporalFilter(temporalFilter: TemporalFilter,
+                         alpha: float = DEFAULT_TEMPORAL_ALPHA,
+                         frames: int = DEFAULT_TEMPORAL_FRAMES,
+                         motionThresholdC: float = DEFAULT_MOTION_THRESHOLD_C,
+                         d: float = DEFAULT_NORMALIZATION_DIVISOR) -> TemporalNoiseFilter | None:
+    """
+    Creates the selected temporal filter, or None for TemporalFilter.NONE.
+    """
+    match temporalFilter:
+        case TemporalFilter.EMA:
+            return EmaFilter(alpha)
+        case TemporalFilter.RUNNING_MEAN:
+            return RunningMeanFilter(frames)
+        case TemporalFilter.MOTION_ADAPTIVE:
+            return MotionAdaptiveFilter(alpha, motionThresholdC * d)
+    return None
+
+def estimateNetdMk(frames: NDArray, d: float = DEFAULT_NORMALIZATION_DIVISOR) -> float:
+    """
+    Estimates the NETD (noise equivalent temperature difference, in mK) from a stack of frames of a static scene:
+    the temporal standard deviation of each pixel, averaged over all pixels.
+    """
+    return float(np.mean(np.std(np.asarray(frames, dtype=np.float64), axis=0)) / d * 1000)
@@ -0,0 +1,46 @@
+import numpy as np
+from numpy.typing import NDArray
+from src.enums.ThermalByteOrderEnum import ThermalByteOrder
+
+# NOTE: these helpers operate on whole frames at once. Avoid per-pixel Python math on the hot path.
+
+def getRawDtype(byteOrder: ThermalByteOrder | None) -> np.dtype:
+    """
+    Gets the 16-bit dtype that matches the byte order of the thermal data.
+    LSB_BYTE_0 (the default) means channel 0 holds the LSB, which is little-endian.
+    """
+    if byteOrder == ThermalByteOrder.LSB_BYTE_1:
+        return np.dtype('>u2')
+    return np.dtype('<u2')
+
+def decodeRawThermalData(thdata: NDArray, byteOrder: ThermalByteOrder | None = None, out: NDArray | None = None) -> NDArray[np.uint16]:
+    """
+    Decodes the 2-channel uint8 thermal half of a frame into a 2D uint16 matrix of raw samples.
+
+    When the two bytes of each pixel are adjacent in memory (the normal case, even with a padded row stride)
+    this is a zero-copy `.view()`. A copy into `out` is only made if the byte order is not native
+    or if the channels are not adjacent in memory. Already decoded 2D uint16 data is returned as-is.
+    """
+    if thdata.ndim == 2 and thdata.dtype == np.uint16:
+        return thdata
+    if thdata.ndim != 3 or thdata.shape[2] < 2:
+        raise ValueError(f"Cannot decode thermal data with shape {thdata.shape} and dtype {thdata.dtype}")
+
+    rawDtype = getRawDtype(byteOrder)
+    height, width = thdata.shape[0], thdata.shape[1]
+    if out is None or out.shape != (height, width):
+        out = np.empty((height, width), dtype=np.uint16)
+
+    # Fast path: reinterpret each pair of bytes as one 16-bit sample
+    if thdata.dtype == np.uint8 and thdata.shape[2] == 2 and thdata.strides[2] == 1 and thdata.strides[1] == 2:
+        raw = thdata.view(rawDtype)[..., 0]
+        if raw.dtype.isnative:
+            return raw
+        np.copyto(out, raw, casting='unsafe')
+        return out
+
+    # Slow path: combine the channels explicitly (still vectorized)
+    lsbChannel, msbChannel = (1, 0) if byteOrder == ThermalByteOrder.LSB_BYTE_1 else (0, 1)
+    np.left_shift(thdata[..., msbChannel], 8, out=out, dtype=np.uint16)
+    np.bitwise_or(out, thdata[..., lsbChannel], out=out, casting='unsafe')
+    return out
@@ -0,0 +1,49 @@
+import cv2, numpy as np
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_NORMALIZATION_OFFSET, DEFAULT_TEMPERATURE_SIG_DIGITS
+from src.models.framestats import FrameStats
+
+STATS_PERCENTILES: tuple[float, float, float] = (1.0, 50.0, 99.0)
+
+def computeFrameStats(raw: NDArray[np.uint16], d: float = DEFAULT_NORMALIZATION_DIVISOR, c: float = DEFAULT_NORMALIZATION_OFFSET) -> FrameStats:
+    """
+    Calculates all frame statistics from the decoded raw matrix.
+
+    A single histogram of the raw samples yields the mean, standard deviation and percentiles without
+    sorting, and cv2.minMaxLoc finds the extremes along with their positions in one pass.
+    Everything is calculated on the exact 16-bit samples and only normalized to Celsius at the end.
+    """
+    if raw.size == 0:
+        return FrameStats()
+
+    minRaw, maxRaw, minLoc, maxLoc = cv2.minMaxLoc(raw)
+
+    # Histogram the samples; every statistic below is derived from it
+    histogram = np.bincount(raw.ravel(), minlength=int(maxRaw) + 1)[int(minRaw):]
+    values = np.arange(int(minRaw), int(maxRaw) + 1, dtype=np.float64)
+    count = raw.size
+
+    mean = float(histogram @ values) / count
+    variance = float(histogram @ np.square(values - mean)) / count
+    cumulative = np.cumsum(histogram)
+    percentiles = np.searchsorted(cumulative, np.array(STATS_PERCENTILES) / 100.0 * count, side='left') + int(minRaw)
+
+    centerRaw = int(raw[raw.shape[0] // 2, raw.shape[1] // 2])
+
+    def normalize(value: float) -> float:
+        return round((value / d) - c, DEFAULT_TEMPERATURE_SIG_DIGITS)
+
+    return FrameStats(
+        rawTemp=centerRaw,
+        centerTemp=normalize(centerRaw),
+        avgTemp=normalize(mean),
+        minTemp=normalize(minRaw),
+        maxTemp=normalize(maxRaw),
+        stdTemp=round(variance ** 0.5 / d, DEFAULT_TEMPERATURE_SIG_DIGITS),
+        p1Temp=normalize(int(percentiles[0])),
+        p50Temp=normalize(int(percentiles[1])),
+        p99Temp=normalize(int(percentiles[2])),
+        minRow=minLoc[1],
+        minCol=minLoc[0],
+        maxRow=maxLoc[1],
+        maxCol=maxLoc[0])
@@ -0,0 +1,64 @@
+from dataclasses import dataclass
+from src.defaults.values import ALARM_FILE_EXTENSIONS, ALARM_TARGET_FRAME, DEFAULT_ALARM_HYSTERESIS_C, DEFAULT_ALARM_MIN_DURATION_S, DEFAULT_ALARM_RISE_WINDOW_S
+from src.enums.AlarmKindEnum import AlarmKind
+from src.enums.AlarmMetricEnum import AlarmMetric
+from src.helpers.config_files import loadConfigFile, findConfigFileForDevice
+
+@dataclass
+class AlarmDefinition:
+    """
+    A temperature alarm on one metric of the whole frame or of a region of interest (or of every region, with the target "*").
+    Temperatures are in Celsius; the threshold and hysteresis of RISE alarms are in °C/s.
+    The alarm is raised once the condition held for minDuration seconds, and cleared once the value got back past the threshold
+    by the hysteresis for minDuration seconds.
+    """
+    name: str
+    threshold: float
+    kind: AlarmKind = AlarmKind.ABOVE
+    target: str = ALARM_TARGET_FRAME
+    metric: AlarmMetric = AlarmMetric.MAX
+    hysteresis: float = DEFAULT_ALARM_HYSTERESIS_C
+    minDuration: float = DEFAULT_ALARM_MIN_DURATION_S
+    window: float = DEFAULT_ALARM_RISE_WINDOW_S
+
+    @staticmethod
+    def createFromJson(data: dict) -> 'AlarmDefinition':
+        """
+        Creates an alarm from its JSON/YAML definition, e.g.
+        {"name": "bearing overheat", "target": "bearing", "metric": "max", "kind": "above", "threshold": 80, "hysteresis": 2, "min_duration_s": 1}.
+        """
+        name = str(data["name"])
+        try:
+            kind = AlarmKind[str(data.get("kind", AlarmKind.ABOVE.name)).upper()]
+            metric = AlarmMetric[str(data.get("metric", AlarmMetric.MAX.name)).upper()]
+        except KeyError as e:
+            raise ValueError(f"Alarm '{name}' has an invalid kind or metric: {e}") from e
+
+        alarm = AlarmDefinition(
+            name=name,
+            threshold=float(data["threshold"]),
+            kind=kind,
+            target=str(data.get("target", ALARM_TARGET_FRAME)),
+            metric=metric,
+            hysteresis=float(data.get("hysteresis", DEFAULT_ALARM_HYSTERESIS_C)),
+            minDuration=float(data.get("min_duration_s", DEFAULT_ALARM_MIN_DURATION_S)),
+            window=float(data.get("window_s", DEFAULT_ALARM_RISE_WINDOW_S)))
+        if alarm.hysteresis < 0 or alarm.minDuration < 0 or alarm.window <= 0:
+            raise ValueError(f"Alarm '{name}' needs a hysteresis and min duration of at least 0 and a positive window")
+        if alarm.metric == AlarmMetric.CENTER and alarm.target != ALARM_TARGET_FRAME:
+            raise ValueError(f"Alarm '{name}': the CENTER metric is only available for the target '{ALARM_TARGET_FRAME}'")
+        return alarm
+
+    @staticmethod
+    def loadAllFromFile(path: str) -> list['AlarmDefinition']:
+        """
+        Loads all alarms from a JSON or YAML (.yaml/.yml, requires PyYAML) file with a top-level "alarms" list.
+        """
+        return [AlarmDefinition.createFromJson(alarm) for alarm in loadConfigFile(path).get("alarms", [])]
+
+    @staticmethod
+    def findFileForDevice(devicePath: str) -> str | None:
+        """
+        Finds the alarm file that belongs to a device JSON (e.g. devices/TC001.alarms.json for devices/TC001.json), if there is one.
+        """
+        return findConfigFileForDevice(devicePath, ALARM_FILE_EXTENSIONS)
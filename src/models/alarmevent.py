@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from src.enums.AlarmKindEnum import AlarmKind
+from src.enums.AlarmMetricEnum import AlarmMetric
+from src.enums.AlarmStateEnum import AlarmState
+
+@dataclass
+class AlarmEvent:
+    """
+    An alarm that was raised or cleared. The value is the temperature (°C), or the rate of rise (°C/s) for RISE alarms, that triggered the event.
+    """
+    name: str
+    target: str
+    metric: AlarmMetric
+    kind: AlarmKind
+    state: AlarmState
+    value: float
+    threshold: float
+    timestamp: int # time.time_ns() of the frame
+    frameIndex: int
+
+    def toJson(self) -> dict:
+        return {
+            "name": self.name,
+            "target": self.target,
+            "metric": self.metric.name,
+            "kind": self.kind.name,
+            "state": self.state.name,
+            "value": self.value,
+            "threshold": self.threshold,
+            "timestamp": self.timestamp,
+            "frame_index": self.frameIndex,
+        }
+
+    def __str__(self) -> str:
+        unit = "C/s" if self.kind == AlarmKind.RISE else "C"
+        return f"Alarm '{self.name}' {self.state.name} on {self.target} {self.metric.name} ({self.kind.name} {self.threshold} {unit}): {self.value:.2f} {unit} at frame {self.frameIndex}"
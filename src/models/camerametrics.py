@@ -0,0 +1,16 @@
+from dataclasses import dataclass
+
+@dataclass
+class CameraMetrics:
+    """
+    Per-camera counters of the multi-camera supervisor. The rates are over the last metrics interval, the counts are totals.
+    """
+    label: str
+    fps: float = 0
+    captured: int = 0
+    processed: int = 0
+    dropped: int = 0 # Captured frames that were never processed (the supervisor always takes the newest frame)
+    processMs: float = 0 # Mean time to decode, analyze and render a frame
+
+    def __str__(self) -> str:
+        return f"{self.label}: {self.fps:.1f} fps, {self.processMs:.1f} ms/frame, {self.dropped}/{self.captured} dropped"
@@ -0,0 +1,45 @@
+import time
+from dataclasses import dataclass, asdict
+
+@dataclass
+class CaptureBackendChoice:
+    """
+    The capture settings that worked for a camera: the OpenCV backend that delivered raw frames, what it negotiated, and the
+    layout of its frames. Cached per device (see src.helpers.capture_backend_cache), so the next start can open the camera directly.
+    """
+    backend: int # cv2.CAP_* id
+    backendName: str
+    fourcc: str # As negotiated by the backend, e.g. YUY2
+    width: int
+    height: int
+    frameShape: tuple[int, ...]
+    frameDtype: str
+    rowStrideBytes: int # Of the frames as delivered (padded buffers have more bytes per row than the pixels need)
+    frameLayout: str # The FrameLayout name of the frames
+    savedAt: str = ""
+
+    def matchesFrame(self, shape: tuple[int, ...], dtype: str, frameLayout: str) -> bool:
+        """
+        Whether a frame has the shape, dtype and layout the cached frames had.
+        """
+        return tuple(shape) == tuple(self.frameShape) and dtype == self.frameDtype and frameLayout == self.frameLayout
+
+    def toJson(self) -> dict:
+        data = asdict(self)
+        data["frameShape"] = list(self.frameShape)
+        data["savedAt"] = self.savedAt or time.strftime("%Y-%m-%dT%H:%M:%S%z")
+        return data
+
+    @staticmethod
+    def createFromJson(data: dict) -> 'CaptureBackendChoice':
+        return CaptureBackendChoice(
+            backend=int(data["backend"]),
+            backendName=str(data.get("backendName", "")),
+            fourcc=str(data.get("fourcc", "")),
+            width=int(data.get("width", 0)),
+            height=int(data.get("height", 0)),
+            frameShape=tuple(int(size) for size in data["frameShape"]),
+            frameDtype=str(data["frameDtype"]),
+            rowStrideBytes=int(data.get("rowStrideBytes", 0)),
+            frameLayout=str(data["frameLayout"]),
+            savedAt=str(data.get("savedAt", "")))
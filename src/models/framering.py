@@ -0,0 +1,157 @@
+import threading, numpy as np
+from numpy.typing import NDArray
+from src.enums.FramePolicyEnum import FramePolicy
+
+class FrameRingConsumer:
+    """
+    A reader of a FrameRing. Each consumer keeps its own position in the ring and its own counters.
+    Frames are copied into a buffer owned by the consumer, so the producer can keep writing while the frame is used.
+    Read-only frames are returned without copying.
+    """
+    def __init__(self, ring: 'FrameRing', name: str, policy: FramePolicy):
+        self.name = name
+        self.policy = policy
+        self.cursor: int = 0
+        self.consumed: int = 0
+        self.dropped: int = 0
+        self.late: int = 0
+        self._ring = ring
+        self._buffer: NDArray | None = None
+
+    def next(self, timeout: float | None = None) -> tuple[NDArray | None, int]:
+        """
+        Returns the next unread frame and its timestamp (ns), waiting up to timeout seconds for one.
+        If this consumer fell so far behind that frames were overwritten, it skips ahead to the oldest frame still available.
+        Returns (None, 0) on timeout or when the ring is closed.
+        """
+        return self._ring._read(self, latest=False, timeout=timeout)
+
+    def latest(self, timeout: float | None = None) -> tuple[NDArray | None, int]:
+        """
+        Returns the newest frame and its timestamp (ns), skipping any unread frames in between.
+        Returns (None, 0) on timeout or when the ring is closed.
+        """
+        return self._ring._read(self, latest=True, timeout=timeout)
+
+    def getCounters(self) -> dict:
+        return {"policy": self.policy.name, "consumed": self.consumed, "dropped": self.dropped, "late": self.late}
+
+class FrameRing:
+    """
+    A bounded ring of frame buffers with a single producer (the capture thread) and any number of consumers.
+
+    The buffers are allocated once from the first frame (its shape depends on the capture backend) and are then reused,
+    so the producer can read directly into them. One slot is always reserved for the producer to write into.
+    Consumers with the BLOCK policy make the producer wait instead of overwriting frames they have not read yet;
+    DROP_OLDEST consumers never hold up the producer and simply count the frames they missed.
+    The optional frameEvent is set on every new frame (and on close), so one thread can wait on several rings at once.
+    """
+    def __init__(self, capacity: int, frameEvent: threading.Event | None = None):
+        if capacity < 2:
+            raise ValueError(f"Frame ring capacity must be at least 2, got {capacity}")
+
+        self.capacity = capacity
+        self.captured: int = 0
+        self.blockedWrites: int = 0
+        self._slots: list[NDArray | None] = [None] * capacity
+        self._timestamps = np.zeros(capacity, dtype=np.int64)
+        self._writeSeq: int = 0
+        self._closed: bool = False
+        self._consumers: list[FrameRingConsumer] = []
+        self._condition = threading.Condition()
+        self._frameEvent = frameEvent
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def addConsumer(self, name: str, policy: FramePolicy = FramePolicy.DROP_OLDEST) -> FrameRingConsumer:
+        """
+        Registers a new consumer. It starts reading from the next frame written.
+        """
+        with self._condition:
+            consumer = FrameRingConsumer(self, name, policy)
+            consumer.cursor = self._writeSeq
+            self._consumers.append(consumer)
+            return consumer
+
+    def removeConsumer(self, consumer: FrameRingConsumer) -> None:
+        with self._condition:
+            if consumer in self._consumers:
+                self._consumers.remove(consumer)
+            self._condition.notify_all()
+
+    def getWriteBuffer(self) -> NDArray | None:
+        """
+        Returns the buffer the producer should read the next frame into (None until the first frame is committed).
+        The slot always holds a frame that consumers can no longer read, so it is safe to write into without locking.
+        """
+        with self._condition:
+            return self._slots[self._writeSeq % self.capacity]
+
+    def commitWrite(self, frame: NDArray, timestamp: int, timeout: float | None = None) -> None:
+        """
+        Publishes the frame written into the current slot. If the capture returned a different array
+        (first frame, or the frame shape changed), that array becomes the slot's buffer.
+
+        Publishing a frame makes the oldest readable frame unavailable, so this waits (up to timeout seconds)
+        while a BLOCK consumer still has to read it.
+        """
+        with self._condition:
+            isBlocked = lambda: any(c.policy == FramePolicy.BLOCK and c.cursor <= self._writeSeq - self.capacity + 1 for c in self._consumers)
+            if not self._closed and isBlocked():
+                self.blockedWrites += 1
+                self._condition.wait_for(lambda: self._closed or not isBlocked(), timeout)
+
+            index = self._writeSeq % self.capacity
+            self._slots[index] = frame
+            self._timestamps[index] = timestamp
+            self._writeSeq += 1
+            self.captured += 1
+            self._condition.notify_all()
+        if self._frameEvent is not None:
+            self._frameEvent.set()
+
+    def close(self) -> None:
+        """
+        Closes the ring and wakes up every waiting consumer and producer.
+        """
+        with self._condition:
+            self._closed = True
+            self._condition.notify_all()
+        if self._frameEvent is not None:
+            self._frameEvent.set()
+
+    def getCounters(self) -> dict:
+        with self._condition:
+            return {
+                "captured": self.captured,
+                "blockedWrites": self.blockedWrites,
+                "consumers": {c.name: c.getCounters() for c in self._consumers}}
+
+    def _read(self, consumer: FrameRingConsumer, latest: bool, timeout: float | None) -> tuple[NDArray | None, int]:
+        with self._condition:
+            self._condition.wait_for(lambda: self._closed or self._writeSeq > consumer.cursor, timeout)
+            if self._writeSeq <= consumer.cursor:
+                return None, 0
+
+            # The slot of the oldest frame is the one being written to next, so it is not readable
+            oldest = max(0, self._writeSeq - self.capacity + 1)
+            seq = self._writeSeq - 1 if latest else max(consumer.cursor, oldest)
+            consumer.dropped += seq - consumer.cursor
+            if seq < self._writeSeq - 1:
+                consumer.late += 1
+
+            slot = self._slots[seq % self.capacity]
+            consumer.cursor = seq + 1
+            consumer.consumed += 1
+            self._condition.notify_all()
+
+            # Read-only frames (e.g. memory-mapped recordings) can never change underneath the consumer, so they are shared as-is
+            if not slot.flags.writeable:
+                return slot, int(self._timestamps[seq % self.capacity])
+
+            if consumer._buffer is None or consumer._buffer.shape != slot.shape or consumer._buffer.dtype != slot.dtype:
+                consumer._buffer = np.empty_like(slot)
+            np.copyto(consumer._buffer, slot)
+            return consumer._buffer, int(self._timestamps[seq % self.capacity])
@@ -0,0 +1,58 @@
+from dataclasses import dataclass, replace
+from src.defaults.values import DEFAULT_TEMPERATURE, DEFAULT_TEMPERATURE_AVG, DEFAULT_TEMPERATURE_MAX, DEFAULT_TEMPERATURE_MIN, DEFAULT_TEMPERATURE_RAW
+from src.enums.TemperatureUnitEnum import TemperatureUnit
+from src.helpers.conversions import convertTemperatureDeltaForDisplay, convertTemperatureForDisplay
+
+@dataclass
+class FrameStats:
+    """
+    Holds the statistics calculated from a single decoded thermal frame.
+    Temperatures are in Celsius unless converted with toDisplayUnit(). Positions are in sensor pixels.
+    """
+    rawTemp: int = DEFAULT_TEMPERATURE_RAW
+    centerTemp: float = DEFAULT_TEMPERATURE
+    avgTemp: float = DEFAULT_TEMPERATURE_AVG
+    minTemp: float = DEFAULT_TEMPERATURE_MIN
+    maxTemp: float = DEFAULT_TEMPERATURE_MAX
+    stdTemp: float = 0
+    p1Temp: float = DEFAULT_TEMPERATURE_MIN
+    p50Temp: float = DEFAULT_TEMPERATURE_AVG
+    p99Temp: float = DEFAULT_TEMPERATURE_MAX
+    minRow: int = 0
+    minCol: int = 0
+    maxRow: int = 0
+    maxCol: int = 0
+
+    def toDisplayUnit(self, temperatureUnit: TemperatureUnit) -> 'FrameStats':
+        """
+        Returns a copy of the stats with all temperatures converted to the given display unit.
+        """
+        if temperatureUnit == TemperatureUnit.CELSIUS:
+            return self
+        return replace(
+            self,
+            centerTemp=convertTemperatureForDisplay(self.centerTemp, temperatureUnit),
+            avgTemp=convertTemperatureForDisplay(self.avgTemp, temperatureUnit),
+            minTemp=convertTemperatureForDisplay(self.minTemp, temperatureUnit),
+            maxTemp=convertTemperatureForDisplay(self.maxTemp, temperatureUnit),
+            stdTemp=convertTemperatureDeltaForDisplay(self.stdTemp, temperatureUnit),
+            p1Temp=convertTemperatureForDisplay(self.p1Temp, temperatureUnit),
+            p50Temp=convertTemperatureForDisplay(self.p50Temp, temperatureUnit),
+            p99Temp=convertTemperatureForDisplay(self.p99Temp, temperatureUnit))
+
+    def toJson(self) -> dict:
+        return {
+            "raw": int(self.rawTemp),
+            "center": float(self.centerTemp),
+            "avg": float(self.avgTemp),
+            "min": float(self.minTemp),
+            "max": float(self.maxTemp),
+            "std": float(self.stdTemp),
+            "p1": float(self.p1Temp),
+            "p50": float(self.p50Temp),
+            "p99": float(self.p99Temp),
+            "min_row": int(self.minRow),
+            "min_col": int(self.minCol),
+            "max_row": int(self.maxRow),
+            "max_col": int(self.maxCol),
+        }
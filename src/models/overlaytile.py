@@ -0,0 +1,137 @@
+import cv2, numpy as np
+from numpy.typing import NDArray
+
+class OverlayTile:
+    """
+    A small cached overlay (the HUD, the crosshair, ...) that is drawn once and then blitted onto every frame.
+
+    Drawing happens in frame coordinates onto a BGR image over black and a matching coverage (alpha) mask,
+    so anti-aliased edges are kept as premultiplied colors. The covered pixels are collected on the next blit after a change.
+    An optional opaque block in the top-left corner (like the HUD's black box) is blitted with a single slice copy;
+    everything else only touches the covered pixels: a masked copy where they are fully covered, a blend on anti-aliased edges.
+    Drawing that stays within the opaque block does not need the covered pixels to be collected again.
+    """
+    def __init__(self, x: int, y: int, width: int, height: int, key: object = None, opaqueWidth: int = 0, opaqueHeight: int = 0):
+        self.x = x
+        self.y = y
+        self.key = key
+        self.opaqueWidth = min(opaqueWidth, width)
+        self.opaqueHeight = min(opaqueHeight, height)
+        self.image: NDArray[np.uint8] = np.zeros((height, width, 3), dtype=np.uint8)
+        self.alpha: NDArray[np.uint8] = np.zeros((height, width), dtype=np.uint8)
+        self.alpha[:self.opaqueHeight, :self.opaqueWidth] = 255
+        self._isSealed: bool = False
+        self._solid: tuple[NDArray, NDArray, NDArray[np.uint8]] | None = None # (rows, cols, pixels) of fully covered pixels
+        self._edges: tuple[NDArray, NDArray, NDArray[np.uint16], NDArray[np.uint16]] | None = None # (rows, cols, pixels, inverse alpha) of partially covered pixels
+
+    @property
+    def width(self) -> int:
+        return self.image.shape[1]
+
+    @property
+    def height(self) -> int:
+        return self.image.shape[0]
+
+    def _offset(self, point: tuple[int, int]) -> tuple[int, int]:
+        return (point[0] - self.x, point[1] - self.y)
+
+    def _isWithinOpaque(self, left: int, top: int, right: int, bottom: int) -> bool:
+        """
+        Whether the (tile coordinate) box [left, right) x [top, bottom) lies within the opaque block.
+        """
+        return left >= 0 and top >= 0 and right <= self.opaqueWidth and bottom <= self.opaqueHeight
+
+    def clearRows(self, top: int, bottom: int) -> None:
+        """
+        Clears the rows [top, bottom) (in frame coordinates) so they can be drawn again. The opaque block stays opaque.
+        """
+        top, bottom = max(top - self.y, 0), max(bottom - self.y, 0)
+        if self._isSealed and any(np.any((rows >= top) & (rows < bottom)) for rows in (self._solid[0], self._edges[0])):
+            self._isSealed = False # Covered pixels outside the opaque block were cleared
+        self.image[top:bottom] = 0
+        self.alpha[top:bottom] = 0
+        self.alpha[top:min(bottom, self.opaqueHeight), :self.opaqueWidth] = 255
+
+    def line(self, pt1: tuple[int, int], pt2: tuple[int, int], color: tuple[int, int, int], thickness: int = 1) -> None:
+        self._isSealed = False
+        cv2.line(self.image, self._offset(pt1), self._offset(pt2), color, thickness)
+        cv2.line(self.alpha, self._offset(pt1), self._offset(pt2), 255, thickness)
+
+    def rectangle(self, pt1: tuple[int, int], pt2: tuple[int, int], color: tuple[int, int, int], thickness: int = 1) -> None:
+        self._isSealed = False
+        cv2.rectangle(self.image, self._offset(pt1), self._offset(pt2), color, thickness)
+        cv2.rectangle(self.alpha, self._offset(pt1), self._offset(pt2), 255, thickness)
+
+    def putText(self,
+                text: str,
+                org: tuple[int, int],
+                fontFace: int,
+                fontScale: float,
+                color: tuple[int, int, int],
+                thickness: int = 1,
+                lineType: int = cv2.LINE_AA,
+                clipRows: tuple[int, int] | None = None) -> None:
+        """
+        Draws text like cv2.putText. With clipRows, only the rows [top, bottom) (in frame coordinates) are drawn to,
+        so a cleared band can be redrawn exactly, including the parts of neighbouring text that reach into it.
+        """
+        top, bottom = (0, self.height) if clipRows is None else (max(clipRows[0] - self.y, 0), max(clipRows[1] - self.y, 0))
+        (width, height), baseline = cv2.getTextSize(text, fontFace, fontScale, thickness)
+        x, y = self._offset(org)
+        margin = thickness + 1 # Anti-aliasing reaches a little past the text size
+        textTop, textBottom = max(y - height - margin, 0), y + baseline + margin
+
+        # Text within the opaque block is fully covered anyway, so only its colors have to be drawn
+        isOpaque = self._isWithinOpaque(x - margin, max(textTop, top), x + width + margin, min(textBottom, bottom))
+        canvases = (self.image,) if isOpaque else (self.image, self.alpha)
+        if not isOpaque:
+            self._isSealed = False
+
+        # Drawing into a view of the band would skip text whose origin lies above it (and anti-alias its edges differently),
+        # so draw onto the whole tile and restore the rows outside the band that the text reaches into afterwards
+        above = [canvas[textTop:top].copy() for canvas in canvases]
+        below = [canvas[bottom:textBottom].copy() for canvas in canvases]
+        for canvas in canvases:
+            cv2.putText(canvas, text, (x, y), fontFace, fontScale, color if canvas is self.image else 255, thickness, lineType)
+        for canvas, rowsAbove, rowsBelow in zip(canvases, above, below):
+            canvas[textTop:textTop + len(rowsAbove)] = rowsAbove
+            canvas[bottom:bottom + len(rowsBelow)] = rowsBelow
+
+    def _seal(self) -> None:
+        """
+        Collects the covered pixels outside the opaque block, split into fully covered ones and anti-aliased edges.
+        """
+        alpha = self.alpha.copy()
+        alpha[:self.opaqueHeight, :self.opaqueWidth] = 0
+        rows, cols = np.nonzero(alpha == 255)
+        self._solid = (rows, cols, self.image[rows, cols])
+        rows, cols = np.nonzero((alpha > 0) & (alpha < 255))
+        self._edges = (rows, cols, self.image[rows, cols].astype(np.uint16), (255 - alpha[rows, cols]).astype(np.uint16)[:, np.newaxis])
+        self._isSealed = True
+
+    def blit(self, img: NDArray[np.uint8]) -> NDArray[np.uint8]:
+        """
+        Draws the tile onto the image in place. The tile has to lie within the image.
+        """
+        if not self._isSealed:
+            self._seal()
+
+        roi = img[self.y:self.y + self.height, self.x:self.x + self.width]
+        if self.opaqueWidth > 0 and self.opaqueHeight > 0:
+            roi[:self.opaqueHeight, :self.opaqueWidth] = self.image[:self.opaqueHeight, :self.opaqueWidth]
+
+        rows, cols, pixels = self._solid
+        if len(rows) > 0:
+            roi[rows, cols] = pixels
+
+        rows, cols, pixels, inverseAlpha = self._edges
+        if len(rows) > 0:
+            # Premultiplied "over": tile + background * (1 - alpha)
+            background = roi[rows, cols].astype(np.uint16)
+            background *= inverseAlpha
+            background += 127
+            background //= 255
+            background += pixels
+            np.minimum(background, 255, out=background)
+            roi[rows, cols] = background
+        return img
@@ -0,0 +1,72 @@
+import time
+from dataclasses import dataclass, asdict, field
+from src.defaults.values import DEFAULT_DEVICE_FPS, DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_NORMALIZATION_OFFSET, DEFAULT_RAW_CHUNK_FRAMES, RAW_STREAM_VERSION
+from src.enums.RawCompressionEnum import RawCompression
+from src.enums.ThermalByteOrderEnum import ThermalByteOrder
+from src.models.deviceinfo import DeviceInfo
+
+@dataclass
+class RawStreamHeader:
+    """
+    The header of a raw thermal recording. It holds everything needed to turn the stored raw samples back into temperatures.
+    NOTE: The samples are always stored as little-endian uint16 values, already decoded. thermal_byte_order only records how the source device delivered them.
+    rois holds the definitions (see RegionOfInterest.toJson) of the regions of interest that were tracked while recording, so they can be analyzed again.
+    """
+    width: int
+    height: int
+    device_id: str | None = None
+    device_name: str | None = None
+    normalization_divisor: float = DEFAULT_NORMALIZATION_DIVISOR
+    normalization_offset: float = DEFAULT_NORMALIZATION_OFFSET
+    thermal_byte_order: str = ThermalByteOrder.LSB_BYTE_0.name
+    frame_rate_hz: float = DEFAULT_DEVICE_FPS
+    compression: str = RawCompression.NONE.name
+    chunk_frames: int = DEFAULT_RAW_CHUNK_FRAMES
+    created: str = ""
+    version: int = RAW_STREAM_VERSION
+    rois: list[dict] = field(default_factory=list)
+
+    @staticmethod
+    def createFromDeviceInfo(device: DeviceInfo,
+                             width: int,
+                             height: int,
+                             compression: RawCompression = RawCompression.NONE,
+                             chunkFrames: int = DEFAULT_RAW_CHUNK_FRAMES,
+                             rois: list[dict] | None = None) -> 'RawStreamHeader':
+        """
+        Creates a header for a recording of the given device. The width/height are those of the decoded thermal matrix.
+        """
+        byteOrder = device.misc.thermal_byte_order or ThermalByteOrder.LSB_BYTE_0
+        return RawStreamHeader(
+            width=width,
+            height=height,
+            device_id=device.id,
+            device_name=device.name,
+            normalization_divisor=device.misc.normalization_divisor,
+            normalization_offset=device.misc.normalization_offset,
+            thermal_byte_order=byteOrder.name,
+            frame_rate_hz=device.specs.imaging.frame_rate_hz or DEFAULT_DEVICE_FPS,
+            compression=compression.name,
+            chunk_frames=chunkFrames,
+            created=time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            rois=list(rois or []))
+
+    @staticmethod
+    def createFromJson(data: dict) -> 'RawStreamHeader':
+        return RawStreamHeader(
+            width=int(data["width"]),
+            height=int(data["height"]),
+            device_id=data.get("device_id"),
+            device_name=data.get("device_name"),
+            normalization_divisor=float(data.get("normalization_divisor", DEFAULT_NORMALIZATION_DIVISOR)),
+            normalization_offset=float(data.get("normalization_offset", DEFAULT_NORMALIZATION_OFFSET)),
+            thermal_byte_order=data.get("thermal_byte_order", ThermalByteOrder.LSB_BYTE_0.name),
+            frame_rate_hz=float(data.get("frame_rate_hz", DEFAULT_DEVICE_FPS)),
+            compression=data.get("compression", RawCompression.NONE.name),
+            chunk_frames=int(data.get("chunk_frames", DEFAULT_RAW_CHUNK_FRAMES)),
+            created=data.get("created", ""),
+            version=int(data.get("version", RAW_STREAM_VERSION)),
+            rois=list(data.get("rois", [])))
+
+    def toJson(self) -> dict:
+        return asdict(self)
@@ -0,0 +1,69 @@
+from dataclasses import dataclass, field
+from src.defaults.values import ROI_FILE_EXTENSIONS
+from src.enums.RoiShapeEnum import RoiShape
+from src.helpers.config_files import loadConfigFile, findConfigFileForDevice
+
+@dataclass
+class RegionOfInterest:
+    """
+    A user-defined region of the frame (a machine bearing, a breaker panel, ...) whose temperatures are tracked separately.
+    Coordinates are in sensor pixels. Rectangles span [x, x + width) x [y, y + height); polygons are given by their vertices.
+    """
+    name: str
+    shape: RoiShape = RoiShape.RECT
+    x: int = 0
+    y: int = 0
+    width: int = 0
+    height: int = 0
+    points: list[tuple[int, int]] = field(default_factory=list)
+
+    @staticmethod
+    def createFromJson(data: dict) -> 'RegionOfInterest':
+        """
+        Creates a region from its JSON/YAML definition, e.g.
+        {"name": "bearing", "x": 10, "y": 20, "width": 8, "height": 6} or {"name": "panel", "points": [[0, 0], [40, 0], [20, 30]]}.
+        The shape is a polygon if points are given, otherwise a rectangle.
+        """
+        name = str(data["name"])
+        if "points" in data:
+            points = [(int(x), int(y)) for x, y in data["points"]]
+            if len(points) < 3:
+                raise ValueError(f"Polygon ROI '{name}' needs at least 3 points, got {len(points)}")
+            xs, ys = [x for x, _ in points], [y for _, y in points]
+            return RegionOfInterest(
+                name=name,
+                shape=RoiShape.POLYGON,
+                x=min(xs),
+                y=min(ys),
+                width=max(xs) - min(xs) + 1,
+                height=max(ys) - min(ys) + 1,
+                points=points)
+
+        width, height = int(data["width"]), int(data["height"])
+        if width <= 0 or height <= 0:
+            raise ValueError(f"Rectangle ROI '{name}' must have a positive size, got {width}x{height}")
+        return RegionOfInterest(name=name, x=int(data["x"]), y=int(data["y"]), width=width, height=height)
+
+    def toJson(self) -> dict:
+        if self.shape == RoiShape.POLYGON:
+            return {"name": self.name, "points": [list(point) for point in self.points]}
+        return {"name": self.name, "x": self.x, "y": self.y, "width": self.width, "height": self.height}
+
+    @staticmethod
+    def loadAllFromFile(path: str) -> list['RegionOfInterest']:
+        """
+        Loads all regions from a JSON or YAML (.yaml/.yml, requires PyYAML) file with a top-level "rois" list.
+        """
+        regions = [RegionOfInterest.createFromJson(roi) for roi in loadConfigFile(path).get("rois", [])]
+        names = [region.name for region in regions]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise ValueError(f"Duplicate ROI names in '{path}': {', '.join(duplicates)}")
+        return regions
+
+    @staticmethod
+    def findFileForDevice(devicePath: str) -> str | None:
+        """
+        Finds the ROI file that belongs to a device JSON (e.g. devices/TC001.roi.json for devices/TC001.json), if there is one.
+        """
+        return findConfigFileForDevice(devicePath, ROI_FILE_EXTENSIONS)
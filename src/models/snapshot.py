@@ -0,0 +1,14 @@
+from dataclasses import dataclass
+import numpy as np
+from numpy.typing import NDArray
+
+@dataclass
+class Snapshot:
+    """
+    A snapshot waiting to be written by the SnapshotWriter.
+    NOTE: The arrays must be copies, since the rendered frame and the raw field are buffers that are reused for the next frame.
+    """
+    basePath: str # Without extension: the image is saved as .png, the raw field as .tiff or .npy, and its metadata as .json
+    image: NDArray[np.uint8] | None
+    raw: NDArray[np.uint16] | None = None
+    metadata: dict | None = None
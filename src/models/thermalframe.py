@@ -0,0 +1,22 @@
+from dataclasses import dataclass
+import numpy as np
+from numpy.typing import NDArray
+from src.models.framestats import FrameStats
+from src.models.regionofinterest import RegionOfInterest
+
+@dataclass
+class ThermalFrame:
+    """
+    A single processed frame as it is handed to the frame sinks.
+    NOTE: The arrays are views into buffers that are reused for the next frame. Sinks that keep them around must copy them.
+    """
+    index: int
+    timestamp: int
+    raw: NDArray[np.uint16]
+    stats: FrameStats
+    imdata: NDArray | None = None
+    sensorRaw: NDArray[np.uint16] | None = None # The unfiltered samples when a temporal noise filter is on (raw is then the filtered field)
+    hotspots: NDArray | None = None # HOTSPOT_DTYPE, in Celsius (None when the hotspot engine is off)
+    coldspots: NDArray | None = None # HOTSPOT_DTYPE, in Celsius (None when the hotspot engine is off)
+    regions: list[RegionOfInterest] | None = None # The regions of interest, in the same order as roiStats
+    roiStats: NDArray | None = None # ROI_STATS_DTYPE, in Celsius (None without regions of interest)
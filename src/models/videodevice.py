@@ -0,0 +1,28 @@
+from dataclasses import dataclass, field
+
+@dataclass
+class VideoDevice:
+    """
+    A video device found by the device discovery (see src.helpers.device_discovery).
+    The metadata comes from sysfs and the V4L2 format queries, which do not start a stream; the probe fields are only set when the device was opened.
+    """
+    index: int
+    path: str | None = None # e.g. /dev/video0
+    name: str | None = None
+    usbVendorId: str | None = None # Hex, as in lsusb (e.g. 0bda)
+    usbProductId: str | None = None
+    busInfo: str | None = None
+    isCapture: bool = True # False for V4L2 metadata nodes, which never deliver frames
+    formats: dict[str, list[tuple[int, int]]] = field(default_factory=dict) # FOURCC to its discrete frame sizes (width, height)
+    matches: list[str] = field(default_factory=list) # Paths of the device JSONs whose sensor fits one of the formats
+
+    # Probe results
+    probed: bool = False
+    probeOk: bool | None = None # Whether a raw frame could be read (None if the probe timed out)
+    probeFrameShape: tuple[int, ...] | None = None
+    probeSeconds: float | None = None
+    probeError: str | None = None
+
+    @property
+    def usbId(self) -> str | None:
+        return f"{self.usbVendorId}:{self.usbProductId}" if self.usbVendorId and self.usbProductId else None
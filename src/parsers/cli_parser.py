@@ -1,7 +1,24 @@
 
 
-from argparse import ArgumentParser
-from src.defaults.values import DEFAULT_VIDEO_DEVICE_INDEX
+from argparse import ArgumentParser, ArgumentTypeError
+from src.defaults.values import (
+    DEFAULT_VIDEO_DEVICE_INDEX, DEFAULT_FRAME_RING_CAPACITY, DEFAULT_FRAME_POLICY, DEFAULT_RECORDING_FORMAT,
+    DEFAULT_RAW_COMPRESSION, RAW_STREAM_EXTENSION, DEFAULT_PLAYBACK_SPEED, DEFAULT_ANALYSIS_FRAMES_PER_SHARD,
+    ANALYSIS_OUTPUT_SUFFIX, DEFAULT_COLOR_SPAN, DEFAULT_COLOR_SPAN_MIN_C, DEFAULT_COLOR_SPAN_MAX_C, DEFAULT_COLOR_SPAN_SMOOTHING,
+    DEFAULT_INTERPOLATION, DEFAULT_PI_INTERPOLATION, DEFAULT_HOTSPOT_COUNT, DEFAULT_HOTSPOT_FILTER, DEFAULT_HOTSPOT_FILTER_SIZE,
+    DEFAULT_HOTSPOT_MIN_DISTANCE, ROI_FILE_EXTENSIONS, ALARM_FILE_EXTENSIONS, DEFAULT_TEMPORAL_FILTER, DEFAULT_TEMPORAL_ALPHA,
+    DEFAULT_TEMPORAL_FRAMES, TEMPORAL_FRAMES_MAX, DEFAULT_MOTION_THRESHOLD_C, DEFAULT_STREAM_HOST, DEFAULT_STREAM_JPEG_QUALITY,
+    DEFAULT_MULTI_CAMERA_MAX_FPS, PROFILER_LOG_INTERVAL_S, DEVICE_PROBE_TIMEOUT_S, CAPTURE_BACKEND_CACHE_FILE_NAME,
+    DEFAULT_SNAPSHOT_RAW_FORMAT, DEFAULT_SNAPSHOT_BURST_FRAMES)
+from src.defaults.keybinds import KEY_TOGGLE_PROFILER, KEY_SNAPSHOT_BURST
+from src.enums.ColorSpanEnum import ColorSpan
+from src.enums.InterpolationEnum import Interpolation
+from src.enums.HotspotFilterEnum import HotspotFilter
+from src.enums.TemporalFilterEnum import TemporalFilter
+from src.enums.FramePolicyEnum import FramePolicy
+from src.enums.RawCompressionEnum import RawCompression
+from src.enums.RecordingFormatEnum import RecordingFormat
+from src.enums.SnapshotRawFormatEnum import SnapshotRawFormat
 
 def addGlobalArgs(parser: ArgumentParser) -> None:
     """Adds the global options/args so they can be reused on main and subparsers."""
@@ -43,6 +60,252 @@ def addGlobalArgs(parser: ArgumentParser) -> None:
         , action="store_true"
         , help="Supresses all console output.\nTODO: this needs to be implemented")
 
+def parseCameraSpec(spec: str) -> tuple[int | str, str]:
+    """
+    Parses a camera of the multi subcommand: "INDEX:JSON" (a video device index and its device JSON),
+    or "RECORDING:JSON" to play back a raw recording instead. Returns the source (index or recording path) and the JSON path.
+    """
+    if RAW_STREAM_EXTENSION + ":" in spec:
+        source, _, jsonPath = spec.partition(RAW_STREAM_EXTENSION + ":")
+        return source + RAW_STREAM_EXTENSION, jsonPath
+    index, separator, jsonPath = spec.partition(":")
+    if not separator or not index.strip().isdigit() or not jsonPath:
+        raise ArgumentTypeError(f"'{spec}' is not INDEX:JSON (e.g. 0:devices/TC001.json) or RECORDING{RAW_STREAM_EXTENSION}:JSON")
+    return int(index), jsonPath
+
+def addPipelineArgs(parser: ArgumentParser) -> None:
+    """Adds the options of the camera pipeline so they can be reused on the device and multi subcommands."""
+    parser.add_argument(
+        "--ring-size"
+        , dest="ring_size"
+        , type=int
+        , default=DEFAULT_FRAME_RING_CAPACITY
+        , help=f"Number of frame buffers in the capture ring. One is always reserved for the capture thread. Default is {DEFAULT_FRAME_RING_CAPACITY}.")
+    parser.add_argument(
+        "--frame-policy"
+        , dest="frame_policy"
+        , choices=[p.name for p in FramePolicy]
+        , default=None
+        , help="What happens when the display falls behind the capture thread. DROP_OLDEST always shows the newest frame and never stalls capture. "
+               "BLOCK shows every frame, and makes capture wait when the ring is full. "
+               f"Default is {DEFAULT_FRAME_POLICY.name} for cameras and BLOCK for --source recordings.")
+
+    parser.add_argument(
+        "--snapshot-raw"
+        , dest="snapshot_raw"
+        , choices=[f.name for f in SnapshotRawFormat]
+        , default=DEFAULT_SNAPSHOT_RAW_FORMAT.name
+        , help="Also save the raw thermal field with every snapshot, as a 16-bit TIFF or an NPY file, "
+               f"with a JSON file of the metadata needed to turn it into temperatures. Default is {DEFAULT_SNAPSHOT_RAW_FORMAT.name}.")
+    parser.add_argument(
+        "--snapshot-burst"
+        , dest="snapshot_burst"
+        , type=int
+        , default=DEFAULT_SNAPSHOT_BURST_FRAMES
+        , help=f"Number of consecutive frames the snapshot burst key ({KEY_SNAPSHOT_BURST}) saves. Default is {DEFAULT_SNAPSHOT_BURST_FRAMES}.")
+    parser.add_argument(
+        "--no-backend-cache"
+        , dest="no_backend_cache"
+        , action="store_true"
+        , help="Probe the capture backends on every start instead of reusing the one that worked last time "
+               f"(cached per device in the media output folder as {CAPTURE_BACKEND_CACHE_FILE_NAME}).")
+
+    parser.add_argument(
+        "--record-format"
+        , dest="record_format"
+        , choices=[f.name for f in RecordingFormat]
+        , default=DEFAULT_RECORDING_FORMAT.name
+        , help="What to record when recording is started. AVI is the rendered view, "
+               f"RAW is the lossless 16-bit thermal data ({RAW_STREAM_EXTENSION}) from which temperatures can be recovered, "
+               f"BOTH records both side by side. Default is {DEFAULT_RECORDING_FORMAT.name}.")
+    parser.add_argument(
+        "--raw-compression"
+        , dest="raw_compression"
+        , choices=[c.name for c in RawCompression]
+        , default=DEFAULT_RAW_COMPRESSION.name
+        , help="Compression of raw recordings. "
+               "NONE can be memory-mapped for fast playback, DELTA stores frame-to-frame differences and is roughly half the size. "
+               f"Default is {DEFAULT_RAW_COMPRESSION.name}.")
+    parser.add_argument(
+        "--color-span"
+        , dest="color_span"
+        , choices=[s.name for s in ColorSpan]
+        , default=DEFAULT_COLOR_SPAN.name
+        , help="What the colormap is stretched over. LUMA colors the camera's image data. "
+               "FIXED colors the measured temperatures between --span-min and --span-max, AUTO between the min and max of each frame, "
+               f"SMOOTHED between a moving average of them (no flicker). Default is {DEFAULT_COLOR_SPAN.name}.")
+    parser.add_argument(
+        "--span-min"
+        , dest="span_min"
+        , type=float
+        , default=DEFAULT_COLOR_SPAN_MIN_C
+        , help=f"Lowest temperature (in Celsius) of the FIXED color span. Default is {DEFAULT_COLOR_SPAN_MIN_C}.")
+    parser.add_argument(
+        "--span-max"
+        , dest="span_max"
+        , type=float
+        , default=DEFAULT_COLOR_SPAN_MAX_C
+        , help=f"Highest temperature (in Celsius) of the FIXED color span. Default is {DEFAULT_COLOR_SPAN_MAX_C}.")
+    parser.add_argument(
+        "--span-smoothing"
+        , dest="span_smoothing"
+        , type=float
+        , default=DEFAULT_COLOR_SPAN_SMOOTHING
+        , help=f"Weight (0-1] of the newest frame in the SMOOTHED color span. Lower is smoother but slower to follow the scene. Default is {DEFAULT_COLOR_SPAN_SMOOTHING}.")
+    parser.add_argument(
+        "--interpolation"
+        , dest="interpolation"
+        , choices=[i.name for i in Interpolation]
+        , default=None
+        , help="Interpolation used to upscale the image to the display size. NEAREST is the cheapest, LANCZOS the sharpest and costliest. "
+               f"Default is {DEFAULT_INTERPOLATION.name}, or {DEFAULT_PI_INTERPOLATION.name} on a Raspberry Pi.")
+    parser.add_argument(
+        "--native-compositing"
+        , dest="native_compositing"
+        , action="store_true"
+        , help="Do all pixel processing (colormap, blur, PiP) at sensor resolution and upscale once, then draw only the overlays (HUD, labels, "
+               "markers) at display size. Faster at higher scales. The blur radius is then in sensor pixels.")
+    parser.add_argument(
+        "--hotspots"
+        , dest="hotspots"
+        , type=int
+        , default=DEFAULT_HOTSPOT_COUNT
+        , help="Number of hottest and coldest spots to mark, located with sub-pixel precision. 0 marks only the single hottest and coldest pixel. "
+               f"Default is {DEFAULT_HOTSPOT_COUNT}.")
+    parser.add_argument(
+        "--hotspot-filter"
+        , dest="hotspot_filter"
+        , choices=[f.name for f in HotspotFilter]
+        , default=DEFAULT_HOTSPOT_FILTER.name
+        , help=f"Spatial filter applied before searching for hotspots, so single noisy pixels are not picked. Default is {DEFAULT_HOTSPOT_FILTER.name}.")
+    parser.add_argument(
+        "--hotspot-filter-size"
+        , dest="hotspot_filter_size"
+        , type=int
+        , default=DEFAULT_HOTSPOT_FILTER_SIZE
+        , help=f"Kernel size (in sensor pixels, odd) of the hotspot filter. Default is {DEFAULT_HOTSPOT_FILTER_SIZE}.")
+    parser.add_argument(
+        "--hotspot-distance"
+        , dest="hotspot_distance"
+        , type=int
+        , default=DEFAULT_HOTSPOT_MIN_DISTANCE
+        , help=f"Minimum distance (in sensor pixels) between two marked hotspots. Default is {DEFAULT_HOTSPOT_MIN_DISTANCE}.")
+    parser.add_argument(
+        "--temporal-filter"
+        , dest="temporal_filter"
+        , choices=[f.name for f in TemporalFilter]
+        , default=DEFAULT_TEMPORAL_FILTER.name
+        , help="Temporal noise filter on the raw thermal data (at sensor resolution, before any stats): EMA (exponential moving average), "
+               "RUNNING_MEAN (of the last --temporal-frames frames) or MOTION_ADAPTIVE (an EMA that follows real changes immediately). "
+               f"Unlike the blur, it keeps edges sharp. Default is {DEFAULT_TEMPORAL_FILTER.name}.")
+    parser.add_argument(
+        "--temporal-alpha"
+        , dest="temporal_alpha"
+        , type=float
+        , default=DEFAULT_TEMPORAL_ALPHA
+        , help="Weight (0-1] of the newest frame in the EMA (the minimum weight for MOTION_ADAPTIVE). "
+               f"Lower is less noisy but slower to follow the scene. Default is {DEFAULT_TEMPORAL_ALPHA}.")
+    parser.add_argument(
+        "--temporal-frames"
+        , dest="temporal_frames"
+        , type=int
+        , default=DEFAULT_TEMPORAL_FRAMES
+        , help=f"Number of frames (1-{TEMPORAL_FRAMES_MAX}) averaged by the RUNNING_MEAN filter. Default is {DEFAULT_TEMPORAL_FRAMES}.")
+    parser.add_argument(
+        "--motion-threshold"
+        , dest="motion_threshold"
+        , type=float
+        , default=DEFAULT_MOTION_THRESHOLD_C
+        , help=f"Temperature change (in Celsius) that the MOTION_ADAPTIVE filter follows immediately. Default is {DEFAULT_MOTION_THRESHOLD_C}.")
+    parser.add_argument(
+        "--roi"
+        , dest="roi_path"
+        , default=None
+        , help="JSON or YAML (requires PyYAML) file with regions of interest to track. "
+               f"By default a file next to the device JSON with the same name is used if it exists ({', '.join(ROI_FILE_EXTENSIONS)}). "
+               "With several cameras, a given file applies to all of them.")
+    parser.add_argument(
+        "--alarms"
+        , dest="alarms_path"
+        , default=None
+        , help="JSON or YAML (requires PyYAML) file with temperature alarms on the frame or the regions of interest. "
+               f"By default a file next to the device JSON with the same name is used if it exists ({', '.join(ALARM_FILE_EXTENSIONS)}). "
+               "With several cameras, a given file applies to all of them.")
+    parser.add_argument(
+        "--alarm-high"
+        , dest="alarm_high"
+        , type=float
+        , default=None
+        , help="Raise an alarm when the hottest pixel (in Celsius) rises above this temperature, like the device's own high temperature alarm.")
+    parser.add_argument(
+        "--alarm-low"
+        , dest="alarm_low"
+        , type=float
+        , default=None
+        , help="Raise an alarm when the coldest pixel (in Celsius) falls below this temperature, like the device's own low temperature alarm.")
+    parser.add_argument(
+        "--alarm-log"
+        , dest="alarm_log"
+        , default=None
+        , help="Append every alarm event as a JSON line to this file.")
+    parser.add_argument(
+        "--alarm-socket"
+        , dest="alarm_socket"
+        , default=None
+        , help="Send every alarm event as a JSON datagram to a local UDP port ('host:port') or Unix datagram socket ('unix:/path/to/socket').")
+    parser.add_argument(
+        "--playback-speed"
+        , dest="playback_speed"
+        , type=float
+        , default=DEFAULT_PLAYBACK_SPEED
+        , help="Playback rate of --source relative to the recorded timestamps (e.g. 10 is ten times faster). 0 plays back as fast as possible. "
+               f"Default is {DEFAULT_PLAYBACK_SPEED}.")
+    parser.add_argument(
+        "--headless"
+        , dest="headless"
+        , action="store_true"
+        , help="Run without a window. Frames are only captured, decoded and passed to the sinks (stats are printed to the console). "
+               "Nothing is drawn unless recording or taking a snapshot. "
+               "Control it with signals (SIGINT/SIGTERM quit, SIGUSR1 snapshot, SIGUSR2 toggle recording) or --control-port.")
+    parser.add_argument(
+        "--control-port"
+        , dest="control_port"
+        , type=int
+        , default=None
+        , help="Listen for control commands on this local UDP port (e.g. 'snapshot', 'record', 'stop', 'quit', or any single key binding). Only used in headless mode.")
+    parser.add_argument(
+        "--stream-port"
+        , dest="stream_port"
+        , type=int
+        , default=None
+        , help="Serve the camera over HTTP on this port: /stream.mjpg (MJPEG of the rendered view), "
+               "and the WebSockets /raw (uint16 thermal data for your own radiometry) and /stats (JSON stats). "
+               "Each frame is encoded once for all clients, and slow clients skip frames. Works with and without --headless. "
+               "With several cameras, camera N is served on this port + N.")
+    parser.add_argument(
+        "--stream-host"
+        , dest="stream_host"
+        , default=DEFAULT_STREAM_HOST
+        , help=f"Address the stream server listens on. Use 0.0.0.0 to serve other machines. Default is {DEFAULT_STREAM_HOST} (this machine only).")
+    parser.add_argument(
+        "--stream-quality"
+        , dest="stream_quality"
+        , type=int
+        , default=DEFAULT_STREAM_JPEG_QUALITY
+        , help=f"JPEG quality (1-100) of the MJPEG stream. Default is {DEFAULT_STREAM_JPEG_QUALITY}.")
+    parser.add_argument(
+        "--profile"
+        , dest="profile"
+        , action="store_true"
+        , help="Time every stage of the frame pipeline (capture, decode, stats, colormap, overlays, "
+               f"...) and log their p50/p95/p99 every {PROFILER_LOG_INTERVAL_S:g} seconds. The '{KEY_TOGGLE_PROFILER}' key shows them on the display.")
+    parser.add_argument(
+        "--profile-report"
+        , dest="profile_report"
+        , type=str
+        , default=None
+        , help="Write the stage timings to this JSON file on exit (implies --profile). With several cameras, each camera writes its own file (e.g. report_cam0.json).")
+
 def createParser() -> ArgumentParser:
     """
     Creates the main argument parser for the CLI.
@@ -64,11 +327,100 @@ def createParser() -> ArgumentParser:
         "json_path"
         , type=str
         , help="Path to a device JSON file to load. See the devices/ folder for examples.")
+    addPipelineArgs(parserDevice)
+    parserDevice.add_argument(
+        "--source"
+        , dest="source"
+        , type=str
+        , default=None
+        , help=f"Play back a raw recording ({RAW_STREAM_EXTENSION}) through the full pipeline instead of capturing from the camera.")
+
+    # Multi-camera subcommand setup
+    parserMulti = parserSubcommands.add_parser(
+        "multi"
+        , help="Runs several cameras in one process, shown as a mosaic or headless."
+        , description="Runs several cameras in one process (e.g. all cameras of an inspection station). "
+                      "Each camera has its own capture thread, and a shared pool of workers decodes, analyzes and renders their frames. "
+                      "All pipeline options apply to every camera. Media is saved to a subfolder per camera (cam0, cam1, ...).")
+    addGlobalArgs(parserMulti)
+    parserMulti.add_argument(
+        "cameras"
+        , type=parseCameraSpec
+        , nargs="+"
+        , metavar="INDEX:JSON"
+        , help="The cameras, each as a video device index and its device JSON (e.g. 0:devices/TC001.json 1:devices/TC001.json). "
+               f"A raw recording can stand in for a camera (e.g. recording{RAW_STREAM_EXTENSION}:devices/TC001.json).")
+    addPipelineArgs(parserMulti)
+    parserMulti.add_argument(
+        "--workers"
+        , dest="workers"
+        , type=int
+        , default=None
+        , help="Number of worker threads that process the frames of all cameras. This bounds the CPU use of the whole station. "
+               "Default is one per camera, up to the number of CPU cores.")
+    parserMulti.add_argument(
+        "--max-fps"
+        , dest="max_fps"
+        , type=float
+        , default=DEFAULT_MULTI_CAMERA_MAX_FPS
+        , help="Process at most this many frames per second of each camera (the newest frame is always taken). 0 processes every frame. Default is no limit.")
+    parserMulti.add_argument(
+        "--mosaic-columns"
+        , dest="mosaic_columns"
+        , type=int
+        , default=None
+        , help="Number of columns of the mosaic window. Default is a square grid.")
 
     parserList = parserSubcommands.add_parser(
         name="list"
-        , help="Lists all available video devices and their indices."
-        , description="Lists all available video devices and their indices. This can be used to determine the correct device index to use with the --device-index argument.")
+        , help="Lists the supported devices and the connected video devices."
+        , description="Lists the supported devices, and the connected video devices with their indices, formats and the supported devices they fit. "
+                      "This can be used to determine the correct device index to use with the --device-index argument, "
+                      "or the cameras to pass to the multi subcommand.")
     addGlobalArgs(parserList)
+    parserList.add_argument(
+        "--probe"
+        , action="store_true"
+        , help="Also open every capture device and read one raw frame, to check that it works. The devices are probed at the same time. "
+               "Without sysfs (Windows, macOS) the devices are always probed, since they cannot be listed otherwise.")
+    parserList.add_argument(
+        "--probe-timeout"
+        , dest="probe_timeout"
+        , type=float
+        , default=DEVICE_PROBE_TIMEOUT_S
+        , help=f"Seconds to wait for all probes together; devices that have not answered by then are reported as timed out. Default is {DEVICE_PROBE_TIMEOUT_S}.")
+
+    parserAnalyze = parserSubcommands.add_parser(
+        name="analyze"
+        , help="Calculates per-frame stats of raw recordings offline."
+        , description="Calculates the per-frame stats (center/min/max/avg temperatures, hotspot positions, "
+                      f"percentiles) of raw recordings ({RAW_STREAM_EXTENSION}) on all CPU cores, "
+                      f"and saves them as columns to a {ANALYSIS_OUTPUT_SUFFIX} file per recording.")
+    addGlobalArgs(parserAnalyze)
+    parserAnalyze.add_argument(
+        "paths"
+        , type=str
+        , nargs="+"
+        , help="Raw recordings, or directories to search for them (recursively).")
+    parserAnalyze.add_argument(
+        "-o"
+        , "--output"
+        , dest="output_dir"
+        , type=str
+        , default=None
+        , help="Directory to save the stats files to. Default is next to each recording.")
+    parserAnalyze.add_argument(
+        "-j"
+        , "--jobs"
+        , dest="jobs"
+        , type=int
+        , default=None
+        , help="Number of worker processes. Default is the number of CPU cores.")
+    parserAnalyze.add_argument(
+        "--frames-per-shard"
+        , dest="frames_per_shard"
+        , type=int
+        , default=DEFAULT_ANALYSIS_FRAMES_PER_SHARD
+        , help=f"Number of frames each worker processes at a time. Default is {DEFAULT_ANALYSIS_FRAMES_PER_SHARD}.")
 
     return parser
\ No newline at end of file
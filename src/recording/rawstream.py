@@ -0,0 +1,320 @@
+import os, json, struct, numpy as np
+from typing import Iterator
+from numpy.typing import NDArray
+from src.defaults.values import RAW_STREAM_ALIGNMENT, RAW_STREAM_MAGIC, RAW_STREAM_CHUNK_MAGIC, RAW_STREAM_PREALLOCATE_BYTES
+from src.enums.RawCompressionEnum import RawCompression
+from src.models.rawstreamheader import RawStreamHeader
+
+'''
+Raw thermal recording container (.ptr)
+
+All values are little-endian.
+
+    magic           8 bytes, RAW_STREAM_MAGIC
+    header length   uint32
+    header          UTF-8 JSON (see RawStreamHeader), padded with spaces up to RAW_STREAM_ALIGNMENT
+
+Uncompressed (NONE) streams are then a flat array of fixed-size records, so they can be memory-mapped:
+
+    timestamp       int64, time.time_ns() of the capture
+    frame           uint16[height, width], decoded raw samples
+
+Delta-compressed (DELTA) streams are a sequence of independent chunks of up to chunk_frames frames:
+
+    magic           4 bytes, RAW_STREAM_CHUNK_MAGIC
+    frame count     uint32
+    payload length  uint64
+    timestamps      int64[frame count]
+    encodings       uint8[frame count], padded to 8 bytes (see FRAME_ENCODING_*)
+    payload         the encoded frames back to back
+
+The first frame of a chunk is stored verbatim. Each following frame is stored as the zigzag-encoded difference
+to the previous frame, narrowed to uint8 when every difference fits (typical for a static scene plus sensor noise).
+'''
+
+FRAME_ENCODING_VERBATIM: int = 0
+FRAME_ENCODING_DELTA_U8: int = 1
+FRAME_ENCODING_DELTA_U16: int = 2
+
+_FILE_PREFIX = struct.Struct("<8sI")
+_CHUNK_HEADER = struct.Struct("<4sIQ")
+
+def getRecordDtype(width: int, height: int) -> np.dtype:
+    """
+    Gets the dtype of one record of an uncompressed stream.
+    """
+    return np.dtype([("timestamp", "<i8"), ("frame", "<u2", (height, width))])
+
+def _align(value: int, alignment: int) -> int:
+    return -(-value // alignment) * alignment
+
+class RawStreamWriter:
+    """
+    Appends decoded uint16 thermal frames and their timestamps to a raw recording.
+    Frames are collected into a preallocated chunk buffer and written one chunk at a time; file space is reserved ahead of the writes where the OS supports it.
+    """
+    def __init__(self, path: str, header: RawStreamHeader):
+        self.path = path
+        self.header = header
+        self.frameCount: int = 0
+        self._compression = RawCompression[header.compression]
+        self._chunkFrames = max(1, header.chunk_frames)
+        self._frameShape = (header.height, header.width)
+        self._frameBytes = header.width * header.height * 2
+
+        # Preallocated chunk buffers
+        self._chunkCount: int = 0
+        self._timestamps = np.zeros(self._chunkFrames, dtype="<i8")
+        if self._compression == RawCompression.NONE:
+            self._records = np.zeros(self._chunkFrames, dtype=getRecordDtype(header.width, header.height))
+        else:
+            self._encodings = np.zeros(_align(self._chunkFrames, 8), dtype=np.uint8)
+            self._payload = np.zeros(self._chunkFrames * self._frameBytes, dtype=np.uint8)
+            self._payloadLength: int = 0
+            self._previous = np.zeros(self._frameShape, dtype=np.uint16)
+            self._delta = np.zeros(self._frameShape, dtype=np.int32)
+            self._zigzag = np.zeros(self._frameShape, dtype=np.int32)
+
+        self._file = open(path, "wb")
+        headerBytes = json.dumps(header.toJson()).encode("utf-8")
+        dataOffset = _align(_FILE_PREFIX.size + len(headerBytes), RAW_STREAM_ALIGNMENT)
+        self._file.write(_FILE_PREFIX.pack(RAW_STREAM_MAGIC, len(headerBytes)))
+        self._file.write(headerBytes.ljust(dataOffset - _FILE_PREFIX.size, b" "))
+        self._position: int = dataOffset
+        self._reservedUntil: int = dataOffset
+
+    def write(self, raw: NDArray[np.uint16], timestamp: int) -> None:
+        """
+        Appends one frame. The frame is copied, so the caller can reuse its buffer right away.
+        """
+        if raw.shape != self._frameShape:
+            raise ValueError(f"Frame shape {raw.shape} does not match the recording's shape {self._frameShape}")
+
+        index = self._chunkCount
+        self._timestamps[index] = timestamp
+        if self._compression == RawCompression.NONE:
+            self._records["timestamp"][index] = timestamp
+            np.copyto(self._records["frame"][index], raw, casting="unsafe")
+        else:
+            self._encodeDelta(raw, index)
+
+        self._chunkCount += 1
+        self.frameCount += 1
+        if self._chunkCount == self._chunkFrames:
+            self.flush()
+
+    def flush(self) -> None:
+        """
+        Writes the frames collected so far as one chunk.
+        """
+        count = self._chunkCount
+        if count == 0:
+            return
+
+        if self._compression == RawCompression.NONE:
+            data = [self._records[:count].view(np.uint8)]
+        else:
+            encodingsLength = _align(count, 8)
+            data = [
+                _CHUNK_HEADER.pack(RAW_STREAM_CHUNK_MAGIC, count, self._payloadLength),
+                self._timestamps[:count].view(np.uint8),
+                self._encodings[:encodingsLength],
+                self._payload[:self._payloadLength]]
+            self._payloadLength = 0
+
+        size = sum(len(d) if isinstance(d, bytes) else d.nbytes for d in data)
+        self._reserve(self._position + size)
+        for d in data:
+            self._file.write(d)
+        self._position += size
+        self._chunkCount = 0
+
+    def close(self) -> None:
+        """
+        Writes any pending frames, releases the reserved space past the end and closes the file.
+        """
+        if self._file.closed:
+            return
+        self.flush()
+        self._file.truncate(self._position)
+        self._file.close()
+
+    def _reserve(self, end: int) -> None:
+        """
+        Reserves file space ahead of the writes so the filesystem does not have to grow the file on every chunk.
+        """
+        if end <= self._reservedUntil or not hasattr(os, "posix_fallocate"):
+            return
+        newEnd = end + RAW_STREAM_PREALLOCATE_BYTES
+        try:
+            self._file.flush()
+            os.posix_fallocate(self._file.fileno(), self._reservedUntil, newEnd - self._reservedUntil)
+            self._reservedUntil = newEnd
+        except OSError:
+            # Not supported on every filesystem; writing still works without it
+            self._reservedUntil = end
+
+    def _encodeDelta(self, raw: NDArray[np.uint16], index: int) -> None:
+        payload = self._payload[self._payloadLength:]
+        if index == 0:
+            self._encodings[index] = FRAME_ENCODING_VERBATIM
+            np.copyto(payload[:self._frameBytes].view("<u2").reshape(self._frameShape), raw, casting="unsafe")
+            self._payloadLength += self._frameBytes
+        else:
+            # Difference to the previous frame, wrapped to int16, then zigzag encoded so small differences become small unsigned values
+            np.subtract(raw, self._previous, out=self._delta, dtype=np.int32)
+            np.add(self._delta, 32768, out=self._delta)
+            np.bitwise_and(self._delta, 0xFFFF, out=self._delta)
+            np.subtract(self._delta, 32768, out=self._delta)
+            np.left_shift(self._delta, 1, out=self._zigzag)
+            np.right_shift(self._delta, 31, out=self._delta)
+            np.bitwise_xor(self._zigzag, self._delta, out=self._zigzag)
+
+            if int(self._zigzag.max()) <= 0xFF:
+                self._encodings[index] = FRAME_ENCODING_DELTA_U8
+                length = self._frameBytes // 2
+                np.copyto(payload[:length].reshape(self._frameShape), self._zigzag, casting="unsafe")
+            else:
+                self._encodings[index] = FRAME_ENCODING_DELTA_U16
+                length = self._frameBytes
+                np.copyto(payload[:length].view("<u2").reshape(self._frameShape), self._zigzag, casting="unsafe")
+            self._payloadLength += length
+
+        np.copyto(self._previous, raw, casting="unsafe")
+
+class RawStreamReader:
+    """
+    Reads a raw recording written by RawStreamWriter.
+    Uncompressed recordings are memory-mapped, so frames are zero-copy views into the file.
+    """
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            prefix = f.read(_FILE_PREFIX.size)
+            if len(prefix) < _FILE_PREFIX.size:
+                raise ValueError(f"Not a raw thermal recording: {path}")
+            magic, headerLength = _FILE_PREFIX.unpack(prefix)
+            if magic != RAW_STREAM_MAGIC:
+                raise ValueError(f"Not a raw thermal recording: {path}")
+            self.header = RawStreamHeader.createFromJson(json.loads(f.read(headerLength).decode("utf-8")))
+
+        self.compression = RawCompression[self.header.compression]
+        self.dataOffset = _align(_FILE_PREFIX.size + headerLength, RAW_STREAM_ALIGNMENT)
+        self.frameShape = (self.header.height, self.header.width)
+        self._frameBytes = self.header.width * self.header.height * 2
+        self._records: np.memmap | None = None
+        self._chunks: list[tuple[int, int, int]] = []  # (file offset, first frame index, frame count)
+
+        if self.compression == RawCompression.NONE:
+            recordDtype = getRecordDtype(self.header.width, self.header.height)
+            count = (os.path.getsize(path) - self.dataOffset) // recordDtype.itemsize
+            if count > 0:
+                self._records = np.memmap(path, dtype=recordDtype, mode="r", offset=self.dataOffset, shape=(count,))
+                # Drop trailing records that were reserved but never written (e.g. if the recording was interrupted)
+                written = np.flatnonzero(self._records["timestamp"])
+                self._records = self._records[:written[-1] + 1] if written.size > 0 else None
+            self.frameCount = 0 if self._records is None else len(self._records)
+        else:
+            self.frameCount = self._indexChunks()
+
+    def __len__(self) -> int:
+        return self.frameCount
+
+    @property
+    def frames(self) -> NDArray[np.uint16]:
+        """
+        All frames of an uncompressed recording as a memory-mapped (frameCount, height, width) array.
+        """
+        if self.compression != RawCompression.NONE:
+            raise ValueError("Only uncompressed recordings can be memory-mapped. Use readFrames() instead.")
+        if self._records is None:
+            return np.zeros((0, *self.frameShape), dtype="<u2")
+        return self._records["frame"]
+
+    @property
+    def timestamps(self) -> NDArray[np.int64]:
+        """
+        The capture timestamps (ns) of every frame.
+        """
+        if self.compression == RawCompression.NONE:
+            return np.zeros(0, dtype="<i8") if self._records is None else self._records["timestamp"]
+        timestamps = np.zeros(self.frameCount, dtype="<i8")
+        with open(self.path, "rb") as f:
+            for offset, first, count in self._chunks:
+                f.seek(offset + _CHUNK_HEADER.size)
+                timestamps[first:first + count] = np.frombuffer(f.read(count * 8), dtype="<i8")
+        return timestamps
+
+    def readFrames(self, start: int = 0, stop: int | None = None) -> tuple[NDArray[np.uint16], NDArray[np.int64]]:
+        """
+        Reads the frames [start, stop) and their timestamps.
+        Views into the memory map for uncompressed recordings; decoded copies for compressed ones.
+        """
+        stop = self.frameCount if stop is None else min(stop, self.frameCount)
+        start = max(0, min(start, stop))
+        if self.compression == RawCompression.NONE:
+            return self.frames[start:stop], self.timestamps[start:stop]
+
+        frames = np.zeros((stop - start, *self.frameShape), dtype=np.uint16)
+        timestamps = np.zeros(stop - start, dtype="<i8")
+        for index, (frame, timestamp) in enumerate(self.iterFrames(start, stop)):
+            frames[index] = frame
+            timestamps[index] = timestamp
+        return frames, timestamps
+
+    def iterFrames(self, start: int = 0, stop: int | None = None) -> Iterator[tuple[NDArray[np.uint16], int]]:
+        """
+        Yields (frame, timestamp) for the frames [start, stop).
+        For compressed recordings the yielded frame is a buffer that is reused for the next frame.
+        """
+        stop = self.frameCount if stop is None else min(stop, self.frameCount)
+        if self.compression == RawCompression.NONE:
+            for index in range(start, stop):
+                yield self._records["frame"][index], int(self._records["timestamp"][index])
+            return
+
+        with open(self.path, "rb") as f:
+            for offset, first, count in self._chunks:
+                if first + count <= start or first >= stop:
+                    continue
+                for index, frame, timestamp in self._decodeChunk(f, offset, count):
+                    if start <= first + index < stop:
+                        yield frame, timestamp
+
+    def close(self) -> None:
+        self._records = None
+
+    def _indexChunks(self) -> int:
+        fileSize = os.path.getsize(self.path)
+        offset = self.dataOffset
+        frameCount = 0
+        with open(self.path, "rb") as f:
+            while offset + _CHUNK_HEADER.size <= fileSize:
+                f.seek(offset)
+                magic, count, payloadLength = _CHUNK_HEADER.unpack(f.read(_CHUNK_HEADER.size))
+                chunkSize = _CHUNK_HEADER.size + count * 8 + _align(count, 8) + payloadLength
+                if magic != RAW_STREAM_CHUNK_MAGIC or offset + chunkSize > fileSize:
+                    break
+                self._chunks.append((offset, frameCount, count))
+                frameCount += count
+                offset += chunkSize
+        return frameCount
+
+    def _decodeChunk(self, f, offset: int, count: int) -> Iterator[tuple[int, NDArray[np.uint16], int]]:
+        f.seek(offset + _CHUNK_HEADER.size)
+        timestamps = np.frombuffer(f.read(count * 8), dtype="<i8")
+        encodings = np.frombuffer(f.read(_align(count, 8)), dtype=np.uint8)[:count]
+        frame = np.zeros(self.frameShape, dtype=np.uint16)
+        delta = np.zeros(self.frameShape, dtype=np.int32)
+        for index in range(count):
+            if encodings[index] == FRAME_ENCODING_VERBATIM:
+                frame[...] = np.frombuffer(f.read(self._frameBytes), dtype="<u2").reshape(self.frameShape)
+            else:
+                width = 1 if encodings[index] == FRAME_ENCODING_DELTA_U8 else 2
+                zigzag = np.frombuffer(f.read(self._frameBytes // 2 * width), dtype="<u1" if width == 1 else "<u2").reshape(self.frameShape)
+                # Undo the zigzag encoding, then add the difference to the previous frame (wrapping around 16 bits)
+                np.right_shift(zigzag, 1, out=delta, dtype=np.int32)
+                np.bitwise_xor(delta, -np.bitwise_and(zigzag, 1, dtype=np.int32), out=delta)
+                np.add(delta, frame, out=delta)
+                np.copyto(frame, delta, casting="unsafe")
+            yield index, frame, int(timestamps[index])
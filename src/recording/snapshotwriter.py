@@ -0,0 +1,107 @@
+import json, logging, os, queue, threading
+import cv2
+import numpy as np
+from src.defaults.values import DEFAULT_SNAPSHOT_RAW_FORMAT, SNAPSHOT_QUEUE_CAPACITY, SNAPSHOT_WRITER_THREADS
+from src.enums.SnapshotRawFormatEnum import SnapshotRawFormat
+from src.models.snapshot import Snapshot
+
+class SnapshotWriter:
+    """
+    Writes snapshots on a pool of background threads, so encoding (a PNG of a scale-5 frame takes tens of milliseconds) and slow
+    storage (an SD card on the Pi) never hold up the frame loop. The queue is bounded: when it is full, snapshots are dropped and
+    counted rather than piling up in memory or blocking the caller.
+
+    Besides the rendered image, the raw field can be saved as a 16-bit TIFF or an NPY file, with the metadata needed to turn it
+    into temperatures in a JSON sidecar.
+    """
+    def __init__(self,
+                 logger: logging.Logger,
+                 rawFormat: SnapshotRawFormat = DEFAULT_SNAPSHOT_RAW_FORMAT,
+                 workers: int = SNAPSHOT_WRITER_THREADS,
+                 capacity: int = SNAPSHOT_QUEUE_CAPACITY):
+        self.logger = logger
+        self.rawFormat = rawFormat
+        self.workers = max(workers, 1)
+        self._queue: queue.Queue[Snapshot | None] = queue.Queue(maxsize=max(capacity, 1))
+        self._threads: list[threading.Thread] = []
+        self._lock = threading.Lock()
+        self.written = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def submit(self, snapshot: Snapshot) -> bool:
+        """
+        Queues the snapshot to be written, without blocking. Returns False if it was dropped because the queue is full.
+        """
+        if not self._threads:
+            # Started on the first snapshot, so cameras that never take one have no idle threads
+            self._threads = [threading.Thread(target=self._run, name=f"SnapshotWriter{index}", daemon=True) for index in range(self.workers)]
+            for thread in self._threads:
+                thread.start()
+        try:
+            self._queue.put_nowait(snapshot)
+        except queue.Full:
+            with self._lock:
+                self.dropped += 1
+            self.logger.warning(f"Snapshot {os.path.basename(snapshot.basePath)} dropped: {self._queue.maxsize} snapshots are still waiting to be written.")
+            return False
+        return True
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def close(self) -> None:
+        """
+        Writes the snapshots still queued and stops the threads.
+        """
+        for _ in self._threads:
+            self._queue.put(None)
+        for thread in self._threads:
+            thread.join()
+        if self._threads:
+            self.logger.info(f"Snapshots written: {self.written}, failed: {self.failed}, dropped: {self.dropped}")
+        self._threads = []
+
+    def _run(self) -> None:
+        while True:
+            snapshot = self._queue.get()
+            if snapshot is None:
+                return
+            self._write(snapshot)
+
+    def _write(self, snapshot: Snapshot) -> None:
+        paths = []
+        try:
+            if snapshot.image is not None:
+                paths.append(f"{snapshot.basePath}.png")
+                if not cv2.imwrite(paths[-1], snapshot.image):
+                    raise OSError(f"Could not write {paths[-1]}")
+            if snapshot.raw is not None and self.rawFormat != SnapshotRawFormat.NONE:
+                paths += self._writeRaw(snapshot)
+        except (OSError, cv2.error) as e:
+            with self._lock:
+                self.failed += 1
+            self.logger.error(f"Failed to save snapshot {os.path.basename(snapshot.basePath)}: {e}")
+            return
+        with self._lock:
+            self.written += 1
+        self.logger.info(f"Snapshot saved to {', '.join(paths)}")
+
+    def _writeRaw(self, snapshot: Snapshot) -> list[str]:
+        """
+        Writes the raw field (uint16, as processed: decoded and, if a temporal filter is on, filtered) and its JSON sidecar. Returns the paths written.
+        """
+        raw = np.ascontiguousarray(snapshot.raw, dtype=np.uint16)
+        if self.rawFormat == SnapshotRawFormat.TIFF:
+            rawPath = f"{snapshot.basePath}.tiff"
+            if not cv2.imwrite(rawPath, raw):
+                raise OSError(f"Could not write {rawPath}")
+        else:
+            rawPath = f"{snapshot.basePath}.npy"
+            np.save(rawPath, raw)
+
+        sidecarPath = f"{snapshot.basePath}.json"
+        with open(sidecarPath, "w", encoding="utf-8") as file:
+            json.dump({**(snapshot.metadata or {}), "raw_file": os.path.basename(rawPath), "raw_format": self.rawFormat.name, "width": raw.shape[1], "height": raw.shape[0]}, file, indent=4)
+        return [rawPath, sidecarPath]
@@ -0,0 +1,17 @@
+from abc import ABC, abstractmethod
+from src.models.thermalframe import ThermalFrame
+
+class FrameSink(ABC):
+    """
+    Base class for everything that consumes processed frames (console output, recordings, streams, ...).
+    Sinks are called from the main loop once per frame, so write() should be cheap.
+    """
+    @abstractmethod
+    def write(self, frame: ThermalFrame) -> None:
+        ...
+
+    def close(self) -> None:
+        """
+        Flushes and releases anything the sink holds. Called once when the main loop exits.
+        """
+        pass
@@ -0,0 +1,24 @@
+from src.models.rawstreamheader import RawStreamHeader
+from src.models.thermalframe import ThermalFrame
+from src.recording.rawstream import RawStreamWriter
+from src.sinks.framesink import FrameSink
+
+class RawRecordingSink(FrameSink):
+    """
+    Records the decoded uint16 thermal matrix of every frame, with its timestamp, to a raw recording (.ptr).
+    Unlike the AVI recording, the temperatures can be recovered exactly afterwards.
+    The sensor samples are recorded even when a temporal noise filter is on, so the filter can be chosen again on playback.
+    """
+    def __init__(self, path: str, header: RawStreamHeader):
+        self.path = path
+        self._writer = RawStreamWriter(path, header)
+
+    @property
+    def frameCount(self) -> int:
+        return self._writer.frameCount
+
+    def write(self, frame: ThermalFrame) -> None:
+        self._writer.write(frame.sensorRaw if frame.sensorRaw is not None else frame.raw, frame.timestamp)
+
+    def close(self) -> None:
+        self._writer.close()
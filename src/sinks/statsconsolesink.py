@@ -0,0 +1,52 @@
+import sys, time, numpy as np
+from src.defaults.values import DEFAULT_STATS_PRINT_INTERVAL_S, DEFAULT_TEMPERATURE_SIG_DIGITS, ROI_LABEL_LIMIT
+from src.enums.TemperatureUnitEnum import TemperatureUnit, getSymbolFromTempUnit
+from src.helpers.conversions import convertTemperatureForDisplay
+from src.models.thermalframe import ThermalFrame
+from src.sinks.framesink import FrameSink
+
+class StatsConsoleSink(FrameSink):
+    """
+    Prints a one-line summary of the frame stats to the console at a fixed interval.
+    This is the default output in headless mode.
+    Regions of interest are printed below it, hottest first (up to ROI_LABEL_LIMIT of them).
+    With several cameras, each line starts with the camera's label.
+    """
+    def __init__(self, interval: float = DEFAULT_STATS_PRINT_INTERVAL_S, temperatureUnit: TemperatureUnit = TemperatureUnit.CELSIUS, label: str | None = None):
+        self.interval = interval
+        self.temperatureUnit = temperatureUnit
+        self._prefix: str = f"{label} " if label else ""
+        self._lastPrintTime: float = 0
+        self._framesSinceLastPrint: int = 0
+
+    def write(self, frame: ThermalFrame) -> None:
+        self._framesSinceLastPrint += 1
+        now = time.monotonic()
+        elapsed = now - self._lastPrintTime
+        if elapsed < self.interval:
+            return
+
+        stats = frame.stats.toDisplayUnit(self.temperatureUnit)
+        symbol = getSymbolFromTempUnit(self.temperatureUnit)
+        fps = self._framesSinceLastPrint / elapsed if self._lastPrintTime > 0 else 0
+        lines = [f"{self._prefix}[{frame.index}] center: {stats.centerTemp} {symbol}, avg: {stats.avgTemp} {symbol}, "
+                 f"min: {stats.minTemp} {symbol} @ ({stats.minRow}, {stats.minCol}), max: {stats.maxTemp} {symbol} @ ({stats.maxRow}, {stats.maxCol}), "
+                 f"fps: {fps:.1f}"]
+        if frame.regions and frame.roiStats is not None:
+            lines += self._formatRegions(frame, symbol)
+        # A single write, so the lines of cameras printing from different threads do not interleave
+        sys.stdout.write("\n".join(lines) + "\n")
+        self._lastPrintTime = now
+        self._framesSinceLastPrint = 0
+
+    def _formatRegions(self, frame: ThermalFrame, symbol: str) -> list[str]:
+        """
+        Returns the stats of the hottest regions of interest, one line per region.
+        """
+        lines = []
+        maxima = np.nan_to_num(frame.roiStats["max"], nan=-np.inf)
+        for index in np.argsort(-maxima, kind='stable')[:ROI_LABEL_LIMIT]:
+            stats = frame.roiStats[index]
+            mean, minimum, maximum = (round(convertTemperatureForDisplay(float(stats[field]), self.temperatureUnit), DEFAULT_TEMPERATURE_SIG_DIGITS) for field in ("mean", "min", "max"))
+            lines.append(f"    {self._prefix}{frame.regions[index].name}: avg: {mean} {symbol}, min: {minimum} {symbol}, max: {maximum} {symbol}")
+        return lines
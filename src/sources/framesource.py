@@ -0,0 +1,34 @@
+from abc import ABC, abstractmethod
+from numpy.typing import NDArray
+from src.models.rawstreamheader import RawStreamHeader
+
+class FrameSource(ABC):
+    """
+    Base class for everything frames can be captured from. It mirrors the parts of cv2.VideoCapture the capture thread uses.
+
+    isDecoded tells the controller what read() returns: False for camera frames that still have to be split and decoded,
+    True for already decoded uint16 thermal matrices (e.g. recordings).
+    """
+    isDecoded: bool = False
+    header: RawStreamHeader | None = None
+
+    @abstractmethod
+    def open(self) -> None:
+        """
+        Opens the source. Raises if it cannot be opened.
+        """
+
+    @abstractmethod
+    def isOpened(self) -> bool:
+        ...
+
+    @abstractmethod
+    def read(self, image: NDArray | None = None) -> tuple[bool, NDArray | None, int]:
+        """
+        Reads the next frame, into image if the source can and image has the right shape.
+        Also returns the frame's timestamp in nanoseconds: the capture time for live sources, the recorded one for recordings.
+        """
+
+    @abstractmethod
+    def release(self) -> None:
+        ...
@@ -0,0 +1,34 @@
+import time, cv2
+from typing import Callable
+from numpy.typing import NDArray
+from src.sources.framesource import FrameSource
+
+class LiveCameraSource(FrameSource):
+    """
+    Captures frames from a live camera through OpenCV.
+    Opening is delegated to the controller, which knows how to find a backend that keeps the raw thermal bytes.
+    """
+    isDecoded = False
+
+    def __init__(self, openCapture: Callable[[], cv2.VideoCapture], configureCapture: Callable[[cv2.VideoCapture], None]):
+        self._openCapture = openCapture
+        self._configureCapture = configureCapture
+        self._cap: cv2.VideoCapture | None = None
+
+    def open(self) -> None:
+        self._cap = self._openCapture()
+        if self._cap is None or not self._cap.isOpened():
+            raise RuntimeError("Failed to open the video capture.")
+        # Ensure our settings are applied even if the backend changes behavior after opening.
+        self._configureCapture(self._cap)
+
+    def isOpened(self) -> bool:
+        return self._cap is not None and self._cap.isOpened()
+
+    def read(self, image: NDArray | None = None) -> tuple[bool, NDArray | None, int]:
+        ret, frame = self._cap.read(image) if image is not None else self._cap.read()
+        return ret, frame, time.time_ns()
+
+    def release(self) -> None:
+        if self._cap is not None:
+            self._cap.release()
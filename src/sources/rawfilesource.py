@@ -0,0 +1,81 @@
+import time, numpy as np
+from numpy.typing import NDArray
+from src.defaults.values import DEFAULT_PLAYBACK_SPEED
+from src.enums.RawCompressionEnum import RawCompression
+from src.recording.rawstream import RawStreamReader
+from src.sources.framesource import FrameSource
+
+class RawFileSource(FrameSource):
+    """
+    Plays back a raw thermal recording (.ptr) as if it was a camera, so it can run through the full pipeline without hardware.
+
+    Uncompressed recordings are memory-mapped and read() returns read-only, zero-copy views of the frames in the file.
+    The speed sets the playback rate relative to the recorded timestamps: 1 is the native rate, 10 is ten times faster,
+    and 0 plays back as fast as possible.
+    """
+    isDecoded = True
+
+    def __init__(self, path: str, speed: float = DEFAULT_PLAYBACK_SPEED):
+        self.path = path
+        self.speed = speed
+        self._reader = RawStreamReader(path)
+        self.header = self._reader.header
+        self._frames = None
+        self._timestamps: NDArray[np.int64] | None = None
+        self._index: int = 0
+        self._startTime: float = 0
+        self._isOpened: bool = False
+
+    @property
+    def frameCount(self) -> int:
+        return len(self._reader)
+
+    def open(self) -> None:
+        self._timestamps = np.asarray(self._reader.timestamps)
+        if self._reader.compression == RawCompression.NONE:
+            self._frames = self._reader.frames
+        else:
+            self._frames = self._reader.iterFrames()
+        self._index = 0
+        self._isOpened = True
+
+    def isOpened(self) -> bool:
+        return self._isOpened and self._index < self.frameCount
+
+    def read(self, image: NDArray | None = None) -> tuple[bool, NDArray | None, int]:
+        """
+        Reads the next frame, with its recorded timestamp, so alarms and re-recordings see the recorded time whatever the playback speed.
+        """
+        if not self.isOpened():
+            return False, None, 0
+
+        self._waitForFrame(self._index)
+        if isinstance(self._frames, np.ndarray):
+            frame = self._frames[self._index]
+        else:
+            # Compressed frames are decoded into a reused buffer, so they have to be copied out
+            decoded, _ = next(self._frames)
+            frame = image if image is not None and image.shape == decoded.shape and image.dtype == decoded.dtype else np.empty_like(decoded)
+            np.copyto(frame, decoded)
+        timestamp = int(self._timestamps[self._index])
+        self._index += 1
+        return True, frame, timestamp
+
+    def release(self) -> None:
+        self._isOpened = False
+        self._frames = None
+        self._reader.close()
+
+    def _waitForFrame(self, index: int) -> None:
+        """
+        Sleeps until the frame is due according to its recorded timestamp and the playback speed.
+        """
+        if self.speed <= 0:
+            return
+        if index == 0:
+            self._startTime = time.perf_counter()
+            return
+        due = self._startTime + (self._timestamps[index] - self._timestamps[0]) / 1e9 / self.speed
+        delay = due - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
@@ -0,0 +1,133 @@
+import asyncio, logging, threading, numpy as np
+from typing import Callable
+from numpy.typing import NDArray
+
+class StreamChannel:
+    """
+    One stream of the StreamServer (the MJPEG view, the raw frames or the stats).
+
+    Frames are offered from the main loop and encoded on the channel's own thread, once per frame, into a payload that is
+    shared by all of the channel's clients (e.g. a complete multipart part or WebSocket frame).
+    Only the newest frame is kept at every step:
+    - offer() copies the frame into a pending buffer and returns; if the encoder is still busy, the next offer replaces it
+    - each client sends the newest payload when its socket has room, skipping any it did not get to
+    so neither a slow encoder nor a slow client can stall the main loop or make memory grow.
+    Nothing is copied or encoded while the channel has no clients.
+    """
+    def __init__(self, name: str, encode: Callable[[dict | None, NDArray | None], bytes], logger: logging.Logger):
+        self.name = name
+        self.logger = logger
+        self.clients: int = 0 # Changed on the event loop, read from the main loop
+        self.sequence: int = 0
+        self.payload: bytes | None = None
+        self.encodedFrames: int = 0
+        self._encode = encode
+        self._condition = threading.Condition()
+        self._pending: NDArray | None = None
+        self._pendingMeta: dict | None = None
+        self._hasPending: bool = False
+        self._working: NDArray | None = None
+        self._running: bool = False
+        self._thread: threading.Thread | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._changed: asyncio.Event | None = None
+        self._didLogError: bool = False
+
+    @property
+    def hasClients(self) -> bool:
+        return self.clients > 0
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        Starts the encoder thread. Must be called on the event loop that serves the clients.
+        """
+        self._loop = loop
+        self._changed = asyncio.Event()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name=f"StreamEncoderThread-{self.name}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Stops the encoder thread. Waiting clients are woken up by close().
+        """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def offer(self, meta: dict | None, data: NDArray | None = None) -> None:
+        """
+        Hands a frame to the encoder. The data is copied, so reused buffers can be passed. Does nothing without clients.
+        """
+        if not self.hasClients:
+            return
+        with self._condition:
+            if data is not None:
+                if self._pending is None or self._pending.shape != data.shape or self._pending.dtype != data.dtype:
+                    self._pending = np.empty_like(data)
+                np.copyto(self._pending, data)
+            self._pendingMeta = meta
+            self._hasPending = True
+            self._condition.notify()
+
+    async def next(self, sequence: int) -> tuple[int, bytes] | None:
+        """
+        Waits for a payload newer than the given sequence number and returns it with its own sequence number,
+        or None once the channel is closed.
+        """
+        while self._changed is not None and (self.payload is None or self.sequence == sequence):
+            await self._changed.wait()
+        if self._changed is None:
+            return None
+        return self.sequence, self.payload
+
+    def close(self) -> None:
+        """
+        Wakes up and ends all waiting clients. Must be called on the event loop.
+        """
+        changed, self._changed = self._changed, None
+        if changed is not None:
+            changed.set()
+
+    def removeClient(self) -> None:
+        """
+        Forgets the payload when the last client leaves, so the next client does not get a stale frame.
+        """
+        self.clients -= 1
+        if self.clients == 0:
+            self.payload = None
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                while self._running and not self._hasPending:
+                    self._condition.wait()
+                if not self._running:
+                    return
+                # Swap the buffers, so the main loop can offer the next frame while this one is encoded
+                self._pending, self._working = self._working, self._pending
+                meta = self._pendingMeta
+                self._hasPending = False
+            try:
+                payload = self._encode(meta, self._working)
+            except Exception as e:
+                if not self._didLogError:
+                    self.logger.error(f"Failed to encode a frame for the {self.name} stream: {e}")
+                    self._didLogError = True
+                continue
+            self.encodedFrames += 1
+            try:
+                self._loop.call_soon_threadsafe(self._publish, payload)
+            except RuntimeError:
+                return # The event loop is closed
+
+    def _publish(self, payload: bytes) -> None:
+        if self._changed is None or not self.hasClients:
+            return
+        self.sequence += 1
+        self.payload = payload
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
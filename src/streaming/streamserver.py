@@ -0,0 +1,278 @@
+import asyncio, json, logging, math, struct, threading, cv2, numpy as np
+from numpy.typing import NDArray
+from src.defaults.values import (
+    DEFAULT_STREAM_HOST, DEFAULT_STREAM_JPEG_QUALITY, DEFAULT_NORMALIZATION_DIVISOR, DEFAULT_NORMALIZATION_OFFSET,
+    STREAM_WRITE_BUFFER_BYTES, STREAM_CLIENT_TIMEOUT_S, STREAM_MAX_REQUEST_BYTES, STREAM_MJPEG_BOUNDARY)
+from src.models.thermalframe import ThermalFrame
+from src.sinks.framesink import FrameSink
+from src.streaming.streamchannel import StreamChannel
+from src.streaming.websocket import (
+    WS_OPCODE_BINARY, WS_OPCODE_CLOSE, WS_OPCODE_PING, WS_OPCODE_PONG, WS_OPCODE_TEXT, encodeWebSocketFrame, readWebSocketFrame,
+    websocketAcceptKey)
+
+# Header of every binary message of the raw stream, followed by height * width little-endian uint16 samples:
+# frame index, timestamp (time.time_ns()), height, width
+RAW_FRAME_HEADER: struct.Struct = struct.Struct("<QqHH")
+
+INDEX_PAGE: str = """<!DOCTYPE html>
+<html><head><title>Thermal camera</title></head>
+<body style="margin:0;background:#000">
+<img src="/stream.mjpg" alt="Thermal camera view">
+</body></html>
+"""
+
+class StreamServer(FrameSink):
+    """
+    Serves the live camera to other machines over HTTP and WebSockets, from an asyncio event loop on its own thread:
+    - GET /stream.mjpg: MJPEG of the rendered view (multipart/x-mixed-replace, viewable in any browser)
+    - WebSocket /raw: the decoded uint16 raw field of every frame (a JSON description first, then RAW_FRAME_HEADER + samples per binary message),
+      so clients can do their own radiometry with temperature = raw / normalization_divisor - normalization_offset
+    - WebSocket /stats: the frame stats, hotspots and ROI stats of every frame as JSON text messages (in Celsius)
+
+    Each stream is a StreamChannel: frames are encoded once and the result is shared by all clients, and slow clients skip frames.
+    """
+    def __init__(self,
+                 logger: logging.Logger,
+                 port: int,
+                 host: str = DEFAULT_STREAM_HOST,
+                 jpegQuality: int = DEFAULT_STREAM_JPEG_QUALITY,
+                 normalizationDivisor: float = DEFAULT_NORMALIZATION_DIVISOR,
+                 normalizationOffset: float = DEFAULT_NORMALIZATION_OFFSET):
+        self.logger = logger
+        self.port = port
+        self.host = host
+        self.jpegQuality = jpegQuality
+        self.normalizationDivisor = normalizationDivisor
+        self.normalizationOffset = normalizationOffset
+        self.viewChannel = StreamChannel("view", self._encodeView, logger)
+        self.rawChannel = StreamChannel("raw", self._encodeRaw, logger)
+        self.statsChannel = StreamChannel("stats", self._encodeStats, logger)
+        self._rawShape: tuple[int, int] | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self._server: asyncio.AbstractServer | None = None
+        self._clientTasks: set[asyncio.Task] = set()
+
+    @property
+    def channels(self) -> tuple[StreamChannel, ...]:
+        return (self.viewChannel, self.rawChannel, self.statsChannel)
+
+    @property
+    def wantsView(self) -> bool:
+        """
+        Whether anyone is watching the MJPEG stream, i.e. whether the view has to be rendered even when headless.
+        """
+        return self.viewChannel.hasClients
+
+    def start(self) -> None:
+        """
+        Starts the event loop thread and binds the server. Raises OSError if the address cannot be bound.
+        """
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="StreamServerThread", daemon=True)
+        self._thread.start()
+        try:
+            asyncio.run_coroutine_threadsafe(self._startServer(), self._loop).result()
+        except Exception:
+            self.close()
+            raise
+        self.logger.info(f"Streaming on http://{self.host}:{self.port}/ (/stream.mjpg, ws /raw, ws /stats)")
+
+    def publishView(self, image: NDArray[np.uint8]) -> None:
+        """
+        Offers the rendered view to the MJPEG stream. It is copied, so the GUI's reused buffer can be passed.
+        """
+        self.viewChannel.offer(None, image)
+
+    def write(self, frame: ThermalFrame) -> None:
+        self._rawShape = frame.raw.shape
+        self.rawChannel.offer({"index": frame.index, "timestamp": frame.timestamp}, frame.raw)
+        if self.statsChannel.hasClients:
+            self.statsChannel.offer(self._statsToJson(frame))
+
+    def close(self) -> None:
+        """
+        Disconnects all clients and stops the encoder and event loop threads.
+        """
+        if self._loop is None:
+            return
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._stopServer(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+        for channel in self.channels:
+            channel.stop()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        self._loop.close()
+        self._loop = None
+
+    async def _startServer(self) -> None:
+        for channel in self.channels:
+            channel.start(asyncio.get_running_loop())
+        self._server = await asyncio.start_server(self._handleClient, self.host, self.port, limit=STREAM_MAX_REQUEST_BYTES)
+        # Port 0 picks a free port
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def _stopServer(self) -> None:
+        if self._server is not None:
+            self._server.close()
+        for channel in self.channels:
+            channel.close()
+        for task in list(self._clientTasks):
+            task.cancel()
+        if self._clientTasks:
+            await asyncio.wait(self._clientTasks, timeout=STREAM_CLIENT_TIMEOUT_S)
+
+    async def _handleClient(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._clientTasks.add(task)
+        peer = writer.get_extra_info("peername")
+        # Bounds what a slow client can queue in memory; drain() waits above it
+        writer.transport.set_write_buffer_limits(high=STREAM_WRITE_BUFFER_BYTES)
+        try:
+            request = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), STREAM_CLIENT_TIMEOUT_S)
+            lines = request.decode("latin-1").split("\r\n")
+            method, path, _ = (lines[0].split(" ") + ["", ""])[:3]
+            headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:] if line)}
+            path = path.split("?", 1)[0]
+            if method != "GET":
+                await self._writeResponse(writer, "405 Method Not Allowed", "text/plain", b"Only GET is supported.\n")
+            elif path in ("/", "/index.html"):
+                await self._writeResponse(writer, "200 OK", "text/html; charset=utf-8", INDEX_PAGE.encode("utf-8"))
+            elif path == "/stream.mjpg":
+                await self._serveMjpeg(writer, peer)
+            elif path in ("/raw", "/stats"):
+                await self._serveWebSocket(self.rawChannel if path == "/raw" else self.statsChannel, reader, writer, headers, peer)
+            else:
+                await self._writeResponse(writer, "404 Not Found", "text/plain", b"Not found. Try /, /stream.mjpg, /raw or /stats.\n")
+        except (asyncio.TimeoutError, asyncio.IncompleteReadError, asyncio.LimitOverrunError, OSError, ValueError) as e:
+            self.logger.debug(f"Stream client {peer} disconnected: {type(e).__name__} {e}")
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self._clientTasks.discard(task)
+            writer.close()
+
+    async def _writeResponse(self, writer: asyncio.StreamWriter, status: str, contentType: str, body: bytes) -> None:
+        writer.write(f"HTTP/1.1 {status}\r\nContent-Type: {contentType}\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1") + body)
+        await writer.drain()
+
+    async def _serveMjpeg(self, writer: asyncio.StreamWriter, peer) -> None:
+        writer.write((
+            "HTTP/1.1 200 OK\r\n"
+            f"Content-Type: multipart/x-mixed-replace; boundary={STREAM_MJPEG_BOUNDARY}\r\n"
+            "Cache-Control: no-cache, no-store\r\n"
+            "Connection: close\r\n\r\n").encode("latin-1"))
+        await self._sendChannel(self.viewChannel, writer, peer)
+
+    async def _serveWebSocket(self, channel: StreamChannel, reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: dict[str, str], peer) -> None:
+        key = headers.get("sec-websocket-key")
+        if key is None or "websocket" not in headers.get("upgrade", "").lower():
+            await self._writeResponse(writer, "426 Upgrade Required", "text/plain", f"{channel.name} is a WebSocket stream.\n".encode("latin-1"))
+            return
+        writer.write((
+            "HTTP/1.1 101 Switching Protocols\r\n"
+            "Upgrade: websocket\r\n"
+            "Connection: Upgrade\r\n"
+            f"Sec-WebSocket-Accept: {websocketAcceptKey(key)}\r\n\r\n").encode("latin-1"))
+        if channel is self.rawChannel:
+            writer.write(encodeWebSocketFrame(json.dumps(self._rawDescription()).encode("utf-8"), WS_OPCODE_TEXT))
+
+        # Send until either side ends the connection
+        sending = asyncio.ensure_future(self._sendChannel(channel, writer, peer))
+        receiving = asyncio.ensure_future(self._receiveWebSocket(reader, writer))
+        try:
+            done, _ = await asyncio.wait((sending, receiving), return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            sending.cancel()
+            receiving.cancel()
+        for task in done:
+            if not task.cancelled() and task.exception() is not None:
+                raise task.exception()
+
+    async def _receiveWebSocket(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """
+        Answers pings and the closing handshake. Clients are not expected to send any data.
+        """
+        while True:
+            opcode, payload = await readWebSocketFrame(reader)
+            if opcode == WS_OPCODE_PING:
+                writer.write(encodeWebSocketFrame(payload, WS_OPCODE_PONG))
+            elif opcode == WS_OPCODE_CLOSE:
+                writer.write(encodeWebSocketFrame(payload[:2], WS_OPCODE_CLOSE))
+                await writer.drain()
+                return
+
+    async def _sendChannel(self, channel: StreamChannel, writer: asyncio.StreamWriter, peer) -> None:
+        """
+        Sends the newest payload of the channel whenever the client's socket has room for it, until the channel is closed.
+        """
+        channel.clients += 1
+        self.logger.info(f"Stream client {peer} connected to {channel.name} ({channel.clients} client(s)).")
+        sequence, sent, dropped = 0, 0, 0
+        try:
+            while True:
+                result = await channel.next(sequence)
+                if result is None:
+                    return
+                if sent > 0:
+                    dropped += result[0] - sequence - 1
+                sequence, payload = result
+                writer.write(payload)
+                await asyncio.wait_for(writer.drain(), STREAM_CLIENT_TIMEOUT_S)
+                sent += 1
+        finally:
+            channel.removeClient()
+            self.logger.info(f"Stream client {peer} left {channel.name} after {sent} frame(s), {dropped} dropped.")
+
+    def _rawDescription(self) -> dict:
+        height, width = self._rawShape if self._rawShape is not None else (None, None)
+        return {
+            "width": width,
+            "height": height,
+            "dtype": "<u2",
+            "header": RAW_FRAME_HEADER.format,
+            "header_fields": ["index", "timestamp", "height", "width"],
+            "normalization_divisor": self.normalizationDivisor,
+            "normalization_offset": self.normalizationOffset,
+        }
+
+    def _encodeView(self, meta: dict | None, image: NDArray[np.uint8]) -> bytes:
+        ok, jpeg = cv2.imencode(".jpg", image, [cv2.IMWRITE_JPEG_QUALITY, self.jpegQuality])
+        if not ok:
+            raise ValueError("cv2.imencode failed")
+        header = f"--{STREAM_MJPEG_BOUNDARY}\r\nContent-Type: image/jpeg\r\nContent-Length: {jpeg.size}\r\n\r\n".encode("latin-1")
+        return b"".join((header, jpeg.data, b"\r\n"))
+
+    def _encodeRaw(self, meta: dict, raw: NDArray[np.uint16]) -> bytes:
+        header = RAW_FRAME_HEADER.pack(meta["index"], meta["timestamp"], raw.shape[0], raw.shape[1])
+        return encodeWebSocketFrame(header + raw.astype("<u2", copy=False).tobytes(), WS_OPCODE_BINARY)
+
+    def _encodeStats(self, meta: dict, _: None) -> bytes:
+        return encodeWebSocketFrame(json.dumps(meta).encode("utf-8"), WS_OPCODE_TEXT)
+
+    @staticmethod
+    def _statsToJson(frame: ThermalFrame) -> dict:
+        """
+        Everything but the pixels of a frame, as JSON. Regions without data (NaN) are null.
+        """
+        def number(value) -> float | None:
+            value = float(value)
+            return None if math.isnan(value) else round(value, 3)
+        def spots(array: NDArray | None) -> list[dict] | None:
+            if array is None:
+                return None
+            return [{"row": number(spot["row"]), "col": number(spot["col"]), "temperature": number(spot["temperature"])} for spot in array]
+
+        data = {
+            "index": frame.index,
+            "timestamp": frame.timestamp,
+            "stats": frame.stats.toJson(),
+            "hotspots": spots(frame.hotspots),
+            "coldspots": spots(frame.coldspots),
+        }
+        if frame.regions and frame.roiStats is not None:
+            data["rois"] = [{"name": region.name, **{field: number(stats[field]) for field in ("mean", "min", "max", "std")}}
+                            for region, stats in zip(frame.regions, frame.roiStats)]
+        return data
@@ -0,0 +1,52 @@
+import asyncio, base64, hashlib, struct
+
+# RFC 6455 opcodes
+WS_OPCODE_CONTINUATION: int = 0x0
+WS_OPCODE_TEXT: int = 0x1
+WS_OPCODE_BINARY: int = 0x2
+WS_OPCODE_CLOSE: int = 0x8
+WS_OPCODE_PING: int = 0x9
+WS_OPCODE_PONG: int = 0xA
+
+WS_HANDSHAKE_GUID: bytes = b"258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+WS_MAX_CLIENT_PAYLOAD: int = 1 << 16 # Clients only send control frames, so anything bigger is rejected
+
+def websocketAcceptKey(key: str) -> str:
+    """
+    Returns the Sec-WebSocket-Accept value for the client's Sec-WebSocket-Key.
+    """
+    return base64.b64encode(hashlib.sha1(key.strip().encode("ascii") + WS_HANDSHAKE_GUID).digest()).decode("ascii")
+
+def encodeWebSocketFrame(payload: bytes, opcode: int = WS_OPCODE_BINARY) -> bytes:
+    """
+    Builds a complete, unfragmented server-to-client frame.
+    Server frames are not masked, so the same frame can be written to every client.
+    """
+    length = len(payload)
+    if length < 126:
+        header = struct.pack("!BB", 0x80 | opcode, length)
+    elif length < 1 << 16:
+        header = struct.pack("!BBH", 0x80 | opcode, 126, length)
+    else:
+        header = struct.pack("!BBQ", 0x80 | opcode, 127, length)
+    return header + payload
+
+async def readWebSocketFrame(reader: asyncio.StreamReader) -> tuple[int, bytes]:
+    """
+    Reads one client-to-server frame and returns its opcode and unmasked payload.
+    Raises asyncio.IncompleteReadError when the connection is closed, and ValueError for frames that are too big.
+    """
+    first, second = await reader.readexactly(2)
+    opcode = first & 0x0F
+    length = second & 0x7F
+    if length == 126:
+        length = struct.unpack("!H", await reader.readexactly(2))[0]
+    elif length == 127:
+        length = struct.unpack("!Q", await reader.readexactly(8))[0]
+    if length > WS_MAX_CLIENT_PAYLOAD:
+        raise ValueError(f"WebSocket frame of {length} bytes is too big")
+    mask = await reader.readexactly(4) if second & 0x80 else None
+    payload = await reader.readexactly(length)
+    if mask is not None:
+        payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+    return opcode, payload
@@ -0,0 +1,177 @@
+import json
+import logging
+import os
+import socket
+import sys
+import tempfile
+import time
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.alarms.alarmengine import AlarmEngine
+from src.alarms.alarmsinks import AlarmEventSink, JsonlAlarmEventSink, SocketAlarmEventSink
+from src.enums.AlarmKindEnum import AlarmKind
+from src.enums.AlarmMetricEnum import AlarmMetric
+from src.enums.AlarmStateEnum import AlarmState
+from src.helpers.roi_stats import ROI_STATS_DTYPE
+from src.models.alarmdefinition import AlarmDefinition
+from src.models.framestats import FrameStats
+from src.models.regionofinterest import RegionOfInterest
+from src.models.thermalframe import ThermalFrame
+
+class CollectingSink(AlarmEventSink):
+    def __init__(self):
+        self.events = []
+
+    def emit(self, event):
+        self.events.append(event)
+
+def makeFrame(index: int, seconds: float, maxTemp: float = 30.0, minTemp: float = 20.0, regions=None, roiMax=None) -> ThermalFrame:
+    roiStats = None
+    if regions is not None:
+        roiStats = np.zeros(len(regions), dtype=ROI_STATS_DTYPE)
+        roiStats["max"] = roiMax
+        roiStats["mean"] = roiMax
+        roiStats["min"] = roiMax
+    return ThermalFrame(
+        index=index,
+        timestamp=int(seconds * 1e9),
+        raw=np.zeros((1, 1), dtype=np.uint16),
+        stats=FrameStats(maxTemp=maxTemp, minTemp=minTemp, avgTemp=25.0, centerTemp=25.0),
+        regions=regions,
+        roiStats=roiStats)
+
+class AlarmEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.logger = logging.getLogger("AlarmEngineTests")
+        self.sink = CollectingSink()
+
+    def _states(self):
+        return [(event.name, event.target, event.state) for event in self.sink.events]
+
+    def test_threshold_with_hysteresis(self):
+        engine = AlarmEngine([AlarmDefinition("hot", 50.0, hysteresis=2.0)], None, [self.sink], self.logger)
+        for index, temp in enumerate([40, 51, 49, 51, 47.9, 47, 52]):
+            engine.evaluate(makeFrame(index, index, maxTemp=temp))
+        self.assertEqual(self._states(), [("hot", "frame", AlarmState.RAISED), ("hot", "frame", AlarmState.CLEARED), ("hot", "frame", AlarmState.RAISED)])
+        self.assertEqual([event.frameIndex for event in self.sink.events], [1, 4, 6])
+        self.assertEqual(engine.activeAlarms, [("hot", "frame")])
+
+    def test_sinks_added_to_the_callers_list_later_are_not_used(self):
+        sinks = [self.sink]
+        engine = AlarmEngine([AlarmDefinition("hot", 50.0)], None, sinks, self.logger)
+        otherSink = CollectingSink()
+        sinks.append(otherSink) # As main does with the sinks of the next camera
+        engine.evaluate(makeFrame(0, 0, maxTemp=60))
+        self.assertEqual((len(self.sink.events), len(otherSink.events)), (1, 0))
+
+    def test_below_alarm(self):
+        engine = AlarmEngine([AlarmDefinition("cold", 5.0, kind=AlarmKind.BELOW, metric=AlarmMetric.MIN, hysteresis=1.0)], None, [self.sink], self.logger)
+        for index, temp in enumerate([10, 4, 5.5, 6.5]):
+            engine.evaluate(makeFrame(index, index, minTemp=temp))
+        self.assertEqual([(event.state, event.frameIndex) for event in self.sink.events], [(AlarmState.RAISED, 1), (AlarmState.CLEARED, 3)])
+
+    def test_min_duration_debounces_short_spikes(self):
+        engine = AlarmEngine([AlarmDefinition("hot", 50.0, hysteresis=0.0, minDuration=1.0)], None, [self.sink], self.logger)
+        temps = [60, 40, 60, 60, 60, 60, 40, 60, 40, 40, 40]
+        for index, temp in enumerate(temps):
+            engine.evaluate(makeFrame(index, index * 0.5, maxTemp=temp))
+        # The single-frame spikes are ignored; the alarm is raised after 1 s above and cleared after 1 s below
+        self.assertEqual([(event.state, event.frameIndex) for event in self.sink.events], [(AlarmState.RAISED, 4), (AlarmState.CLEARED, 10)])
+
+    def test_rate_of_rise(self):
+        engine = AlarmEngine([AlarmDefinition("rising", 1.0, kind=AlarmKind.RISE, hysteresis=0.5, window=2.0)], None, [self.sink], self.logger)
+        # Steady for 3 s, then rising by 2 °C/s for 3 s, then steady again
+        times = np.arange(0, 10, 0.1)
+        temps = np.clip(30 + 2 * (times - 3), 30, 36)
+        for index, (seconds, temp) in enumerate(zip(times, temps)):
+            engine.evaluate(makeFrame(index, seconds, maxTemp=float(temp)))
+        self.assertEqual([event.state for event in self.sink.events], [AlarmState.RAISED, AlarmState.CLEARED])
+        raised, cleared = self.sink.events
+        self.assertAlmostEqual(times[raised.frameIndex], 4.05, delta=0.1) # The rate over the 2 s window passes 1 °C/s after 1 s of rising
+        self.assertGreater(raised.value, 1.0)
+        self.assertGreater(times[cleared.frameIndex], 6.0)
+
+    def test_rate_of_rise_ignores_noise_before_the_window_is_covered(self):
+        engine = AlarmEngine([AlarmDefinition("rising", 0.5, kind=AlarmKind.RISE, window=5.0)], None, [self.sink], self.logger)
+        # 25 fps, with 0.1 °C of sensor noise in the first frames and a steady scene after
+        temps = [30.0, 30.1, 29.9, 30.1] + [30.0] * 200
+        for index, temp in enumerate(temps):
+            engine.evaluate(makeFrame(index, index * 0.04, maxTemp=temp))
+        self.assertEqual(self.sink.events, [])
+
+    def test_alarms_on_all_regions(self):
+        regions = [RegionOfInterest(f"roi {i}", x=i, y=0, width=1, height=1) for i in range(200)]
+        alarms = [AlarmDefinition("roi hot", 80.0, target="*"), AlarmDefinition("roi 7 hot", 60.0, target="roi 7")]
+        engine = AlarmEngine(alarms, regions, [self.sink], self.logger)
+        self.assertEqual(len(engine.alarms), 201)
+        roiMax = np.full(len(regions), 50.0)
+        engine.evaluate(makeFrame(0, 0, regions=regions, roiMax=roiMax))
+        roiMax[[3, 7, 150]] = 90.0
+        engine.evaluate(makeFrame(1, 1, regions=regions, roiMax=roiMax))
+        self.assertEqual(sorted((event.name, event.target) for event in self.sink.events),
+                         [("roi 7 hot", "roi 7"), ("roi hot", "roi 150"), ("roi hot", "roi 3"), ("roi hot", "roi 7")])
+
+        with self.assertRaises(ValueError):
+            AlarmEngine([AlarmDefinition("missing", 1.0, target="nope")], regions, [], self.logger)
+
+    def test_evaluation_is_vectorized(self):
+        regions = [RegionOfInterest(f"roi {i}", x=i, y=0, width=1, height=1) for i in range(500)]
+        alarms = [AlarmDefinition("hot", 80.0, target="*"), AlarmDefinition("rising", 1.0, kind=AlarmKind.RISE, target="*")]
+        engine = AlarmEngine(alarms, regions, [], self.logger)
+        roiMax = np.full(len(regions), 50.0)
+        engine.evaluate(makeFrame(0, 0, regions=regions, roiMax=roiMax))
+        start = time.perf_counter()
+        for index in range(1, 51):
+            engine.evaluate(makeFrame(index, index * 0.04, regions=regions, roiMax=roiMax))
+        self.assertLess((time.perf_counter() - start) / 50, 0.002)
+
+    def test_load_definitions(self):
+        alarm = AlarmDefinition.createFromJson({"name": "bearing", "target": "bearing", "metric": "mean", "kind": "rise", "threshold": 0.5, "window_s": 10, "min_duration_s": 2})
+        self.assertEqual((alarm.kind, alarm.metric, alarm.window, alarm.minDuration), (AlarmKind.RISE, AlarmMetric.MEAN, 10.0, 2.0))
+        with self.assertRaises(ValueError):
+            AlarmDefinition.createFromJson({"name": "bad", "threshold": 1, "kind": "sideways"})
+        with self.assertRaises(ValueError):
+            AlarmDefinition.createFromJson({"name": "bad", "threshold": 1, "target": "bearing", "metric": "center"})
+
+class AlarmSinkTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _raiseOneEvent(self, sink: AlarmEventSink):
+        engine = AlarmEngine([AlarmDefinition("hot", 50.0)], None, [sink], logging.getLogger("AlarmSinkTests"))
+        engine.evaluate(makeFrame(0, 0, maxTemp=60))
+        engine.close()
+
+    def test_jsonl_sink(self):
+        path = os.path.join(self.tempDir.name, "alarms", "events.jsonl")
+        self._raiseOneEvent(JsonlAlarmEventSink(path))
+        with open(path, "r", encoding="utf-8") as f:
+            events = [json.loads(line) for line in f]
+        self.assertEqual(len(events), 1)
+        self.assertEqual((events[0]["name"], events[0]["state"], events[0]["value"]), ("hot", "RAISED", 60.0))
+
+    def test_udp_sink(self):
+        receiver = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        receiver.bind(("127.0.0.1", 0))
+        receiver.settimeout(2)
+        self._raiseOneEvent(SocketAlarmEventSink(f"127.0.0.1:{receiver.getsockname()[1]}", logging.getLogger("AlarmSinkTests")))
+        event = json.loads(receiver.recv(65536))
+        receiver.close()
+        self.assertEqual((event["name"], event["state"]), ("hot", "RAISED"))
+
+    def test_unix_sink_without_listener_does_not_raise(self):
+        if not hasattr(socket, "AF_UNIX"):
+            self.skipTest("Unix sockets are not available")
+        self._raiseOneEvent(SocketAlarmEventSink("unix:" + os.path.join(self.tempDir.name, "missing.sock"), logging.getLogger("AlarmSinkTests")))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,115 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+import cv2
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.synthetic_frames import SyntheticFrameGenerator
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.defaults.values import CAPTURE_BACKEND_CACHE_FILE_NAME
+from src.enums.FrameLayoutEnum import FrameLayout
+from src.helpers.capture_backend_cache import CaptureBackendCache
+from src.models.deviceinfo import DeviceInfo
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class FakeCapture:
+    """
+    Stands in for cv2.VideoCapture: the backends in `rawBackends` deliver frames in the given layout, the others converted BGR frames.
+    """
+    def __init__(self, backend: int, generator: SyntheticFrameGenerator, rawBackends: dict[int, FrameLayout]):
+        self.backend = backend
+        self.generator = generator
+        self.layout = rawBackends.get(backend, FrameLayout.CONVERTED)
+        self.reads = 0
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop, value):
+        return True
+
+    def get(self, prop):
+        return {cv2.CAP_PROP_FOURCC: cv2.VideoWriter_fourcc(*'YUY2'), cv2.CAP_PROP_FRAME_WIDTH: 256, cv2.CAP_PROP_FRAME_HEIGHT: 384}.get(prop, 0)
+
+    def getBackendName(self):
+        return f"FAKE{self.backend}"
+
+    def read(self):
+        self.reads += 1
+        return True, self.generator.frame(self.reads, self.layout)
+
+    def release(self):
+        pass
+
+class CaptureBackendCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        self.generator = SyntheticFrameGenerator(self.device)
+        self.cachePath = os.path.join(self.tempDir.name, CAPTURE_BACKEND_CACHE_FILE_NAME)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _openCapture(self, rawBackends: dict[int, FrameLayout]) -> list[FakeCapture]:
+        """
+        Opens the capture of a fresh controller and returns the captures it created, in order.
+        """
+        controller = ThermalCameraController(device=self.device, logger=logging.getLogger("CaptureBackendCacheTests"), mediaOutputPath=self.tempDir.name, headless=True, printStats=False)
+        captures = []
+        def createCapture(backend):
+            captures.append(FakeCapture(backend, self.generator, rawBackends))
+            return captures[-1]
+        controller._createCapture = createCapture
+        controller._openCapture()
+        controller.close()
+        return captures
+
+    def test_reuses_the_cached_backend_with_a_single_frame(self):
+        # Only the last backend (CAP_ANY, on every platform) delivers raw frames
+        probed = self._openCapture({cv2.CAP_ANY: FrameLayout.PADDED})
+        self.assertGreater(len(probed), 1)
+        self.assertEqual(probed[-1].backend, cv2.CAP_ANY)
+
+        with open(self.cachePath) as f:
+            entry = next(iter(json.load(f).values()))
+        self.assertEqual((entry["backend"], entry["fourcc"], entry["frameLayout"]), (cv2.CAP_ANY, "YUY2", "PADDED"))
+        self.assertEqual(entry["rowStrideBytes"], (256 + 32) * 2)
+
+        cached = self._openCapture({cv2.CAP_ANY: FrameLayout.PADDED})
+        self.assertEqual([(capture.backend, capture.reads) for capture in cached], [(cv2.CAP_ANY, 1)])
+
+    def test_invalidates_the_cache_when_validation_fails(self):
+        self._openCapture({cv2.CAP_ANY: FrameLayout.YUY2})
+
+        # The cached backend now converts to BGR, and another one delivers raw frames
+        rawBackend = cv2.CAP_DSHOW if sys.platform.startswith("win") else cv2.CAP_V4L2
+        captures = self._openCapture({rawBackend: FrameLayout.UINT16})
+        self.assertEqual(captures[0].backend, cv2.CAP_ANY)
+        self.assertEqual(captures[1].backend, rawBackend)
+
+        entry = next(iter(CaptureBackendCache(self.cachePath)._load().values()))
+        self.assertEqual((entry["backend"], entry["frameLayout"]), (rawBackend, "UINT16"))
+
+    def test_malformed_cache_counts_as_missing(self):
+        with open(self.cachePath, "w") as f:
+            f.write("{not json")
+        cache = CaptureBackendCache(self.cachePath, logger=logging.getLogger("CaptureBackendCacheTests"))
+        with self.assertLogs("CaptureBackendCacheTests", level="WARNING"):
+            self.assertIsNone(cache.get("TC001|unknown|0"))
+
+        with open(self.cachePath, "w") as f:
+            json.dump({"TC001|unknown|0": {"backend": 200}}, f)
+        with self.assertLogs("CaptureBackendCacheTests", level="WARNING"):
+            self.assertIsNone(cache.get("TC001|unknown|0"))
+
+if __name__ == "__main__":
+    unittest.main()
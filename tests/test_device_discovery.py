@@ -0,0 +1,84 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.helpers.device_discovery import matchVideoDevices, probeVideoDevices, scanVideoDevices
+from src.models.deviceinfo import DeviceInfo
+from src.models.videodevice import VideoDevice
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class DeviceDiscoveryTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _writeSysfsNode(self, sysfsRoot: str, node: str, name: str, usbDevice: str) -> None:
+        # As in sysfs: the node's device links to the USB interface, a child of the USB device with the ids
+        interfacePath = os.path.join(self.tempDir.name, "usb", usbDevice, f"{usbDevice}:1.0")
+        os.makedirs(interfacePath, exist_ok=True)
+        with open(os.path.join(self.tempDir.name, "usb", usbDevice, "idVendor"), "w") as file:
+            file.write("0bda\n")
+        with open(os.path.join(self.tempDir.name, "usb", usbDevice, "idProduct"), "w") as file:
+            file.write("5830\n")
+        os.makedirs(os.path.join(sysfsRoot, node))
+        with open(os.path.join(sysfsRoot, node, "name"), "w") as file:
+            file.write(f"{name}\n")
+        os.symlink(interfacePath, os.path.join(sysfsRoot, node, "device"))
+
+    def test_scans_sysfs_without_opening_devices(self):
+        sysfsRoot = os.path.join(self.tempDir.name, "video4linux")
+        self._writeSysfsNode(sysfsRoot, "video10", "USB Camera: Thermal", "1-2")
+        self._writeSysfsNode(sysfsRoot, "video2", "USB Camera: Thermal", "1-2")
+        os.makedirs(os.path.join(sysfsRoot, "v4l-subdev0"))
+
+        devices = scanVideoDevices(sysfsRoot=sysfsRoot, devRoot=os.path.join(self.tempDir.name, "dev"))
+
+        self.assertEqual([device.index for device in devices], [2, 10])
+        self.assertEqual(devices[0].path, os.path.join(self.tempDir.name, "dev", "video2"))
+        self.assertEqual(devices[0].name, "USB Camera: Thermal")
+        self.assertEqual(devices[0].usbId, "0bda:5830")
+        self.assertEqual(scanVideoDevices(sysfsRoot=os.path.join(self.tempDir.name, "missing")), [])
+
+    def test_matches_devices_by_their_raw_frame_size(self):
+        supported = {"devices/TC001.json": DeviceInfo.createFromJson(DEVICE_JSON_PATH)}
+        devices = [VideoDevice(index=0, formats={"YUYV": [(256, 384), (256, 192)], "MJPG": [(1280, 720)]}),
+                   VideoDevice(index=2, formats={"YUYV": [(640, 480)]}),
+                   VideoDevice(index=4, probed=True, probeOk=True, probeFrameShape=(384, 256, 2))]
+
+        matchVideoDevices(devices, supported)
+
+        self.assertEqual([device.matches for device in devices], [["devices/TC001.json"], [], ["devices/TC001.json"]])
+
+    def test_probes_run_concurrently_and_time_out(self):
+        hung = threading.Event()
+
+        def probe(device: VideoDevice):
+            if device.index == 1:
+                hung.wait(5) # A device that never answers
+            time.sleep(0.2)
+            return (device.index != 2), (384, 256, 2), (None if device.index != 2 else "no frame")
+
+        start = time.perf_counter()
+        devices = probeVideoDevices([VideoDevice(index=index) for index in range(4)], timeout=0.5, probe=probe)
+        elapsed = time.perf_counter() - start
+        hung.set()
+
+        self.assertLess(elapsed, 0.8) # The hung device does not hold up the result beyond the timeout
+        self.assertEqual([device.probeOk for device in devices], [True, None, False, True]) # One after another, the last probe would have missed the deadline
+        self.assertIn("timed out", devices[1].probeError)
+        self.assertEqual(devices[2].probeError, "no frame")
+        self.assertEqual(devices[3].probeFrameShape, (384, 256, 2))
+
+if __name__ == "__main__":
+    unittest.main()
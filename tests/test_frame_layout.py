@@ -0,0 +1,57 @@
+import logging
+import os
+import sys
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.synthetic_frames import FRAME_LAYOUTS, SyntheticFrameGenerator
+from src.enums.FrameLayoutEnum import FrameLayout
+from src.helpers.frame_layout import FrameSplitter, detectFrameLayout
+from src.models.deviceinfo import DeviceInfo
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class FrameLayoutTests(unittest.TestCase):
+    def setUp(self):
+        self.generator = SyntheticFrameGenerator(DeviceInfo.createFromJson(DEVICE_JSON_PATH))
+        self.splitter = FrameSplitter(width=256, height=192, logger=logging.getLogger("FrameLayoutTests"))
+
+    def test_detects_every_layout(self):
+        for layout in FRAME_LAYOUTS:
+            with self.subTest(layout=layout):
+                self.assertEqual(detectFrameLayout(self.generator.frame(0, layout), 256, 192), layout)
+        self.assertEqual(detectFrameLayout(np.zeros((100, 256, 2), dtype=np.uint8), 256, 192), FrameLayout.HALVES)
+        self.assertEqual(detectFrameLayout(np.zeros((1, 1000), dtype=np.uint8), 256, 192), FrameLayout.UNSUPPORTED)
+
+    def test_halves_are_views_of_the_frame(self):
+        for layout in (FrameLayout.YUY2, FrameLayout.UINT16, FrameLayout.PADDED):
+            with self.subTest(layout=layout):
+                frame = self.generator.frame(0, layout)
+                imdata, thdata = self.splitter.split(frame)
+                self.assertEqual(thdata.shape, (192, 256, 2))
+                self.assertTrue(np.shares_memory(thdata, frame))
+                self.assertTrue(np.shares_memory(imdata, frame))
+
+        frame = np.arange(101 * 4 * 2, dtype=np.uint8).reshape(101, 4, 2)
+        imdata, thdata = self.splitter.split(frame)
+        for half, expected in zip((imdata, thdata), np.array_split(frame, 2, axis=0)):
+            np.testing.assert_array_equal(half, expected)
+
+    def test_detects_again_only_when_the_frames_change(self):
+        for index in range(5):
+            self.splitter.split(self.generator.frame(index, FrameLayout.YUY2))
+        self.assertEqual((self.splitter.layout, self.splitter.detections), (FrameLayout.YUY2, 1))
+
+        self.assertEqual(self.splitter.split(self.generator.frame(0, FrameLayout.CONVERTED)), (None, None))
+        self.assertEqual((self.splitter.layout, self.splitter.detections), (FrameLayout.CONVERTED, 2))
+
+        self.splitter.split(self.generator.frame(0, FrameLayout.PADDED))
+        self.assertEqual((self.splitter.layout, self.splitter.detections), (FrameLayout.PADDED, 3))
+
+if __name__ == "__main__":
+    unittest.main()
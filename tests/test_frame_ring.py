@@ -0,0 +1,87 @@
+import os
+import sys
+import logging
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.captureController import CaptureController
+from src.enums.FramePolicyEnum import FramePolicy
+from src.models.framering import FrameRing
+
+class FakeCapture:
+    """A stand-in for a FrameSource that yields a fixed number of numbered frames."""
+    def __init__(self, frameCount: int):
+        self.frameCount = frameCount
+        self.reads = 0
+
+    def isOpened(self):
+        return self.reads < self.frameCount
+
+    def read(self, image=None):
+        if image is None:
+            image = np.zeros((4, 4), dtype=np.uint16)
+        image[...] = self.reads
+        self.reads += 1
+        return True, image, 1000 + self.reads
+
+class FrameRingTests(unittest.TestCase):
+    def test_latest_skips_and_counts_dropped_frames(self):
+        ring = FrameRing(4)
+        consumer = ring.addConsumer("display", FramePolicy.DROP_OLDEST)
+        for i in range(3):
+            ring.commitWrite(np.full((2, 2), i, dtype=np.uint16), timestamp=i)
+
+        frame, timestamp = consumer.latest(timeout=0)
+
+        self.assertEqual(int(frame[0, 0]), 2)
+        self.assertEqual(timestamp, 2)
+        self.assertEqual(consumer.dropped, 2)
+
+    def test_next_skips_to_oldest_available_frame_when_overwritten(self):
+        ring = FrameRing(3)
+        consumer = ring.addConsumer("recorder", FramePolicy.DROP_OLDEST)
+        for i in range(6):
+            ring.commitWrite(np.full((2, 2), i, dtype=np.uint16), timestamp=i)
+
+        frame, _ = consumer.next(timeout=0)
+
+        # Capacity 3 keeps 2 readable frames (one slot is reserved for the producer)
+        self.assertEqual(int(frame[0, 0]), 4)
+        self.assertEqual(consumer.dropped, 4)
+        self.assertEqual(consumer.late, 1)
+
+    def test_read_returns_none_when_closed(self):
+        ring = FrameRing(2)
+        consumer = ring.addConsumer("display")
+        ring.close()
+
+        frame, timestamp = consumer.next(timeout=1)
+
+        self.assertIsNone(frame)
+        self.assertEqual(timestamp, 0)
+
+    def test_block_consumer_receives_every_frame_from_capture_thread(self):
+        ring = FrameRing(2)
+        consumer = ring.addConsumer("recorder", FramePolicy.BLOCK)
+        capture = CaptureController(FakeCapture(20), ring, logger=logging.getLogger("tests"))
+        capture.start()
+
+        received = []
+        while True:
+            frame, timestamp = consumer.next(timeout=1)
+            if frame is None:
+                break
+            received.append((int(frame[0, 0]), timestamp))
+        capture.stop()
+
+        self.assertEqual(received, [(index, 1001 + index) for index in range(20)]) # With the timestamps the source gave
+        self.assertEqual(consumer.dropped, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
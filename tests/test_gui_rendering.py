@@ -0,0 +1,173 @@
+import logging
+import os
+import sys
+import unittest
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.guiController import GuiController
+from src.defaults.keybinds import KEY_INCREASE_SCALE
+from src.enums.ColormapEnum import Colormap
+from src.enums.ColorSpanEnum import ColorSpan
+from src.enums.InterpolationEnum import Interpolation
+from src.helpers.display_lut import OPENCV_COLORMAPS, applyDisplayLut, buildDisplayLut
+from src.models.deviceinfo import DeviceInfo
+from src.models.framestats import FrameStats
+from src.models.overlaytile import OverlayTile
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class GuiRenderingTests(unittest.TestCase):
+    def setUp(self):
+        self.gui = GuiController(logging.getLogger("GuiRenderingTests"), colormap=Colormap.INV_RAINBOW, blurRadius=3, headless=True)
+        self.gui.isInverted = True
+        rng = np.random.default_rng(0)
+        self.imdata = rng.integers(0, 255, size=(192, 256, 2), dtype=np.uint8)
+        self.thdata = rng.integers(0, 255, size=(192, 256, 2), dtype=np.uint8)
+        self.stats = FrameStats(18000, 30.0, 25.0, 10.0, 60.0, 1.0, 11.0, 25.0, 55.0, 5, 6, 100, 120)
+
+    def _render(self):
+        return self.gui.drawGUI(self.imdata, self.thdata, self.stats, labelThreshold=2, isRecording=False)
+
+    def test_steady_state_frames_do_not_allocate(self):
+        first = self._render()
+        self.assertGreater(self.gui.frameBufferAllocations, 0)
+
+        second = self._render()
+
+        self.assertEqual(self.gui.frameBufferAllocations, 0)
+        self.assertIs(first, second)
+        self.assertEqual(second.shape, (192 * self.gui.scale, 256 * self.gui.scale, 3))
+
+    def test_native_compositing_upscales_once(self):
+        self.gui.nativeCompositing = True
+        self.gui.interpolation = Interpolation.NEAREST
+        self.gui.blurRadius = 0
+        self.gui.isHudVisible = False
+
+        img = self._render()
+        self._render()
+
+        self.assertEqual(img.shape, (192 * self.gui.scale, 256 * self.gui.scale, 3))
+        self.assertEqual(self.gui.frameBufferAllocations, 0)
+        # With nearest neighbour every sensor pixel becomes a uniform block (away from the overlays)
+        block = img[:self.gui.scale, :self.gui.scale].reshape(-1, 3)
+        self.assertTrue((block == block[0]).all())
+
+    def test_scale_change_reallocates_buffers(self):
+        self._render()
+        self.gui.handleKeyPresses(ord(KEY_INCREASE_SCALE), DeviceInfo.createFromJson(DEVICE_JSON_PATH))
+
+        img = self._render()
+
+        self.assertGreater(self.gui.frameBufferAllocations, 0)
+        self.assertEqual(img.shape, (192 * self.gui.scale, 256 * self.gui.scale, 3))
+        self._render()
+        self.assertEqual(self.gui.frameBufferAllocations, 0)
+
+    def test_display_lut_matches_sequential_effects(self):
+        gray = np.arange(256, dtype=np.uint8).reshape(16, 16)
+        for colormap in Colormap:
+            for isInverted in (False, True):
+                expected = cv2.convertScaleAbs(gray, alpha=1.7)
+                if isInverted:
+                    expected = cv2.bitwise_not(expected)
+                if colormap == Colormap.NONE:
+                    expected = cv2.cvtColor(expected, cv2.COLOR_GRAY2BGR)
+                else:
+                    expected = cv2.applyColorMap(expected, OPENCV_COLORMAPS[colormap])
+                if colormap == Colormap.INV_RAINBOW:
+                    expected = cv2.cvtColor(expected, cv2.COLOR_BGR2RGB)
+
+                np.testing.assert_array_equal(applyDisplayLut(gray, buildDisplayLut(1.7, isInverted, colormap)), expected)
+
+    def test_yuyv_colorization_matches_conversion_to_bgr(self):
+        # As the frames were drawn before the lookup table: YUYV to BGR, contrast, inversion, then the colormap of the luminance
+        yuyv = self.imdata.copy()
+        yuyv[..., 1] = 128 # The camera's image data has neutral chroma
+        self.gui.contrast = 1.3
+        for colormap in (Colormap.JET, Colormap.INV_RAINBOW, Colormap.NONE):
+            with self.subTest(colormap=colormap):
+                self.gui.colormap = colormap
+                expected = cv2.convertScaleAbs(cv2.cvtColor(yuyv, cv2.COLOR_YUV2BGR_YUYV), alpha=1.3)
+                expected = cv2.bitwise_not(expected)
+                if colormap != Colormap.NONE:
+                    expected = cv2.applyColorMap(expected, OPENCV_COLORMAPS[colormap])
+                if colormap == Colormap.INV_RAINBOW:
+                    expected = cv2.cvtColor(expected, cv2.COLOR_BGR2RGB)
+
+                np.testing.assert_array_equal(self.gui.colorizeImageData(yuyv), expected)
+
+    def test_display_lut_is_only_rebuilt_on_changes(self):
+        self._render()
+        lut = self.gui._displayLut
+
+        self._render()
+        self.assertIs(self.gui._displayLut, lut)
+
+        self.gui.colormap = Colormap.JET
+        self._render()
+        self.assertIsNot(self.gui._displayLut, lut)
+
+    def test_fixed_color_span_maps_temperatures_to_palette(self):
+        self.gui.colormap = Colormap.NONE
+        self.gui.isInverted = False
+        self.gui.colorSpan = ColorSpan.FIXED
+        self.gui.colorSpanMinC, self.gui.colorSpanMaxC = 20.0, 40.0
+        # 10C, 20C, 30C and 50C with the default normalization
+        raw = np.array([[(10 + 273.15) * 64, (20 + 273.15) * 64, (30 + 273.15) * 64, (50 + 273.15) * 64]], dtype=np.uint16)
+
+        img = self.gui.applyTemperatureEffects(np.repeat(raw, 4, axis=0))
+
+        self.assertEqual(img.shape[2], 3)
+        np.testing.assert_allclose(self.gui._renderBuffers["paletteIndex"][0], [0, 0, 127, 255], atol=1)
+
+    def test_smoothed_color_span_follows_scene_gradually(self):
+        self.gui.colorSpan = ColorSpan.SMOOTHED
+        self.gui.colorSpanSmoothing = 0.5
+        cold = np.full((4, 4), 18000, dtype=np.uint16)
+        cold[0, 0] = 19000
+        hot = cold + 1000
+
+        self.assertEqual(self.gui.getColorSpan(cold), (18000, 19000))
+        self.assertEqual(self.gui.getColorSpan(hot), (18500, 19500))
+        self.assertEqual(self.gui.getColorSpan(hot), (18750, 19750))
+
+        self.gui.colorSpan = ColorSpan.AUTO
+        self.assertEqual(self.gui.getColorSpan(hot), (19000, 20000))
+
+    def test_cached_hud_matches_a_fresh_redraw(self):
+        background = np.random.default_rng(1).integers(0, 255, size=(self.gui.scaledHeight, self.gui.scaledWidth, 3), dtype=np.uint8)
+        self.gui.drawHUD(background.copy(), 25.0, 2, False)
+        self.gui.last_snapshot_time = "20261017-061529"
+
+        cached = self.gui.drawHUD(background.copy(), 25.37, 2, True)
+        fresh = GuiController(logging.getLogger("GuiRenderingTests"), colormap=Colormap.INV_RAINBOW, blurRadius=3, headless=True)
+        fresh.isInverted = True
+        fresh.last_snapshot_time = "20261017-061529"
+        expected = fresh.drawHUD(background.copy(), 25.37, 2, True)
+
+        np.testing.assert_array_equal(cached, expected)
+
+    def test_overlay_tile_blit_matches_direct_drawing(self):
+        background = np.random.default_rng(2).integers(0, 255, size=(60, 120, 3), dtype=np.uint8)
+        expected = background.copy()
+        cv2.line(expected, (10, 30), (100, 30), (255, 255, 255), 2)
+        cv2.putText(expected, "LABEL", (20, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1, cv2.LINE_AA)
+        tile = OverlayTile(5, 5, 110, 40)
+        tile.line((10, 30), (100, 30), (255, 255, 255), 2)
+        tile.putText("LABEL", (20, 20), cv2.FONT_HERSHEY_SIMPLEX, 0.4, (0, 255, 255), 1, cv2.LINE_AA)
+
+        img = tile.blit(background.copy())
+
+        # Solid pixels are copied exactly; anti-aliased edges are blended, which may round slightly differently
+        np.testing.assert_allclose(img, expected, atol=6)
+        np.testing.assert_array_equal(img[29:32], expected[29:32])
+
+if __name__ == "__main__":
+    unittest.main()
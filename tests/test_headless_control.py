@@ -0,0 +1,125 @@
+import io
+import logging
+import os
+import signal
+import socket
+import sys
+import tempfile
+import time
+import unittest
+from contextlib import redirect_stdout
+from unittest import mock
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.controlController import ControlController
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.defaults.keybinds import KEY_QUIT, KEY_RECORD, KEY_SNAPSHOT, KEY_STOP, KEY_TOGGLE_TEMP_UNIT
+from src.defaults.values import NO_KEY_PRESS
+from src.enums.FramePolicyEnum import FramePolicy
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.recording.rawstream import RawStreamWriter
+from src.sources.rawfilesource import RawFileSource
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+def pollUntilKey(control: ControlController, timeout: float = 2.0) -> int:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        keyPress = control.poll()
+        if keyPress != NO_KEY_PRESS:
+            return keyPress
+        time.sleep(0.01)
+    return NO_KEY_PRESS
+
+class ControlControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.control = ControlController(logging.getLogger("ControlControllerTests"))
+
+    def tearDown(self):
+        self.control.stop()
+
+    def test_commands_and_single_keys(self):
+        self.assertTrue(self.control.pushCommand(" Snapshot\n"))
+        self.assertTrue(self.control.pushCommand("u"))
+        self.assertFalse(self.control.pushCommand("sideways"))
+        self.assertEqual([self.control.poll() for _ in range(3)], [ord(KEY_SNAPSHOT), ord(KEY_TOGGLE_TEMP_UNIT), NO_KEY_PRESS])
+
+    def test_udp_commands(self):
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        self.control = ControlController(logging.getLogger("ControlControllerTests"), port=port, host="127.0.0.1")
+        self.control.start()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+            for command in (b"record", b"nope", b"q"):
+                sender.sendto(command, ("127.0.0.1", port))
+        # The unknown command is dropped
+        self.assertEqual(pollUntilKey(self.control), ord(KEY_RECORD))
+        self.assertEqual(pollUntilKey(self.control), ord(KEY_QUIT))
+
+    def test_signals(self):
+        if not hasattr(signal, "SIGUSR1") or not hasattr(signal, "SIGUSR2"):
+            self.skipTest("SIGUSR1/SIGUSR2 are not available")
+        self.control.start()
+        os.kill(os.getpid(), signal.SIGUSR1)
+        self.assertEqual(pollUntilKey(self.control), ord(KEY_SNAPSHOT))
+
+        # SIGUSR2 toggles recording, depending on whether the camera is recording
+        os.kill(os.getpid(), signal.SIGUSR2)
+        self.assertEqual(pollUntilKey(self.control), ord(KEY_RECORD))
+        self.control.isRecording = True
+        os.kill(os.getpid(), signal.SIGUSR2)
+        self.assertEqual(pollUntilKey(self.control), ord(KEY_STOP))
+
+        # The previous handlers are restored on stop
+        self.control.stop()
+        self.assertIs(signal.getsignal(signal.SIGUSR1), signal.SIG_DFL)
+
+class HeadlessControllerTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        self.recordingPath = os.path.join(self.tempDir.name, "recording.ptr")
+        writer = RawStreamWriter(self.recordingPath, RawStreamHeader.createFromDeviceInfo(self.device, width=256, height=192))
+        for index in range(10):
+            writer.write(np.full((192, 256), 19000, dtype=np.uint16), timestamp=index)
+        writer.close()
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _createController(self, **kwargs) -> ThermalCameraController:
+        return ThermalCameraController(
+            device=self.device,
+            logger=logging.getLogger("HeadlessControllerTests"),
+            mediaOutputPath=self.tempDir.name,
+            framePolicy=FramePolicy.BLOCK,
+            headless=True,
+            frameSource=RawFileSource(self.recordingPath, speed=0),
+            **kwargs)
+
+    def test_headless_run_does_not_draw_the_gui(self):
+        controller = self._createController(printStats=False)
+        with mock.patch.object(controller._guiController, "drawGUI") as drawGUI:
+            controller.run()
+        self.assertEqual(controller.getFrameCounters()["captured"], 10)
+        drawGUI.assert_not_called()
+
+    def test_unit_toggle_changes_the_console_output(self):
+        controller = self._createController(printStats=True)
+        controller.handleKeyPress(ord(KEY_TOGGLE_TEMP_UNIT), None)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            controller.run()
+        lines = [line for line in output.getvalue().splitlines() if "center:" in line]
+        self.assertGreater(len(lines), 0)
+        self.assertTrue(all(" F, avg:" in line for line in lines), lines)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,64 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.helpers.hot_path_logging import HotPathLogger, startQueueLogging
+
+class FormatCounter:
+    """
+    A log argument that counts how often it is formatted.
+    """
+    def __init__(self):
+        self.formats = 0
+
+    def __str__(self):
+        self.formats += 1
+        return "shape"
+
+class HotPathLoggingTests(unittest.TestCase):
+    def test_nothing_is_formatted_when_debug_is_disabled(self):
+        logger = logging.getLogger("HotPathLoggingTests.disabled")
+        logger.setLevel(logging.INFO)
+        argument = FormatCounter()
+        hotPathLogger = HotPathLogger(logger, sampleEvery=1)
+        for _ in range(10):
+            hotPathLogger.debug("Frame %s", argument)
+        self.assertEqual(argument.formats, 0)
+
+    def test_samples_each_message_separately(self):
+        logger = logging.getLogger("HotPathLoggingTests.sampled")
+        logger.setLevel(logging.DEBUG)
+        hotPathLogger = HotPathLogger(logger, sampleEvery=10)
+        with self.assertLogs(logger, level="DEBUG") as logs:
+            for index in range(25):
+                hotPathLogger.debug("Frame %d", index)
+                hotPathLogger.debug("Stats of frame %d", index)
+        messages = [record.getMessage() for record in logs.records]
+        self.assertEqual([message.split(" [")[0] for message in messages], ["Frame 0", "Stats of frame 0", "Frame 10", "Stats of frame 10", "Frame 20", "Stats of frame 20"])
+        self.assertTrue(messages[2].endswith("[call 11, 1 in 10 logged]"))
+
+    def test_queue_logging_writes_the_file_from_a_background_thread(self):
+        rootLogger = logging.getLogger()
+        handlers, level = list(rootLogger.handlers), rootLogger.level
+        with tempfile.TemporaryDirectory() as tempDir:
+            path = os.path.join(tempDir, "test.log")
+            listener = startQueueLogging(path, format="%(name)s %(levelname)s %(message)s", level=logging.INFO)
+            try:
+                logging.getLogger("HotPathLoggingTests.queued").warning("Frame %d dropped", 7)
+            finally:
+                listener.stop()
+                for handler in listener.handlers:
+                    handler.close()
+                rootLogger.handlers, rootLogger.level = handlers, level
+            with open(path, encoding="utf-8") as file:
+                self.assertEqual(file.read(), "HotPathLoggingTests.queued WARNING Frame 7 dropped\n")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+import logging
+import os
+import sys
+import time
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.guiController import GuiController
+from src.enums.HotspotFilterEnum import HotspotFilter
+from src.helpers.hotspots import HOTSPOT_DTYPE, findHotspots, prefilterField
+from src.models.framestats import FrameStats
+
+HEIGHT, WIDTH = 192, 256
+BACKGROUND_RAW = 18000
+D, C = 64.0, 273.15
+
+def gaussianBlob(row: float, col: float, amplitude: float, sigma: float = 2.0) -> np.ndarray:
+    rows, cols = np.mgrid[0:HEIGHT, 0:WIDTH]
+    return amplitude * np.exp(-((rows - row) ** 2 + (cols - col) ** 2) / (2 * sigma ** 2))
+
+def makeField(blobs: list[tuple[float, float, float]], noise: float = 0.0, seed: int = 0) -> np.ndarray:
+    field = np.full((HEIGHT, WIDTH), BACKGROUND_RAW, dtype=np.float64)
+    for row, col, amplitude in blobs:
+        field += gaussianBlob(row, col, amplitude)
+    if noise > 0:
+        field += np.random.default_rng(seed).normal(0, noise, field.shape)
+    return np.clip(np.rint(field), 0, 65535).astype(np.uint16)
+
+class HotspotTests(unittest.TestCase):
+    def test_sub_pixel_position_of_gaussian_blobs(self):
+        blobs = [(40.3, 60.7, 2000), (120.6, 200.2, 1500), (150.45, 30.85, 1000)]
+        raw = makeField(blobs)
+        spots = findHotspots(raw, count=3, minDistance=8, prefilter=HotspotFilter.NONE, d=D, c=C)
+        self.assertEqual(spots.dtype, HOTSPOT_DTYPE)
+        self.assertEqual(len(spots), 3)
+        for spot, (row, col, amplitude) in zip(spots, blobs):
+            self.assertAlmostEqual(float(spot["row"]), row, delta=0.15)
+            self.assertAlmostEqual(float(spot["col"]), col, delta=0.15)
+            self.assertAlmostEqual(float(spot["raw"]), BACKGROUND_RAW + amplitude, delta=amplitude * 0.05)
+            self.assertAlmostEqual(float(spot["temperature"]), float(spot["raw"]) / D - C, places=3)
+
+    def test_prefilter_ignores_single_noisy_pixels(self):
+        raw = makeField([(96.4, 128.6, 800)], noise=5)
+        raw[10, 10] = BACKGROUND_RAW + 1200 # A dead/hot pixel that is higher than the real hotspot
+        unfiltered = findHotspots(raw, count=1, prefilter=HotspotFilter.NONE, d=D, c=C)
+        self.assertEqual((int(unfiltered["row"][0]), int(unfiltered["col"][0])), (10, 10))
+        filtered = findHotspots(raw, count=1, prefilter=HotspotFilter.GAUSSIAN, filterSize=5, d=D, c=C)
+        self.assertAlmostEqual(float(filtered["row"][0]), 96.4, delta=0.5)
+        self.assertAlmostEqual(float(filtered["col"][0]), 128.6, delta=0.5)
+
+    def test_nearby_peaks_are_suppressed(self):
+        raw = makeField([(50, 50, 2000), (50, 54, 1900), (100, 150, 1000)])
+        spots = findHotspots(raw, count=2, minDistance=8, prefilter=HotspotFilter.NONE, d=D, c=C)
+        self.assertEqual(len(spots), 2)
+        self.assertAlmostEqual(float(spots["row"][1]), 100, delta=0.2)
+        self.assertAlmostEqual(float(spots["col"][1]), 150, delta=0.2)
+
+    def test_coldspots_are_found_coldest_first(self):
+        raw = makeField([(30.25, 40.5, -1500), (160.5, 220.75, -2500)])
+        spots = findHotspots(raw, count=2, coldspots=True, prefilter=HotspotFilter.NONE, d=D, c=C)
+        self.assertAlmostEqual(float(spots["row"][0]), 160.5, delta=0.15)
+        self.assertAlmostEqual(float(spots["col"][0]), 220.75, delta=0.15)
+        self.assertLess(float(spots["raw"][0]), float(spots["raw"][1]))
+
+    def test_shared_field_and_empty_results(self):
+        raw = makeField([(96, 128, 1000)], noise=5)
+        field = prefilterField(raw, HotspotFilter.BOX, 3)
+        shared = findHotspots(raw, count=4, prefilter=HotspotFilter.BOX, filterSize=3, d=D, c=C, field=field)
+        own = findHotspots(raw, count=4, prefilter=HotspotFilter.BOX, filterSize=3, d=D, c=C)
+        np.testing.assert_array_equal(shared, own)
+        self.assertEqual(len(findHotspots(raw, count=0)), 0)
+
+    def test_both_passes_fit_the_frame_budget(self):
+        raw = makeField([(40, 60, 2000), (120, 200, 1500)], noise=20)
+        field = np.empty(raw.shape, dtype=np.float32)
+        timings = []
+        for _ in range(20):
+            start = time.perf_counter()
+            field = prefilterField(raw, HotspotFilter.GAUSSIAN, 3, out=field)
+            findHotspots(raw, count=5, d=D, c=C, field=field)
+            findHotspots(raw, count=5, coldspots=True, d=D, c=C, field=field)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), 0.005)
+
+    def test_gui_draws_hotspot_markers(self):
+        gui = GuiController(logging.getLogger("HotspotTests"), headless=True)
+        rng = np.random.default_rng(0)
+        imdata = rng.integers(0, 255, size=(HEIGHT, WIDTH, 2), dtype=np.uint8)
+        thdata = rng.integers(0, 255, size=(HEIGHT, WIDTH, 2), dtype=np.uint8)
+        stats = FrameStats(18000, 30.0, 25.0, 10.0, 60.0, 1.0, 11.0, 25.0, 55.0, 5, 6, 100, 120)
+        legacy = gui.drawGUI(imdata, thdata, stats, labelThreshold=2, isRecording=False).copy()
+
+        hotspots = np.zeros(2, dtype=HOTSPOT_DTYPE)
+        hotspots["row"], hotspots["col"], hotspots["temperature"] = (100.25, 150.5), (120.5, 40.75), (60.0, 20.0)
+        coldspots = np.zeros(0, dtype=HOTSPOT_DTYPE)
+        marked = gui.drawGUI(imdata, thdata, stats, labelThreshold=2, isRecording=False, hotspots=hotspots, coldspots=coldspots)
+        self.assertFalse(np.array_equal(legacy, marked))
+        # Only the first hotspot is above the threshold; the second one is not marked
+        x, y = int(120.5 * gui.scale), int(100.25 * gui.scale)
+        np.testing.assert_array_equal(marked[y, x], (0, 0, 255))
+
+if __name__ == "__main__":
+    unittest.main()
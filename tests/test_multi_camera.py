@@ -0,0 +1,91 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+from argparse import ArgumentTypeError
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.multiCameraController import MultiCameraController
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.enums.FramePolicyEnum import FramePolicy
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.parsers.cli_parser import parseCameraSpec
+from src.recording.rawstream import RawStreamWriter
+from src.sources.rawfilesource import RawFileSource
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class MultiCameraTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        self.logger = logging.getLogger("MultiCameraTests")
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _writeRecording(self, name: str, frameCount: int) -> str:
+        path = os.path.join(self.tempDir.name, f"{name}.ptr")
+        rng = np.random.default_rng(frameCount)
+        writer = RawStreamWriter(path, RawStreamHeader.createFromDeviceInfo(self.device, width=256, height=192))
+        for index in range(frameCount):
+            writer.write(rng.integers(17000, 21000, size=(192, 256), dtype=np.uint16), timestamp=index)
+        writer.close()
+        return path
+
+    def _createCamera(self, label: str, recordingPath: str) -> ThermalCameraController:
+        return ThermalCameraController(
+            device=self.device,
+            logger=self.logger.getChild(label),
+            mediaOutputPath=os.path.join(self.tempDir.name, label),
+            framePolicy=FramePolicy.BLOCK,
+            headless=True,
+            frameSource=RawFileSource(recordingPath, speed=0),
+            label=label,
+            printStats=False)
+
+    def test_headless_run_processes_every_recorded_frame(self):
+        cameras = [self._createCamera("cam0", self._writeRecording("a", 30)), self._createCamera("cam1", self._writeRecording("b", 50))]
+        supervisor = MultiCameraController(cameras, self.logger, headless=True, workers=2)
+
+        supervisor.run()
+
+        metrics = supervisor.getMetrics()
+        self.assertEqual([cameraMetrics.label for cameraMetrics in metrics], ["cam0", "cam1"])
+        self.assertEqual([(cameraMetrics.captured, cameraMetrics.processed, cameraMetrics.dropped) for cameraMetrics in metrics], [(30, 30, 0), (50, 50, 0)])
+        self.assertTrue(all(camera.captureEnded for camera in cameras))
+
+    def test_mosaic_tiles(self):
+        cameras = [self._createCamera(f"cam{index}", self._writeRecording(str(index), 1)) for index in range(3)]
+        supervisor = MultiCameraController(cameras, self.logger, headless=False, mosaicColumns=2)
+        small = np.full((100, 120, 3), 50, dtype=np.uint8)
+        large = np.full((200, 240, 3), 200, dtype=np.uint8)
+
+        supervisor._updateTile(0, small)
+        supervisor._updateTile(2, large) # The cells grow to the largest frame
+
+        mosaic = supervisor._mosaic
+        self.assertEqual(mosaic.shape, (400, 480, 3))
+        self.assertEqual(mosaic[200 + 10, 10, 0], 200) # cam2 is the first cell of the second row
+        self.assertEqual(mosaic[10, 240 + 10, 0], 0) # cam1 has not drawn yet
+
+        supervisor._updateTile(0, small)
+        self.assertEqual(mosaic[10, 10, 0], 50)
+        self.assertEqual(mosaic[150, 200, 0], 0) # The rest of a smaller frame's cell is cleared
+
+    def test_camera_specs(self):
+        self.assertEqual(parseCameraSpec("0:devices/TC001.json"), (0, "devices/TC001.json"))
+        self.assertEqual(parseCameraSpec("C:/recordings/line1.ptr:C:/devices/TC001.json"), ("C:/recordings/line1.ptr", "C:/devices/TC001.json"))
+        for spec in ("devices/TC001.json", "x:devices/TC001.json", "0:"):
+            with self.assertRaises(ArgumentTypeError):
+                parseCameraSpec(spec)
+
+if __name__ == "__main__":
+    unittest.main()
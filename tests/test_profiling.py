@@ -0,0 +1,87 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.enums.FramePolicyEnum import FramePolicy
+from src.helpers.profiling import StageProfiler
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.recording.rawstream import RawStreamWriter
+from src.sources.rawfilesource import RawFileSource
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class StageProfilerTests(unittest.TestCase):
+    def test_percentiles_over_the_rolling_window(self):
+        profiler = StageProfiler(enabled=True, window=100)
+        for duration in range(1, 201):
+            profiler.record("decode", duration * 1_000_000)
+
+        summary = profiler.getReport()["decode"]
+
+        # The percentiles only cover the last 100 timings (101-200 ms); the count, mean and max cover all of them
+        self.assertEqual(summary["count"], 200)
+        self.assertAlmostEqual(summary["p50_ms"], 150.5)
+        self.assertAlmostEqual(summary["p99_ms"], 199.01)
+        self.assertAlmostEqual(summary["mean_ms"], 100.5)
+        self.assertEqual(summary["max_ms"], 200)
+
+    def test_disabled_profiler_records_nothing(self):
+        profiler = StageProfiler()
+        with profiler.measure("decode"):
+            pass
+        profiler.record("frame", 1000)
+        self.assertEqual(profiler.getReport(), {})
+
+        profiler.enabled = True
+        with profiler.measure("decode"):
+            pass
+        self.assertEqual(profiler.stages, ["decode"])
+        self.assertEqual(len(profiler.formatReport()), 1)
+
+    def test_controller_stages_and_report(self):
+        with tempfile.TemporaryDirectory() as tempDir:
+            device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+            recordingPath = os.path.join(tempDir, "recording.ptr")
+            writer = RawStreamWriter(recordingPath, RawStreamHeader.createFromDeviceInfo(device, width=256, height=192))
+            rng = np.random.default_rng(0)
+            for index in range(20):
+                writer.write(rng.integers(17000, 21000, size=(192, 256), dtype=np.uint16), timestamp=index)
+            writer.close()
+
+            reportPath = os.path.join(tempDir, "report.json")
+            controller = ThermalCameraController(
+                device=device,
+                logger=logging.getLogger("StageProfilerTests"),
+                mediaOutputPath=tempDir,
+                framePolicy=FramePolicy.BLOCK,
+                headless=True,
+                frameSource=RawFileSource(recordingPath, speed=0),
+                printStats=False,
+                profileReportPath=reportPath)
+            controller.run()
+
+            # The GUI stages are only timed when a frame is drawn, here with the profiler panel shown
+            controller._guiController.showProfiler = True
+            self.assertIsNotNone(controller.renderFrame(force=True))
+            for stage in ("capture", "stats", "hotspots", "sinks", "frame", "colormap", "effects", "overlays"):
+                self.assertIn(stage, controller.profiler.stages)
+
+            with open(reportPath, encoding="utf-8") as file:
+                report = json.load(file)
+            self.assertEqual(report["frames"], 20)
+            self.assertEqual(report["stages"]["frame"]["count"], 20)
+            self.assertNotIn("colormap", report["stages"])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,129 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.defaults.keybinds import KEY_RECORD, KEY_STOP
+from src.enums.RawCompressionEnum import RawCompression
+from src.enums.RecordingFormatEnum import RecordingFormat
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.models.framering import FrameRing
+from src.recording.rawstream import RawStreamReader, RawStreamWriter
+from src.sources.rawfilesource import RawFileSource
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class RawStreamTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        rng = np.random.default_rng(0)
+        base = rng.integers(17000, 21000, size=(192, 256), dtype=np.uint16)
+        self.frames = [(base + rng.integers(-20, 20, size=(192, 256))).astype(np.uint16) for _ in range(40)]
+        # A frame with large jumps forces the 16-bit delta encoding
+        self.frames[25] = rng.integers(0, 65535, size=(192, 256), dtype=np.uint16)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _writeRecording(self, compression: RawCompression) -> str:
+        path = os.path.join(self.tempDir.name, f"recording-{compression.name}.ptr")
+        header = RawStreamHeader.createFromDeviceInfo(self.device, width=256, height=192, compression=compression, chunkFrames=16)
+        writer = RawStreamWriter(path, header)
+        for index, frame in enumerate(self.frames):
+            writer.write(frame, timestamp=1000 + index)
+        writer.close()
+        return path
+
+    def test_uncompressed_round_trip_is_memory_mapped(self):
+        reader = RawStreamReader(self._writeRecording(RawCompression.NONE))
+
+        frames, timestamps = reader.readFrames()
+
+        self.assertEqual(len(reader), 40)
+        self.assertIsInstance(frames, np.memmap)
+        np.testing.assert_array_equal(frames, np.array(self.frames))
+        np.testing.assert_array_equal(timestamps, np.arange(1000, 1040))
+        self.assertEqual(reader.header.device_id, "TC001")
+        self.assertEqual(reader.header.normalization_divisor, 64.0)
+        reader.close()
+
+    def test_delta_round_trip_is_lossless_and_smaller(self):
+        uncompressedPath = self._writeRecording(RawCompression.NONE)
+        reader = RawStreamReader(self._writeRecording(RawCompression.DELTA))
+
+        frames, timestamps = reader.readFrames(10, 30)
+
+        np.testing.assert_array_equal(frames, np.array(self.frames[10:30]))
+        np.testing.assert_array_equal(timestamps, np.arange(1010, 1030))
+        self.assertLess(os.path.getsize(reader.path), os.path.getsize(uncompressedPath))
+
+    def test_file_source_plays_back_zero_copy_views_through_ring(self):
+        source = RawFileSource(self._writeRecording(RawCompression.NONE), speed=0)
+        source.open()
+        ring = FrameRing(4)
+        consumer = ring.addConsumer("display")
+
+        ret, frame, _ = source.read()
+        ring.commitWrite(frame, timestamp=1)
+        shared, _ = consumer.next(timeout=0)
+
+        self.assertTrue(ret)
+        self.assertFalse(frame.flags.writeable)
+        self.assertIs(shared, frame)
+        np.testing.assert_array_equal(shared, self.frames[0])
+        source.release()
+
+    def test_file_source_reads_every_compressed_frame(self):
+        source = RawFileSource(self._writeRecording(RawCompression.DELTA), speed=0)
+        source.open()
+
+        frames, timestamps = [], []
+        while source.isOpened():
+            ret, frame, timestamp = source.read()
+            frames.append(frame)
+            timestamps.append(timestamp)
+
+        self.assertEqual(len(frames), 40)
+        np.testing.assert_array_equal(np.array(frames), np.array(self.frames))
+        self.assertEqual(timestamps, list(range(1000, 1040))) # The recorded timestamps, not the time of playback
+        source.release()
+
+    def test_recording_a_played_back_recording(self):
+        source = RawFileSource(self._writeRecording(RawCompression.NONE), speed=0)
+        outputDir = os.path.join(self.tempDir.name, "output")
+        os.makedirs(outputDir)
+        controller = ThermalCameraController(device=self.device, logger=logging.getLogger("RawStreamTests"), frameSource=source, mediaOutputPath=outputDir,
+                                             headless=True, printStats=False, recordingFormat=RecordingFormat.RAW)
+        source.open()
+        try:
+            for index in range(5):
+                ret, frame, timestamp = source.read()
+                controller.processFrame(frame, timestamp)
+                if index == 1:
+                    controller.handleKeyPress(ord(KEY_RECORD), None)
+            controller.handleKeyPress(ord(KEY_STOP), None)
+        finally:
+            source.release()
+            controller.close()
+
+        recordings = [name for name in os.listdir(outputDir) if name.endswith(".ptr")]
+        self.assertEqual(len(recordings), 1)
+        reader = RawStreamReader(os.path.join(outputDir, recordings[0]))
+        frames, timestamps = reader.readFrames()
+        np.testing.assert_array_equal(frames, np.array(self.frames[2:5]))
+        np.testing.assert_array_equal(timestamps, [1002, 1003, 1004])
+        reader.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
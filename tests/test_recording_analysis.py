@@ -0,0 +1,84 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.analysis.recordinganalysis import analyzeRecordings, planShards, printAnalysisSummary
+from src.enums.RawCompressionEnum import RawCompression
+from src.helpers.thermal_stats import computeFrameStats
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.recording.rawstream import RawStreamWriter
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class RecordingAnalysisTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger("RecordingAnalysisTests")
+        device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        rng = np.random.default_rng(0)
+        self.frames = [rng.integers(17000, 21000, size=(48, 64), dtype=np.uint16) for _ in range(50)]
+        self.paths = []
+        for compression in (RawCompression.NONE, RawCompression.DELTA):
+            path = os.path.join(self.tempDir.name, f"recording-{compression.name}.ptr")
+            header = RawStreamHeader.createFromDeviceInfo(device, width=64, height=48, compression=compression, chunkFrames=8)
+            writer = RawStreamWriter(path, header)
+            for index, frame in enumerate(self.frames):
+                writer.write(frame, timestamp=1000 + index)
+            writer.close()
+            self.paths.append(path)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_compressed_shards_are_chunk_aligned(self):
+        shards = planShards([self.paths[1]], framesPerShard=10)
+
+        self.assertEqual([(shard.start, shard.stop) for shard in shards], [(0, 16), (16, 32), (32, 48), (48, 50)])
+
+    def test_empty_recording_has_empty_columns(self):
+        path = os.path.join(self.tempDir.name, "empty", "recording-EMPTY.ptr")
+        os.makedirs(os.path.dirname(path))
+        RawStreamWriter(path, RawStreamHeader.createFromDeviceInfo(DeviceInfo.createFromJson(DEVICE_JSON_PATH), width=64, height=48)).close()
+
+        outputPaths = analyzeRecordings([path], self.logger, workers=1)
+
+        with np.load(outputPaths[0]) as data:
+            self.assertEqual(len(data["frame_index"]), 0)
+            self.assertEqual(data["maxTemp"].dtype, np.float32)
+        printAnalysisSummary(outputPaths)
+
+    def test_file_that_is_not_a_recording_is_rejected(self):
+        path = os.path.join(self.tempDir.name, "notes.txt")
+        with open(path, "w") as f:
+            f.write("x")
+
+        with self.assertRaises(ValueError):
+            analyzeRecordings([path], self.logger, workers=1)
+
+    def test_sharded_analysis_matches_live_stats(self):
+        outputDir = os.path.join(self.tempDir.name, "stats")
+
+        outputPaths = analyzeRecordings([self.tempDir.name], self.logger, outputDir=outputDir, workers=2, framesPerShard=7)
+
+        self.assertEqual(len(outputPaths), 2)
+        for outputPath in outputPaths:
+            with np.load(outputPath) as data:
+                np.testing.assert_array_equal(data["frame_index"], np.arange(50))
+                np.testing.assert_array_equal(data["timestamp"], np.arange(1000, 1050))
+                for index in (0, 13, 49):
+                    stats = computeFrameStats(self.frames[index], d=64.0, c=273.15)
+                    self.assertAlmostEqual(float(data["maxTemp"][index]), stats.maxTemp, places=3)
+                    self.assertAlmostEqual(float(data["avgTemp"][index]), stats.avgTemp, places=3)
+                    self.assertEqual((data["maxRow"][index], data["maxCol"][index]), (stats.maxRow, stats.maxCol))
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import sys
+import tempfile
+import time
+import unittest
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.guiController import GuiController
+from src.enums.RoiShapeEnum import RoiShape
+from src.helpers.roi_stats import ROI_STATS_DTYPE, RoiStatsCalculator
+from src.models.deviceinfo import DeviceInfo
+from src.models.framestats import FrameStats
+from src.models.rawstreamheader import RawStreamHeader
+from src.models.regionofinterest import RegionOfInterest
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+D, C = 64.0, 273.15
+
+class RoiStatsTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.raw = np.random.default_rng(0).integers(17000, 21000, size=(192, 256), dtype=np.uint16)
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def _assertStats(self, stats, samples: np.ndarray):
+        samples = samples.astype(np.float64)
+        self.assertAlmostEqual(float(stats["mean"]), samples.mean() / D - C, places=3)
+        self.assertAlmostEqual(float(stats["min"]), samples.min() / D - C, places=3)
+        self.assertAlmostEqual(float(stats["max"]), samples.max() / D - C, places=3)
+        self.assertAlmostEqual(float(stats["std"]), samples.std() / D, places=3)
+
+    def test_rectangles_match_numpy(self):
+        regions = [
+            RegionOfInterest("inside", x=10, y=20, width=30, height=15),
+            RegionOfInterest("single pixel", x=100, y=100, width=1, height=1),
+            RegionOfInterest("clipped", x=-5, y=180, width=20, height=30),
+            RegionOfInterest("bottom right corner", x=250, y=186, width=6, height=6),
+            RegionOfInterest("outside", x=300, y=10, width=5, height=5),
+        ]
+        stats = RoiStatsCalculator(regions).calculate(self.raw, d=D, c=C)
+        self.assertEqual(stats.dtype, ROI_STATS_DTYPE)
+        self._assertStats(stats[0], self.raw[20:35, 10:40])
+        self._assertStats(stats[1], self.raw[100:101, 100:101])
+        self._assertStats(stats[2], self.raw[180:192, 0:15])
+        self._assertStats(stats[3], self.raw[186:192, 250:256])
+        self.assertTrue(np.isnan(stats[4]["mean"]))
+
+    def test_polygons_use_their_mask(self):
+        points = [(20, 10), (80, 30), (40, 90)]
+        region = RegionOfInterest.createFromJson({"name": "panel", "points": [list(point) for point in points]})
+        self.assertEqual(region.shape, RoiShape.POLYGON)
+        mask = np.zeros(self.raw.shape, dtype=np.uint8)
+        cv2.fillPoly(mask, [np.array(points, dtype=np.int32)], 255)
+        stats = RoiStatsCalculator([region]).calculate(self.raw, d=D, c=C)
+        self._assertStats(stats[0], self.raw[mask > 0])
+
+    def test_hundreds_of_regions_fit_the_frame_budget(self):
+        rng = np.random.default_rng(1)
+        regions = [RegionOfInterest(f"rect {i}", x=int(rng.integers(0, 230)), y=int(rng.integers(0, 170)), width=int(rng.integers(2, 25)), height=int(rng.integers(2, 20))) for i in range(300)]
+        calculator = RoiStatsCalculator(regions)
+        stats = calculator.calculate(self.raw, d=D, c=C)
+        for region, regionStats in zip(regions[:20], stats[:20]):
+            self._assertStats(regionStats, self.raw[region.y:region.y + region.height, region.x:region.x + region.width])
+
+        timings = []
+        for _ in range(10):
+            start = time.perf_counter()
+            calculator.calculate(self.raw, d=D, c=C)
+            timings.append(time.perf_counter() - start)
+        self.assertLess(min(timings), 0.005)
+
+    def test_load_json_file_and_reject_duplicates(self):
+        path = os.path.join(self.tempDir.name, "TC001.roi.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"rois": [{"name": "bearing", "x": 1, "y": 2, "width": 3, "height": 4}, {"name": "panel", "points": [[0, 0], [9, 0], [5, 7]]}]}, f)
+        regions = RegionOfInterest.loadAllFromFile(path)
+        self.assertEqual([region.name for region in regions], ["bearing", "panel"])
+        self.assertEqual(RegionOfInterest.findFileForDevice(os.path.join(self.tempDir.name, "TC001.json")), path)
+        self.assertEqual([RegionOfInterest.createFromJson(region.toJson()) for region in regions], regions)
+
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"rois": [{"name": "a", "x": 0, "y": 0, "width": 1, "height": 1}] * 2}, f)
+        with self.assertRaises(ValueError):
+            RegionOfInterest.loadAllFromFile(path)
+
+    def test_load_yaml_file(self):
+        try:
+            import yaml
+        except ImportError:
+            self.skipTest("PyYAML is not installed")
+        path = os.path.join(self.tempDir.name, "TC001.roi.yaml")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("rois:\n  - name: bearing\n    x: 1\n    y: 2\n    width: 3\n    height: 4\n")
+        self.assertEqual(RegionOfInterest.loadAllFromFile(path), [RegionOfInterest("bearing", x=1, y=2, width=3, height=4)])
+
+    def test_recording_header_keeps_regions(self):
+        device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        rois = [RegionOfInterest("bearing", x=1, y=2, width=3, height=4).toJson()]
+        header = RawStreamHeader.createFromDeviceInfo(device, width=256, height=192, rois=rois)
+        self.assertEqual(RawStreamHeader.createFromJson(json.loads(json.dumps(header.toJson()))).rois, rois)
+
+    def test_gui_draws_regions(self):
+        gui = GuiController(logging.getLogger("RoiStatsTests"), headless=True)
+        imdata = np.zeros((192, 256, 2), dtype=np.uint8)
+        stats = FrameStats()
+        regions = [RegionOfInterest("bearing", x=150, y=120, width=30, height=15)]
+        roiStats = RoiStatsCalculator(regions).calculate(self.raw, d=D, c=C)
+        plain = gui.drawGUI(imdata, imdata, stats, labelThreshold=2, isRecording=False).copy()
+        marked = gui.drawGUI(imdata, imdata, stats, labelThreshold=2, isRecording=False, regions=regions, roiStats=roiStats)
+        bottom = (120 + 15) * gui.scale - 1
+        np.testing.assert_array_equal(marked[bottom, 160 * gui.scale], (255, 255, 255))
+        self.assertFalse(np.array_equal(plain, marked))
+
+if __name__ == "__main__":
+    unittest.main()
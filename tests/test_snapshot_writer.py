@@ -0,0 +1,138 @@
+import glob
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import unittest
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.synthetic_frames import SyntheticFrameGenerator
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.defaults.keybinds import KEY_SNAPSHOT_BURST
+from src.enums.SnapshotRawFormatEnum import SnapshotRawFormat
+from src.enums.TemporalFilterEnum import TemporalFilter
+from src.models.deviceinfo import DeviceInfo
+from src.models.rawstreamheader import RawStreamHeader
+from src.models.snapshot import Snapshot
+from src.recording.rawstream import RawStreamWriter
+from src.recording.snapshotwriter import SnapshotWriter
+from src.sources.rawfilesource import RawFileSource
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class BlockingSnapshotWriter(SnapshotWriter):
+    """
+    A writer whose threads wait until released, like on a stalled SD card.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.writing = threading.Event()
+        self.release = threading.Event()
+
+    def _write(self, snapshot: Snapshot) -> None:
+        self.writing.set()
+        self.release.wait(5)
+
+class SnapshotWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.logger = logging.getLogger("SnapshotWriterTests")
+        self.image = np.full((96, 128, 3), 200, dtype=np.uint8)
+        self.raw = np.arange(64 * 48, dtype=np.uint16).reshape(48, 64) + 18000
+
+    def tearDown(self):
+        self.tempDir.cleanup()
+
+    def test_writes_the_image_and_the_radiometric_field(self):
+        for rawFormat in (SnapshotRawFormat.TIFF, SnapshotRawFormat.NPY):
+            with self.subTest(rawFormat=rawFormat):
+                basePath = os.path.join(self.tempDir.name, rawFormat.name)
+                writer = SnapshotWriter(self.logger, rawFormat=rawFormat)
+                self.assertTrue(writer.submit(Snapshot(basePath, self.image, self.raw, {"normalization_divisor": 64})))
+                writer.close()
+
+                np.testing.assert_array_equal(cv2.imread(f"{basePath}.png"), self.image)
+                raw = cv2.imread(f"{basePath}.tiff", cv2.IMREAD_UNCHANGED) if rawFormat == SnapshotRawFormat.TIFF else np.load(f"{basePath}.npy")
+                self.assertEqual(raw.dtype, np.uint16)
+                np.testing.assert_array_equal(raw, self.raw)
+                with open(f"{basePath}.json") as file:
+                    metadata = json.load(file)
+                self.assertEqual((metadata["normalization_divisor"], metadata["raw_format"], metadata["width"], metadata["height"]), (64, rawFormat.name, 64, 48))
+                self.assertEqual(writer.written, 1)
+
+    def test_full_queue_drops_instead_of_blocking(self):
+        writer = BlockingSnapshotWriter(self.logger, workers=1, capacity=2)
+        snapshot = Snapshot(os.path.join(self.tempDir.name, "stalled"), self.image)
+        self.assertTrue(writer.submit(snapshot))
+        self.assertTrue(writer.writing.wait(5)) # The only thread is now stuck writing
+
+        with self.assertLogs(self.logger, level="WARNING"):
+            results = [writer.submit(snapshot) for _ in range(3)]
+        self.assertEqual(results, [True, True, False])
+        self.assertEqual((writer.dropped, writer.pending), (1, 2))
+
+        writer.release.set()
+        writer.close()
+        self.assertEqual(writer.pending, 0)
+
+    def test_burst_snapshots_consecutive_frames(self):
+        device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        generator = SyntheticFrameGenerator(device)
+        controller = ThermalCameraController(device=device, logger=self.logger, mediaOutputPath=self.tempDir.name, headless=True, printStats=False,
+                                             snapshotRawFormat=SnapshotRawFormat.NPY, snapshotBurstFrames=3)
+        try:
+            controller.processFrame(generator.frame(0), 0)
+            self.assertIsNone(controller.renderFrame())
+            controller.handleKeyPress(ord(KEY_SNAPSHOT_BURST), None)
+            for index in range(1, 6):
+                controller.processFrame(generator.frame(index), index)
+                self.assertEqual(controller.renderFrame() is not None, index <= 3) # Headless frames are only rendered for the burst
+        finally:
+            controller.close()
+
+        images = sorted(glob.glob(os.path.join(self.tempDir.name, "*-burst*.png")))
+        self.assertEqual([path[-12:] for path in images], ["-burst00.png", "-burst01.png", "-burst02.png"])
+        fields = [np.load(path[:-4] + ".npy") for path in images]
+        self.assertFalse(np.array_equal(fields[0], fields[1])) # Each snapshot holds its own frame, not the reused buffer
+        with open(images[0][:-4] + ".json") as file:
+            self.assertEqual(json.load(file)["frame_index"], 1)
+
+    def test_playback_snapshot_saves_the_processed_field(self):
+        device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        rng = np.random.default_rng(0)
+        path = os.path.join(self.tempDir.name, "recording.ptr")
+        recording = RawStreamWriter(path, RawStreamHeader.createFromDeviceInfo(device, width=256, height=192))
+        for index in range(3):
+            recording.write(rng.integers(18000, 20000, size=(192, 256), dtype=np.uint16), timestamp=index)
+        recording.close()
+
+        source = RawFileSource(path, speed=0)
+        controller = ThermalCameraController(device=device, logger=self.logger, frameSource=source, mediaOutputPath=self.tempDir.name, headless=True, printStats=False,
+                                             snapshotRawFormat=SnapshotRawFormat.NPY, temporalFilter=TemporalFilter.EMA, temporalAlpha=0.5)
+        source.open()
+        try:
+            for index in range(3):
+                thermalFrame = controller.processFrame(source.read()[1], index)
+            controller._snapshot(None, name="playback")
+        finally:
+            source.release()
+            controller.close()
+
+        raw = np.load(os.path.join(self.tempDir.name, "playback.npy"))
+        np.testing.assert_array_equal(raw, thermalFrame.raw)
+        self.assertFalse(np.array_equal(raw, thermalFrame.sensorRaw))
+        with open(os.path.join(self.tempDir.name, "playback.json")) as file:
+            metadata = json.load(file)
+        self.assertTrue(metadata["raw_is_filtered"])
+        self.assertAlmostEqual(metadata["stats_c"]["max"], raw.max() / device.misc.normalization_divisor - device.misc.normalization_offset, places=2)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+import base64
+import json
+import logging
+import os
+import socket
+import struct
+import sys
+import time
+import unittest
+import cv2
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.defaults.values import STREAM_MJPEG_BOUNDARY
+from src.models.framestats import FrameStats
+from src.models.regionofinterest import RegionOfInterest
+from src.models.thermalframe import ThermalFrame
+from src.helpers.roi_stats import ROI_STATS_DTYPE
+from src.streaming.streamserver import RAW_FRAME_HEADER, StreamServer
+from src.streaming.websocket import WS_OPCODE_BINARY, WS_OPCODE_CLOSE, WS_OPCODE_TEXT, websocketAcceptKey
+
+def waitFor(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError("Condition not met in time")
+        time.sleep(0.005)
+
+class StreamClient:
+    """
+    A blocking HTTP/WebSocket client for the tests.
+    """
+    def __init__(self, port: int, path: str, websocket: bool = False):
+        self.socket = socket.create_connection(("127.0.0.1", port), timeout=5)
+        self.buffer = b""
+        headers = f"GET {path} HTTP/1.1\r\nHost: localhost\r\n"
+        if websocket:
+            self.key = base64.b64encode(os.urandom(16)).decode("ascii")
+            headers += f"Upgrade: websocket\r\nConnection: Upgrade\r\nSec-WebSocket-Key: {self.key}\r\nSec-WebSocket-Version: 13\r\n"
+        self.socket.sendall((headers + "\r\n").encode("latin-1"))
+        self.status, self.headers = self._readHead()
+
+    def _readExactly(self, count: int) -> bytes:
+        while len(self.buffer) < count:
+            data = self.socket.recv(65536)
+            if not data:
+                raise ConnectionError("Connection closed")
+            self.buffer += data
+        data, self.buffer = self.buffer[:count], self.buffer[count:]
+        return data
+
+    def _readUntil(self, marker: bytes) -> bytes:
+        while marker not in self.buffer:
+            data = self.socket.recv(65536)
+            if not data:
+                raise ConnectionError("Connection closed")
+            self.buffer += data
+        data, _, self.buffer = self.buffer.partition(marker)
+        return data
+
+    def _readHead(self) -> tuple[int, dict[str, str]]:
+        lines = self._readUntil(b"\r\n\r\n").decode("latin-1").split("\r\n")
+        headers = {name.strip().lower(): value.strip() for name, _, value in (line.partition(":") for line in lines[1:])}
+        return int(lines[0].split(" ")[1]), headers
+
+    def readJpeg(self) -> np.ndarray:
+        self._readUntil(f"--{STREAM_MJPEG_BOUNDARY}\r\n".encode("latin-1"))
+        headers = dict(line.split(": ", 1) for line in self._readUntil(b"\r\n\r\n").decode("latin-1").split("\r\n"))
+        return cv2.imdecode(np.frombuffer(self._readExactly(int(headers["Content-Length"])), dtype=np.uint8), cv2.IMREAD_COLOR)
+
+    def readMessage(self) -> tuple[int, bytes]:
+        first, second = self._readExactly(2)
+        length = second & 0x7F
+        if length == 126:
+            length = struct.unpack("!H", self._readExactly(2))[0]
+        elif length == 127:
+            length = struct.unpack("!Q", self._readExactly(8))[0]
+        return first & 0x0F, self._readExactly(length)
+
+    def sendClose(self) -> None:
+        mask = os.urandom(4)
+        payload = struct.pack("!H", 1000)
+        self.socket.sendall(bytes((0x80 | WS_OPCODE_CLOSE, 0x80 | len(payload))) + mask + bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload)))
+
+    def close(self) -> None:
+        self.socket.close()
+
+def makeFrame(index: int, raw: np.ndarray, regions=None) -> ThermalFrame:
+    roiStats = None
+    if regions is not None:
+        roiStats = np.zeros(len(regions), dtype=ROI_STATS_DTYPE)
+        roiStats["max"] = (41.5, np.nan)
+    return ThermalFrame(index=index, timestamp=1000 + index, raw=raw, stats=FrameStats(maxTemp=42.0), regions=regions, roiStats=roiStats)
+
+class StreamServerTests(unittest.TestCase):
+    def setUp(self):
+        self.server = StreamServer(logging.getLogger("StreamServerTests"), port=0, normalizationDivisor=64.0, normalizationOffset=273.15)
+        self.server.start()
+        self.clients: list[StreamClient] = []
+        self.raw = np.random.default_rng(0).integers(17000, 21000, size=(192, 256), dtype=np.uint16)
+        self.view = np.zeros((384, 512, 3), dtype=np.uint8)
+        self.view[100:200, 100:300] = (0, 0, 255)
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.close()
+
+    def _connect(self, path: str, websocket: bool = False) -> StreamClient:
+        client = StreamClient(self.server.port, path, websocket)
+        self.clients.append(client)
+        return client
+
+    def test_mjpeg_is_encoded_once_for_all_clients(self):
+        viewers = [self._connect("/stream.mjpg") for _ in range(3)]
+        self.assertEqual(viewers[0].status, 200)
+        self.assertIn(STREAM_MJPEG_BOUNDARY, viewers[0].headers["content-type"])
+        waitFor(lambda: self.server.viewChannel.clients == 3)
+        self.assertTrue(self.server.wantsView)
+
+        self.server.publishView(self.view)
+        for viewer in viewers:
+            image = viewer.readJpeg()
+            self.assertEqual(image.shape, self.view.shape)
+            self.assertGreater(image[150, 200, 2], 200)
+        self.assertEqual(self.server.viewChannel.encodedFrames, 1)
+
+    def test_raw_websocket(self):
+        self.server.write(makeFrame(0, self.raw)) # No clients yet: nothing is encoded
+        self.assertEqual(self.server.rawChannel.encodedFrames, 0)
+        client = self._connect("/raw", websocket=True)
+        self.assertEqual(client.status, 101)
+        self.assertEqual(client.headers["sec-websocket-accept"], websocketAcceptKey(client.key))
+        opcode, description = client.readMessage()
+        self.assertEqual(opcode, WS_OPCODE_TEXT)
+        description = json.loads(description)
+        self.assertEqual((description["width"], description["height"], description["normalization_divisor"]), (256, 192, 64.0))
+
+        waitFor(lambda: self.server.rawChannel.hasClients)
+        self.server.write(makeFrame(7, self.raw))
+        opcode, message = client.readMessage()
+        self.assertEqual(opcode, WS_OPCODE_BINARY)
+        index, timestamp, height, width = RAW_FRAME_HEADER.unpack_from(message)
+        self.assertEqual((index, timestamp, height, width), (7, 1007, 192, 256))
+        samples = np.frombuffer(message, dtype="<u2", offset=RAW_FRAME_HEADER.size).reshape(height, width)
+        np.testing.assert_array_equal(samples, self.raw)
+
+        client.sendClose()
+        opcode, _ = client.readMessage()
+        self.assertEqual(opcode, WS_OPCODE_CLOSE)
+        waitFor(lambda: not self.server.rawChannel.hasClients)
+
+    def test_stats_websocket(self):
+        client = self._connect("/stats", websocket=True)
+        waitFor(lambda: self.server.statsChannel.hasClients)
+        regions = [RegionOfInterest("bearing", x=0, y=0, width=2, height=2), RegionOfInterest("outside", x=900, y=0, width=2, height=2)]
+        self.server.write(makeFrame(3, self.raw, regions))
+        opcode, message = client.readMessage()
+        self.assertEqual(opcode, WS_OPCODE_TEXT)
+        stats = json.loads(message)
+        self.assertEqual((stats["index"], stats["stats"]["max"]), (3, 42.0))
+        self.assertEqual([(roi["name"], roi["max"]) for roi in stats["rois"]], [("bearing", 41.5), ("outside", None)])
+
+    def test_slow_clients_do_not_hold_back_others(self):
+        slow = self._connect("/raw", websocket=True)
+        slow.socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4096)
+        fast = self._connect("/raw", websocket=True)
+        fast.readMessage()
+        waitFor(lambda: self.server.rawChannel.clients == 2)
+
+        # The slow client never reads; the main loop must never block and the fast client keeps getting the newest frames
+        start = time.perf_counter()
+        for index in range(200):
+            self.server.write(makeFrame(index, self.raw))
+            time.sleep(0.001)
+        self.assertLess(time.perf_counter() - start, 2)
+        received = []
+        while not received or received[-1] != 199:
+            _, message = fast.readMessage()
+            received.append(RAW_FRAME_HEADER.unpack_from(message)[0])
+        self.assertEqual(received, sorted(set(received)))
+        self.assertEqual(self.server.rawChannel.clients, 2)
+
+    def test_plain_requests(self):
+        self.assertEqual(self._connect("/").status, 200)
+        self.assertEqual(self._connect("/missing").status, 404)
+        self.assertEqual(self._connect("/raw").status, 426)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+import logging
+import os
+import sys
+import tempfile
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from benchmarks.bench_pipeline import compareToBaseline
+from benchmarks.synthetic_frames import FRAME_LAYOUTS, SyntheticFrameGenerator
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.enums.FrameLayoutEnum import FrameLayout
+from src.models.deviceinfo import DeviceInfo
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+
+class SyntheticFrameTests(unittest.TestCase):
+    def setUp(self):
+        self.tempDir = tempfile.TemporaryDirectory()
+        self.device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        self.generator = SyntheticFrameGenerator(self.device, hotspots=2)
+        self.controller = ThermalCameraController(device=self.device, logger=logging.getLogger("SyntheticFrameTests"), mediaOutputPath=self.tempDir.name, headless=True, printStats=False)
+
+    def tearDown(self):
+        self.controller.close()
+        self.tempDir.cleanup()
+
+    def test_every_layout_splits_back_to_the_raw_samples(self):
+        raw = self.generator.raw(0)
+        for layout in FRAME_LAYOUTS:
+            with self.subTest(layout=layout):
+                imdata, thdata = self.controller._splitFrameData(self.generator.frameFromRaw(raw, layout), logWarnings=False)
+                if layout == FrameLayout.CONVERTED:
+                    self.assertIsNone(thdata)
+                    continue
+                self.assertEqual(imdata.shape, (192, 256, 2))
+                np.testing.assert_array_equal(self.controller.decodeThermalData(thdata), raw)
+
+    def test_scene_temperatures(self):
+        stats = self.controller.calculateFrameStats(self.generator.raw(5))
+        peak = self.generator.hotspotPositions(5)[np.argmax(self.generator.hotspotPositions(5)[:, 1])] # The background gets warmer to the right
+
+        self.assertAlmostEqual(stats.minTemp, 22, delta=0.5)
+        self.assertGreater(stats.maxTemp, 50)
+        self.assertLessEqual(abs(stats.maxRow - peak[0]) + abs(stats.maxCol - peak[1]), 2)
+
+    def test_regressions_against_baseline(self):
+        baseline = {"decode": 1000.0, "stats": 500.0, "render/x3/JET": 200.0}
+        results = {"decode": 850.0, "stats": 350.0, "split/YUY2": 10.0}
+        self.assertEqual(compareToBaseline(results, baseline, threshold=0.2), ["stats"])
+
+if __name__ == "__main__":
+    unittest.main()
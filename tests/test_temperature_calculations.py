@@ -1,30 +1,43 @@
 import os
 import sys
+import logging
 import unittest
 import numpy as np
-from controllers.thermalcameracontroller import ThermalCameraController
-from enums.TemperatureUnitEnum import TemperatureUnit
-from helpers.conversions import convertTemperatureDeltaForDisplay, convertTemperatureForDisplay
 
 PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
-SRC_ROOT = os.path.join(PROJECT_ROOT, "src")
 
-if SRC_ROOT not in sys.path:
-    sys.path.insert(0, SRC_ROOT)
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.controllers.thermalcameracontroller import ThermalCameraController
+from src.enums.TemperatureUnitEnum import TemperatureUnit
+from src.enums.ThermalByteOrderEnum import ThermalByteOrder
+from src.helpers.conversions import convertTemperatureDeltaForDisplay, convertTemperatureForDisplay
+from src.helpers.frame_layout import FrameSplitter
+from src.helpers.hot_path_logging import HotPathLogger
+from src.helpers.thermal_decoding import decodeRawThermalData
+from src.models.deviceinfo import DeviceInfo
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
 
 class TemperatureCalculationTests(unittest.TestCase):
     def setUp(self):
         self.controller = ThermalCameraController.__new__(ThermalCameraController)
+        self.controller.logger = logging.getLogger("tests")
+        self.controller._hotPathLogger = HotPathLogger(self.controller.logger)
+        self.controller._deviceInfo = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
         self.controller._width = 256
         self.controller._height = 192
+        self.controller._rawField = None
         self.controller._didLogFrameLayoutWarning = False
+        self.controller._frameSplitter = FrameSplitter(width=256, height=192, logger=self.controller.logger)
 
     def test_normalize_temperature(self):
         normalized = self.controller.normalizeTemperature(rawTemp=19200)
         self.assertAlmostEqual(normalized, 26.85, places=2)
 
     def test_calculate_raw_temperature_from_center_pixel(self):
-        thdata = np.zeros((192, 256, 3), dtype=np.uint8)
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
         thdata[96, 128, 0] = 10
         thdata[96, 128, 1] = 2
 
@@ -33,7 +46,7 @@ class TemperatureCalculationTests(unittest.TestCase):
         self.assertEqual(raw, 522)
 
     def test_calculate_average_temperature(self):
-        thdata = np.zeros((192, 256, 3), dtype=np.uint8)
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
         thdata[..., 0] = 10
         thdata[..., 1] = 2
 
@@ -43,7 +56,7 @@ class TemperatureCalculationTests(unittest.TestCase):
         self.assertEqual(avg_temp, expected)
 
     def test_calculate_minimum_temperature_tracks_position(self):
-        thdata = np.zeros((192, 256, 3), dtype=np.uint8)
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
         thdata[..., 1] = 5
         thdata[20, 30, 1] = 1
         thdata[20, 30, 0] = 7
@@ -52,10 +65,12 @@ class TemperatureCalculationTests(unittest.TestCase):
 
         expected = round(((1 * 256 + 7) / 64) - 273.15, 2)
         self.assertEqual(min_temp, expected)
-        self.assertEqual((self.controller._lcol, self.controller._lrow), (20, 30))
+        stats = self.controller.calculateFrameStats(thdata)
+        self.assertEqual(stats.minTemp, expected)
+        self.assertEqual((stats.minRow, stats.minCol), (20, 30))
 
     def test_calculate_maximum_temperature_tracks_position(self):
-        thdata = np.zeros((192, 256, 3), dtype=np.uint8)
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
         thdata[..., 1] = 25
         thdata[80, 100, 1] = 200
         thdata[80, 100, 0] = 9
@@ -64,7 +79,71 @@ class TemperatureCalculationTests(unittest.TestCase):
 
         expected = round(((200 * 256 + 9) / 64) - 273.15, 2)
         self.assertEqual(max_temp, expected)
-        self.assertEqual((self.controller._mcol, self.controller._mrow), (80, 100))
+        stats = self.controller.calculateFrameStats(thdata)
+        self.assertEqual(stats.maxTemp, expected)
+        self.assertEqual((stats.maxRow, stats.maxCol), (80, 100))
+
+    def test_calculate_maximum_temperature_uses_low_byte(self):
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
+        thdata[..., 1] = 25
+        thdata[10, 12, 0] = 3
+        thdata[150, 200, 0] = 4
+
+        max_temp = self.controller.calculateMaximumTemperature(thdata)
+
+        expected = round(((25 * 256 + 4) / 64) - 273.15, 2)
+        self.assertEqual(max_temp, expected)
+        stats = self.controller.calculateFrameStats(thdata)
+        self.assertEqual((stats.maxRow, stats.maxCol), (150, 200))
+
+    def test_calculate_frame_stats_average_handles_low_byte_carry(self):
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
+        thdata[:96, :, 0] = 255
+        thdata[:96, :, 1] = 1
+        thdata[96:, :, 0] = 1
+        thdata[96:, :, 1] = 2
+
+        stats = self.controller.calculateFrameStats(thdata)
+
+        expected = round(((((1 * 256 + 255) + (2 * 256 + 1)) / 2) / 64) - 273.15, 2)
+        self.assertEqual(stats.avgTemp, expected)
+        self.assertEqual(stats.avgTemp, self.controller.calculateAverageTemperature(thdata))
+
+    def test_calculate_frame_stats_matches_numpy(self):
+        rng = np.random.default_rng(0)
+        raw = rng.integers(17000, 20000, size=(192, 256), dtype=np.uint16)
+
+        stats = self.controller.calculateFrameStats(raw)
+
+        p1, p50, p99 = np.percentile(raw, [1, 50, 99], method="inverted_cdf")
+        self.assertAlmostEqual(stats.avgTemp, (raw.mean() / 64) - 273.15, places=2)
+        self.assertAlmostEqual(stats.stdTemp, raw.std() / 64, places=2)
+        self.assertEqual(stats.minTemp, round((int(raw.min()) / 64) - 273.15, 2))
+        self.assertEqual(stats.maxTemp, round((int(raw.max()) / 64) - 273.15, 2))
+        self.assertEqual((stats.p1Temp, stats.p50Temp, stats.p99Temp), tuple(round((p / 64) - 273.15, 2) for p in (p1, p50, p99)))
+        self.assertEqual(stats.centerTemp, round((int(raw[96, 128]) / 64) - 273.15, 2))
+
+    def test_decode_raw_thermal_data_is_zero_copy_view(self):
+        frame = np.zeros((384, 256, 2), dtype=np.uint8)
+        frame[192 + 5, 7, 0] = 10
+        frame[192 + 5, 7, 1] = 2
+        thdata = frame[192:, :, :]
+
+        raw = decodeRawThermalData(thdata, ThermalByteOrder.LSB_BYTE_0)
+
+        self.assertEqual(raw.shape, (192, 256))
+        self.assertEqual(raw[5, 7], 522)
+        self.assertTrue(np.shares_memory(raw, frame))
+
+    def test_decode_raw_thermal_data_honours_swapped_byte_order(self):
+        thdata = np.zeros((192, 256, 2), dtype=np.uint8)
+        thdata[5, 7, 0] = 2
+        thdata[5, 7, 1] = 10
+
+        raw = decodeRawThermalData(thdata, ThermalByteOrder.LSB_BYTE_1)
+
+        self.assertEqual(raw.dtype, np.uint16)
+        self.assertEqual(raw[5, 7], 522)
 
     def test_convert_temperature_for_display_fahrenheit(self):
         converted = convertTemperatureForDisplay(0, TemperatureUnit.FAHRENHEIT)
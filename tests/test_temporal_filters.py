@@ -0,0 +1,74 @@
+import os
+import sys
+import unittest
+import numpy as np
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from src.enums.TemporalFilterEnum import TemporalFilter
+from src.helpers.temporalfilters import EmaFilter, MotionAdaptiveFilter, RunningMeanFilter, createTemporalFilter, estimateNetdMk
+from src.models.deviceinfo import DeviceInfo
+
+DEVICE_JSON_PATH = os.path.join(PROJECT_ROOT, "devices", "TC001.json")
+HEIGHT, WIDTH = 48, 64
+SCENE_RAW = 19000
+
+def staticScene(frames: int, netdMk: float, d: float, seed: int = 0) -> np.ndarray:
+    """
+    A static scene with the temporal noise of a sensor with the given NETD.
+    """
+    noise = np.random.default_rng(seed).normal(0, netdMk / 1000 * d, (frames, HEIGHT, WIDTH))
+    return np.clip(np.rint(SCENE_RAW + noise), 0, 65535).astype(np.uint16)
+
+def filterAll(temporalFilter, frames: np.ndarray) -> np.ndarray:
+    return np.array([temporalFilter.apply(frame).copy() for frame in frames])
+
+class TemporalFilterTests(unittest.TestCase):
+    def setUp(self):
+        device = DeviceInfo.createFromJson(DEVICE_JSON_PATH)
+        self.d = device.misc.normalization_divisor
+        self.netdMk = device.specs.imaging.netd_mk
+        self.frames = staticScene(400, self.netdMk, self.d)
+
+    def test_filters_reduce_the_netd(self):
+        unfiltered = estimateNetdMk(self.frames, self.d)
+        self.assertAlmostEqual(unfiltered, self.netdMk, delta=self.netdMk * 0.1)
+        # Skip the frames the filters need to settle
+        ema = estimateNetdMk(filterAll(EmaFilter(0.2), self.frames)[50:], self.d)
+        self.assertAlmostEqual(ema, unfiltered * np.sqrt(0.2 / 1.8), delta=unfiltered * 0.1)
+        mean = estimateNetdMk(filterAll(RunningMeanFilter(8), self.frames)[50:], self.d)
+        self.assertAlmostEqual(mean, unfiltered / np.sqrt(8), delta=unfiltered * 0.1)
+        adaptive = estimateNetdMk(filterAll(MotionAdaptiveFilter(0.2, 0.5 * self.d), self.frames)[50:], self.d)
+        self.assertLess(adaptive, unfiltered * 0.5)
+
+    def test_motion_adaptive_follows_steps(self):
+        step = np.full((40, HEIGHT, WIDTH), SCENE_RAW, dtype=np.uint16)
+        step[20:] += int(5 * self.d) # The scene warms up by 5 °C at once
+        adaptive = filterAll(MotionAdaptiveFilter(0.2, 0.5 * self.d), step)
+        ema = filterAll(EmaFilter(0.2), step)
+        np.testing.assert_array_equal(adaptive[20], step[20])
+        self.assertLess(ema[20, 0, 0], SCENE_RAW + 2 * self.d)
+
+    def test_running_mean_is_exact(self):
+        runningMean = RunningMeanFilter(5)
+        filtered = filterAll(runningMean, self.frames[:100])
+        for index in (0, 3, 4, 50, 99):
+            expected = np.rint(self.frames[max(index - 4, 0):index + 1].astype(np.float64).mean(axis=0))
+            np.testing.assert_array_equal(filtered[index], expected)
+
+        runningMean.reset()
+        np.testing.assert_array_equal(runningMean.apply(self.frames[0]), self.frames[0])
+        with self.assertRaises(ValueError):
+            RunningMeanFilter(0)
+
+    def test_create_filter(self):
+        self.assertIsNone(createTemporalFilter(TemporalFilter.NONE))
+        self.assertIsInstance(createTemporalFilter(TemporalFilter.EMA, alpha=0.5), EmaFilter)
+        self.assertEqual(createTemporalFilter(TemporalFilter.RUNNING_MEAN, frames=4).frames, 4)
+        self.assertEqual(createTemporalFilter(TemporalFilter.MOTION_ADAPTIVE, motionThresholdC=2.0, d=64.0).motionThreshold, 128.0)
+
+if __name__ == "__main__":
+    unittest.main()